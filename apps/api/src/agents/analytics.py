@@ -229,6 +229,7 @@ async def _llm_fallback_answer(query: str, guild_id: int) -> str:
     """
     try:
         from langchain_core.messages import SystemMessage, HumanMessage
+        from apps.api.src.core.answer_stream import ainvoke_answer
         from apps.api.src.core.config import get_settings
         from apps.api.src.core.llm_factory import get_llm
         
@@ -243,7 +244,7 @@ Unfortunately, the database is not currently available to run queries.
 Politely explain that you cannot retrieve the specific data they requested because the database is offline.
 Suggest they try again later or ask a general knowledge question instead."""
 
-        response = await llm.ainvoke([
+        response = await ainvoke_answer(llm, [
             SystemMessage(content=system_prompt),
             HumanMessage(content=query),
         ])
@@ -297,6 +298,7 @@ async def process_analytics_query(
             sources=[],
             routed_to=RouterIntent.ANALYTICS_DB,
             execution_time_ms=(time.time() - start_time) * 1000,
+            error=True,
         )
     
     # Try to execute against database
@@ -316,4 +318,5 @@ async def process_analytics_query(
         sources=[],
         routed_to=RouterIntent.ANALYTICS_DB,
         execution_time_ms=execution_time,
+        error=results is None,  # LLM fallback: the database was unavailable
     )
@@ -15,19 +15,37 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
 
 from sqlalchemy import create_engine, text
 
+from packages.database.qdrant_schema import DM_MEMORY_COLLECTION
 
-# Embedding model for semantic search
+
+# Embedding model for semantic search (dm_memory collection is 384-dim)
+DM_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 _embedding_model = None
 
 def get_embedding_model():
     """Get or create the embedding model."""
     global _embedding_model
     if _embedding_model is None:
-        from sentence_transformers import SentenceTransformer
-        _embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        from apps.api.src.core.llm_factory import load_local_sentence_model
+        _embedding_model = load_local_sentence_model(DM_EMBEDDING_MODEL)
     return _embedding_model
 
 
+def embed_texts(texts: list[str]) -> list[list[float]]:
+    """
+    Embed texts with the DM model, in one batch.
+    
+    Uses the shared embedding server when configured instead of loading
+    another model copy into this process.
+    """
+    from apps.api.src.services.embedding_client import get_embedding_server_client
+    
+    client = get_embedding_server_client()
+    if client is not None:
+        return client.embed_dense(texts, DM_EMBEDDING_MODEL)
+    return [emb.tolist() for emb in get_embedding_model().encode(texts)]
+
+
 def get_db_engine():
     """Get database engine."""
     from apps.api.src.core.config import get_settings
@@ -37,28 +55,16 @@ def get_db_engine():
 
 
 def get_qdrant_client():
-    """Get Qdrant client."""
-    from qdrant_client import QdrantClient
-    from apps.api.src.core.config import get_settings
-    settings = get_settings()
-    return QdrantClient(url=settings.qdrant_url)
+    """Get the shared Qdrant client."""
+    from apps.api.src.services.qdrant_service import qdrant_service
+    return qdrant_service.get_client()
 
 
 def ensure_dm_collection():
-    """Ensure the DM memory collection exists in Qdrant."""
+    """Ensure the DM memory collection exists in Qdrant (checked once per process)."""
     try:
-        from qdrant_client.models import Distance, VectorParams
-        client = get_qdrant_client()
-        
-        collections = client.get_collections().collections
-        collection_names = [c.name for c in collections]
-        
-        if "dm_memory" not in collection_names:
-            client.create_collection(
-                collection_name="dm_memory",
-                vectors_config=VectorParams(size=384, distance=Distance.COSINE),
-            )
-            print("Created dm_memory collection in Qdrant")
+        from apps.api.src.services.qdrant_service import qdrant_service
+        qdrant_service.registry.ensure(DM_MEMORY_COLLECTION)
         return True
     except Exception as e:
         print(f"Qdrant not available: {e}")
@@ -111,22 +117,20 @@ def embed_dm_message(
     """Embed a DM message in Qdrant for semantic retrieval."""
     try:
         from qdrant_client.models import PointStruct
+        from apps.api.src.services.qdrant_service import qdrant_service
         
         if not ensure_dm_collection():
             return False
         
-        model = get_embedding_model()
-        client = get_qdrant_client()
-        
         # Create embedding
-        embedding = model.encode(content).tolist()
+        embedding = embed_texts([content])[0]
         
         # Generate UUID for the point
         point_id = str(uuid.uuid4())
         
         # Store in Qdrant with user_id for filtering
-        client.upsert(
-            collection_name="dm_memory",
+        qdrant_service.run(DM_MEMORY_COLLECTION, lambda client: client.upsert(
+            collection_name=DM_MEMORY_COLLECTION,
             points=[
                 PointStruct(
                     id=point_id,
@@ -140,7 +144,7 @@ def embed_dm_message(
                     }
                 )
             ]
-        )
+        ))
         
         # Update PostgreSQL with point ID
         engine = get_db_engine()
@@ -172,20 +176,19 @@ def retrieve_relevant_context(
     Uses semantic search to find relevant past messages.
     """
     try:
+        from apps.api.src.services.qdrant_service import qdrant_service
+        
         if not ensure_dm_collection():
             return []
         
-        model = get_embedding_model()
-        client = get_qdrant_client()
-        
         # Create query embedding
-        query_embedding = model.encode(query).tolist()
+        query_embedding = embed_texts([query])[0]
         
         # Search with user_id filter
         from qdrant_client.models import Filter, FieldCondition, MatchValue
         
-        results = client.search(
-            collection_name="dm_memory",
+        results = qdrant_service.run(DM_MEMORY_COLLECTION, lambda client: client.search(
+            collection_name=DM_MEMORY_COLLECTION,
             query_vector=query_embedding,
             query_filter=Filter(
                 must=[
@@ -197,7 +200,7 @@ def retrieve_relevant_context(
             ),
             limit=limit,
             score_threshold=0.3,  # Only return reasonably relevant results
-        )
+        ))
         
         return [
             {
@@ -224,9 +227,6 @@ def get_user_server_context(
     Searches messages the user sent in server channels for context.
     """
     try:
-        model = get_embedding_model()
-        query_embedding = model.encode(query).tolist()
-        
         # Search user's server messages in database
         engine = get_db_engine()
         with engine.connect() as conn:
@@ -254,11 +254,14 @@ def get_user_server_context(
         if not messages:
             return []
         
+        # Query and all candidate messages in one batch
+        embeddings = embed_texts([query] + [msg["content"] for msg in messages])
+        query_embedding = embeddings[0]
+        
         # Score messages by semantic similarity
         import math
         scored = []
-        for msg in messages:
-            msg_embedding = model.encode(msg["content"]).tolist()
+        for msg, msg_embedding in zip(messages, embeddings[1:], strict=True):
             # Proper cosine similarity with normalization
             dot_product = sum(a * b for a, b in zip(query_embedding, msg_embedding))
             norm_q = math.sqrt(sum(a * a for a in query_embedding))
@@ -35,6 +35,7 @@ async def process_general_knowledge_query(
     """
     start_time = time.time()
     web_context = ""
+    error = False
     
     # Optionally fetch web search context
     if enable_web_search:
@@ -44,6 +45,7 @@ async def process_general_knowledge_query(
         from langchain_core.messages import SystemMessage, HumanMessage
         
         from apps.api.src.core.config import get_settings
+        from apps.api.src.core.answer_stream import ainvoke_answer
         from apps.api.src.core.llm_factory import get_llm
         
         settings = get_settings()
@@ -53,6 +55,7 @@ async def process_general_knowledge_query(
                 sources=[],
                 routed_to=RouterIntent.GENERAL_KNOWLEDGE,
                 execution_time_ms=(time.time() - start_time) * 1000,
+                error=True,
             )
         
         llm = get_llm(temperature=0.3)
@@ -83,7 +86,7 @@ For time-related questions, provide the answer using the timestamp above. Conver
 
 For factual questions, provide accurate answers based on your knowledge. If you're genuinely uncertain about something, say so.{web_section}{pre_prompt_section}"""
 
-        response = await llm.ainvoke([
+        response = await ainvoke_answer(llm, [
             SystemMessage(content=system_prompt),
             HumanMessage(content=query),
         ])
@@ -92,8 +95,10 @@ For factual questions, provide accurate answers based on your knowledge. If you'
         
     except ImportError:
         answer = "LangChain is not available. Please install it to enable general knowledge queries."
+        error = True
     except Exception as e:
         answer = f"Error processing query: {str(e)}"
+        error = True
     
     execution_time = (time.time() - start_time) * 1000
     
@@ -102,6 +107,7 @@ For factual questions, provide accurate answers based on your knowledge. If you'
         sources=[],
         routed_to=RouterIntent.GENERAL_KNOWLEDGE,
         execution_time_ms=execution_time,
+        error=error,
     )
 
 
@@ -10,7 +10,7 @@ Used when a single source isn't sufficient for a complete answer.
 """
 
 import time
-from typing import Optional
+from typing import Any, Optional
 import asyncio
 
 import sys
@@ -19,9 +19,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
 
 from packages.shared.python.models import (
     AskResponse,
+    ErrorAnswer,
     MessageSource,
     RouterIntent,
 )
+from apps.api.src.core.answer_stream import emit_sources
 
 
 async def process_hybrid_query(
@@ -32,6 +34,7 @@ async def process_hybrid_query(
     include_vector: bool = True,
     include_web: bool = True,
     include_knowledge: bool = True,
+    time_range: Optional[Any] = None,
 ) -> AskResponse:
     """
     Process a query using multiple sources for a comprehensive answer.
@@ -44,6 +47,7 @@ async def process_hybrid_query(
         include_vector: Whether to search Discord context
         include_web: Whether to search the web
         include_knowledge: Whether to use general LLM knowledge
+        time_range: Optional TimeRange for the vector search
         
     Returns:
         Combined response with sources from all used pipelines
@@ -68,7 +72,7 @@ async def process_hybrid_query(
     
     # Gather context from multiple sources in parallel
     if include_vector:
-        tasks.append(("vector", _get_vector_context(query, guild_id, channel_ids)))
+        tasks.append(("vector", _get_vector_context(query, guild_id, channel_ids, time_range)))
     
     if include_web:
         tasks.append(("web", _get_web_context(query)))
@@ -93,6 +97,8 @@ async def process_hybrid_query(
     if include_knowledge:
         sources_used.append("knowledge")
     
+    emit_sources(all_sources)
+    
     # Generate final answer using all context
     combined_context = "\n\n".join(context_sections) if context_sections else ""
     
@@ -114,6 +120,7 @@ async def process_hybrid_query(
         sources=all_sources,
         routed_to=routing_label,  # Dynamic label like "vector + knowledge"
         execution_time_ms=execution_time,
+        error=isinstance(answer, ErrorAnswer),
     )
 
 
@@ -121,6 +128,7 @@ async def _get_vector_context(
     query: str,
     guild_id: int,
     channel_ids: Optional[list[int]] = None,
+    time_range: Optional[Any] = None,
 ) -> tuple[str, list[MessageSource]]:
     """Get context from vector search (Discord messages/documents)."""
     try:
@@ -132,6 +140,7 @@ async def _get_vector_context(
             guild_id=guild_id,
             channel_ids=channel_ids,
             limit=5,
+            time_range=time_range,
         )
         
         if not results:
@@ -242,14 +251,15 @@ async def _generate_combined_answer(
         from datetime import datetime, timezone
         
         from apps.api.src.core.config import get_settings
+        from apps.api.src.core.answer_stream import ainvoke_answer
         from apps.api.src.core.llm_factory import get_llm
         from apps.api.src.core.pre_prompt import get_guild_pre_prompt
         
         settings = get_settings()
         if not settings.active_llm_api_key:
             if context:
-                return f"Based on available context:\n\n{context[:1000]}"
-            return "I need an LLM API key configured to answer this question."
+                return ErrorAnswer(f"Based on available context:\n\n{context[:1000]}")
+            return ErrorAnswer("I need an LLM API key configured to answer this question.")
         
         llm = get_llm(temperature=0.3)
         
@@ -288,7 +298,7 @@ Current date and time: {current_time}{conversation_section}
 
 Answer the question using your knowledge. If you're uncertain about something, say so.{pre_prompt_section}"""
         
-        response = await llm.ainvoke([
+        response = await ainvoke_answer(llm, [
             SystemMessage(content=system_prompt),
             HumanMessage(content=query),
         ])
@@ -297,5 +307,5 @@ Answer the question using your knowledge. If you're uncertain about something, s
         
     except Exception as e:
         if context:
-            return f"Based on available context:\n\n{context[:1000]}"
-        return f"Error generating response: {str(e)}"
+            return ErrorAnswer(f"Based on available context:\n\n{context[:1000]}")
+        return ErrorAnswer(f"Error generating response: {str(e)}")
@@ -0,0 +1,228 @@
+"""
+Embedding Intent Classifier - Local routing for queries the patterns miss.
+
+Picking one of five labels with a full LLM call costs hundreds of
+milliseconds and a paid request before any real work starts. Instead, the
+query is embedded with the configured embedding model and compared with one
+centroid per intent (the normalized mean of its labeled examples, see
+intent_examples). The query embedding goes through the embedding cache, so
+vector search reuses it when the query is routed to RAG.
+
+Confidence is the softmax of the cosine similarities (temperature
+SOFTMAX_TEMPERATURE). Below the configured threshold the router still asks
+the LLM.
+
+The process-wide classifier is rebuilt when the settings version changes
+(PUT /settings/provider can switch the embedding model), and a failed fit
+is not retried for FIT_RETRY_SECONDS.
+
+Results of both the classifier and the LLM are kept in an IntentCache
+(in-process LRU keyed by the normalized query).
+"""
+
+import asyncio
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import numpy as np
+
+from packages.shared.python.models import RouterIntent
+
+
+# Cosine similarities sit close together; this spreads them into probabilities
+SOFTMAX_TEMPERATURE = 0.05
+FIT_RETRY_SECONDS = 30.0  # Back-off after the examples failed to embed
+
+
+@dataclass
+class IntentPrediction:
+    """Nearest-centroid result for one query."""
+    intent: RouterIntent
+    confidence: float  # Softmax probability of intent
+    scores: dict[str, float] = field(default_factory=dict)  # Cosine similarity per intent
+
+
+class EmbeddingIntentClassifier:
+    """
+    Nearest-centroid classifier over query embeddings.
+
+    Usage:
+        classifier = EmbeddingIntentClassifier(INTENT_EXAMPLES)
+        prediction = await classifier.aclassify("who talks the most here?")
+    """
+
+    def __init__(
+        self,
+        examples: dict[RouterIntent, list[str]],
+        embed_queries: Optional[Callable[[list[str]], list[list[float]]]] = None,
+        aembed_query: Optional[Callable] = None,
+    ):
+        """
+        Args:
+            examples: Labeled queries per intent
+            embed_queries: Batch embedder for the examples (default: embedding model)
+            aembed_query: Async embedder for queries (default: embedding model)
+        """
+        self.examples = examples
+        self._embed_queries = embed_queries
+        self._aembed_query = aembed_query
+        self._intents: list[RouterIntent] = []
+        self._centroids: Optional[np.ndarray] = None
+        self._fit_lock = threading.Lock()
+        self._retry_at = 0.0
+
+    @property
+    def fitted(self) -> bool:
+        return self._centroids is not None
+
+    def fit(self) -> None:
+        """
+        Embed the examples (one batch) and compute the intent centroids.
+
+        Raises if embedding fails; further calls raise without embedding
+        until FIT_RETRY_SECONDS have passed.
+        """
+        with self._fit_lock:
+            if self._centroids is not None:
+                return
+            wait = self._retry_at - time.monotonic()
+            if wait > 0:
+                raise RuntimeError(f"intent examples failed to embed, retrying in {wait:.0f}s")
+
+            embed_queries = self._embed_queries
+            if embed_queries is None:
+                from apps.api.src.core.llm_factory import get_embedding_model
+                embed_queries = get_embedding_model().embed_queries
+
+            intents = [intent for intent, texts in self.examples.items() if texts]
+            texts = [text for intent in intents for text in self.examples[intent]]
+            try:
+                vectors = _normalize(np.asarray(embed_queries(texts), dtype=np.float32))
+            except Exception:
+                self._retry_at = time.monotonic() + FIT_RETRY_SECONDS
+                raise
+
+            centroids = []
+            start = 0
+            for intent in intents:
+                count = len(self.examples[intent])
+                centroids.append(vectors[start:start + count].mean(axis=0))
+                start += count
+
+            self._intents = intents
+            self._centroids = _normalize(np.stack(centroids))
+
+    def predict(self, query_vector: list[float]) -> IntentPrediction:
+        """Classify an embedded query."""
+        if self._centroids is None:
+            self.fit()
+
+        query = _normalize(np.asarray(query_vector, dtype=np.float32)[None, :])[0]
+        similarities = self._centroids @ query
+        logits = (similarities - similarities.max()) / SOFTMAX_TEMPERATURE
+        probabilities = np.exp(logits) / np.exp(logits).sum()
+
+        best = int(np.argmax(similarities))
+        return IntentPrediction(
+            intent=self._intents[best],
+            confidence=float(probabilities[best]),
+            scores={intent.value: round(float(score), 4) for intent, score in zip(self._intents, similarities, strict=True)},
+        )
+
+    async def aclassify(self, query: str) -> IntentPrediction:
+        """Embed and classify a query from async code."""
+        if self._centroids is None:
+            await asyncio.to_thread(self.fit)
+
+        aembed_query = self._aembed_query
+        if aembed_query is None:
+            from apps.api.src.core.llm_factory import get_embedding_model
+            aembed_query = get_embedding_model().aembed_query
+
+        return self.predict(await aembed_query(query))
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the intent."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!. ").lower()
+
+
+class IntentCache:
+    """Thread-safe LRU of normalized query -> intent."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, RouterIntent] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query: str) -> Optional[RouterIntent]:
+        key = normalize_query(query)
+        with self._lock:
+            intent = self._entries.get(key)
+            if intent is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return intent
+
+    def put(self, query: str, intent: RouterIntent) -> None:
+        if self.max_entries <= 0:
+            return
+        key = normalize_query(query)
+        with self._lock:
+            self._entries[key] = intent
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_classifiers: dict[int, EmbeddingIntentClassifier] = {}
+_intent_cache: Optional[IntentCache] = None
+
+
+def get_intent_classifier() -> EmbeddingIntentClassifier:
+    """
+    Process-wide classifier trained on INTENT_EXAMPLES (fitted on first use).
+
+    Built once per settings version, so centroids are refit with the new
+    embedding model after a provider change.
+    """
+    global _classifiers
+    from apps.api.src.core.config import get_settings_version
+
+    version = get_settings_version()
+    classifier = _classifiers.get(version)
+    if classifier is None:
+        from apps.api.src.agents.intent_examples import INTENT_EXAMPLES
+        classifier = EmbeddingIntentClassifier(INTENT_EXAMPLES)
+        # Centroids from older settings are dropped
+        _classifiers = {version: classifier}
+    return classifier
+
+
+def get_intent_cache() -> IntentCache:
+    """Process-wide classification cache."""
+    global _intent_cache
+    if _intent_cache is None:
+        from apps.api.src.core.config import get_settings
+        _intent_cache = IntentCache(get_settings().intent_cache_entries)
+    return _intent_cache
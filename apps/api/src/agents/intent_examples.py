@@ -0,0 +1,105 @@
+"""
+Labeled routing examples for the embedding intent classifier.
+
+Each intent's centroid is the mean embedding of its examples (see
+intent_classifier). The classifier only sees queries no regex in router.py
+matched, so most examples are phrasings the patterns miss. The first
+examples of analytics_db, vector_rag and web_search are the cases from
+tests/repro_routing.py.
+
+Add a misrouted query here under its correct intent to fix it; keep the
+lists roughly balanced so no centroid dominates.
+"""
+
+from packages.shared.python.models import RouterIntent
+
+
+INTENT_EXAMPLES: dict[RouterIntent, list[str]] = {
+    RouterIntent.ANALYTICS_DB: [
+        # tests/repro_routing.py
+        "Who spoke most?",
+        "How many messages were sent last week?",
+        "What's the most active channel?",
+        "Show me message counts by user",
+        "Which users are most active between 9am and 5pm?",
+        # Phrasings the patterns miss
+        "Who talks the most here?",
+        "Who posts the most in general?",
+        "Which channel gets the least traffic?",
+        "When is the server busiest?",
+        "What time of day do people chat the most?",
+        "Who joined most recently?",
+        "Rank everyone by how much they've posted",
+        "Which day had the most conversation?",
+        "Is the server getting more or less active?",
+        "Who hasn't said anything in a month?",
+    ],
+    RouterIntent.VECTOR_RAG: [
+        # tests/repro_routing.py
+        "What are the main complaints?",
+        "Summarize the discussion about the new feature",
+        "What has been said about performance issues?",
+        "Find messages where people discussed deployment",
+        # Phrasings the patterns miss
+        "What did we decide about the release date?",
+        "Did anyone figure out the login bug?",
+        "Why did Sam leave the project?",
+        "Catch me up on what happened in dev-chat",
+        "Has anyone shared a link to the design doc?",
+        "What was the fix for the database timeout?",
+        "Which library did the team pick for auth?",
+        "Remind me what Alex proposed for the API",
+        "Any updates on the migration?",
+        "What were people arguing about yesterday?",
+    ],
+    RouterIntent.GRAPH_RAG: [
+        "What are the main topics people discuss?",
+        "What are common complaints?",
+        "Overview of server discussions",
+        "What is this community mostly about?",
+        "What kind of stuff gets talked about here?",
+        "Give me the big picture of the server",
+        "What themes keep coming up across channels?",
+        "How do people generally feel about the project?",
+        "What's the vibe of this server?",
+        "What recurring problems do members run into?",
+        "Which subjects dominate the conversation?",
+        "How has the conversation shifted over time?",
+        "What are the hot topics lately?",
+        "What does this community care about most?",
+    ],
+    RouterIntent.WEB_SEARCH: [
+        # tests/repro_routing.py
+        "What is the latest news about Python 3.13?",
+        "How do I configure nginx for websockets?",
+        "What's the current price of Bitcoin?",
+        # Phrasings the patterns miss
+        "Who won the game last night?",
+        "Is GitHub down right now?",
+        "What's the weather in Berlin?",
+        "When does the next iPhone come out?",
+        "What changed in the newest Node.js release?",
+        "Are there any known outages on AWS today?",
+        "What's the exchange rate from euros to dollars?",
+        "Did the Rust 2024 edition ship yet?",
+        "What are the release notes for Django 5?",
+        "What's trending on Hacker News?",
+        "How much does a Discord Nitro subscription cost now?",
+    ],
+    RouterIntent.GENERAL_KNOWLEDGE: [
+        "How many states are in the US?",
+        "What is the capital of France?",
+        "Who wrote Romeo and Juliet?",
+        "What's the difference between TCP and UDP?",
+        "Explain recursion like I'm five",
+        "What does HTTP 418 mean?",
+        "Write a haiku about autumn",
+        "How does a hash map work?",
+        "What's a good name for a cat?",
+        "Translate 'good morning' into Spanish",
+        "Why is the sky blue?",
+        "What is a closure in JavaScript?",
+        "Give me a fun fact",
+        "How many bytes are in a kilobyte?",
+    ],
+}
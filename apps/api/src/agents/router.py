@@ -7,10 +7,13 @@ Routes user queries to the appropriate processing pipeline:
 - web_search: External information queries → Web search API
 
 Uses a lightweight classifier that can work without LLM for common patterns,
-falling back to LLM classification for ambiguous queries.
+then an embedding nearest-centroid classifier (see intent_classifier), and
+falls back to LLM classification only when that one isn't confident.
 """
 
 import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import sys
@@ -99,57 +102,277 @@ CONVERSATIONAL_PATTERNS: list[re.Pattern[str]] = [
 ]
 
 
-def _is_conversational(query: str) -> bool:
-    """Check if the query is a conversational statement, not a question."""
-    # Check for question indicators
-    query_stripped = query.strip()
+# Hybrid routing signals (see should_use_hybrid)
+HYBRID_CONTEXT_PATTERNS: list[re.Pattern[str]] = [
+    # Patterns that suggest needing Discord context
+    re.compile(r"\b(file|document|pdf|attachment|uploaded|shared)\b", re.IGNORECASE),
+    re.compile(r"\b(said|mentioned|discussed|talked about)\b", re.IGNORECASE),
+    re.compile(r"\b(in (this|the) (server|channel|chat))\b", re.IGNORECASE),
+    re.compile(r"\[Attachments?:", re.IGNORECASE),
+]
+
+HYBRID_WEB_PATTERNS: list[re.Pattern[str]] = [
+    # Patterns that suggest needing web search
+    re.compile(r"\b(latest|current|recent|now|today)\b", re.IGNORECASE),
+    re.compile(r"\b(how (do|does|to|can I))\b", re.IGNORECASE),
+    re.compile(r"\b(what is|who is|where is)\b", re.IGNORECASE),
+    re.compile(r"\b(explain|define|meaning of)\b", re.IGNORECASE),
+]
+
+HYBRID_META_PATTERNS: list[re.Pattern[str]] = [
+    # Meta questions about the bot's capabilities
+    re.compile(r"\b(can you|are you able|do you)\b.*\b(see|read|access|view)\b", re.IGNORECASE),
+    re.compile(r"\b(what (can|do) you)\b", re.IGNORECASE),
+    re.compile(r"\b(your capabilities|how do you work)\b", re.IGNORECASE),
+]
+
+# Intent pattern families in precedence order (most specific first)
+INTENT_PATTERN_FAMILIES: list[tuple[RouterIntent, list[re.Pattern[str]]]] = [
+    (RouterIntent.ANALYTICS_DB, ANALYTICS_PATTERNS),
+    (RouterIntent.GRAPH_RAG, GRAPH_RAG_PATTERNS),  # Thematic/broad queries
+    (RouterIntent.WEB_SEARCH, WEB_SEARCH_PATTERNS),  # External info
+    (RouterIntent.VECTOR_RAG, VECTOR_RAG_PATTERNS),
+]
+
+
+@dataclass
+class RouteMatch:
+    """What the routing patterns say about a query (see RoutingEngine.route)."""
+    use_hybrid: bool = False
+    include_vector: bool = False
+    include_web: bool = False
+    include_knowledge: bool = True
+    conversational: bool = False  # A statement, not a question
+    intent: Optional[RouterIntent] = None  # None if no intent pattern matched
+    pattern: Optional[str] = None  # Matching intent pattern, e.g. "analytics_db_2" (family_index)
+    
+    @property
+    def hybrid_config(self) -> dict:
+        """should_use_hybrid() result."""
+        return {
+            "use_hybrid": self.use_hybrid,
+            "include_vector": self.include_vector,
+            "include_web": self.include_web,
+            "include_knowledge": self.include_knowledge,
+        }
+
+
+def _literal_prefixes(items: list) -> Optional[set[str]]:
+    """
+    Literals one of which every match of a parsed pattern starts with.
+    
+    Zero-width assertions (\\b, ^) are skipped; groups and alternations of
+    literals are followed. None if the pattern can start some other way.
+    """
+    from re import _constants as sre
     
-    # If it ends with a question mark, it's likely a question
-    if query_stripped.endswith("?"):
-        return False
+    literal = ""
+    position = 0
+    while position < len(items):
+        op, av = items[position]
+        if op is sre.AT and not literal:
+            position += 1
+        elif op is sre.LITERAL:
+            literal += chr(av)
+            position += 1
+        else:
+            break
+    if literal:
+        return {literal.lower()}
+    if position == len(items):
+        return None
     
-    # Check conversational patterns
-    for pattern in CONVERSATIONAL_PATTERNS:
-        if pattern.search(query):
-            return True
+    op, av = items[position]
+    if op is sre.SUBPATTERN:
+        return _literal_prefixes(list(av[-1]))
+    if op is sre.BRANCH:
+        prefixes: set[str] = set()
+        for branch in av[1]:
+            branch_prefixes = _literal_prefixes(list(branch))
+            if branch_prefixes is None:
+                return None
+            prefixes |= branch_prefixes
+        return prefixes
+    return None
+
+
+def pattern_triggers(pattern: re.Pattern[str]) -> Optional[frozenset[str]]:
+    """
+    Lowercase literals that must occur in any text the pattern matches (None: unknown).
     
-    return False
+    Reads the parse tree from the private re._parser module (Python 3.11+).
+    If that fails the pattern is simply always run, so the failure is logged
+    rather than raised; tests/test_routing_engine.py checks every shipped
+    pattern gets triggers.
+    """
+    try:
+        from re import _parser
+        prefixes = _literal_prefixes(list(_parser.parse(pattern.pattern, pattern.flags)))
+    except Exception as e:
+        print(f"[ROUTER] No trigger literals for {pattern.pattern!r}, always running it: {e}")
+        return None
+    return frozenset(prefixes) if prefixes else None
+
+
+class RoutingEngine:
+    """
+    All routing pattern families, compiled and indexed once.
+    
+    Every pattern starts with one of a few literals ("how many", "summar",
+    "[attachment"...), taken from the parsed regex. route() scans the query
+    once for all of those trigger literals, then only runs the patterns
+    whose trigger occurs - usually a handful out of ~45 - family by family
+    in routing order, stopping as soon as the outcome is known.
+    
+    Non-ASCII queries skip the trigger filter (IGNORECASE folds some
+    non-ASCII letters onto ASCII ones), so results always equal running
+    every pattern. A single regex over all families would have to try
+    every family at every position and measured ~5x slower than separate
+    searches in CPython's backtracking engine - see scripts/bench_routing.py.
+    """
+    
+    def __init__(self):
+        families = {
+            "context": HYBRID_CONTEXT_PATTERNS,
+            "web": HYBRID_WEB_PATTERNS,
+            "meta": HYBRID_META_PATTERNS,
+            "conversational": CONVERSATIONAL_PATTERNS,
+        }
+        families.update({intent.value: patterns for intent, patterns in INTENT_PATTERN_FAMILIES})
+        
+        self.families: dict[str, list[tuple[str, re.Pattern[str], Optional[frozenset[str]]]]] = {
+            family: [(f"{family}_{i}", pattern, pattern_triggers(pattern)) for i, pattern in enumerate(patterns)]
+            for family, patterns in families.items()
+        }
+        self.triggers = frozenset(
+            trigger
+            for patterns in self.families.values()
+            for _, _, triggers in patterns if triggers
+            for trigger in triggers
+        )
+        self.intents = [intent for intent, _ in INTENT_PATTERN_FAMILIES]
+    
+    def scan(self, query: str) -> Optional[set[str]]:
+        """Trigger literals in the query (None: run every pattern)."""
+        if not query.isascii():
+            return None
+        text = query.lower()
+        return {trigger for trigger in self.triggers if trigger in text}
+    
+    def search(self, family: str, query: str, found: Optional[set[str]] = None) -> Optional[str]:
+        """Name of the first pattern of a family that matches, if any."""
+        for name, pattern, triggers in self.families[family]:
+            if found is not None and triggers is not None and triggers.isdisjoint(found):
+                continue
+            if pattern.search(query):
+                return name
+        return None
+    
+    def is_conversational(self, query: str, found: Optional[set[str]] = None) -> bool:
+        # If it ends with a question mark, it's likely a question
+        if query.strip().endswith("?"):
+            return False
+        return self.search("conversational", query, found) is not None
+    
+    def match_intent(
+        self,
+        query: str,
+        found: Optional[set[str]] = None,
+    ) -> tuple[Optional[RouterIntent], Optional[str]]:
+        """First intent family (in precedence order) with a matching pattern."""
+        for intent in self.intents:
+            name = self.search(intent.value, query, found)
+            if name:
+                return intent, name
+        return None, None
+    
+    def route(self, query: str, classify_hybrid: bool = False) -> RouteMatch:
+        """
+        Hybrid flags, conversational flag and intent from one trigger scan.
+        
+        Hybrid queries skip the conversational and intent families (/ask
+        answers them from several sources) unless classify_hybrid is set.
+        """
+        found = self.scan(query)
+        include_vector = self.search("context", query, found) is not None
+        include_web = self.search("web", query, found) is not None
+        
+        if include_vector and self.search("meta", query, found):
+            # Meta questions about the bot should check vector first (for
+            # context about files), then fall back to knowledge
+            route = RouteMatch(use_hybrid=True, include_vector=True)
+        elif include_vector and include_web:
+            # Query seems to need both Discord context AND external info
+            route = RouteMatch(use_hybrid=True, include_vector=True, include_web=True)
+        else:
+            route = RouteMatch(include_vector=include_vector, include_web=include_web)
+        if route.use_hybrid and not classify_hybrid:
+            return route
+        
+        if self.is_conversational(query, found):
+            route.conversational = True
+            return route
+        
+        route.intent, route.pattern = self.match_intent(query, found)
+        return route
+
+
+routing_engine = RoutingEngine()
+
+
+def route_query(query: str) -> RouteMatch:
+    """Run every routing pattern family over a query (see RoutingEngine)."""
+    return routing_engine.route(query)
+
+
+def _is_conversational(query: str) -> bool:
+    """Check if the query is a conversational statement, not a question."""
+    return routing_engine.is_conversational(query, routing_engine.scan(query))
 
 
 def _classify_by_pattern(query: str) -> Optional[RouterIntent]:
     """
     Attempt to classify query using regex patterns.
     
-    Returns None if no pattern matches (requires LLM fallback).
+    Returns None if no pattern matches (requires classifier/LLM fallback).
     """
-    # Check analytics patterns first (most specific)
-    for pattern in ANALYTICS_PATTERNS:
-        if pattern.search(query):
-            return RouterIntent.ANALYTICS_DB
+    return routing_engine.match_intent(query, routing_engine.scan(query))[0]
+
+
+async def _classify_with_embeddings(query: str) -> Optional[RouterIntent]:
+    """
+    Classify with the embedding classifier.
     
-    # Check graph RAG patterns (thematic/broad queries)
-    for pattern in GRAPH_RAG_PATTERNS:
-        if pattern.search(query):
-            return RouterIntent.GRAPH_RAG
+    Returns None if it is disabled, unavailable or below the confidence
+    threshold (requires LLM fallback).
+    """
+    from apps.api.src.agents.intent_classifier import get_intent_classifier
+    from apps.api.src.core.config import get_settings
     
-    # Check web search patterns (external info)
-    for pattern in WEB_SEARCH_PATTERNS:
-        if pattern.search(query):
-            return RouterIntent.WEB_SEARCH
+    settings = get_settings()
+    if not settings.intent_embedding_enabled:
+        return None
     
-    # Check vector RAG patterns
-    for pattern in VECTOR_RAG_PATTERNS:
-        if pattern.search(query):
-            return RouterIntent.VECTOR_RAG
+    try:
+        prediction = await get_intent_classifier().aclassify(query)
+    except Exception as e:
+        print(f"[ROUTER] Embedding classifier unavailable: {e}")
+        return None
     
-    return None
+    if prediction.confidence < settings.intent_confidence_threshold:
+        print(f"[ROUTER] Embedding classifier unsure ({prediction.intent.value}, {prediction.confidence:.2f}), asking LLM")
+        return None
+    
+    print(f"[ROUTER] Embedding classifier: {prediction.intent.value} ({prediction.confidence:.2f})")
+    return prediction.intent
 
 
-async def _classify_with_llm(query: str) -> RouterIntent:
+async def _classify_with_llm(query: str) -> Optional[RouterIntent]:
     """
     Use LLM to classify ambiguous queries.
     
-    Falls back to GENERAL_KNOWLEDGE if LLM is unavailable (safe default for unknown queries).
+    Returns None if the LLM is unavailable, so the caller can use its
+    default without caching it.
     """
     try:
         from langchain_core.messages import SystemMessage, HumanMessage
@@ -159,8 +382,8 @@ async def _classify_with_llm(query: str) -> RouterIntent:
         
         settings = get_settings()
         if not settings.active_llm_api_key:
-            # No API key - default to general knowledge (direct LLM answer)
-            return RouterIntent.GENERAL_KNOWLEDGE
+            # No API key - caller defaults to general knowledge (direct LLM answer)
+            return None
         
         llm = get_llm(temperature=0.0)
         
@@ -203,11 +426,100 @@ Respond with ONLY the category name, nothing else."""
             return RouterIntent.VECTOR_RAG
             
     except ImportError:
-        # LangChain not available - default to general knowledge
-        return RouterIntent.GENERAL_KNOWLEDGE
+        # LangChain not available
+        return None
     except Exception:
-        # Any other error - default to general knowledge
-        return RouterIntent.GENERAL_KNOWLEDGE
+        # Any other error
+        return None
+
+
+@dataclass
+class TimeRange:
+    """
+    Time window extracted from a query, passed down to vector search.
+    
+    `since`/`until` become indexed Qdrant filters; `recency_half_life_days`
+    turns on server-side recency decay for vague "recently" queries.
+    """
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    recency_half_life_days: Optional[float] = None
+    label: str = ""
+
+
+_RELATIVE_UNITS = {"hour": 1 / 24, "day": 1, "week": 7, "month": 30, "year": 365}
+_NUMBER_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+                 "six": 6, "seven": 7, "few": 3, "couple": 2, "couple of": 2}
+
+_PAST_N_PATTERN = re.compile(
+    r"\b(?:in the |over the |during the )?(?:past|last|previous)\s+"
+    r"(\d+|a|an|one|two|three|four|five|six|seven|few|couple(?: of)?)\s+"
+    r"(hour|day|week|month|year)s?\b",
+    re.IGNORECASE,
+)
+_AGO_PATTERN = re.compile(
+    r"\b(\d+|a|an|one|two|three|four|five|six|seven|few|couple(?: of)?)\s+"
+    r"(hour|day|week|month|year)s?\s+ago\b",
+    re.IGNORECASE,
+)
+_RECENCY_PATTERN = re.compile(r"\b(recently|lately|latest|most recent|these days)\b", re.IGNORECASE)
+
+
+def extract_time_range(query: str, now: Optional[datetime] = None) -> Optional[TimeRange]:
+    """
+    Extract a time window from phrases like "last week" or "past 3 days".
+    
+    Calendar phrases ("this week", "last month") use calendar boundaries in
+    UTC; relative phrases ("past 3 days") count back from now. Vague recency
+    ("recently", "latest") sets no window but enables recency decay.
+    
+    Args:
+        query: The user's natural language query
+        now: Reference time (default: current UTC time)
+        
+    Returns:
+        TimeRange, or None if the query has no time reference
+    """
+    now = now or datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    
+    text = query.lower()
+    
+    if re.search(r"\btoday\b|\bthis morning\b|\bthis afternoon\b|\btonight\b", text):
+        return TimeRange(since=today, label="today")
+    if re.search(r"\byesterday\b", text):
+        return TimeRange(since=today - timedelta(days=1), until=today, label="yesterday")
+    if re.search(r"\bthis week\b", text):
+        return TimeRange(since=week_start, label="this week")
+    if re.search(r"\blast week\b", text):
+        return TimeRange(since=week_start - timedelta(days=7), until=week_start, label="last week")
+    if re.search(r"\bthis month\b", text):
+        return TimeRange(since=month_start, label="this month")
+    if re.search(r"\blast month\b", text):
+        previous_month_start = (month_start - timedelta(days=1)).replace(day=1)
+        return TimeRange(since=previous_month_start, until=month_start, label="last month")
+    
+    match = _PAST_N_PATTERN.search(text)
+    if match:
+        count = _NUMBER_WORDS.get(match.group(1), None) or int(match.group(1))
+        days = count * _RELATIVE_UNITS[match.group(2)]
+        return TimeRange(since=now - timedelta(days=days), label=match.group(0).strip())
+    
+    match = _AGO_PATTERN.search(text)
+    if match:
+        count = _NUMBER_WORDS.get(match.group(1), None) or int(match.group(1))
+        days = count * _RELATIVE_UNITS[match.group(2)]
+        # "3 days ago" - that day, with a little slack either side
+        center = now - timedelta(days=days)
+        slack = timedelta(days=max(days * 0.25, 1))
+        return TimeRange(since=center - slack, until=center + slack, label=match.group(0).strip())
+    
+    if _RECENCY_PATTERN.search(text):
+        return TimeRange(recency_half_life_days=7, label="recent")
+    
+    return None
 
 
 def should_use_hybrid(query: str) -> dict:
@@ -220,85 +532,51 @@ def should_use_hybrid(query: str) -> dict:
         - include_web: bool - whether to search the web
         - include_knowledge: bool - whether to use LLM knowledge
     """
-    query_lower = query.lower()
-    
-    # Patterns that suggest needing Discord context
-    discord_context_patterns = [
-        r'\b(file|document|pdf|attachment|uploaded|shared)\b',
-        r'\b(said|mentioned|discussed|talked about)\b',
-        r'\b(in (this|the) (server|channel|chat))\b',
-        r'\[Attachments?:',
-    ]
-    
-    # Patterns that suggest needing web search
-    web_search_patterns = [
-        r'\b(latest|current|recent|now|today)\b',
-        r'\b(how (do|does|to|can I))\b',
-        r'\b(what is|who is|where is)\b',
-        r'\b(explain|define|meaning of)\b',
-    ]
-    
-    # Patterns for meta questions about the bot's capabilities
-    meta_patterns = [
-        r'\b(can you|are you able|do you)\b.*\b(see|read|access|view)\b',
-        r'\b(what (can|do) you)\b',
-        r'\b(your capabilities|how do you work)\b',
-    ]
-    
-    include_vector = any(re.search(p, query, re.IGNORECASE) for p in discord_context_patterns)
-    include_web = any(re.search(p, query, re.IGNORECASE) for p in web_search_patterns)
-    is_meta = any(re.search(p, query, re.IGNORECASE) for p in meta_patterns)
-    
-    # Meta questions about the bot should check vector first (for context about files)
-    # then fall back to knowledge
-    if is_meta and include_vector:
-        return {
-            "use_hybrid": True,
-            "include_vector": True,
-            "include_web": False,
-            "include_knowledge": True,
-        }
-    
-    # If query seems to need both Discord context AND external info
-    if include_vector and include_web:
-        return {
-            "use_hybrid": True,
-            "include_vector": True,
-            "include_web": True,
-            "include_knowledge": True,
-        }
-    
-    # Default: single-source routing
-    return {
-        "use_hybrid": False,
-        "include_vector": include_vector,
-        "include_web": include_web,
-        "include_knowledge": True,
-    }
+    return routing_engine.route(query).hybrid_config
 
 
-async def classify_intent(query: str) -> RouterIntent:
+async def classify_intent(query: str, route: Optional[RouteMatch] = None) -> RouterIntent:
     """
     Classify the intent of a user query for routing.
     
-    Uses pattern matching first for speed and determinism,
-    falls back to LLM for ambiguous queries.
+    Uses pattern matching first for speed and determinism, then the
+    embedding classifier, and falls back to LLM for ambiguous queries.
+    Classifier and LLM results are cached per normalized query.
     
     Args:
         query: The user's natural language query
+        route: route_query(query) if the caller already ran it
         
     Returns:
         RouterIntent enum indicating where to route the query
     """
+    if route is None or route.use_hybrid:
+        # Hybrid routes carry no intent; classify the query like any other
+        route = routing_engine.route(query, classify_hybrid=True)
+    
     # Check for conversational statements first (not questions)
-    if _is_conversational(query):
+    if route.conversational:
         print(f"[ROUTER] Conversational statement detected: {query[:50]}...")
         return RouterIntent.GENERAL_KNOWLEDGE
     
     # Try pattern-based classification first (fast, deterministic)
-    pattern_result = _classify_by_pattern(query)
-    if pattern_result is not None:
-        return pattern_result
+    if route.intent is not None:
+        return route.intent
+    
+    from apps.api.src.agents.intent_classifier import get_intent_cache
+    
+    cache = get_intent_cache()
+    cached = cache.get(query)
+    if cached is not None:
+        return cached
+    
+    # Local embedding classifier, then LLM classification if it isn't confident
+    intent = await _classify_with_embeddings(query)
+    if intent is None:
+        intent = await _classify_with_llm(query)
+    if intent is None:
+        # Safe default for unknown queries; not cached so the LLM is retried
+        return RouterIntent.GENERAL_KNOWLEDGE
     
-    # Fall back to LLM classification for ambiguous queries
-    return await _classify_with_llm(query)
+    cache.put(query, intent)
+    return intent
@@ -7,15 +7,21 @@ Uses embeddings to find relevant message sessions and generates responses.
 INVARIANT: All queries MUST filter by guild_id for multi-tenant isolation.
 """
 
+import asyncio
 import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Awaitable, Optional
 from uuid import UUID
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
 
+from apps.api.src.core.answer_stream import ainvoke_answer, emit_sources
+from apps.api.src.core.context_budget import AssembledContext, ContextAssembler, ContextItem
 from packages.shared.python.models import (
     AskResponse,
+    ErrorAnswer,
     MessageSource,
     RouterIntent,
 )
@@ -26,6 +32,11 @@ from packages.database.qdrant_schema import (
 )
 
 
+# Grouped search: cap hits per document / per channel for diverse context
+DOCUMENT_CHUNKS_PER_GROUP = 2
+SESSIONS_PER_CHANNEL = 3
+
+
 async def search_vectors(
     query: str,
     guild_id: int,
@@ -35,6 +46,9 @@ async def search_vectors(
     qdrant_client: Optional[Any] = None,
     use_hybrid: bool = True,
     use_reranking: bool = True,
+    time_range: Optional[Any] = None,
+    author_ids: Optional[list[int]] = None,
+    group_results: bool = True,
 ) -> list[dict[str, Any]]:
     """
     Search Qdrant for semantically similar content using hybrid search.
@@ -56,12 +70,15 @@ async def search_vectors(
         qdrant_client: Optional Qdrant client instance (ignored, uses service)
         use_hybrid: Whether to use hybrid search (default True)
         use_reranking: Whether to apply late interaction reranking (default True)
+        time_range: Optional TimeRange from the router (window + recency decay)
+        author_ids: Optional list of author IDs to filter
+        group_results: Cap hits per document/channel (default True) so one
+            PDF's adjacent chunks don't take the whole result budget
         
     Returns:
         List of search results with payloads and scores
     """
     try:
-        from apps.api.src.services.qdrant_service import qdrant_service
         import re
         
         # Detect if query mentions attachments/files - search documents first
@@ -76,34 +93,28 @@ async def search_vectors(
         clean_query = re.sub(attachment_pattern, '', query).strip()
         search_query = clean_query if clean_query else query
         
-        results = []
+        # Hybrid query and its legacy fallback go out together (one round trip)
+        results, query_vector, reranked = await _batched_search(
+            query=search_query,
+            guild_id=guild_id,
+            channel_ids=channel_ids,
+            limit=limit * 2 if use_reranking else limit,  # Oversample for reranking
+            fallback_limit=limit,
+            source_types=['pdf', 'markdown', 'text', 'image'] if (attachment_match or mentions_file) else None,
+            use_hybrid=use_hybrid,
+            time_range=time_range,
+            author_ids=author_ids,
+            group_results=group_results,
+            with_vectors=use_reranking,  # Reranker scores stored vectors, no re-encoding
+            late_interaction=use_reranking,
+        )
         
-        # Try hybrid search first if enabled
-        if use_hybrid:
-            results = await _hybrid_search(
-                query=search_query,
-                guild_id=guild_id,
-                channel_ids=channel_ids,
-                limit=limit * 2 if use_reranking else limit,  # Oversample for reranking
-                source_types=['pdf', 'markdown', 'text', 'image'] if (attachment_match or mentions_file) else None,
-            )
-            
-            if results:
-                print(f"[VECTOR_RAG] Hybrid search found {len(results)} results")
-        
-        # Fallback to legacy dense-only search if hybrid fails or returns nothing
-        if not results:
-            results = await _legacy_search(
-                query=search_query,
-                guild_id=guild_id,
-                channel_ids=channel_ids,
-                limit=limit,
-                source_types=['pdf', 'markdown', 'text', 'image'] if (attachment_match or mentions_file) else None,
-            )
+        # Client-side reranking unless Qdrant already reranked by ColBERT MaxSim
+        if use_reranking and not reranked and results and len(results) > 1:
+            results = _apply_reranking(search_query, results, limit, query_vector)
         
-        # Apply late interaction reranking if enabled and we have results
-        if use_reranking and results and len(results) > 1:
-            results = _apply_reranking(search_query, results, limit)
+        for result in results:
+            result.pop("vector", None)
         
         return results[:limit]
         
@@ -114,88 +125,148 @@ async def search_vectors(
         return []
 
 
-async def _hybrid_search(
+async def _batched_search(
     query: str,
     guild_id: int,
     channel_ids: Optional[list[int]] = None,
     limit: int = 10,
+    fallback_limit: int = 5,
     source_types: Optional[list[str]] = None,
-) -> list[dict[str, Any]]:
+    use_hybrid: bool = True,
+    time_range: Optional[Any] = None,
+    author_ids: Optional[list[int]] = None,
+    group_results: bool = True,
+    with_vectors: bool = False,
+    late_interaction: bool = False,
+) -> tuple[list[dict[str, Any]], Optional[list[float]], bool]:
     """
-    Perform hybrid search using dense + sparse vectors with RRF fusion.
+    Hybrid search (dense + sparse, RRF fusion) with legacy dense fallback.
+    
+    Both queries share one dense embedding and are sent together through
+    search_batch, so falling back to the legacy collection costs no extra
+    round trip. Hybrid results win when there are any. A time range is
+    applied as a payload filter (and optional recency decay) on both.
+    With group_results, both are grouped searches (documents by
+    attachment_id, chat by channel_id).
+    
+    With late_interaction, and a hybrid collection that stores ColBERT
+    multivectors, the ColBERT query encode runs alongside the dense one and
+    Qdrant reranks the fused candidates by MaxSim as its final stage.
+    
+    Returns:
+        (results, query dense vector, whether the results were reranked by
+        late interaction); with_vectors adds each hit's stored dense vector
+        as "vector"
     """
     try:
-        from apps.api.src.services.qdrant_service import qdrant_service
-        from apps.api.src.services.hybrid_embedding import get_hybrid_embedding_model
-        
-        # Get hybrid embeddings (dense + sparse)
-        hybrid_model = get_hybrid_embedding_model()
-        hybrid_embedding = hybrid_model.embed_query(query)
-        
-        # Perform hybrid search with RRF fusion
-        results = qdrant_service.hybrid_search(
-            query_dense=hybrid_embedding.dense,
-            query_sparse_indices=hybrid_embedding.sparse_indices,
-            query_sparse_values=hybrid_embedding.sparse_values,
-            guild_id=guild_id,
-            channel_ids=channel_ids,
-            limit=limit,
-            source_types=source_types,
+        from apps.api.src.services.qdrant_service import (
+            COLLECTION_NAME,
+            HYBRID_COLLECTION_NAME,
+            SearchRequest,
+            async_qdrant_service,
+            default_group_by,
         )
         
-        return results
-        
-    except Exception as e:
-        print(f"[VECTOR_RAG] Hybrid search failed: {e}")
-        return []
-
-
-async def _legacy_search(
-    query: str,
-    guild_id: int,
-    channel_ids: Optional[list[int]] = None,
-    limit: int = 5,
-    source_types: Optional[list[str]] = None,
-) -> list[dict[str, Any]]:
-    """
-    Fallback to legacy dense-only search.
-    """
-    try:
-        from apps.api.src.services.qdrant_service import qdrant_service
-        from apps.api.src.core.llm_factory import get_embedding_model
+        # Time window / author filters are pruned by Qdrant before scoring
+        request_options = {
+            "since": getattr(time_range, "since", None),
+            "until": getattr(time_range, "until", None),
+            "recency_half_life_days": getattr(time_range, "recency_half_life_days", None),
+            "author_ids": author_ids,
+            "with_vectors": with_vectors,
+        }
+        
+        if group_results:
+            group_by = default_group_by(source_types)
+            request_options["group_by"] = group_by
+            request_options["group_size"] = (
+                DOCUMENT_CHUNKS_PER_GROUP if group_by == "attachment_id" else SESSIONS_PER_CHANNEL
+            )
         
-        embedding_model = get_embedding_model()
-        query_embedding = embedding_model.embed_query(query)
+        requests = []
+        hybrid_embedding = None
+        query_dense = None
+        if use_hybrid:
+            try:
+                from apps.api.src.services.hybrid_embedding import get_hybrid_embedding_model
+                
+                # Only encode ColBERT query tokens if there is something to score them against
+                late_interaction = late_interaction and await async_qdrant_service.late_interaction_ready(
+                    HYBRID_COLLECTION_NAME
+                )
+                
+                # Get hybrid embeddings (dense + sparse, optionally multivector)
+                hybrid_embedding = await get_hybrid_embedding_model().aembed_query(
+                    query, multivector=late_interaction
+                )
+            except Exception as e:
+                print(f"[VECTOR_RAG] Hybrid embedding failed, using legacy search only: {e}")
+        
+        if hybrid_embedding is not None:
+            query_dense = hybrid_embedding.dense
+            query_multivector = hybrid_embedding.multivector
+            requests.append(SearchRequest(
+                collection_name=HYBRID_COLLECTION_NAME,
+                query_dense=query_dense,
+                query_sparse_indices=hybrid_embedding.sparse_indices,
+                query_sparse_values=hybrid_embedding.sparse_values,
+                fusion=True,
+                guild_id=guild_id,
+                channel_ids=channel_ids,
+                source_types=source_types,
+                limit=limit,
+                score_threshold=0.0,
+                query_multivector=query_multivector,
+                **{**request_options, "with_vectors": with_vectors and not query_multivector},
+            ))
+        else:
+            from apps.api.src.core.llm_factory import get_embedding_model
+            query_dense = await get_embedding_model().aembed_query(query)
         
-        results = qdrant_service.search(
-            query_embedding=query_embedding,
+        # Legacy dense-only search (same embedding model as the hybrid dense vector)
+        requests.append(SearchRequest(
+            collection_name=COLLECTION_NAME,
+            query_dense=query_dense,
             guild_id=guild_id,
             channel_ids=channel_ids,
-            limit=limit,
             source_types=source_types,
-        )
+            limit=fallback_limit,
+            score_threshold=0.2,
+            **request_options,
+        ))
+        
+        result_sets = await async_qdrant_service.search_batch(requests)
         
-        return results
+        if hybrid_embedding is not None and result_sets[0]:
+            print(f"[VECTOR_RAG] Hybrid search found {len(result_sets[0])} results")
+            return result_sets[0], query_dense, bool(hybrid_embedding.multivector)
+        
+        return result_sets[-1], query_dense, False
         
     except Exception as e:
-        print(f"[VECTOR_RAG] Legacy search failed: {e}")
-        return []
+        print(f"[VECTOR_RAG] Batched search failed: {e}")
+        return [], query_dense, False
 
 
 def _apply_reranking(
     query: str,
     results: list[dict[str, Any]],
     top_k: int = 5,
+    query_vector: Optional[list[float]] = None,
 ) -> list[dict[str, Any]]:
     """
     Apply late interaction reranking to improve result quality.
+    
+    With query_vector and stored vectors on the results, no model is
+    loaded or called (see LateInteractionModel.rerank).
     """
     try:
         from apps.api.src.services.hybrid_embedding import get_late_interaction_model
         
         reranker = get_late_interaction_model()
-        if reranker.enabled:
-            reranked = reranker.rerank(query, results, top_k=top_k)
+        has_vectors = query_vector is not None and all("vector" in r for r in results)
+        if has_vectors or reranker.enabled:
+            reranked = reranker.rerank(query, results, top_k=top_k, query_vector=query_vector)
             print(f"[VECTOR_RAG] Reranked {len(results)} results to top {len(reranked)}")
             return reranked
         
@@ -216,34 +287,125 @@ async def _get_embedding(text: str) -> list[float]:
         from apps.api.src.core.llm_factory import get_embedding_model
         
         embedding_model = get_embedding_model()
-        return embedding_model.embed_query(text)
+        return await embedding_model.aembed_query(text)
         
     except Exception:
         # Return zero vector for testing/fallback
         return [0.0] * 384  # Default dimension for local embeddings
 
 
+@dataclass
+class RagContext:
+    """Prompt context for one RAG answer, within the token budget."""
+    recent_text: str
+    chunk_text: str
+    recent: AssembledContext
+    chunks: AssembledContext
+    
+    @property
+    def tokens(self) -> int:
+        return self.recent.tokens + self.chunks.tokens
+
+
+def assemble_rag_context(
+    context_chunks: list[dict[str, Any]],
+    recent_messages: Optional[list[dict]] = None,
+    budget_tokens: Optional[int] = None,
+    recent_share: Optional[float] = None,
+    assembler: Optional[ContextAssembler] = None,
+) -> RagContext:
+    """
+    Fit recent messages and retrieved chunks into the prompt token budget.
+    
+    Recent messages get up to recent_share of the budget, newest first
+    (shown oldest first). Chunks fill the rest by relevance score, so a
+    low-scoring chunk is the first to go; a chunk repeating a kept message
+    or another chunk is dropped.
+    
+    Args:
+        context_chunks: Search results (payload + score)
+        recent_messages: Messages from get_recent_channel_messages
+        budget_tokens: Total budget (default RAG_CONTEXT_TOKENS)
+        recent_share: Share reserved for recent messages (default RAG_RECENT_SHARE)
+        assembler: Token counter/assembler (default: active LLM's tokenizer)
+    """
+    from apps.api.src.core.config import get_settings
+    from apps.api.src.services.conversation_memory import format_recent_message
+    
+    settings = get_settings()
+    budget_tokens = budget_tokens if budget_tokens is not None else settings.rag_context_tokens
+    recent_share = recent_share if recent_share is not None else settings.rag_recent_share
+    assembler = assembler or ContextAssembler()
+    seen: set[str] = set()
+    
+    messages = recent_messages or []
+    recent = assembler.assemble(
+        [
+            # Deduplicated on the content, not the "[HH:MM] author: " line
+            ContextItem(text=format_recent_message(msg), key=msg.get('content') or None, score=i, order=i)
+            for i, msg in enumerate(messages)
+        ],
+        budget=int(budget_tokens * recent_share),
+        seen=seen,
+    )
+    
+    items = []
+    for i, chunk in enumerate(context_chunks):
+        payload = chunk.get('payload') or {}
+        # Document chunks use 'text', chat sessions use 'summary' or 'content'
+        text = payload.get('text', payload.get('summary', payload.get('content', '')))
+        source_type = payload.get('source_type', 'chat')
+        parent_file = payload.get('parent_file', '')
+        
+        if source_type != 'chat' and parent_file:
+            prefix = f"[Source: {parent_file}, Relevance: {chunk['score']:.2f}]\n"
+        else:
+            prefix = f"[Relevance: {chunk['score']:.2f}]\n"
+        items.append(ContextItem(text=text or "", score=chunk.get('score', 0.0), prefix=prefix, order=i, source=chunk))
+    
+    # Whatever recent messages left unused goes to the archive
+    chunks = assembler.assemble(items, budget=budget_tokens - recent.tokens, separator_tokens=2, seen=seen)
+    
+    return RagContext(
+        recent_text="\n".join(recent.texts),
+        chunk_text="\n\n".join(chunks.texts),
+        recent=recent,
+        chunks=chunks,
+    )
+
+
 async def generate_rag_response(
     query: str,
     context_chunks: list[dict[str, Any]],
     guild_id: int,
-    recent_messages_context: str = "",
+    recent_messages: Optional[list[dict]] = None,
+    pre_prompt: Optional[str] = None,
+    usage: Optional[dict[str, Any]] = None,
 ) -> str:
     """
     Generate a response using retrieved context.
     
+    The context is cut to the token budget first (see assemble_rag_context).
+    
     Args:
         query: Original user query
         context_chunks: Retrieved context from vector search (long-term/Qdrant)
         guild_id: Guild ID for context
-        recent_messages_context: Last 30 channel messages from Postgres (short-term memory)
+        recent_messages: Last 30 channel messages from Postgres (short-term memory)
+        pre_prompt: Guild personality/rules (fetched by process_rag_query
+            alongside retrieval)
+        usage: Filled with "tokens_in" (prompt tokens, as reported by the
+            provider when available) and "context" (assembly stats)
         
     Returns:
-        Generated response string
+        Generated response string (an ErrorAnswer when the LLM failed or
+        isn't configured)
     """
-    if not context_chunks and not recent_messages_context:
+    if not context_chunks and not recent_messages:
         return "I couldn't find any relevant discussions matching your query."
     
+    usage = usage if usage is not None else {}
+    
     try:
         from langchain_core.messages import SystemMessage, HumanMessage
         
@@ -252,37 +414,20 @@ async def generate_rag_response(
         
         settings = get_settings()
         if not settings.active_llm_api_key:
-            return _fallback_response(context_chunks)
+            return ErrorAnswer(_fallback_response(context_chunks))
         
         llm = get_llm(temperature=0.3)
         
-        # Format context from vector search (supports both chat sessions and document chunks)
-        context_text = ""
-        if context_chunks:
-            formatted_chunks = []
-            for chunk in context_chunks:
-                payload = chunk['payload']
-                # Document chunks use 'text', chat sessions use 'summary' or 'content'
-                text = payload.get('text', payload.get('summary', payload.get('content', '')))
-                source_type = payload.get('source_type', 'chat')
-                parent_file = payload.get('parent_file', '')
-                
-                if source_type != 'chat' and parent_file:
-                    formatted_chunks.append(f"[Source: {parent_file}, Relevance: {chunk['score']:.2f}]\n{text}")
-                else:
-                    formatted_chunks.append(f"[Relevance: {chunk['score']:.2f}]\n{text}")
-            
-            context_text = "\n\n".join(formatted_chunks)
+        assembler = ContextAssembler()
+        context = assemble_rag_context(context_chunks, recent_messages, assembler=assembler)
         
-        # Fetch guild pre-prompt for personality injection
-        from apps.api.src.core.pre_prompt import get_guild_pre_prompt
-        pre_prompt = get_guild_pre_prompt(guild_id)
+        # Guild pre-prompt for personality injection
         pre_prompt_section = f"\n\n{pre_prompt}" if pre_prompt else ""
         
         # Add recent channel messages (short-term memory from Postgres - respects deletions)
         recent_section = ""
-        if recent_messages_context:
-            recent_section = f"\n\nRecent channel messages (last 30):\n{recent_messages_context}"
+        if context.recent_text:
+            recent_section = f"\n\nRecent channel messages:\n{context.recent_text}"
         
         system_prompt = f"""You are a helpful assistant analyzing Discord community discussions.
 Answer the user's question using the provided context.
@@ -298,21 +443,37 @@ If the context doesn't contain enough information, say so.{pre_prompt_section}""
         user_content = ""
         if recent_section:
             user_content += recent_section
-        if context_text:
-            user_content += f"\n\nHistorical context from archive:\n{context_text}"
+        if context.chunk_text:
+            user_content += f"\n\nHistorical context from archive:\n{context.chunk_text}"
         user_content += f"\n\nQuestion: {query}"
+        
+        usage["tokens_in"] = assembler.count(system_prompt) + assembler.count(user_content)
+        usage["context"] = {
+            "recent": context.recent.stats(),
+            "chunks": context.chunks.stats(),
+        }
+        print(
+            f"[VECTOR_RAG] Prompt ~{usage['tokens_in']} tokens "
+            f"(context {context.tokens}, chunks kept {len(context.chunks.items)}/{len(context_chunks)}, "
+            f"duplicates {context.recent.duplicates + context.chunks.duplicates})"
+        )
 
-        response = await llm.ainvoke([
+        response = await ainvoke_answer(llm, [
             SystemMessage(content=system_prompt),
             HumanMessage(content=user_content),
         ])
         
+        # Provider's own count when it reports one
+        reported = (getattr(response, "usage_metadata", None) or {}).get("input_tokens")
+        if reported:
+            usage["tokens_in"] = reported
+        
         return response.content.strip()
         
     except ImportError:
-        return _fallback_response(context_chunks)
+        return ErrorAnswer(_fallback_response(context_chunks))
     except Exception as e:
-        return f"Error generating response: {str(e)}"
+        return ErrorAnswer(f"Error generating response: {str(e)}")
 
 
 def _fallback_response(context_chunks: list[dict[str, Any]]) -> str:
@@ -336,12 +497,69 @@ def _fallback_response(context_chunks: list[dict[str, Any]]) -> str:
     )
 
 
+@dataclass
+class RagRetrieval:
+    """Everything a RAG answer is generated from, fetched before the LLM call."""
+    recent_messages: list[dict]
+    pre_prompt: Optional[str]
+    results: list[dict[str, Any]]
+    timings: dict[str, float]
+
+
+async def retrieve_rag_context(
+    query: str,
+    guild_id: int,
+    channel_ids: Optional[list[int]] = None,
+    qdrant_client: Optional[Any] = None,
+    channel_id: Optional[int] = None,
+    time_range: Optional[Any] = None,
+) -> RagRetrieval:
+    """
+    Retrieval stage of process_rag_query (no LLM call).
+    
+    The recent-message fetch, the pre-prompt lookup (both blocking Postgres
+    queries, run in the threadpool) and the vector search are independent,
+    so they run concurrently; retrieval waits only on the slowest. Has no
+    side effects, so /ask can start it before the query is classified and
+    cancel it if the query goes elsewhere (see core/speculation.py).
+    """
+    from apps.api.src.core.pre_prompt import get_guild_pre_prompt
+    
+    start_time = time.perf_counter()
+    timings: dict[str, float] = {}
+    
+    recent_messages, pre_prompt, results = await asyncio.gather(
+        _timed(timings, "recent_messages", asyncio.to_thread(
+            _recent_messages, guild_id, channel_id,
+        )),
+        _timed(timings, "pre_prompt", asyncio.to_thread(get_guild_pre_prompt, guild_id)),
+        # Search Qdrant for long-term memory (historical content)
+        _timed(timings, "search", search_vectors(
+            query=query,
+            guild_id=guild_id,
+            channel_ids=channel_ids,
+            qdrant_client=qdrant_client,
+            time_range=time_range,
+        )),
+    )
+    timings["retrieval"] = _elapsed_ms(start_time)
+    
+    return RagRetrieval(
+        recent_messages=recent_messages,
+        pre_prompt=pre_prompt,
+        results=results,
+        timings=timings,
+    )
+
+
 async def process_rag_query(
     query: str,
     guild_id: int,
     channel_ids: Optional[list[int]] = None,
     qdrant_client: Optional[Any] = None,
     channel_id: Optional[int] = None,
+    time_range: Optional[Any] = None,
+    retrieval: Optional[Awaitable[RagRetrieval]] = None,
 ) -> AskResponse:
     """
     Process a semantic/RAG query and return formatted response.
@@ -349,8 +567,11 @@ async def process_rag_query(
     This is the main entry point for the Vector RAG agent.
     
     Strategy:
-    1. First check recent messages (last 30) from the current channel - no RAG needed
-    2. If no matches found, fall back to Qdrant vector search for long-term memory
+    1. Recent messages (last 30) from the current channel for short-term context
+    2. Qdrant vector search for long-term memory
+    3. Answer from both, with the guild pre-prompt
+    
+    Steps 1 and 2 (and the pre-prompt lookup) are retrieve_rag_context().
     
     Args:
         query: Natural language query
@@ -358,52 +579,28 @@ async def process_rag_query(
         channel_ids: Optional channel filter
         qdrant_client: Optional Qdrant client
         channel_id: Optional current channel ID for recent message lookup
+        time_range: Optional TimeRange extracted by the router
+        retrieval: Retrieval already started for these arguments (speculative
+            /ask); awaited instead of retrieving again
         
     Returns:
-        AskResponse with answer and sources
+        AskResponse with answer, sources and per-stage timings
     """
-    import time
-    start_time = time.time()
-    
-    # Get recent messages from Postgres (authoritative, respects deletions)
-    recent_messages_context = ""
-    
-    if channel_id:
-        try:
-            from apps.api.src.services.conversation_memory import (
-                get_recent_channel_messages,
-                format_recent_messages_as_context,
-            )
-            
-            # Get last 30 messages from the channel (short-term memory)
-            # This is from Postgres which properly handles deletions (Right to be Forgotten)
-            recent_messages = get_recent_channel_messages(
-                guild_id=guild_id,
-                channel_id=channel_id,
-                limit=30,
-            )
-            
-            if recent_messages:
-                recent_messages_context = format_recent_messages_as_context(recent_messages)
-                print(f"[VECTOR_RAG] Using {len(recent_messages)} recent messages as short-term context")
-        except Exception as e:
-            print(f"[VECTOR_RAG] Error fetching recent messages: {e}")
-    
-    # Search Qdrant for long-term memory (historical content)
-    results = await search_vectors(
-        query=query,
-        guild_id=guild_id,
-        channel_ids=channel_ids,
-        qdrant_client=qdrant_client,
-    )
+    start_time = time.perf_counter()
+    usage: dict[str, Any] = {}
     
-    # Generate response from context (recent messages + RAG results)
-    answer = await generate_rag_response(
-        query=query,
-        context_chunks=results,
-        guild_id=guild_id,
-        recent_messages_context=recent_messages_context,
-    )
+    if retrieval is None:
+        retrieval = retrieve_rag_context(
+            query=query,
+            guild_id=guild_id,
+            channel_ids=channel_ids,
+            qdrant_client=qdrant_client,
+            channel_id=channel_id,
+            time_range=time_range,
+        )
+    retrieved = await retrieval
+    timings = dict(retrieved.timings)
+    results = retrieved.results
     
     # Convert results to MessageSource format (supports both chat and document sources)
     sources = []
@@ -440,11 +637,67 @@ async def process_rag_query(
             )
         )
     
-    execution_time = (time.time() - start_time) * 1000
+    # Streaming clients get the sources before the answer tokens
+    emit_sources(sources)
+    
+    # Generate response from context (recent messages + RAG results)
+    answer = await _timed(timings, "generate", generate_rag_response(
+        query=query,
+        context_chunks=results,
+        guild_id=guild_id,
+        recent_messages=retrieved.recent_messages,
+        pre_prompt=retrieved.pre_prompt,
+        usage=usage,
+    ))
+    
+    execution_time = _elapsed_ms(start_time)
+    print(f"[VECTOR_RAG] Timings (ms): {timings}")
     
     return AskResponse(
         answer=answer,
         sources=sources,
         routed_to=RouterIntent.VECTOR_RAG,
         execution_time_ms=execution_time,
+        timings_ms=timings,
+        tokens_in=usage.get("tokens_in"),
+        error=isinstance(answer, ErrorAnswer),
     )
+
+
+def _recent_messages(guild_id: int, channel_id: Optional[int]) -> list[dict]:
+    """
+    Last 30 messages of the current channel (oldest first).
+    
+    Read from Postgres, which is authoritative and respects deletions
+    (Right to be Forgotten). Blocking; empty on error or without a channel.
+    """
+    if not channel_id:
+        return []
+    
+    try:
+        from apps.api.src.services.conversation_memory import get_recent_channel_messages
+        
+        recent_messages = get_recent_channel_messages(
+            guild_id=guild_id,
+            channel_id=channel_id,
+            limit=30,
+        )
+        if recent_messages:
+            print(f"[VECTOR_RAG] Using {len(recent_messages)} recent messages as short-term context")
+        return recent_messages
+    except Exception as e:
+        print(f"[VECTOR_RAG] Error fetching recent messages: {e}")
+        return []
+
+
+async def _timed(timings: dict[str, float], stage: str, awaitable):
+    """Await a pipeline stage, recording its wall time (ms) under `stage`."""
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = _elapsed_ms(start)
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
@@ -14,6 +14,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
 
 from packages.shared.python.models import (
     AskResponse,
+    ErrorAnswer,
     MessageSource,
     RouterIntent,
 )
@@ -78,10 +79,11 @@ async def generate_web_response(
         search_results: Results from web search
         
     Returns:
-        Generated response string
+        Generated response string (an ErrorAnswer when search or the LLM
+        failed or isn't configured)
     """
     if not search_results:
-        return (
+        return ErrorAnswer(
             "I wasn't able to search the web for this information. "
             "Please try searching directly or check if web search is configured."
         )
@@ -90,11 +92,12 @@ async def generate_web_response(
         from langchain_core.messages import SystemMessage, HumanMessage
         
         from apps.api.src.core.config import get_settings
+        from apps.api.src.core.answer_stream import ainvoke_answer
         from apps.api.src.core.llm_factory import get_llm
         
         settings = get_settings()
         if not settings.active_llm_api_key:
-            return _format_search_results(search_results)
+            return ErrorAnswer(_format_search_results(search_results))
         
         llm = get_llm(temperature=0.3)
         
@@ -109,7 +112,7 @@ Synthesize the information from the search results to answer the user's question
 Always cite your sources by mentioning the website or URL.
 If the search results don't contain relevant information, say so."""
 
-        response = await llm.ainvoke([
+        response = await ainvoke_answer(llm, [
             SystemMessage(content=system_prompt),
             HumanMessage(content=f"Search Results:\n{context}\n\nQuestion: {query}"),
         ])
@@ -117,9 +120,9 @@ If the search results don't contain relevant information, say so."""
         return response.content.strip()
         
     except ImportError:
-        return _format_search_results(search_results)
+        return ErrorAnswer(_format_search_results(search_results))
     except Exception as e:
-        return f"Error generating response: {str(e)}"
+        return ErrorAnswer(f"Error generating response: {str(e)}")
 
 
 def _format_search_results(results: list[dict[str, Any]]) -> str:
@@ -170,4 +173,5 @@ async def process_web_search_query(
         sources=[],
         routed_to=RouterIntent.WEB_SEARCH,
         execution_time_ms=execution_time,
+        error=isinstance(answer, ErrorAnswer),
     )
@@ -0,0 +1,204 @@
+"""
+Answer Cache - /ask answers reused until the guild's index changes.
+
+Popular questions ("what's the server about?", "who is most active?") would
+otherwise rerun retrieval and an LLM call every time. Answers are cached in
+Redis under (guild, index version, channel scope, normalized query, intent).
+
+Each guild has a monotonically increasing index version (INCR on
+ask:version:<guild_id>), bumped whenever what an answer could be built from
+changes: a session is indexed (process_session, index_messages), a message
+is deleted or edited (bot events, delete_sessions_for_messages). The version
+is part of the key, so a bump makes every older entry unreachable at once;
+they expire by TTL.
+
+Right to be Forgotten: the bot bumps the version as soon as a deletion is
+soft-deleted in Postgres, and the worker bumps it again once the Qdrant
+sessions are gone (an answer computed in between is cached under the
+in-between version and dropped by the second bump). The cache fails closed:
+if Redis can't be read, nothing is served or stored for SHARED_RETRY_SECONDS.
+
+Not cached:
+- Requests with channel_id (mentions): their answers also use the channel's
+  recent messages and conversation memory, which change on every message
+- Web search (hybrid with web too): results age independently of the index
+- Error answers returned by the agents
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+VERSION_KEY = "ask:version:{guild_id}"
+ANSWER_KEY_PREFIX = "ask:answer:"
+SHARED_RETRY_SECONDS = 30.0  # Back-off after a Redis error
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation don't change the answer."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!. ").lower()
+
+
+def channel_scope(channel_ids: Optional[list[int]]) -> str:
+    """Order-independent channel filter ("all" when unfiltered)."""
+    if not channel_ids:
+        return "all"
+    return ",".join(str(channel_id) for channel_id in sorted(set(channel_ids)))
+
+
+def answer_key(guild_id: int, version: int, scope: str, query: str, intent: str) -> str:
+    """Cache key for one answer; the query itself is only stored as a hash."""
+    digest = hashlib.sha256(f"{scope}\n{intent}\n{normalize_query(query)}".encode("utf-8")).hexdigest()
+    return f"{ANSWER_KEY_PREFIX}{guild_id}:{version}:{digest}"
+
+
+@dataclass
+class AnswerLookup:
+    """Result of a lookup; key is None when the answer must not be stored."""
+    key: Optional[str] = None
+    response: Optional[dict] = None
+
+
+class AnswerCache:
+    """
+    Redis answer cache with per-guild index versions.
+
+    Usage:
+        lookup = await answer_cache.alookup(guild_id, query, intent, channel_ids=...)
+        if lookup.response is None:
+            response = ...  # run the pipeline
+            await answer_cache.astore(lookup, response)
+    """
+
+    def __init__(self, redis_url: Optional[str], ttl_seconds: int = 600, enabled: bool = True):
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled and bool(redis_url) and ttl_seconds > 0
+        self._client = None
+        self._down_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get_client(self):
+        """Lazy-load Redis client."""
+        if self._client is None:
+            import redis
+            self._client = redis.from_url(self.redis_url, socket_timeout=0.5)
+        return self._client
+
+    def index_version(self, guild_id: int) -> int:
+        value = self.get_client().get(VERSION_KEY.format(guild_id=guild_id))
+        return int(value) if value is not None else 0
+
+    def bump_index_version(self, guild_id: int) -> int:
+        """
+        Invalidate every cached answer of a guild. Raises if Redis is
+        unreachable, so callers (e.g. retried Celery tasks) can react.
+        """
+        version = self.get_client().incr(VERSION_KEY.format(guild_id=guild_id))
+        print(f"[ANSWER CACHE] Guild {guild_id} index version -> {version}")
+        return version
+
+    def lookup(
+        self,
+        guild_id: int,
+        query: str,
+        intent: Optional[str],
+        channel_id: Optional[int] = None,
+        channel_ids: Optional[list[int]] = None,
+    ) -> AnswerLookup:
+        """
+        Find a cached answer.
+
+        Args:
+            intent: Route label; None marks the answer as uncacheable
+            channel_id: Conversation channel (answers with one aren't cached)
+        """
+        if not self.enabled or intent is None or channel_id is not None:
+            return AnswerLookup()
+        if time.monotonic() < self._down_until:
+            return AnswerLookup()
+
+        try:
+            version = self.index_version(guild_id)
+            key = answer_key(guild_id, version, channel_scope(channel_ids), query, intent)
+            data = self.get_client().get(key)
+        except Exception as e:
+            self._failed(e)
+            return AnswerLookup()
+
+        if data is None:
+            self.misses += 1
+            return AnswerLookup(key=key)
+        self.hits += 1
+        return AnswerLookup(key=key, response=json.loads(data))
+
+    def store(self, lookup: AnswerLookup, response: Any) -> bool:
+        """Cache a freshly computed AskResponse under the lookup's version."""
+        if lookup.key is None or not response.answer or response.error:
+            return False
+
+        try:
+            data = json.dumps(response.model_dump(mode="json"))
+            self.get_client().set(lookup.key, data, ex=self.ttl_seconds)
+            return True
+        except Exception as e:
+            self._failed(e)
+            return False
+
+    async def alookup(self, *args, **kwargs) -> AnswerLookup:
+        """lookup() off the event loop."""
+        return await asyncio.to_thread(self.lookup, *args, **kwargs)
+
+    async def astore(self, lookup: AnswerLookup, response: Any) -> bool:
+        """store() off the event loop."""
+        if lookup.key is None:
+            return False
+        return await asyncio.to_thread(self.store, lookup, response)
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters for monitoring (per process)."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _failed(self, error: Exception) -> None:
+        """Serve nothing from the cache for a while instead of timing out on every call."""
+        self.errors += 1
+        self._down_until = time.monotonic() + SHARED_RETRY_SECONDS
+        print(f"[ANSWER CACHE] Redis unavailable, answer cache off for {SHARED_RETRY_SECONDS:.0f}s: {error}")
+
+
+_answer_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide AnswerCache configured from settings."""
+    global _answer_cache
+    if _answer_cache is None:
+        from apps.api.src.core.config import get_settings
+
+        settings = get_settings()
+        _answer_cache = AnswerCache(
+            redis_url=settings.redis_url,
+            ttl_seconds=settings.answer_cache_ttl_seconds,
+            enabled=settings.answer_cache_enabled,
+        )
+    return _answer_cache
+
+
+def bump_index_version(guild_id: int) -> int:
+    """Invalidate a guild's cached answers (see AnswerCache.bump_index_version)."""
+    return get_answer_cache().bump_index_version(guild_id)
@@ -0,0 +1,120 @@
+"""
+Answer Stream - Progressive /ask output (routing, sources, LLM tokens).
+
+/ask/stream runs the same pipeline as /ask with an AnswerStream bound to
+the request's context. Agents don't take it as a parameter: they call
+emit() for metadata and ainvoke_answer() instead of llm.ainvoke() for
+the call that writes the answer. Both are no-ops (plain ainvoke) outside
+a streaming request, so /ask behaves as before.
+
+Events are sent as NDJSON, one object per line:
+    {"type": "route", "routed_to": "vector_rag"}
+    {"type": "sources", "sources": [...]}
+    {"type": "token", "text": "..."}
+    {"type": "done", "response": {...AskResponse...}}
+    {"type": "error", "detail": "..."}
+"""
+
+import asyncio
+import json
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Optional
+
+
+_current: ContextVar[Optional["AnswerStream"]] = ContextVar("answer_stream", default=None)
+
+_END = object()  # Closes the event queue
+
+
+class AnswerStream:
+    """Queue of events for one streaming request."""
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(self, event_type: str, **data: Any) -> None:
+        self._queue.put_nowait({"type": event_type, **data})
+
+    def close(self) -> None:
+        self._queue.put_nowait(_END)
+
+    async def ndjson(self, work: Awaitable[Any]) -> AsyncIterator[bytes]:
+        """
+        Run `work` with this stream bound, yielding its events as NDJSON.
+
+        Its result (e.g. the AskResponse) is sent as the final "done"
+        event, an exception as "error". If the client disconnects, the
+        work is cancelled.
+        """
+        async def run():
+            _current.set(self)
+            try:
+                result = await work
+                if hasattr(result, "model_dump"):
+                    result = result.model_dump(mode="json")
+                self.emit("done", response=result)
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e) or type(e).__name__
+                self.emit("error", detail=detail)
+            finally:
+                self.close()
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await self._queue.get()
+                if event is _END:
+                    break
+                yield (json.dumps(event, default=str) + "\n").encode()
+        finally:
+            if not task.done():
+                task.cancel()
+
+
+def current_stream() -> Optional[AnswerStream]:
+    """The AnswerStream of the running request, if it is a streaming one."""
+    return _current.get()
+
+
+def emit(event_type: str, **data: Any) -> None:
+    """Send an event to the client if the request is streaming."""
+    stream = _current.get()
+    if stream is not None:
+        stream.emit(event_type, **data)
+
+
+def emit_sources(sources: list) -> None:
+    """Send retrieved sources (MessageSource models) to a streaming client."""
+    if _current.get() is not None:
+        emit("sources", sources=[source.model_dump(mode="json") for source in sources])
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Text of a message chunk (content may be a list of blocks, e.g. with thinking)."""
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block.get("text", "") for block in content
+        if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+async def ainvoke_answer(llm, messages: list) -> Any:
+    """
+    llm.ainvoke(messages), streaming tokens to the client when it is listening.
+
+    Returns the full message either way (chunks are merged, so .content and
+    .usage_metadata are the same as from ainvoke).
+    """
+    stream = _current.get()
+    if stream is None:
+        return await llm.ainvoke(messages)
+
+    response = None
+    async for chunk in llm.astream(messages):
+        text = _chunk_text(chunk)
+        if text:
+            stream.emit("token", text=text)
+        response = chunk if response is None else response + chunk
+    return response
@@ -29,6 +29,9 @@ class EmbeddingProvider(str, Enum):
 # Runtime overrides for settings that can be changed without restart
 _runtime_overrides: dict[str, str] = {}
 
+# Bumped whenever settings change at runtime (clients built from them are rebuilt)
+_settings_version = 0
+
 # Path to persistent settings file
 _SETTINGS_FILE = Path(__file__).parent.parent.parent.parent.parent / "data" / "settings.json"
 
@@ -72,6 +75,12 @@ class Settings(BaseSettings):
     # Qdrant
     qdrant_url: str = "http://localhost:6333"
     qdrant_api_key: Optional[str] = None
+    qdrant_write_batch_size: int = 64  # Write-behind buffer: flush at this many points
+    qdrant_write_flush_interval: float = 0.5  # ...or after this many seconds
+    qdrant_storage_profile: str = "memory"  # memory, scalar, binary, product (see qdrant_schema)
+    qdrant_search_oversampling: Optional[float] = None  # Override the profile's default
+    qdrant_custom_sharding: bool = False  # Shard new session collections by guild_id
+    qdrant_dedicated_guild_ids: list[int] = []  # Large guilds placed on their own shard
     
     # Redis
     redis_url: str = "redis://localhost:6379"
@@ -102,10 +111,39 @@ class Settings(BaseSettings):
     # Embeddings
     embedding_provider: EmbeddingProvider = EmbeddingProvider.LOCAL
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_cache_enabled: bool = True  # Content-hash cache (see embedding_cache)
+    embedding_cache_local_entries: int = 10_000  # In-process LRU size
+    embedding_cache_shared_mb: int = 256  # Redis tier byte budget (0 = local only)
+    embedding_batch_wait_ms: float = 5.0  # Micro-batch window for concurrent query embeds
+    embedding_batch_max_size: int = 64  # ...flushed early at this many queries
+    embedding_server_url: Optional[str] = None  # Shared model server (http://... or unix:///...)
+    local_embedding_backend: str = "torch"  # LOCAL provider runtime: torch or onnx (see onnx_embedding)
+    local_embedding_quantized: bool = False  # onnx only: int8 weights
+    local_embedding_threads: Optional[int] = None  # onnx only: intra-op threads
+    embedding_remote_concurrency: int = 4  # OpenAI/Voyage requests in flight per bulk embed
+    embedding_remote_tokens_per_minute: int = 1_000_000  # Token bucket, set to your tier's TPM (0 = off)
+    embedding_remote_requests_per_minute: int = 3_000  # ...and RPM (0 = off)
+    embedding_remote_shared_rate_limit: bool = True  # Buckets in Redis, shared by all processes (else per process)
+    embedding_remote_max_retries: int = 5  # Retries of a 429, honouring Retry-After
     
     # Voyage AI
     voyage_api_key: Optional[str] = None
     
+    # Prompt context budgets (tokens of the active LLM, see context_budget)
+    rag_context_tokens: int = 6000  # Recent messages + retrieved chunks in RAG answers
+    rag_recent_share: float = 0.4  # Part of that reserved for recent channel messages
+    summary_context_tokens: int = 3000  # Messages sent to /summary
+    
+    # Intent routing for queries no pattern matches (see intent_classifier)
+    intent_embedding_enabled: bool = True  # Nearest-centroid classifier before the LLM
+    intent_confidence_threshold: float = 0.6  # Below this the LLM classifies
+    intent_cache_entries: int = 4096  # Classification LRU size (0 disables)
+    speculative_retrieval_enabled: bool = True  # Start RAG retrieval while classifying (see speculation)
+    
+    # /ask answer cache (Redis, invalidated by guild index version - see answer_cache)
+    answer_cache_enabled: bool = True
+    answer_cache_ttl_seconds: int = 600  # Upper bound on staleness from unindexed activity
+    
     # Tavily (web search)
     tavily_api_key: Optional[str] = None
     
@@ -225,13 +263,22 @@ def get_settings() -> Settings:
 
 def clear_settings_cache() -> None:
     """Clear the settings cache (useful when settings change at runtime)."""
+    global _settings_version
     get_settings.cache_clear()
+    _settings_version += 1
+
+
+def get_settings_version() -> int:
+    """Counter that changes whenever settings or runtime overrides change."""
+    return _settings_version
 
 
 def set_runtime_override(key: str, value: str) -> None:
     """Set a runtime override for a setting and persist to disk."""
+    global _settings_version
     _runtime_overrides[key] = value
     _save_persistent_settings()
+    _settings_version += 1
 
 
 def get_runtime_overrides() -> dict[str, str]:
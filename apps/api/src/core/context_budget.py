@@ -0,0 +1,200 @@
+"""
+Context Budget - Token-counted prompt context assembly.
+
+Prompt size drives most of the LLM latency and cost, so retrieved context
+is no longer concatenated whole. A ContextAssembler counts tokens with the
+active model's tokenizer and fills a fixed budget best-first: items are
+taken by score, exact duplicates of the content (after whitespace/case
+normalization, ignoring formatting such as a message's time and author) are
+dropped, and the item that crosses the budget is cut to fit.
+
+Token counts use tiktoken. OpenAI models get their own encoding; other
+providers (Anthropic, xAI) have no local tokenizer, so o200k_base stands
+in. Without tiktoken or its encoding files, ~4 characters per token is
+used instead.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Optional
+
+
+# Stand-in encoding for models tiktoken doesn't know
+DEFAULT_ENCODING = "o200k_base"
+
+# A cut-down item shorter than this is left out instead
+MIN_TRUNCATED_TOKENS = 32
+
+
+@lru_cache(maxsize=8)
+def get_tokenizer(model: Optional[str] = None) -> Optional[Any]:
+    """tiktoken encoding for a model (None if tiktoken can't provide one)."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding(DEFAULT_ENCODING)
+    except KeyError:
+        pass  # Not an OpenAI model
+    except Exception as e:
+        print(f"[CONTEXT] Tokenizer for {model} unavailable: {e}")
+        return None
+
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        print(f"[CONTEXT] Tokenizer {DEFAULT_ENCODING} unavailable: {e}")
+        return None
+
+
+def active_model() -> Optional[str]:
+    """Model name of the configured LLM provider."""
+    try:
+        from apps.api.src.core.config import get_settings
+        return get_settings().active_llm_model
+    except Exception:
+        return None
+
+
+class TokenCounter:
+    """Counts and truncates text in tokens of one model."""
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+        self._encoding = get_tokenizer(model)
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from a real tokenizer rather than the estimate."""
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is None:
+            return len(text) // 4 + 1
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """The longest prefix of text within max_tokens."""
+        if self._encoding is None:
+            return text[:max(0, max_tokens - 1) * 4]
+        tokens = self._encoding.encode(text, disallowed_special=())
+        return self._encoding.decode(tokens[:max_tokens])
+
+
+@dataclass
+class ContextItem:
+    """One candidate piece of context (a retrieved chunk, a chat message...)."""
+    text: str
+    score: float = 0.0  # Higher is kept first
+    prefix: str = ""  # Rendered before text (e.g. a source line); never cut, not deduplicated
+    key: Optional[str] = None  # Deduplicated on this instead of text (e.g. a message's bare content)
+    order: int = 0  # Rendering position among the kept items
+    source: Any = None  # Caller's object (e.g. the search result)
+    tokens: int = 0
+    truncated: bool = False
+
+
+@dataclass
+class AssembledContext:
+    """Items kept within the budget, in rendering order."""
+    items: list[ContextItem] = field(default_factory=list)
+    tokens: int = 0
+    budget: int = 0
+    dropped: int = 0  # Left out for lack of budget
+    duplicates: int = 0
+
+    @property
+    def texts(self) -> list[str]:
+        return [item.prefix + item.text for item in self.items]
+
+    def stats(self) -> dict:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "kept": len(self.items),
+            "dropped": self.dropped,
+            "duplicates": self.duplicates,
+        }
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class ContextAssembler:
+    """
+    Fill a token budget with the highest-scoring context items.
+
+    Usage:
+        assembler = ContextAssembler(counter)
+        context = assembler.assemble(items, budget=4000)
+        prompt = "\\n\\n".join(context.texts)
+    """
+
+    def __init__(
+        self,
+        counter: Optional[TokenCounter] = None,
+        count: Optional[Callable[[str], int]] = None,
+    ):
+        self.counter = counter or TokenCounter(active_model())
+        self._count = count or self.counter.count
+
+    def count(self, text: str) -> int:
+        return self._count(text)
+
+    def assemble(
+        self,
+        items: list[ContextItem],
+        budget: int,
+        separator_tokens: int = 1,
+        seen: Optional[set[str]] = None,
+    ) -> AssembledContext:
+        """
+        Keep items best-first until the budget is spent.
+
+        Args:
+            items: Candidates; ties in score keep their input order
+            budget: Token budget for the kept texts
+            separator_tokens: Cost of the separator between two items
+            seen: Normalized keys already in the prompt (shared across
+                sections, so a chunk repeating a recent message is dropped);
+                updated with the kept items
+        """
+        seen = seen if seen is not None else set()
+        result = AssembledContext(budget=budget)
+        remaining = budget
+
+        for item in sorted(items, key=lambda i: i.score, reverse=True):
+            key = _normalize(item.text if item.key is None else item.key)
+            if not key:
+                continue
+            if key in seen:
+                result.duplicates += 1
+                continue
+
+            cost = self.count(item.prefix + item.text) + separator_tokens
+            if cost > remaining:
+                room = remaining - separator_tokens - self.count(item.prefix)
+                if room < MIN_TRUNCATED_TOKENS:
+                    result.dropped += 1
+                    continue
+                item.text = self.counter.truncate(item.text, room)
+                item.truncated = True
+                cost = self.count(item.prefix + item.text) + separator_tokens
+                if cost > remaining:
+                    result.dropped += 1
+                    continue
+
+            seen.add(key)
+            item.tokens = cost - separator_tokens
+            remaining -= cost
+            result.items.append(item)
+
+        result.items.sort(key=lambda i: i.order)
+        result.tokens = budget - remaining
+        return result
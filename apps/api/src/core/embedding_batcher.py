@@ -0,0 +1,107 @@
+"""
+Embedding Batcher - Coalesce concurrent query embeddings into one batch.
+
+Every /ask and /search request embeds a single query string, so under load
+the local model runs many batch-size-1 forward passes back to back. The
+batcher holds each request for up to `max_wait_ms`, then embeds everything
+that arrived in that window with a single batched call and hands each
+caller its own vector.
+
+The batched call runs in the default thread pool, so the event loop keeps
+serving other requests while the model works. A batch is flushed early
+once it reaches `max_batch_size`.
+"""
+
+import asyncio
+from typing import Callable, List, Optional
+
+
+class EmbeddingBatcher:
+    """
+    Async micro-batcher in front of a batched embedding function.
+
+    Usage:
+        batcher = EmbeddingBatcher(model.embed_queries, max_wait_ms=5)
+        vector = await batcher.embed("what's new?")
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], List[List[float]]],
+        max_wait_ms: float = 5.0,
+        max_batch_size: int = 64,
+    ):
+        """
+        Args:
+            embed_batch: Sync function embedding a list of texts in one call
+            max_wait_ms: How long the first request in a batch waits for company
+            max_batch_size: Flush immediately at this many pending texts
+        """
+        self.embed_batch = embed_batch
+        self.max_wait_ms = max_wait_ms
+        self.max_batch_size = max(1, max_batch_size)
+        self._pending: list[tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: set[asyncio.Task] = set()  # Running batches; the loop only keeps weak refs
+        self.batches = 0
+        self.texts = 0
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed one text as part of the next batch."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures belong to one loop; anything pending on an old loop is dead
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+            self._tasks = set()
+
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def get_stats(self) -> dict:
+        """Batch counters for monitoring."""
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def _flush(self) -> None:
+        """Start embedding everything pending as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        # Identical queries in one window are embedded once
+        unique_texts = list(dict.fromkeys(text for text, _ in batch))
+        self.batches += 1
+        self.texts += len(batch)
+
+        try:
+            vectors = await self._loop.run_in_executor(None, self.embed_batch, unique_texts)
+            by_text = dict(zip(unique_texts, vectors, strict=True))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, future in batch:
+            if not future.done():  # Caller may have been cancelled
+                future.set_result(by_text[text])
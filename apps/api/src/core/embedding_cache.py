@@ -0,0 +1,253 @@
+"""
+Embedding Cache - Content-hash cache in front of the embedding providers.
+
+Reindexing a channel re-embeds the same enriched session text, and common
+queries ("what's new") are embedded on every request. Vectors are cached
+under (provider, model, input type, sha256(text)) in two tiers:
+
+1. Local: in-process LRU (per API / Celery worker process)
+2. Shared: Redis, so API and every Celery worker reuse each other's work
+
+Vectors are stored as float16 (half the bytes; cosine rankings are
+unaffected at this precision). The Redis tier keeps an access-ordered index
+and evicts least-recently-used entries once it exceeds its byte budget.
+
+The Redis tier is optional: if Redis is unreachable it is skipped for
+SHARED_RETRY_SECONDS and only the local tier is used.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+
+KEY_PREFIX = "emb:"
+INDEX_KEY = "emb:__lru__"     # Sorted set: key -> last access time
+SHARED_RETRY_SECONDS = 30.0   # Back-off after a Redis error
+TRIM_EVERY = 64               # Check the byte budget every N shared writes
+
+
+def cache_key(provider: str, model: str, input_type: str, text: str) -> str:
+    """Cache key for one text; the text itself is only stored as a hash."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}{provider}:{model}:{input_type}:{digest}"
+
+
+def encode_vector(vector) -> bytes:
+    """float16 bytes for storage."""
+    return np.asarray(vector, dtype=np.float16).tobytes()
+
+
+def decode_vector(data: bytes) -> list[float]:
+    """Inverse of encode_vector."""
+    return np.frombuffer(data, dtype=np.float16).astype(np.float32).tolist()
+
+
+@dataclass
+class EmbeddingCacheStats:
+    """Hit/miss counters (per process)."""
+    local_hits: int = 0
+    shared_hits: int = 0
+    misses: int = 0
+    shared_errors: int = 0
+    evictions: int = 0
+
+
+class LocalEmbeddingCache:
+    """Thread-safe in-process LRU of float16 vectors."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> int:
+        """Store an entry; returns how many old entries were evicted."""
+        if self.max_entries <= 0:
+            return 0
+        evicted = 0
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisEmbeddingCache:
+    """
+    Shared tier in Redis with byte-budget LRU eviction.
+
+    Every entry is also scored in INDEX_KEY by last access time. When the
+    entry count implies more than max_bytes, the oldest entries are popped
+    with ZPOPMIN (atomic, so concurrent trimmers never double-evict).
+    """
+
+    def __init__(self, redis_url: str, max_bytes: int):
+        self.redis_url = redis_url
+        self.max_bytes = max_bytes
+        self._client = None
+        self._writes = 0
+        self._entry_bytes = 0
+
+    def get_client(self):
+        """Lazy-load Redis client."""
+        if self._client is None:
+            import redis
+            self._client = redis.from_url(self.redis_url, socket_timeout=0.5)
+        return self._client
+
+    def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        client = self.get_client()
+        values = client.mget(keys)
+
+        hit_keys = [key for key, value in zip(keys, values, strict=True) if value is not None]
+        if hit_keys:
+            # Refresh recency for hits
+            client.zadd(INDEX_KEY, {key: time.time() for key in hit_keys})
+        return values
+
+    def put_many(self, items: dict[str, bytes]) -> int:
+        """Store entries; returns how many old entries were evicted."""
+        if not items:
+            return 0
+        client = self.get_client()
+        now = time.time()
+        pipe = client.pipeline(transaction=False)
+        for key, data in items.items():
+            pipe.set(key, data)
+        pipe.zadd(INDEX_KEY, {key: now for key in items})
+        pipe.execute()
+
+        self._entry_bytes = max(self._entry_bytes, max(len(data) for data in items.values()))
+        self._writes += len(items)
+        if self._writes >= TRIM_EVERY:
+            self._writes = 0
+            return self.trim()
+        return 0
+
+    def trim(self) -> int:
+        """Evict least-recently-used entries beyond the byte budget."""
+        if not self._entry_bytes:
+            return 0
+        client = self.get_client()
+        max_entries = max(1, self.max_bytes // self._entry_bytes)
+        excess = client.zcard(INDEX_KEY) - max_entries
+        if excess <= 0:
+            return 0
+
+        evicted = [key for key, _ in client.zpopmin(INDEX_KEY, excess)]
+        if evicted:
+            client.delete(*evicted)
+        return len(evicted)
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache.
+
+    Usage:
+        vectors = cache.get_many(keys)          # None where missing
+        cache.put_many({key: vector, ...})
+    """
+
+    def __init__(
+        self,
+        local_entries: int = 10_000,
+        redis_url: Optional[str] = None,
+        shared_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        """
+        Args:
+            local_entries: In-process LRU size (0 disables the local tier)
+            redis_url: Shared tier location (None disables it)
+            shared_max_bytes: Byte budget for the shared tier
+        """
+        self.local = LocalEmbeddingCache(local_entries)
+        self.shared = RedisEmbeddingCache(redis_url, shared_max_bytes) if redis_url and shared_max_bytes > 0 else None
+        self.stats = EmbeddingCacheStats()
+        self._shared_down_until = 0.0
+
+    def get_many(self, keys: list[str]) -> list[Optional[list[float]]]:
+        """Look keys up in the local tier, then the shared tier."""
+        found: list[Optional[bytes]] = [self.local.get(key) for key in keys]
+        self.stats.local_hits += sum(1 for data in found if data is not None)
+
+        missing = [i for i, data in enumerate(found) if data is None]
+        if missing and self._shared_available():
+            try:
+                shared = self.shared.get_many([keys[i] for i in missing])
+                for i, data in zip(missing, shared, strict=True):
+                    if data is not None:
+                        found[i] = data
+                        self.local.put(keys[i], data)
+                        self.stats.shared_hits += 1
+            except Exception as e:
+                self._shared_failed(e)
+
+        self.stats.misses += sum(1 for data in found if data is None)
+        return [decode_vector(data) if data is not None else None for data in found]
+
+    def put_many(self, vectors: dict[str, list[float]]) -> dict[str, list[float]]:
+        """
+        Store freshly computed vectors in both tiers.
+
+        Returns:
+            The vectors as stored (float16-rounded), i.e. exactly what a
+            later get_many() returns for the same keys
+        """
+        encoded = {key: encode_vector(vector) for key, vector in vectors.items()}
+        for key, data in encoded.items():
+            self.stats.evictions += self.local.put(key, data)
+
+        if encoded and self._shared_available():
+            try:
+                self.stats.evictions += self.shared.put_many(encoded)
+            except Exception as e:
+                self._shared_failed(e)
+
+        return {key: decode_vector(data) for key, data in encoded.items()}
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters for monitoring."""
+        stats = self.stats
+        lookups = stats.local_hits + stats.shared_hits + stats.misses
+        return {
+            "local_hits": stats.local_hits,
+            "shared_hits": stats.shared_hits,
+            "misses": stats.misses,
+            "hit_rate": round((stats.local_hits + stats.shared_hits) / lookups, 4) if lookups else 0.0,
+            "local_entries": len(self.local),
+            "shared_enabled": self.shared is not None,
+            "shared_errors": stats.shared_errors,
+            "evictions": stats.evictions,
+        }
+
+    def _shared_available(self) -> bool:
+        return self.shared is not None and time.monotonic() >= self._shared_down_until
+
+    def _shared_failed(self, error: Exception) -> None:
+        """Skip the shared tier for a while instead of timing out on every call."""
+        self.stats.shared_errors += 1
+        self._shared_down_until = time.monotonic() + SHARED_RETRY_SECONDS
+        print(f"[EMBED CACHE] Shared tier unavailable, using local only for {SHARED_RETRY_SECONDS:.0f}s: {error}")
@@ -3,6 +3,7 @@ LLM Factory - Creates LLM and embedding instances based on configuration.
 Supports OpenAI, Anthropic, and xAI (Grok) providers.
 """
 
+import asyncio
 from typing import List, Optional
 from functools import lru_cache
 
@@ -192,77 +193,215 @@ def get_vision_llm(
 
 
 class EmbeddingModel:
-    """Unified embedding interface supporting multiple providers."""
+    """
+    Unified embedding interface supporting multiple providers.
+    
+    Results are cached by content hash (see embedding_cache), so repeated
+    texts - re-indexed sessions, common queries - skip the provider call.
+    """
     
     def __init__(self):
         self.settings = get_settings()
         self._model = None
         self._local_model = None
+        self._batcher = None
+        self._remote_clients: dict = {}
+        self._cache = None
+        if self.settings.embedding_cache_enabled:
+            from .embedding_cache import EmbeddingCache
+            
+            self._cache = EmbeddingCache(
+                local_entries=self.settings.embedding_cache_local_entries,
+                redis_url=self.settings.redis_url,
+                shared_max_bytes=self.settings.embedding_cache_shared_mb * 1024 * 1024,
+            )
     
-    def _get_openai_embedding(self) -> "OpenAIEmbeddings":
-        """Get OpenAI embeddings model."""
-        from langchain_openai import OpenAIEmbeddings
+    def _remote_client(self) -> "RemoteEmbeddingClient":
+        """
+        Pooled OpenAI/Voyage client (see remote_embedding).
         
-        if not self.settings.openai_api_key:
-            raise ValueError("OPENAI_API_KEY is required for OpenAI embeddings")
+        Built once per provider and settings version, so runtime changes to
+        the provider, model or keys take effect without a restart.
+        """
+        from .config import get_settings_version
+        from .remote_embedding import RemoteEmbeddingClient
         
-        return OpenAIEmbeddings(
-            model="text-embedding-3-small",
-            api_key=self.settings.openai_api_key,
-        )
-    
-    def _get_voyage_embedding(self):
-        """Get Voyage AI embeddings model."""
-        import voyageai
+        settings = get_settings()
+        provider = settings.active_embedding_provider
+        key = (provider, get_settings_version())
+        client = self._remote_clients.get(key)
+        if client is not None:
+            return client
         
-        if not self.settings.voyage_api_key:
-            raise ValueError("VOYAGE_API_KEY is required for Voyage AI embeddings")
+        if provider == EmbeddingProvider.OPENAI:
+            api_key = settings.get_api_key_for_provider("openai")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY is required for OpenAI embeddings")
+            model_name = "text-embedding-3-small"
+        else:
+            api_key = settings.get_api_key_for_provider("voyage")
+            if not api_key:
+                raise ValueError("VOYAGE_API_KEY is required for Voyage AI embeddings")
+            model_name = settings.active_embedding_model
         
-        return voyageai.Client(api_key=self.settings.voyage_api_key)
+        client = RemoteEmbeddingClient(
+            provider.value,
+            model_name,
+            api_key,
+            concurrency=settings.embedding_remote_concurrency,
+            tokens_per_minute=settings.embedding_remote_tokens_per_minute,
+            requests_per_minute=settings.embedding_remote_requests_per_minute,
+            redis_url=settings.redis_url if settings.embedding_remote_shared_rate_limit else None,
+            max_retries=settings.embedding_remote_max_retries,
+        )
+        # Clients built for older settings are dropped
+        self._remote_clients = {key: client}
+        return client
+    
+    def _server_client(self):
+        """Shared embedding server client, if EMBEDDING_SERVER_URL is set."""
+        from apps.api.src.services.embedding_client import get_embedding_server_client
+        return get_embedding_server_client()
     
     def _get_local_model(self):
         """Get local sentence-transformers model (lazy loaded)."""
         if self._local_model is None:
-            from sentence_transformers import SentenceTransformer
-            self._local_model = SentenceTransformer(self.settings.active_embedding_model)
+            self._local_model = load_local_sentence_model(self.settings.active_embedding_model)
         return self._local_model
     
     def embed_query(self, text: str) -> List[float]:
         """Embed a single query text."""
+        return self.embed_queries([text])[0]
+    
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed several query texts in one provider call."""
+        return self._cached("query", texts, self._embed_queries)
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed multiple documents."""
+        return self._cached("document", texts, self._embed_documents)
+    
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Embed a query from async code.
+        
+        Concurrent calls are coalesced by the micro-batcher (see
+        embedding_batcher) into one embed_queries() call off the event loop.
+        """
+        if self._batcher is None:
+            from .embedding_batcher import EmbeddingBatcher
+            
+            self._batcher = EmbeddingBatcher(
+                self.embed_queries,
+                max_wait_ms=self.settings.embedding_batch_wait_ms,
+                max_batch_size=self.settings.embedding_batch_max_size,
+            )
+        return await self._batcher.embed(text)
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents from async code.
+        
+        OpenAI/Voyage batches are sent concurrently on the event loop; local
+        and embedding-server models run in the default executor.
+        """
+        return await self._acached("document", texts, self._aembed_documents)
+    
+    def cache_stats(self) -> dict:
+        """Embedding cache hit/miss counters for this process."""
+        stats = self._cache.get_stats() if self._cache else {"enabled": False}
+        if self._batcher is not None:
+            stats["batcher"] = self._batcher.get_stats()
+        if self._remote_clients:
+            stats["remote"] = next(iter(self._remote_clients.values())).get_stats()
+        return stats
+    
+    def _cached(self, input_type: str, texts: List[str], embed) -> List[List[float]]:
+        """Serve what the cache has; embed the rest in one provider call."""
+        if self._cache is None or not texts:
+            return embed(texts)
+        
+        keys, vectors, missing = self._cache_lookup(input_type, texts)
+        if missing:
+            computed = embed([texts[i] for i in missing.values()])
+            vectors = self._cache_fill(keys, vectors, missing, computed)
+        return vectors
+    
+    async def _acached(self, input_type: str, texts: List[str], aembed) -> List[List[float]]:
+        """Async _cached(): cache I/O runs off the event loop."""
+        if self._cache is None or not texts:
+            return await aembed(texts)
+        
+        loop = asyncio.get_running_loop()
+        keys, vectors, missing = await loop.run_in_executor(None, self._cache_lookup, input_type, texts)
+        if missing:
+            computed = await aembed([texts[i] for i in missing.values()])
+            vectors = await loop.run_in_executor(None, self._cache_fill, keys, vectors, missing, computed)
+        return vectors
+    
+    def _cache_lookup(self, input_type: str, texts: List[str]) -> tuple[list, list, dict]:
+        """Cache keys, cached vectors (None = miss) and {key: first index} of misses."""
+        from .embedding_cache import cache_key
+        
+        provider = self.settings.active_embedding_provider.value
+        model_name = self.settings.active_embedding_model
+        keys = [cache_key(provider, model_name, input_type, text) for text in texts]
+        vectors = self._cache.get_many(keys)
+        
+        # Duplicates within one batch are embedded once
+        missing: dict[str, int] = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], i)
+        return keys, vectors, missing
+    
+    def _cache_fill(self, keys: list, vectors: list, missing: dict, computed: list) -> List[List[float]]:
+        """
+        Store freshly computed vectors and merge them into the result.
+        
+        Misses are returned as stored (float16-rounded), so a text embeds to
+        the same vector whether or not it was cached.
+        """
+        by_key = self._cache.put_many(dict(zip(missing, computed, strict=True)))
+        return [by_key[key] if vector is None else vector for key, vector in zip(keys, vectors, strict=True)]
+    
+    def _embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed query texts with the active provider (uncached)."""
         provider = self.settings.active_embedding_provider
         model_name = self.settings.active_embedding_model
         
-        if provider == EmbeddingProvider.OPENAI:
-            model = self._get_openai_embedding()
-            return model.embed_query(text)
-        elif provider == EmbeddingProvider.VOYAGE:
-            client = self._get_voyage_embedding()
-            result = client.embed([text], model=model_name, input_type="query")
-            return result.embeddings[0]
+        if provider in (EmbeddingProvider.OPENAI, EmbeddingProvider.VOYAGE):
+            return self._remote_client().embed(texts, input_type="query")
+        elif self._server_client() is not None:
+            return self._server_client().embed_dense(texts, model_name, input_type="query")
         else:
             # Local embeddings with sentence-transformers
             model = self._get_local_model()
-            embedding = model.encode(text, convert_to_numpy=True)
-            return embedding.tolist()
+            embeddings = model.encode(texts, convert_to_numpy=True)
+            return [emb.tolist() for emb in embeddings]
     
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        """Embed multiple documents."""
+    def _embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed multiple documents with the active provider (uncached)."""
         provider = self.settings.active_embedding_provider
         model_name = self.settings.active_embedding_model
         
-        if provider == EmbeddingProvider.OPENAI:
-            model = self._get_openai_embedding()
-            return model.embed_documents(texts)
-        elif provider == EmbeddingProvider.VOYAGE:
-            client = self._get_voyage_embedding()
-            result = client.embed(texts, model=model_name, input_type="document")
-            return result.embeddings
+        if provider in (EmbeddingProvider.OPENAI, EmbeddingProvider.VOYAGE):
+            # Split into provider-sized batches, sent concurrently under the rate limit
+            return self._remote_client().embed(texts, input_type="document")
+        elif self._server_client() is not None:
+            return self._server_client().embed_dense(texts, model_name, input_type="document")
         else:
             # Local embeddings with sentence-transformers
             model = self._get_local_model()
             embeddings = model.encode(texts, convert_to_numpy=True)
             return [emb.tolist() for emb in embeddings]
     
+    async def _aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Async _embed_documents() (uncached)."""
+        if self.settings.active_embedding_provider in (EmbeddingProvider.OPENAI, EmbeddingProvider.VOYAGE):
+            return await self._remote_client().aembed(texts, input_type="document")
+        return await asyncio.get_running_loop().run_in_executor(None, self._embed_documents, texts)
+    
     @property
     def dimension(self) -> int:
         """Get embedding dimension for the current model."""
@@ -293,6 +432,24 @@ class EmbeddingModel:
             return model_dimensions.get(model_name, 384)
 
 
+def load_local_sentence_model(model_name: str):
+    """
+    Load a local sentence embedding model on the configured backend.
+    
+    LOCAL_EMBEDDING_BACKEND=torch uses sentence-transformers; onnx uses
+    ONNX Runtime (optionally int8). Both expose SentenceTransformer.encode().
+    """
+    from .onnx_embedding import load_sentence_model
+    
+    settings = get_settings()
+    return load_sentence_model(
+        model_name,
+        backend=settings.local_embedding_backend,
+        quantized=settings.local_embedding_quantized,
+        threads=settings.local_embedding_threads,
+    )
+
+
 @lru_cache
 def get_embedding_model() -> EmbeddingModel:
     """Get cached embedding model instance."""
@@ -0,0 +1,161 @@
+"""
+ONNX Embedding Backend - sentence-transformers models on ONNX Runtime.
+
+The LOCAL provider normally runs sentence-transformers on torch: slow to
+import, several hundred MB resident, and CPU-bound on our GPU-less nodes.
+This backend runs the same models' ONNX exports through fastembed (already
+a dependency for BM25), optionally with int8 dynamically-quantized weights.
+
+OnnxSentenceModel.encode() mirrors SentenceTransformer.encode(), so it is a
+drop-in wherever a local model is used (EmbeddingModel, the embedding
+server, reranking, DM memory). Select it with LOCAL_EMBEDDING_BACKEND=onnx
+(and LOCAL_EMBEDDING_QUANTIZED=true for int8).
+
+Vectors stay compatible with ones indexed by the torch path (same weights,
+same pooling); the parity test checks cosine similarity between the two.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class OnnxModelSpec:
+    """ONNX export of a sentence-transformers model on the Hugging Face Hub."""
+    repo: str
+    dim: int
+    pooling: str  # fastembed PoolingType name: MEAN or CLS
+    normalize: bool
+    float_file: str = "onnx/model.onnx"
+    int8_file: str = "onnx/model_quantized.onnx"
+
+
+# Local models we index with, and their ONNX exports (float + int8)
+ONNX_MODELS = {
+    "all-MiniLM-L6-v2": OnnxModelSpec("Xenova/all-MiniLM-L6-v2", dim=384, pooling="MEAN", normalize=True),
+    "all-mpnet-base-v2": OnnxModelSpec("Xenova/all-mpnet-base-v2", dim=768, pooling="MEAN", normalize=True),
+    "multi-qa-mpnet-base-dot-v1": OnnxModelSpec("Xenova/multi-qa-mpnet-base-dot-v1", dim=768, pooling="CLS", normalize=False),
+}
+
+_registered: set[str] = set()
+
+
+def _canonical(model_name: str) -> str:
+    return model_name.removeprefix("sentence-transformers/")
+
+
+def _register(model_name: str, quantized: bool) -> str:
+    """Register the export with fastembed; returns the fastembed model name."""
+    from fastembed import TextEmbedding
+    from fastembed.common.model_description import ModelSource, PoolingType
+
+    spec = ONNX_MODELS.get(_canonical(model_name))
+    if spec is None:
+        raise ValueError(
+            f"No ONNX export configured for {model_name} "
+            f"(supported: {', '.join(sorted(ONNX_MODELS))})"
+        )
+
+    fastembed_name = f"{_canonical(model_name)}-onnx{'-int8' if quantized else ''}"
+    if fastembed_name not in _registered:
+        TextEmbedding.add_custom_model(
+            model=fastembed_name,
+            pooling=PoolingType[spec.pooling],
+            normalization=spec.normalize,
+            sources=ModelSource(hf=spec.repo),
+            dim=spec.dim,
+            model_file=spec.int8_file if quantized else spec.float_file,
+        )
+        _registered.add(fastembed_name)
+    return fastembed_name
+
+
+class OnnxSentenceModel:
+    """
+    SentenceTransformer-compatible encoder on ONNX Runtime.
+
+    Usage:
+        model = OnnxSentenceModel("all-MiniLM-L6-v2", quantized=True)
+        vectors = model.encode(["hello", "world"])   # np.ndarray (2, 384)
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        quantized: bool = False,
+        threads: Optional[int] = None,
+        cache_dir: Optional[str] = None,
+    ):
+        from fastembed import TextEmbedding
+
+        self.model_name = model_name
+        self.quantized = quantized
+        self._model = TextEmbedding(
+            model_name=_register(model_name, quantized),
+            threads=threads,
+            cache_dir=cache_dir,
+        )
+        self._dim = ONNX_MODELS[_canonical(model_name)].dim
+        print(f"[ONNX] Loaded {model_name} ({'int8' if quantized else 'float32'})")
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dim
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        show_progress_bar: Optional[bool] = None,
+        **kwargs,
+    ) -> np.ndarray:
+        """
+        Same contract as SentenceTransformer.encode (numpy output).
+
+        Only sentence embeddings as numpy arrays are supported: options that
+        would change the output (output_value, convert_to_tensor, precision,
+        ...) raise TypeError rather than being silently ignored.
+        """
+        if kwargs:
+            raise TypeError(f"OnnxSentenceModel.encode() does not support: {', '.join(sorted(kwargs))}")
+        if not convert_to_numpy:
+            raise TypeError("OnnxSentenceModel.encode() only returns numpy arrays (convert_to_numpy=True)")
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        if texts:
+            embeddings = np.stack(list(self._model.embed(texts, batch_size=batch_size))).astype(np.float32)
+        else:
+            embeddings = np.zeros((0, self._dim), dtype=np.float32)
+        if normalize_embeddings and len(embeddings):
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-12
+
+        return embeddings[0] if single else embeddings
+
+
+def load_sentence_model(
+    model_name: str,
+    backend: str = "torch",
+    quantized: bool = False,
+    threads: Optional[int] = None,
+):
+    """
+    Local sentence embedding model on the configured backend.
+
+    Args:
+        model_name: sentence-transformers model name
+        backend: "torch" (sentence-transformers) or "onnx" (ONNX Runtime)
+        quantized: onnx only - use int8 weights
+        threads: onnx only - intra-op threads (None = ONNX Runtime default)
+    """
+    if backend == "onnx":
+        return OnnxSentenceModel(model_name, quantized=quantized, threads=threads)
+    if backend != "torch":
+        raise ValueError(f"Unknown local embedding backend: {backend} (use torch or onnx)")
+
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
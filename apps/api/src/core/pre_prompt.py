@@ -13,7 +13,8 @@ def get_guild_pre_prompt(guild_id: int) -> Optional[str]:
         guild_id: The Discord guild ID
         
     Returns:
-        The pre-prompt text if set, None otherwise
+        The pre-prompt text if set, None otherwise (also when the lookup
+        fails - the error is logged and the answer goes out without it)
     """
     try:
         from sqlalchemy import create_engine, text as sql_text
@@ -31,7 +32,7 @@ def get_guild_pre_prompt(guild_id: int) -> Optional[str]:
             
             if row and row[0]:
                 return row[0]
-    except Exception:
-        pass
+    except Exception as e:
+        print(f"[PRE_PROMPT] Failed to load pre-prompt for guild {guild_id}: {e}")
     
     return None
@@ -0,0 +1,418 @@
+"""
+Remote Embeddings - Pooled, rate-limited OpenAI / Voyage embedding clients.
+
+EmbeddingModel used to build a new OpenAIEmbeddings / voyageai.Client on
+every call and send each input list as one serial request. A
+RemoteEmbeddingClient is built once per provider and settings version (keys
+and models can change at runtime) and keeps its HTTP connection pools.
+
+Large inputs are split into provider-sized batches that are sent
+concurrently - from threads for sync callers (Celery), from the event loop
+for async ones. Every request first takes capacity from token buckets on
+tokens/minute and requests/minute, so bulk indexing queues locally instead
+of running into the provider's 429s.
+
+The provider's limits apply to the API key, not to one process, so the
+buckets live in Redis and are shared by every API and Celery worker process
+using that key. If Redis is unreachable a bucket falls back to a
+per-process one for a while; N processes can then briefly send up to N
+times the configured rate, and the 429 retry below absorbs the overshoot.
+
+A 429 that still gets through is retried (up to max_retries), waiting for
+the provider's Retry-After when it sends one and backing off exponentially
+otherwise.
+"""
+
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass(frozen=True)
+class BatchLimits:
+    """Per-request limits of an embedding API."""
+    max_texts: int
+    max_tokens: int
+
+
+PROVIDER_LIMITS = {
+    "openai": BatchLimits(max_texts=2048, max_tokens=300_000),
+    "voyage": BatchLimits(max_texts=1000, max_tokens=120_000),  # voyage-3-large/code; 3.5 allows more
+}
+
+SHARED_LIMIT_RETRY_SECONDS = 30.0  # How long a bucket stays per-process after a Redis error
+RETRY_BACKOFF_BASE = 1.0           # First 429 backoff without Retry-After (doubles per attempt)
+RETRY_BACKOFF_MAX = 60.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English BPE vocabularies)."""
+    return len(text) // 4 + 1
+
+
+def split_batches(texts: List[str], limits: BatchLimits) -> List[tuple[int, int]]:
+    """Contiguous (start, end) ranges of texts that each fit in one request."""
+    batches = []
+    start, tokens = 0, 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if i > start and (i - start >= limits.max_texts or tokens + cost > limits.max_tokens):
+            batches.append((start, i))
+            start, tokens = i, 0
+        tokens += cost
+    if start < len(texts):
+        batches.append((start, len(texts)))
+    return batches
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket, usable from threads and from asyncio.
+
+    Callers reserve capacity up front (the balance may go negative) and then
+    wait out the deficit, so concurrent callers are spaced out in arrival
+    order rather than all firing and retrying. Holds up to 10s of budget.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        self.rate = per_minute / 60.0
+        self.capacity = self.rate * burst_seconds
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_s = 0.0
+
+    def _reserve(self, amount: float) -> float:
+        """Take `amount` and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = max(0.0, -self._tokens / self.rate)
+            self.waited_s += wait
+            return wait
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block the calling thread until `amount` is available."""
+        wait = self._reserve(amount)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, amount: float = 1.0) -> float:
+        """Async version of acquire()."""
+        wait = self._reserve(amount)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class RedisTokenBucket(TokenBucket):
+    """
+    TokenBucket whose balance lives in Redis, shared by every process.
+
+    Reservation is one Lua script (refill from Redis TIME, subtract, return
+    the wait), so concurrent processes are spaced out exactly like threads
+    sharing a local bucket. While Redis is down, the inherited per-process
+    bucket is used instead.
+    """
+
+    # KEYS[1] = bucket hash; ARGV = rate/s, capacity, amount, burst seconds
+    _RESERVE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate) - amount
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+local wait = 0
+if tokens < 0 then wait = -tokens / rate end
+redis.call('EXPIRE', KEYS[1], math.ceil(wait + tonumber(ARGV[4])) + 60)
+return tostring(wait)
+"""
+
+    def __init__(self, redis_url: str, key: str, per_minute: float, burst_seconds: float = 10.0):
+        super().__init__(per_minute, burst_seconds)
+        self.redis_url = redis_url
+        self.key = key
+        self.burst_seconds = burst_seconds
+        self._client = None
+        self._down_until = 0.0
+        self.redis_errors = 0
+
+    def get_client(self):
+        """Lazy-load Redis client."""
+        if self._client is None:
+            import redis
+            self._client = redis.from_url(self.redis_url, socket_timeout=0.5)
+        return self._client
+
+    def _reserve(self, amount: float) -> float:
+        if time.monotonic() < self._down_until:
+            return super()._reserve(amount)
+        try:
+            wait = float(self.get_client().eval(
+                self._RESERVE_SCRIPT, 1, self.key, self.rate, self.capacity, amount, self.burst_seconds
+            ))
+        except Exception as e:
+            self.redis_errors += 1
+            self._down_until = time.monotonic() + SHARED_LIMIT_RETRY_SECONDS
+            print(
+                f"[REMOTE EMBED] Shared rate limit unavailable, limiting per process "
+                f"for {SHARED_LIMIT_RETRY_SECONDS:.0f}s: {e}"
+            )
+            return super()._reserve(amount)
+        with self._lock:
+            self.waited_s += wait
+        return wait
+
+
+def rate_limit_retry_after(error: Exception) -> Optional[float]:
+    """
+    For a provider 429: seconds its Retry-After asked for (0.0 if absent).
+    None for any other error.
+    """
+    response = getattr(error, "response", None)
+    status = (
+        getattr(error, "status_code", None)
+        or getattr(error, "http_status", None)
+        or getattr(response, "status_code", None)
+    )
+    if status != 429 and type(error).__name__ != "RateLimitError":
+        return None
+
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None) or {}
+    headers = {str(k).lower(): v for k, v in dict(headers).items()}
+    if headers.get("retry-after-ms"):
+        try:
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def retry_wait(error: Exception, attempt: int, max_retries: int) -> Optional[float]:
+    """How long to wait before retrying `error` (None = don't retry)."""
+    retry_after = rate_limit_retry_after(error)
+    if retry_after is None or attempt >= max_retries:
+        return None
+    if retry_after > 0:
+        return retry_after
+    return min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class RemoteEmbeddingClient:
+    """
+    One provider's embedding client: pooled connections, concurrent batches,
+    rate limited.
+
+    Usage:
+        client = RemoteEmbeddingClient("voyage", "voyage-3.5", api_key)
+        vectors = client.embed(texts, input_type="document")
+        vectors = await client.aembed(texts, input_type="document")
+
+    With redis_url, the rate limits are shared by every process using the
+    same provider and API key; without it each process gets the full rate.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        model: str,
+        api_key: str,
+        concurrency: int = 4,
+        tokens_per_minute: int = 1_000_000,
+        requests_per_minute: int = 3_000,
+        redis_url: Optional[str] = None,
+        max_retries: int = 5,
+    ):
+        self.provider = provider
+        self.model = model
+        self.api_key = api_key
+        self.limits = PROVIDER_LIMITS[provider]
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max(0, max_retries)
+        self._token_bucket = self._bucket(redis_url, "tokens", tokens_per_minute)
+        self._request_bucket = self._bucket(redis_url, "requests", requests_per_minute)
+
+        self._client = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Async clients and semaphores belong to one event loop
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+
+        self._requests = 0
+        self._texts = 0
+        self._rate_limited = 0
+
+    def _bucket(self, redis_url: Optional[str], kind: str, per_minute: int) -> Optional[TokenBucket]:
+        if per_minute <= 0:
+            return None
+        if not redis_url:
+            return TokenBucket(per_minute)
+        # Limits belong to the API key; never put the key itself in Redis
+        key_id = hashlib.sha256(self.api_key.encode()).hexdigest()[:16]
+        return RedisTokenBucket(redis_url, f"embed_rate:{self.provider}:{key_id}:{kind}", per_minute)
+
+    def get_client(self):
+        """Lazy-load the pooled sync client."""
+        with self._lock:
+            if self._client is None:
+                self._client = self._build_client(use_async=False)
+            return self._client
+
+    def _get_async_client(self):
+        """Async client and concurrency limit for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._async_client = self._build_client(use_async=True)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._async_client
+
+    def _build_client(self, use_async: bool):
+        if self.provider == "openai":
+            from langchain_openai import OpenAIEmbeddings
+
+            # One OpenAIEmbeddings holds both a sync and an async pooled client
+            return OpenAIEmbeddings(model=self.model, api_key=self.api_key, chunk_size=self.limits.max_texts)
+
+        import voyageai
+
+        if use_async:
+            return voyageai.AsyncClient(api_key=self.api_key)
+        return voyageai.Client(api_key=self.api_key)
+
+    def embed(self, texts: List[str], input_type: str = "document") -> List[List[float]]:
+        """Embed any number of texts; batches above one request run concurrently."""
+        batches = split_batches(texts, self.limits)
+        if len(batches) <= 1:
+            return self._embed_batch(texts, input_type) if texts else []
+
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency, thread_name_prefix=f"embed-{self.provider}"
+                )
+
+        futures = [
+            self._executor.submit(self._embed_batch, texts[start:end], input_type)
+            for start, end in batches
+        ]
+        return [vector for future in futures for vector in future.result()]
+
+    async def aembed(self, texts: List[str], input_type: str = "document") -> List[List[float]]:
+        """Async embed(): batches run concurrently on the event loop."""
+        if not texts:
+            return []
+
+        results = await asyncio.gather(*(
+            self._aembed_batch(texts[start:end], input_type)
+            for start, end in split_batches(texts, self.limits)
+        ))
+        return [vector for batch in results for vector in batch]
+
+    def _embed_batch(self, texts: List[str], input_type: str) -> List[List[float]]:
+        attempt = 0
+        while True:
+            self._throttle_sync(texts)
+            try:
+                return self._request(texts, input_type)
+            except Exception as e:
+                wait = self._on_error(e, attempt)
+                time.sleep(wait)
+                attempt += 1
+
+    async def _aembed_batch(self, texts: List[str], input_type: str) -> List[List[float]]:
+        self._get_async_client()
+        async with self._semaphore:
+            attempt = 0
+            while True:
+                await self._throttle_async(texts)
+                try:
+                    return await self._arequest(texts, input_type)
+                except Exception as e:
+                    wait = self._on_error(e, attempt)
+                    await asyncio.sleep(wait)
+                    attempt += 1
+
+    def _on_error(self, error: Exception, attempt: int) -> float:
+        """Backoff before retrying a 429; re-raises anything else (or the last 429)."""
+        wait = retry_wait(error, attempt, self.max_retries)
+        if wait is None:
+            raise error
+        with self._lock:
+            self._rate_limited += 1
+        print(f"[REMOTE EMBED] {self.provider} rate limited, retry {attempt + 1}/{self.max_retries} in {wait:.1f}s")
+        return wait
+
+    def _request(self, texts: List[str], input_type: str) -> List[List[float]]:
+        """One provider request."""
+        client = self.get_client()
+        if self.provider == "openai":
+            # OpenAI has no query/document distinction
+            return client.embed_documents(texts)
+        return client.embed(texts, model=self.model, input_type=input_type).embeddings
+
+    async def _arequest(self, texts: List[str], input_type: str) -> List[List[float]]:
+        """Async version of _request()."""
+        client = self._get_async_client()
+        if self.provider == "openai":
+            return await client.aembed_documents(texts)
+        result = await client.embed(texts, model=self.model, input_type=input_type)
+        return result.embeddings
+
+    def _throttle_sync(self, texts: List[str]) -> None:
+        self._count(texts)
+        if self._request_bucket:
+            self._request_bucket.acquire(1)
+        if self._token_bucket:
+            self._token_bucket.acquire(sum(estimate_tokens(t) for t in texts))
+
+    async def _throttle_async(self, texts: List[str]) -> None:
+        self._count(texts)
+        if self._request_bucket:
+            await self._request_bucket.aacquire(1)
+        if self._token_bucket:
+            await self._token_bucket.aacquire(sum(estimate_tokens(t) for t in texts))
+
+    def _count(self, texts: List[str]) -> None:
+        with self._lock:
+            self._requests += 1
+            self._texts += len(texts)
+
+    def get_stats(self) -> dict:
+        """Request counters and time spent waiting on the rate limit."""
+        waited = sum(b.waited_s for b in (self._token_bucket, self._request_bucket) if b)
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "requests": self._requests,
+            "texts": self._texts,
+            "throttled_s": round(waited, 3),
+            "rate_limited": self._rate_limited,
+            "shared_rate_limit": isinstance(self._request_bucket or self._token_bucket, RedisTokenBucket),
+        }
@@ -0,0 +1,135 @@
+"""
+Speculative Retrieval - RAG retrieval started while /ask classifies the query.
+
+When no routing pattern decides the intent, classify_intent embeds the query
+and may ask the LLM, and only then does retrieval start. Most of those
+queries end up answered from the vector store (vector_rag, or
+general_knowledge with a channel, which /ask answers with RAG), so /ask
+starts retrieve_rag_context() concurrently with classification:
+
+- Hit: the router picked a RAG route; the answer awaits the running
+  retrieval instead of starting it, saving however much of it was done
+- Miss: any other route; the retrieval task is cancelled
+- Discarded: the answer came from the answer cache, or /ask failed
+
+Retrieval and the intent classifier embed the same query at the same time;
+the embedding micro-batcher coalesces identical texts, so this costs no
+extra embedding call. A miss costs the cancelled Qdrant/Postgres work.
+
+Cancelling stops the vector search, but the recent-message and pre-prompt
+queries run in the threadpool (asyncio.to_thread) and can't be interrupted:
+once started they run to completion and their results are dropped. That
+threadpool time is not in wasted_ms, which only counts retrieval time up to
+the cancel, so it is a lower bound of the work a miss costs.
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Optional
+
+from packages.shared.python.models import RouterIntent
+
+
+def uses_rag_retrieval(intent: Optional[RouterIntent], channel_id: Optional[int]) -> bool:
+    """Whether /ask answers this intent from retrieve_rag_context()."""
+    if intent == RouterIntent.VECTOR_RAG:
+        return True
+    return intent == RouterIntent.GENERAL_KNOWLEDGE and bool(channel_id)
+
+
+class SpeculationStats:
+    """Outcome counters and latency accounting for speculative retrieval."""
+
+    def __init__(self):
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.saved_ms = 0.0  # Retrieval time already done when a hit was used
+        self.wasted_ms = 0.0  # Retrieval time until cancelled (excludes threadpool queries left running)
+
+    def get_stats(self) -> dict:
+        """Counters for monitoring (per process)."""
+        decided = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+            "hit_rate": round(self.hits / decided, 4) if decided else 0.0,
+            "saved_ms_total": round(self.saved_ms, 1),
+            "avg_saved_ms": round(self.saved_ms / self.hits, 1) if self.hits else 0.0,
+            "wasted_ms_total": round(self.wasted_ms, 1),
+        }
+
+
+class SpeculativeRetrieval:
+    """
+    A retrieval running ahead of the routing decision.
+
+    Usage:
+        speculation = SpeculativeRetrieval(retrieve_rag_context(...))
+        intent = await classify_intent(query)
+        if uses_rag_retrieval(intent, channel_id):
+            retrieval = speculation.take()
+        else:
+            speculation.cancel()
+    """
+
+    def __init__(self, retrieval: Awaitable[Any], stats: Optional[SpeculationStats] = None):
+        self.stats = stats or get_speculation_stats()
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+        self.outcome: Optional[str] = None  # "hit", "miss" or "discarded" once decided
+        self.saved_ms = 0.0
+        self.task = asyncio.ensure_future(retrieval)
+        self.task.add_done_callback(self._done)
+        self.stats.started += 1
+
+    def take(self) -> Optional[asyncio.Future]:
+        """Use the retrieval for the answer (None if already cancelled)."""
+        if self.outcome is not None:
+            return self.task if self.outcome == "hit" else None
+        self.outcome = "hit"
+        self.saved_ms = self._work_done_ms()
+        self.stats.hits += 1
+        self.stats.saved_ms += self.saved_ms
+        print(f"[SPECULATION] Hit, retrieval {self.saved_ms:.0f}ms ahead")
+        return self.task
+
+    def cancel(self, outcome: str = "miss") -> None:
+        """
+        Drop the retrieval: the router chose another route ("miss") or it isn't needed ("discarded").
+
+        Postgres queries already running in the threadpool finish in the
+        background; only the time up to now is added to wasted_ms.
+        """
+        if self.outcome is not None:
+            return
+        self.outcome = outcome
+        self.task.cancel()
+        self.stats.wasted_ms += self._work_done_ms()
+        if outcome == "miss":
+            self.stats.misses += 1
+        else:
+            self.stats.discarded += 1
+
+    def _work_done_ms(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return (end - self.started_at) * 1000
+
+    def _done(self, task: asyncio.Future) -> None:
+        self.finished_at = time.perf_counter()
+        if not task.cancelled():
+            task.exception()  # Retrieved here, so an unused failure isn't logged as unhandled
+
+
+_speculation_stats: Optional[SpeculationStats] = None
+
+
+def get_speculation_stats() -> SpeculationStats:
+    """Process-wide speculation counters."""
+    global _speculation_stats
+    if _speculation_stats is None:
+        _speculation_stats = SpeculationStats()
+    return _speculation_stats
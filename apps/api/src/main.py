@@ -9,24 +9,29 @@ Routes incoming queries through the LangGraph agent system:
 """
 
 import sys
+import time
 from pathlib import Path
 from contextlib import asynccontextmanager
 from typing import Optional
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from packages.shared.python.models import AskQuery, AskResponse, RouterIntent
-from apps.api.src.agents.router import classify_intent, should_use_hybrid
+from apps.api.src.agents.router import classify_intent, extract_time_range, route_query
 from apps.api.src.agents.analytics import process_analytics_query
-from apps.api.src.agents.vector_rag import process_rag_query
+from apps.api.src.agents.vector_rag import process_rag_query, retrieve_rag_context
 from apps.api.src.agents.web_search import process_web_search_query
 from apps.api.src.agents.general_knowledge import process_general_knowledge_query
+from apps.api.src.core.answer_cache import get_answer_cache
+from apps.api.src.core.answer_stream import AnswerStream, emit as emit_event
 from apps.api.src.core.config import get_settings, LLMProvider, EmbeddingProvider
 from apps.api.src.core.llm_factory import get_provider_info
+from apps.api.src.core.speculation import SpeculativeRetrieval, get_speculation_stats, uses_rag_retrieval
 
 
 @asynccontextmanager
@@ -36,11 +41,11 @@ async def lifespan(app: FastAPI):
     settings = get_settings()
     print(f"Starting Cognitive Layer API (debug={settings.debug})")
     
-    # Initialize Qdrant collection
+    # Verify/create all Qdrant collections and payload indexes once per process
     try:
         from apps.api.src.services.qdrant_service import qdrant_service
-        qdrant_service.ensure_collection()
-        print("Qdrant collection initialized")
+        status = qdrant_service.registry.bootstrap()
+        print(f"Qdrant collections initialized: {status}")
     except Exception as e:
         print(f"Warning: Could not initialize Qdrant: {e}")
     
@@ -48,6 +53,11 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("Shutting down Cognitive Layer API")
+    try:
+        from apps.api.src.services.qdrant_service import async_qdrant_service
+        await async_qdrant_service.close()
+    except Exception as e:
+        print(f"Warning: Could not close async Qdrant client: {e}")
 
 
 app = FastAPI(
@@ -79,6 +89,26 @@ async def health_check() -> HealthResponse:
     return HealthResponse(status="healthy", version="0.1.0")
 
 
+@app.get("/health/embedding-cache")
+async def embedding_cache_stats() -> dict:
+    """Embedding cache hit/miss counters for the API process."""
+    from apps.api.src.core.llm_factory import get_embedding_model
+    
+    return get_embedding_model().cache_stats()
+
+
+@app.get("/health/answer-cache")
+async def answer_cache_stats() -> dict:
+    """/ask answer cache hit/miss counters for the API process."""
+    return get_answer_cache().get_stats()
+
+
+@app.get("/health/speculation")
+async def speculation_stats() -> dict:
+    """Speculative retrieval hit rate and latency saved for the API process."""
+    return get_speculation_stats().get_stats()
+
+
 @app.post("/ask", response_model=AskResponse)
 async def ask(query: AskQuery) -> AskResponse:
     """
@@ -91,6 +121,10 @@ async def ask(query: AskQuery) -> AskResponse:
     - **vector_rag**: Semantic queries → Vector search + RAG
     - **web_search**: External info → Web search API
     
+    When no routing pattern decides the intent, RAG retrieval starts while
+    the query is classified and is kept only if the answer uses it (see
+    core/speculation.py).
+    
     All queries are filtered by guild_id for multi-tenant isolation.
     """
     from apps.api.src.services.conversation_memory import conversation_memory
@@ -100,6 +134,7 @@ async def ask(query: AskQuery) -> AskResponse:
         log_security_event,
     )
     
+    speculation: Optional[SpeculativeRetrieval] = None
     try:
         # Security check - detect prompt injection attempts
         security_result = detect_prompt_injection(query.query)
@@ -133,11 +168,70 @@ async def ask(query: AskQuery) -> AskResponse:
                 query.author_name or "User"
             )
         
-        # Step 1: Check if query needs multi-source (hybrid) routing
-        hybrid_config = should_use_hybrid(safe_query)
+        # Time window ("last week", "yesterday") narrows vector search server-side
+        time_range = extract_time_range(safe_query)
+        if time_range:
+            print(f"[ROUTER] Time range: {time_range.label}")
+        
+        # Step 1: Check if query needs multi-source (hybrid) routing; the same
+        # pass over the routing patterns also gives the pattern intent
+        route = route_query(safe_query)
+        hybrid_config = route.hybrid_config
         
         if hybrid_config["use_hybrid"]:
             print(f"[ROUTER] Using hybrid routing: vector={hybrid_config['include_vector']}, web={hybrid_config['include_web']}")
+            emit_event(
+                "route",
+                routed_to="hybrid",
+                include_vector=hybrid_config["include_vector"],
+                include_web=hybrid_config["include_web"],
+                include_knowledge=hybrid_config["include_knowledge"],
+            )
+            intent = None
+            cache_intent = None if hybrid_config["include_web"] else "hybrid"
+        else:
+            # Classification may embed the query and call the LLM; vector_rag is
+            # the likeliest outcome, so retrieval starts in the meantime
+            if route.intent is None and not route.conversational and get_settings().speculative_retrieval_enabled:
+                speculation = SpeculativeRetrieval(retrieve_rag_context(
+                    query=safe_query,
+                    guild_id=query.guild_id,
+                    channel_ids=query.channel_ids,
+                    channel_id=query.channel_id,
+                    time_range=time_range,
+                ))
+            
+            # Step 2: Classify intent (using sanitized query)
+            intent = await classify_intent(safe_query, route=route)
+            if speculation is not None and not uses_rag_retrieval(intent, query.channel_id):
+                speculation.cancel()
+            
+            # Streaming clients learn the route before any answer tokens
+            routed = intent
+            if intent == RouterIntent.GENERAL_KNOWLEDGE and query.channel_id:
+                routed = RouterIntent.VECTOR_RAG
+            emit_event("route", routed_to=routed.value)
+            cache_intent = None if intent == RouterIntent.WEB_SEARCH else intent.value
+        
+        # Step 3: Reuse the answer if the guild's index hasn't changed since
+        lookup_start = time.perf_counter()
+        cache = get_answer_cache()
+        lookup = await cache.alookup(
+            query.guild_id,
+            safe_query,
+            cache_intent,
+            channel_id=query.channel_id,
+            channel_ids=query.channel_ids,
+        )
+        if lookup.response is not None:
+            response = AskResponse(**lookup.response)
+            response.cached = True
+            response.execution_time_ms = (time.perf_counter() - lookup_start) * 1000
+            print(f"[ANSWER CACHE] Hit for guild {query.guild_id} ({cache_intent})")
+            return response
+        
+        # Step 4: Route to appropriate agent (using sanitized query)
+        if intent is None:
             from apps.api.src.agents.hybrid_query import process_hybrid_query
             response = await process_hybrid_query(
                 query=safe_query,
@@ -147,57 +241,64 @@ async def ask(query: AskQuery) -> AskResponse:
                 include_vector=hybrid_config["include_vector"],
                 include_web=hybrid_config["include_web"],
                 include_knowledge=hybrid_config["include_knowledge"],
+                time_range=time_range,
             )
-        else:
-            # Step 2: Classify intent (using sanitized query)
-            intent = await classify_intent(safe_query)
-            
-            # Step 3: Route to appropriate agent (using sanitized query)
-            if intent == RouterIntent.ANALYTICS_DB:
-                response = await process_analytics_query(
-                    query=safe_query,
-                    guild_id=query.guild_id,
-                )
-            elif intent == RouterIntent.VECTOR_RAG:
+        elif intent == RouterIntent.ANALYTICS_DB:
+            response = await process_analytics_query(
+                query=safe_query,
+                guild_id=query.guild_id,
+            )
+        elif intent == RouterIntent.VECTOR_RAG:
+            response = await process_rag_query(
+                query=safe_query,
+                guild_id=query.guild_id,
+                channel_ids=query.channel_ids,
+                channel_id=query.channel_id,
+                time_range=time_range,
+                retrieval=speculation.take() if speculation else None,
+            )
+        elif intent == RouterIntent.WEB_SEARCH:
+            response = await process_web_search_query(
+                query=safe_query,
+                guild_id=query.guild_id,
+            )
+        elif intent == RouterIntent.GRAPH_RAG:
+            from apps.api.src.agents.graphrag import process_graphrag_query
+            response = await process_graphrag_query(
+                query=safe_query,
+                guild_id=query.guild_id,
+            )
+        elif intent == RouterIntent.GENERAL_KNOWLEDGE:
+            # When channel_id is provided, use vector_rag to check recent messages first
+            # This allows context-aware responses for questions about recent chat
+            if query.channel_id:
                 response = await process_rag_query(
                     query=safe_query,
                     guild_id=query.guild_id,
                     channel_ids=query.channel_ids,
                     channel_id=query.channel_id,
+                    time_range=time_range,
+                    retrieval=speculation.take() if speculation else None,
                 )
-            elif intent == RouterIntent.WEB_SEARCH:
-                response = await process_web_search_query(
-                    query=safe_query,
-                    guild_id=query.guild_id,
-                )
-            elif intent == RouterIntent.GRAPH_RAG:
-                from apps.api.src.agents.graphrag import process_graphrag_query
-                response = await process_graphrag_query(
+                # Override routed_to to indicate it was general_knowledge -> vector_rag
+                response.routed_to = RouterIntent.VECTOR_RAG
+            else:
+                response = await process_general_knowledge_query(
                     query=safe_query,
                     guild_id=query.guild_id,
                 )
-            elif intent == RouterIntent.GENERAL_KNOWLEDGE:
-                # When channel_id is provided, use vector_rag to check recent messages first
-                # This allows context-aware responses for questions about recent chat
-                if query.channel_id:
-                    response = await process_rag_query(
-                        query=safe_query,
-                        guild_id=query.guild_id,
-                        channel_ids=query.channel_ids,
-                        channel_id=query.channel_id,
-                    )
-                    # Override routed_to to indicate it was general_knowledge -> vector_rag
-                    response.routed_to = RouterIntent.VECTOR_RAG
-                else:
-                    response = await process_general_knowledge_query(
-                        query=safe_query,
-                        guild_id=query.guild_id,
-                    )
-            else:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Unknown intent: {intent}",
-                )
+        else:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Unknown intent: {intent}",
+            )
+        
+        if speculation is not None and speculation.outcome == "hit" and response.timings_ms is not None:
+            response.timings_ms["speculation_saved"] = round(speculation.saved_ms, 1)
+        
+        # Stored under the version read before answering, so a bump while
+        # the answer was computed leaves it unreachable
+        await cache.astore(lookup, response)
         
         # Record bot response in conversation memory
         if query.channel_id and response.answer:
@@ -213,6 +314,28 @@ async def ask(query: AskQuery) -> AskResponse:
             status_code=500,
             detail=f"Error processing query: {str(e)}",
         )
+    finally:
+        # Not used by the answer (answer cache hit or error)
+        if speculation is not None:
+            speculation.cancel("discarded")
+
+
+@app.post("/ask/stream")
+async def ask_stream(query: AskQuery) -> StreamingResponse:
+    """
+    Streaming /ask: same pipeline, answered progressively as NDJSON.
+    
+    Emits the route as soon as the query is classified, the sources once
+    retrieval is done (agents that have them), the answer's LLM tokens as
+    they are generated, and finally the complete AskResponse ("done") or
+    an "error". See core/answer_stream.py for the event format.
+    """
+    stream = AnswerStream()
+    return StreamingResponse(
+        stream.ndjson(ask(query)),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 class ClassifyRequest(BaseModel):
@@ -1133,6 +1256,7 @@ class SummaryResponse(BaseModel):
     message_count: int
     participant_count: int
     topics: list[str]
+    tokens_in: Optional[int] = None  # LLM prompt tokens
 
 
 @app.post("/summary", response_model=SummaryResponse)
@@ -1157,14 +1281,15 @@ async def generate_summary(request: SummaryRequest) -> SummaryResponse:
               AND m.message_timestamp > :cutoff
               AND m.is_deleted = FALSE
               AND LENGTH(m.content) > 5
-            ORDER BY m.message_timestamp ASC
+            ORDER BY m.message_timestamp DESC
             LIMIT 500
         """), {
             "guild_id": request.guild_id,
             "channel_id": request.channel_id,
             "cutoff": cutoff,
         })
-        rows = result.fetchall()
+        # Newest 500 in the window, back in chronological order
+        rows = list(reversed(result.fetchall()))
     
     if not rows:
         return SummaryResponse(
@@ -1191,19 +1316,38 @@ async def generate_summary(request: SummaryRequest) -> SummaryResponse:
     topics = [word for word, _ in Counter(words).most_common(5)]
     
     # Generate summary using LLM
+    tokens_in = None
     try:
         from apps.api.src.core.llm_factory import get_llm
+        from apps.api.src.core.context_budget import ContextAssembler, ContextItem
         from langchain_core.messages import SystemMessage, HumanMessage
         
         llm = get_llm(temperature=0.3)
         
+        # Newest messages that fit the token budget (repeats dropped), in order
+        assembler = ContextAssembler()
+        context = assembler.assemble(
+            [
+                ContextItem(text=f"{row.global_name or row.username}: {row.content}", key=row.content, score=i, order=i)
+                for i, row in enumerate(rows)
+            ],
+            budget=settings.summary_context_tokens,
+        )
+        system_prompt = (
+            "You are a helpful assistant that summarizes Discord conversations. "
+            "Provide a concise 2-3 paragraph summary highlighting main topics discussed, "
+            "any decisions made, and notable interactions."
+        )
+        user_content = "Summarize this conversation:\n\n" + "\n".join(context.texts)
+        tokens_in = assembler.count(system_prompt) + assembler.count(user_content)
+        print(f"[SUMMARY] Prompt ~{tokens_in} tokens ({context.stats()})")
+        
         response = await llm.ainvoke([
-            SystemMessage(content="You are a helpful assistant that summarizes Discord conversations. "
-                         "Provide a concise 2-3 paragraph summary highlighting main topics discussed, "
-                         "any decisions made, and notable interactions."),
-            HumanMessage(content=f"Summarize this conversation:\n\n{messages_text[:6000]}"),
+            SystemMessage(content=system_prompt),
+            HumanMessage(content=user_content),
         ])
         
+        tokens_in = (getattr(response, "usage_metadata", None) or {}).get("input_tokens") or tokens_in
         summary = response.content.strip()
     except Exception as e:
         summary = f"Could not generate summary: {str(e)[:100]}"
@@ -1214,6 +1358,7 @@ async def generate_summary(request: SummaryRequest) -> SummaryResponse:
         message_count=len(rows),
         participant_count=len(participants),
         topics=topics,
+        tokens_in=tokens_in,
     )
 
 
@@ -1244,17 +1389,17 @@ class SearchResponse(BaseModel):
 async def search_messages(request: SearchRequest) -> SearchResponse:
     """Semantic search across chat history."""
     from apps.api.src.core.llm_factory import get_embedding_model
-    from apps.api.src.services.qdrant_service import qdrant_service
+    from apps.api.src.services.qdrant_service import async_qdrant_service
     from sqlalchemy import create_engine, text
     
     settings = get_settings()
     
     # Generate query embedding
     embedding_model = get_embedding_model()
-    query_embedding = embedding_model.embed_query(request.query)
+    query_embedding = await embedding_model.aembed_query(request.query)
     
     # Search Qdrant (use low threshold for better recall)
-    results = qdrant_service.search(
+    results = await async_qdrant_service.search(
         query_embedding=query_embedding,
         guild_id=request.guild_id,
         channel_ids=[request.channel_id] if request.channel_id else None,
@@ -1358,11 +1503,14 @@ async def get_sync_health(guild_id: int) -> dict:
     """
     Get sync health metrics for a guild.
     
-    Shows the synchronization status between PostgreSQL and Qdrant.
+    Shows the synchronization status between PostgreSQL and Qdrant, plus
+    the progress of the latest blue/green reindex of the session collection.
     """
+    from apps.api.src.services.reindex_service import reindex_service
     from apps.api.src.services.storage_service import storage_service
     
     health = storage_service.get_sync_health(guild_id)
+    reindex = reindex_service.get_progress()
     
     return {
         "guild_id": health.guild_id,
@@ -1372,6 +1520,7 @@ async def get_sync_health(guild_id: int) -> dict:
         "stale": health.stale,
         "sync_percentage": health.sync_percentage,
         "health": health.health,
+        "reindex": reindex.to_dict() if reindex else None,
     }
 
 
@@ -1383,6 +1532,10 @@ async def repair_sync(guild_id: int, force: bool = False) -> dict:
     Args:
         guild_id: Target guild
         force: If True, re-indexes everything. If False, only pending/stale.
+    
+    A forced repair re-embeds into the live collection. To rebuild every
+    guild without emptying search results, use scripts/reindex_qdrant.py
+    (blue/green reindex) instead.
     """
     from apps.api.src.services.storage_service import storage_service
     
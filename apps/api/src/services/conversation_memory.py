@@ -185,13 +185,14 @@ def format_recent_messages_as_context(messages: list[dict]) -> str:
     if not messages:
         return ""
     
-    lines = []
-    for msg in messages:
-        timestamp = msg["timestamp"]
-        time_str = timestamp.strftime("%H:%M") if timestamp else ""
-        lines.append(f"[{time_str}] {msg['author_name']}: {msg['content']}")
-    
-    return "\n".join(lines)
+    return "\n".join(format_recent_message(msg) for msg in messages)
+
+
+def format_recent_message(msg: dict) -> str:
+    """One message from get_recent_channel_messages as a context line."""
+    timestamp = msg["timestamp"]
+    time_str = timestamp.strftime("%H:%M") if timestamp else ""
+    return f"[{time_str}] {msg['author_name']}: {msg['content']}"
 
 
 def search_recent_messages(
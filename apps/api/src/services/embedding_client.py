@@ -0,0 +1,106 @@
+"""
+Embedding Server Client - Talks to the shared embedding server process.
+
+When EMBEDDING_SERVER_URL is set, local models are not loaded in-process:
+EmbeddingModel (LOCAL provider), HybridEmbeddingModel (BM25),
+LateInteractionModel (rerank) and DM memory send their texts here instead.
+Every API and Celery worker process then shares one copy of each model.
+
+URLs:
+    http://localhost:8090          TCP
+    unix:///tmp/embedding.sock     Unix domain socket (same host, lower overhead)
+"""
+
+from typing import List, Optional, Tuple
+
+
+class EmbeddingServerError(RuntimeError):
+    """The embedding server could not be reached or rejected a request."""
+
+
+class EmbeddingServerClient:
+    """
+    Sync HTTP client for the embedding server.
+
+    Thread-safe (one pooled httpx.Client per process), so it can be used
+    from Celery workers and from the API's embedding thread pool.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        self.url = url
+        self.timeout = timeout
+        self._client = None
+
+    def get_client(self):
+        """Lazy-load the pooled HTTP client."""
+        if self._client is None:
+            import httpx
+
+            if self.url.startswith("unix://"):
+                transport = httpx.HTTPTransport(uds=self.url[len("unix://"):])
+                self._client = httpx.Client(transport=transport, base_url="http://embedding-server", timeout=self.timeout)
+            else:
+                self._client = httpx.Client(base_url=self.url, timeout=self.timeout)
+        return self._client
+
+    def embed_dense(self, texts: List[str], model: str, input_type: str = "document") -> List[List[float]]:
+        """Dense vectors from a sentence-transformers model on the server."""
+        if not texts:
+            return []
+        response = self._post("/embed/dense", {"texts": texts, "model": model, "input_type": input_type})
+        return response["vectors"]
+
+    def embed_sparse(self, texts: List[str], input_type: str = "document") -> List[Tuple[List[int], List[float]]]:
+        """BM25 (indices, values) pairs."""
+        if not texts:
+            return []
+        response = self._post("/embed/sparse", {"texts": texts, "input_type": input_type})
+        return [(vector["indices"], vector["values"]) for vector in response["vectors"]]
+
+    def embed_multivector(self, texts: List[str], input_type: str = "document") -> List[List[List[float]]]:
+        """ColBERT token vectors (one matrix per text)."""
+        if not texts:
+            return []
+        response = self._post("/embed/multivector", {"texts": texts, "input_type": input_type})
+        return response["vectors"]
+
+    def rerank(self, query: str, documents: List[str], model: str) -> List[float]:
+        """Cosine similarity of each document to the query."""
+        if not documents:
+            return []
+        response = self._post("/rerank", {"query": query, "documents": documents, "model": model})
+        return response["scores"]
+
+    def health(self) -> dict:
+        """Loaded models and request counters."""
+        try:
+            response = self.get_client().get("/health")
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            return {"status": "unreachable", "error": str(e)}
+
+    def _post(self, path: str, body: dict) -> dict:
+        try:
+            response = self.get_client().post(path, json=body)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            raise EmbeddingServerError(f"Embedding server {self.url}{path} failed: {e}") from e
+
+
+# Global client (None when no server is configured)
+_client: Optional[EmbeddingServerClient] = None
+
+
+def get_embedding_server_client() -> Optional[EmbeddingServerClient]:
+    """The shared client, or None if EMBEDDING_SERVER_URL is not set."""
+    global _client
+    from apps.api.src.core.config import get_settings
+
+    url = get_settings().embedding_server_url
+    if not url:
+        return None
+    if _client is None or _client.url != url:
+        _client = EmbeddingServerClient(url)
+    return _client
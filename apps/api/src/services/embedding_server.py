@@ -0,0 +1,231 @@
+"""
+Embedding Server - One process that owns the local embedding models.
+
+Every Celery worker process used to load its own SentenceTransformer (plus
+another for DM memory and one for reranking), and the worker memory limit
+kept recycling them into reloads. This server loads each model once and
+serves batched requests from all API and worker processes:
+
+    POST /embed/dense   {"texts", "model", "input_type"} -> {"vectors"}
+    POST /embed/sparse  {"texts", "input_type"}          -> {"vectors": [{"indices", "values"}]}
+    POST /embed/multivector {"texts", "input_type"}      -> {"vectors": [[[token vector], ...]]}
+    POST /rerank        {"query", "documents", "model"}  -> {"scores"}
+    GET  /health
+
+Single-text requests (queries) go through the embedding micro-batcher, so
+concurrent queries from different processes share one forward pass.
+
+Run (one uvicorn worker - the point is a single copy of each model):
+    python -m apps.api.src.services.embedding_server --port 8090
+    python -m apps.api.src.services.embedding_server --uds /tmp/embedding.sock
+"""
+
+import argparse
+import asyncio
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent.parent))
+
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+
+class DenseRequest(BaseModel):
+    texts: list[str]
+    model: str
+    input_type: str = "document"
+
+
+class SparseRequest(BaseModel):
+    texts: list[str]
+    input_type: str = "document"
+
+
+class MultivectorRequest(BaseModel):
+    texts: list[str]
+    input_type: str = "document"
+
+
+class RerankRequest(BaseModel):
+    query: str
+    documents: list[str]
+    model: str
+
+
+class ModelPool:
+    """Loads each model once, on first use."""
+
+    def __init__(self):
+        self._dense: dict[str, object] = {}
+        self._sparse = None
+        self._multivector = None
+        self._batchers: dict[str, object] = {}
+        self._lock = threading.Lock()
+        self.requests = {"dense": 0, "sparse": 0, "multivector": 0, "rerank": 0}
+
+    @staticmethod
+    def _canonical(model: str) -> str:
+        # "sentence-transformers/all-MiniLM-L6-v2" and "all-MiniLM-L6-v2" are the same weights
+        return model.removeprefix("sentence-transformers/")
+
+    def dense_model(self, model: str):
+        name = self._canonical(model)
+        with self._lock:
+            if name not in self._dense:
+                from apps.api.src.core.llm_factory import load_local_sentence_model
+
+                self._dense[name] = load_local_sentence_model(name)
+                print(f"[EMBED SERVER] Loaded dense model {name}")
+            return self._dense[name]
+
+    def sparse_model(self):
+        with self._lock:
+            if self._sparse is None:
+                from fastembed import SparseTextEmbedding
+
+                self._sparse = SparseTextEmbedding(model_name="Qdrant/bm25")
+                print("[EMBED SERVER] Loaded BM25 sparse model")
+            return self._sparse
+
+    def multivector_model(self):
+        with self._lock:
+            if self._multivector is None:
+                from fastembed import LateInteractionTextEmbedding
+                from apps.api.src.services.hybrid_embedding import COLBERT_MODEL_NAME
+
+                self._multivector = LateInteractionTextEmbedding(model_name=COLBERT_MODEL_NAME)
+                print(f"[EMBED SERVER] Loaded late interaction model {COLBERT_MODEL_NAME}")
+            return self._multivector
+
+    def encode(self, model: str, texts: list[str]) -> list[list[float]]:
+        return [emb.tolist() for emb in self.dense_model(model).encode(texts, convert_to_numpy=True)]
+
+    def batcher(self, model: str):
+        """
+        Micro-batcher for single-text requests to one model.
+
+        Dense encoding doesn't depend on input_type, so queries and documents
+        for the same model share a batcher (and a forward pass).
+        """
+        from apps.api.src.core.embedding_batcher import EmbeddingBatcher
+
+        name = self._canonical(model)
+        if name not in self._batchers:
+            self._batchers[name] = EmbeddingBatcher(lambda texts: self.encode(name, texts))
+        return self._batchers[name]
+
+    def loaded(self) -> dict:
+        return {
+            "dense": sorted(self._dense),
+            "sparse": self._sparse is not None,
+            "multivector": self._multivector is not None,
+        }
+
+
+pool = ModelPool()
+app = FastAPI(title="Smart Discord Embedding Server", version="0.1.0")
+
+
+@app.get("/health")
+async def health() -> dict:
+    return {"status": "healthy", "models": pool.loaded(), "requests": pool.requests}
+
+
+@app.post("/embed/dense")
+async def embed_dense(request: DenseRequest) -> dict:
+    pool.requests["dense"] += 1
+    try:
+        if len(request.texts) == 1:
+            vector = await pool.batcher(request.model).embed(request.texts[0])
+            return {"vectors": [vector]}
+        loop = asyncio.get_running_loop()
+        vectors = await loop.run_in_executor(None, pool.encode, request.model, request.texts)
+        return {"vectors": vectors}
+    except Exception as e:
+        print(f"[EMBED SERVER] Dense embedding error: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@app.post("/embed/sparse")
+async def embed_sparse(request: SparseRequest) -> dict:
+    pool.requests["sparse"] += 1
+
+    def run() -> list[dict]:
+        model = pool.sparse_model()
+        if request.input_type == "query":
+            embeddings = [next(iter(model.query_embed(text))) for text in request.texts]
+        else:
+            embeddings = model.passage_embed(request.texts)
+        return [{"indices": e.indices.tolist(), "values": e.values.tolist()} for e in embeddings]
+
+    try:
+        return {"vectors": await asyncio.get_running_loop().run_in_executor(None, run)}
+    except Exception as e:
+        print(f"[EMBED SERVER] Sparse embedding error: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@app.post("/embed/multivector")
+async def embed_multivector(request: MultivectorRequest) -> dict:
+    pool.requests["multivector"] += 1
+
+    def run() -> list[list[list[float]]]:
+        model = pool.multivector_model()
+        if request.input_type == "query":
+            embeddings = [next(iter(model.query_embed(text))) for text in request.texts]
+        else:
+            embeddings = model.embed(request.texts)
+        return [e.tolist() for e in embeddings]
+
+    try:
+        return {"vectors": await asyncio.get_running_loop().run_in_executor(None, run)}
+    except Exception as e:
+        print(f"[EMBED SERVER] Multivector embedding error: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@app.post("/rerank")
+async def rerank(request: RerankRequest) -> dict:
+    pool.requests["rerank"] += 1
+
+    def run() -> list[float]:
+        # Query and documents in one forward pass, then one matrix product
+        embeddings = pool.dense_model(request.model).encode(
+            [request.query] + [doc[:1000] for doc in request.documents],
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        return (embeddings[1:] @ embeddings[0]).tolist()
+
+    try:
+        return {"scores": await asyncio.get_running_loop().run_in_executor(None, run)}
+    except Exception as e:
+        print(f"[EMBED SERVER] Rerank error: {e}")
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+def main(argv: Optional[list[str]] = None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Shared embedding model server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--uds", default=None, help="Serve on a Unix domain socket instead of TCP")
+    parser.add_argument("--preload", nargs="*", default=[], help="Dense models to load at startup")
+
+    args = parser.parse_args(argv)
+
+    for model in args.preload:
+        pool.dense_model(model)
+
+    if args.uds:
+        uvicorn.run(app, uds=args.uds)
+    else:
+        uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,41 @@
 """
 Hybrid Embedding Service - Dense + Sparse (BM25) vector generation.
 
-Generates both:
+Generates:
 1. Dense embeddings (semantic meaning) via sentence-transformers or OpenAI
 2. Sparse embeddings (BM25 keyword matching) via FastEmbed
+3. ColBERT token multivectors via FastEmbed, for MaxSim late-interaction
+   reranking inside Qdrant (hybrid collection's "colbert" vector)
 
 Used for hybrid search combining semantic similarity with exact keyword matching.
 """
 
+import asyncio
 from dataclasses import dataclass
 from typing import List, Optional, Tuple
 import numpy as np
 
 
+# Small ColBERT (33M params, 96-dim tokens): cheap enough to encode every
+# session at index time and each query on the request path.
+# Must match LATE_INTERACTION_VECTOR_SIZE in the Qdrant schema.
+COLBERT_MODEL_NAME = "answerdotai/answerai-colbert-small-v1"
+
+
 @dataclass
 class HybridEmbedding:
-    """Container for dense and sparse embeddings."""
+    """Container for dense, sparse and (optional) multivector embeddings."""
     dense: List[float]
     sparse_indices: List[int]
     sparse_values: List[float]
+    multivector: Optional[List[List[float]]] = None  # ColBERT token vectors
     
     def to_dict(self) -> dict:
         return {
             "dense": self.dense,
             "sparse_indices": self.sparse_indices,
             "sparse_values": self.sparse_values,
+            "multivector": self.multivector,
         }
 
 
@@ -32,12 +43,15 @@ class HybridEmbeddingModel:
     """
     Unified hybrid embedding interface.
     
-    Generates both dense (semantic) and sparse (BM25) vectors for hybrid search.
+    Generates dense (semantic) and sparse (BM25) vectors for hybrid search,
+    plus ColBERT multivectors for the late-interaction rerank stage.
     """
     
     def __init__(self):
         self._dense_model = None
         self._sparse_model = None
+        self._server = None
+        self._colbert_model = None
         self._initialized = False
     
     def _ensure_models(self):
@@ -47,8 +61,16 @@ class HybridEmbeddingModel:
         
         # Get dense embedding model from existing factory
         from apps.api.src.core.llm_factory import get_embedding_model
+        from apps.api.src.services.embedding_client import get_embedding_server_client
         self._dense_model = get_embedding_model()
         
+        # BM25 and ColBERT from the shared embedding server instead of per-process copies
+        self._server = get_embedding_server_client()
+        if self._server is not None:
+            print(f"[HYBRID] Using embedding server {self._server.url} for BM25 and ColBERT")
+            self._initialized = True
+            return
+        
         # Initialize sparse BM25 model via FastEmbed
         try:
             from fastembed import SparseTextEmbedding
@@ -61,6 +83,14 @@ class HybridEmbeddingModel:
             print(f"[HYBRID] Error initializing sparse model: {e}")
             self._sparse_model = None
         
+        try:
+            from fastembed import LateInteractionTextEmbedding
+            self._colbert_model = LateInteractionTextEmbedding(model_name=COLBERT_MODEL_NAME)
+            print(f"[HYBRID] Initialized late interaction model {COLBERT_MODEL_NAME}")
+        except Exception as e:
+            print(f"[HYBRID] Late interaction model not available: {e}")
+            self._colbert_model = None
+        
         self._initialized = True
     
     @property
@@ -73,43 +103,119 @@ class HybridEmbeddingModel:
     def sparse_enabled(self) -> bool:
         """Check if sparse embeddings are available."""
         self._ensure_models()
-        return self._sparse_model is not None
+        return self._sparse_model is not None or self._server is not None
     
-    def embed_query(self, text: str) -> HybridEmbedding:
+    @property
+    def multivector_enabled(self) -> bool:
+        """Check if ColBERT multivectors are available."""
+        self._ensure_models()
+        return self._colbert_model is not None or self._server is not None
+    
+    def embed_query(self, text: str, multivector: bool = True) -> HybridEmbedding:
         """
         Generate hybrid embedding for a query.
         
         Args:
             text: Query text to embed
+            multivector: Also encode ColBERT query tokens (skip when the
+                collection has no multivector to rerank against)
             
         Returns:
-            HybridEmbedding with dense and sparse vectors
+            HybridEmbedding with dense, sparse and multivector embeddings
         """
         self._ensure_models()
         
         # Get dense embedding
         dense = self._dense_model.embed_query(text)
+        sparse_indices, sparse_values = self._sparse_query(text)
         
-        # Get sparse embedding (BM25)
-        sparse_indices = []
-        sparse_values = []
-        
-        if self._sparse_model is not None:
-            try:
-                sparse_embeddings = list(self._sparse_model.query_embed(text))
-                if sparse_embeddings:
-                    sparse_emb = sparse_embeddings[0]
-                    sparse_indices = sparse_emb.indices.tolist()
-                    sparse_values = sparse_emb.values.tolist()
-            except Exception as e:
-                print(f"[HYBRID] Sparse embedding error: {e}")
+        return HybridEmbedding(
+            dense=dense,
+            sparse_indices=sparse_indices,
+            sparse_values=sparse_values,
+            multivector=self._multivector_query(text) if multivector else None,
+        )
+    
+    async def aembed_query(self, text: str, multivector: bool = True) -> HybridEmbedding:
+        """
+        Async embed_query: the dense vector goes through the embedding
+        micro-batcher, so concurrent queries share one forward pass; the
+        ColBERT and BM25 query encodes run alongside it off the event loop.
+        Model loading (first call) also runs in a worker thread.
+        """
+        if not self._initialized:
+            await asyncio.to_thread(self._ensure_models)
+
+        sparse = asyncio.to_thread(self._sparse_query, text)
+        if multivector:
+            dense, (sparse_indices, sparse_values), query_multivector = await asyncio.gather(
+                self._dense_model.aembed_query(text),
+                sparse,
+                asyncio.to_thread(self._multivector_query, text),
+            )
+        else:
+            dense, (sparse_indices, sparse_values) = await asyncio.gather(
+                self._dense_model.aembed_query(text),
+                sparse,
+            )
+            query_multivector = None
         
         return HybridEmbedding(
             dense=dense,
             sparse_indices=sparse_indices,
             sparse_values=sparse_values,
+            multivector=query_multivector,
         )
     
+    def _multivector_query(self, text: str) -> Optional[List[List[float]]]:
+        """ColBERT query token vectors (None if unavailable - search skips the rerank stage)."""
+        try:
+            if self._server is not None:
+                return self._server.embed_multivector([text], input_type="query")[0]
+            if self._colbert_model is None:
+                return None
+            return next(iter(self._colbert_model.query_embed(text))).tolist()
+        except Exception as e:
+            print(f"[HYBRID] Multivector embedding error: {e}")
+            return None
+    
+    def embed_multivector_documents(self, texts: List[str]) -> List[List[List[float]]]:
+        """
+        ColBERT token vectors for documents, in one batch.
+        
+        Unlike the sparse path this raises instead of returning empties:
+        a point stored without its multivector would be dropped by the
+        late-interaction rerank stage.
+        """
+        self._ensure_models()
+        
+        if self._server is not None:
+            return self._server.embed_multivector(texts, input_type="document")
+        if self._colbert_model is None:
+            raise RuntimeError("Late interaction model is not available")
+        return [embedding.tolist() for embedding in self._colbert_model.embed(texts)]
+    
+    def _sparse_query(self, text: str) -> Tuple[List[int], List[float]]:
+        """BM25 query vector (empty if sparse search is unavailable)."""
+        if self._server is not None:
+            try:
+                return self._server.embed_sparse([text], input_type="query")[0]
+            except Exception as e:
+                print(f"[HYBRID] Sparse embedding error: {e}")
+                return [], []
+        
+        if self._sparse_model is None:
+            return [], []
+        
+        try:
+            sparse_embeddings = list(self._sparse_model.query_embed(text))
+            if sparse_embeddings:
+                sparse_emb = sparse_embeddings[0]
+                return sparse_emb.indices.tolist(), sparse_emb.values.tolist()
+        except Exception as e:
+            print(f"[HYBRID] Sparse embedding error: {e}")
+        return [], []
+    
     def embed_document(self, text: str) -> HybridEmbedding:
         """
         Generate hybrid embedding for a document.
@@ -125,24 +231,14 @@ class HybridEmbeddingModel:
         # Get dense embedding
         dense = self._dense_model.embed_query(text)
         
-        # Get sparse embedding (BM25) - use passage_embed for documents
-        sparse_indices = []
-        sparse_values = []
-        
-        if self._sparse_model is not None:
-            try:
-                sparse_embeddings = list(self._sparse_model.passage_embed([text]))
-                if sparse_embeddings:
-                    sparse_emb = sparse_embeddings[0]
-                    sparse_indices = sparse_emb.indices.tolist()
-                    sparse_values = sparse_emb.values.tolist()
-            except Exception as e:
-                print(f"[HYBRID] Sparse embedding error: {e}")
+        # Get sparse embedding (BM25) - passage weighting for documents
+        sparse_indices, sparse_values = self.embed_sparse_documents([text])[0]
         
         return HybridEmbedding(
             dense=dense,
             sparse_indices=sparse_indices,
             sparse_values=sparse_values,
+            multivector=self.embed_multivector_documents([text])[0] if self.multivector_enabled else None,
         )
     
     def embed_documents(self, texts: List[str]) -> List[HybridEmbedding]:
@@ -161,56 +257,94 @@ class HybridEmbeddingModel:
         dense_embeddings = self._dense_model.embed_documents(texts)
         
         # Get sparse embeddings in batch
-        sparse_embeddings_list = []
-        if self._sparse_model is not None:
-            try:
-                sparse_results = list(self._sparse_model.passage_embed(texts))
-                for sparse_emb in sparse_results:
-                    sparse_embeddings_list.append({
-                        "indices": sparse_emb.indices.tolist(),
-                        "values": sparse_emb.values.tolist(),
-                    })
-            except Exception as e:
-                print(f"[HYBRID] Batch sparse embedding error: {e}")
-                sparse_embeddings_list = [{"indices": [], "values": []} for _ in texts]
-        else:
-            sparse_embeddings_list = [{"indices": [], "values": []} for _ in texts]
+        sparse_embeddings_list = self.embed_sparse_documents(texts)
+        
+        # ColBERT token vectors in batch
+        multivectors = self.embed_multivector_documents(texts) if self.multivector_enabled else [None] * len(texts)
         
         # Combine into HybridEmbedding objects
         results = []
         for i, dense in enumerate(dense_embeddings):
-            sparse = sparse_embeddings_list[i] if i < len(sparse_embeddings_list) else {"indices": [], "values": []}
+            sparse_indices, sparse_values = sparse_embeddings_list[i] if i < len(sparse_embeddings_list) else ([], [])
             results.append(HybridEmbedding(
                 dense=dense,
-                sparse_indices=sparse["indices"],
-                sparse_values=sparse["values"],
+                sparse_indices=sparse_indices,
+                sparse_values=sparse_values,
+                multivector=multivectors[i],
             ))
         
         return results
+    
+    def embed_sparse_documents(self, texts: List[str]) -> List[Tuple[List[int], List[float]]]:
+        """
+        Generate BM25 sparse embeddings only, in one batch.
+        
+        Used when dense vectors already exist (e.g. migrating legacy points).
+        
+        Args:
+            texts: List of document texts to embed
+            
+        Returns:
+            One (indices, values) pair per text; empty pairs if sparse is
+            disabled or embedding fails
+        """
+        self._ensure_models()
+        
+        if self._server is not None:
+            try:
+                return self._server.embed_sparse(texts, input_type="document")
+            except Exception as e:
+                print(f"[HYBRID] Batch sparse embedding error: {e}")
+                return [([], []) for _ in texts]
+        
+        if self._sparse_model is None:
+            return [([], []) for _ in texts]
+        
+        try:
+            return [
+                (sparse_emb.indices.tolist(), sparse_emb.values.tolist())
+                for sparse_emb in self._sparse_model.passage_embed(texts)
+            ]
+        except Exception as e:
+            print(f"[HYBRID] Batch sparse embedding error: {e}")
+            return [([], []) for _ in texts]
 
 
 class LateInteractionModel:
     """
-    Late interaction (ColBERT-style) reranking model.
+    Client-side single-vector reranker.
     
-    Uses token-level embeddings for more precise relevance scoring.
-    This is computationally expensive but provides highest quality results.
+    True late interaction (ColBERT MaxSim over token vectors) runs inside
+    Qdrant as the final stage of hybrid search (see
+    HybridEmbeddingModel.embed_multivector_documents and
+    QdrantService.hybrid_search). This reranker covers results that did
+    not get that stage: the legacy collection, or a hybrid collection
+    created before it had the multivector. It re-scores by cosine on whole
+    documents, from stored vectors when possible.
     """
     
+    MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+    
     def __init__(self):
         self._model = None
+        self._server = None
         self._initialized = False
     
     def _ensure_model(self):
-        """Lazy-load late interaction model."""
+        """Lazy-load the reranking model."""
         if self._initialized:
             return
         
+        from apps.api.src.services.embedding_client import get_embedding_server_client
+        self._server = get_embedding_server_client()
+        if self._server is not None:
+            print(f"[LATE_INTERACTION] Using embedding server {self._server.url} for reranking")
+            self._initialized = True
+            return
+        
         try:
-            from sentence_transformers import SentenceTransformer
-            # Use a model that supports token-level embeddings
-            # ColBERT-style models produce per-token embeddings
-            self._model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+            from apps.api.src.core.llm_factory import load_local_sentence_model
+            self._model = load_local_sentence_model(self.MODEL_NAME)
             print("[LATE_INTERACTION] Initialized reranking model")
         except Exception as e:
             print(f"[LATE_INTERACTION] Model not available: {e}")
@@ -222,78 +356,121 @@ class LateInteractionModel:
     def enabled(self) -> bool:
         """Check if late interaction is available."""
         self._ensure_model()
-        return self._model is not None
+        return self._model is not None or self._server is not None
     
     def rerank(
         self,
         query: str,
         documents: List[dict],
         top_k: int = 5,
+        query_vector: Optional[List[float]] = None,
     ) -> List[dict]:
         """
         Rerank documents using late interaction scoring.
         
-        This computes more precise relevance scores by comparing
-        query and document at the token level.
+        Candidates that carry their stored dense vector ("vector", from a
+        search with with_vectors=True) are scored against query_vector
+        directly - no model call. Otherwise the query and all candidates are
+        encoded in one batch. Either way scoring is one matrix product.
         
         Args:
             query: Query text
             documents: List of dicts with 'payload' containing 'content'
             top_k: Number of top results to return
+            query_vector: Query embedding the candidates were retrieved with
             
         Returns:
             Reranked list of documents with updated scores
         """
+        if not documents:
+            return documents[:top_k]
+        
+        stored = self._stored_vectors(documents, query_vector)
+        if stored is not None:
+            similarities = self._cosine(query_vector, stored)
+            return self._combine(documents, list(range(len(documents))), similarities, top_k)
+        
         self._ensure_model()
         
-        if not self._model or not documents:
+        if self._server is not None:
+            return self._rerank_remote(query, documents, top_k)
+        
+        if not self._model:
+            return documents[:top_k]
+        
+        contents = self._contents(documents)
+        with_content = [i for i, content in enumerate(contents) if content]
+        if not with_content:
             return documents[:top_k]
         
         try:
-            # Get query embedding
-            query_embedding = self._model.encode(query, convert_to_numpy=True)
-            
-            # Score each document
-            scored_docs = []
-            for doc in documents:
-                payload = doc.get("payload", {})
-                content = payload.get("content", payload.get("text", payload.get("summary", "")))
-                
-                if not content:
-                    scored_docs.append((doc, doc.get("score", 0)))
-                    continue
-                
-                # Get document embedding
-                doc_embedding = self._model.encode(content[:1000], convert_to_numpy=True)
-                
-                # Compute cosine similarity
-                similarity = float(np.dot(query_embedding, doc_embedding) / (
-                    np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding) + 1e-8
-                ))
-                
-                # Combine with original score (weighted average)
-                original_score = doc.get("score", 0)
-                combined_score = 0.6 * similarity + 0.4 * original_score
-                
-                scored_docs.append((doc, combined_score))
-            
-            # Sort by combined score
-            scored_docs.sort(key=lambda x: x[1], reverse=True)
-            
-            # Return top_k with updated scores
-            results = []
-            for doc, score in scored_docs[:top_k]:
-                updated_doc = doc.copy()
-                updated_doc["rerank_score"] = score
-                updated_doc["original_score"] = doc.get("score", 0)
-                updated_doc["score"] = score
-                results.append(updated_doc)
-            
-            return results
-            
+            # Query and documents in one forward pass
+            embeddings = self._model.encode(
+                [query] + [contents[i][:1000] for i in with_content],
+                convert_to_numpy=True,
+            )
+            similarities = self._cosine(embeddings[0], embeddings[1:])
+        except Exception as e:
+            print(f"[LATE_INTERACTION] Reranking error: {e}")
+            return documents[:top_k]
+        
+        return self._combine(documents, with_content, similarities, top_k)
+    
+    def _rerank_remote(self, query: str, documents: List[dict], top_k: int) -> List[dict]:
+        """Same scoring as rerank(), with similarities from the embedding server."""
+        contents = self._contents(documents)
+        with_content = [i for i, content in enumerate(contents) if content]
+        try:
+            similarities = self._server.rerank(query, [contents[i] for i in with_content], self.MODEL_NAME)
         except Exception as e:
             print(f"[LATE_INTERACTION] Reranking error: {e}")
             return documents[:top_k]
+        
+        return self._combine(documents, with_content, similarities, top_k)
+    
+    @staticmethod
+    def _contents(documents: List[dict]) -> List[str]:
+        contents = []
+        for doc in documents:
+            payload = doc.get("payload", {})
+            contents.append(payload.get("content", payload.get("text", payload.get("summary", ""))))
+        return contents
+    
+    @staticmethod
+    def _stored_vectors(documents: List[dict], query_vector: Optional[List[float]]) -> Optional[np.ndarray]:
+        """Candidates' stored vectors as a matrix, if every one has a usable vector."""
+        if query_vector is None:
+            return None
+        vectors = [doc.get("vector") for doc in documents]
+        if any(vector is None or len(vector) != len(query_vector) for vector in vectors):
+            return None
+        return np.asarray(vectors, dtype=np.float32)
+    
+    @staticmethod
+    def _cosine(query_vector, matrix) -> np.ndarray:
+        """Cosine similarity of each row of matrix to query_vector."""
+        query_vector = np.asarray(query_vector, dtype=np.float32)
+        matrix = np.asarray(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector) + 1e-8
+        return (matrix @ query_vector) / norms
+    
+    @staticmethod
+    def _combine(documents: List[dict], indexes: List[int], similarities, top_k: int) -> List[dict]:
+        """Blend similarities with the search scores and keep the top_k."""
+        scores = np.array([doc.get("score", 0) for doc in documents], dtype=np.float64)
+        if len(indexes):
+            # Weighted average with the original score
+            scores[indexes] = 0.6 * np.asarray(similarities, dtype=np.float64) + 0.4 * scores[indexes]
+        
+        results = []
+        for i in np.argsort(-scores, kind="stable")[:top_k]:
+            doc = documents[i]
+            updated_doc = doc.copy()
+            updated_doc["rerank_score"] = float(scores[i])
+            updated_doc["original_score"] = doc.get("score", 0)
+            updated_doc["score"] = float(scores[i])
+            results.append(updated_doc)
+        return results
 
 
 # Global singleton instances
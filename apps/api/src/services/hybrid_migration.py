@@ -0,0 +1,360 @@
+"""
+Hybrid Migration - Copy the legacy session collection into the hybrid one.
+
+Three stages run concurrently, connected by bounded queues:
+1. Scroll: page through the legacy collection (payloads + dense vectors)
+2. Embed: BM25 sparse vectors (and ColBERT multivectors, when the hybrid
+   collection stores them) for a whole page in one batch (N workers)
+3. Upsert: write hybrid points and advance the checkpoint
+
+Dense vectors are reused as-is, so only the sparse side is computed.
+Multivectors are required: a point without one would be dropped by the
+late-interaction rerank stage, so failing to encode them stops the run.
+
+The checkpoint is the scroll offset after the last page that is durable
+in the hybrid collection, with every earlier page also durable. Pages can
+finish out of order, so it only moves over a contiguous run. An
+interrupted migration resumes from there; pages past the checkpoint may
+be written again, which is harmless because upserts are idempotent by
+point ID. The migrated/errors totals advance with the checkpoint, so
+those re-written pages are only counted once.
+"""
+
+import json
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+
+DEFAULT_CHECKPOINT_PATH = Path(".hybrid_migration_checkpoint.json")
+
+_DONE = object()  # End-of-stream marker between stages
+
+
+class MigrationCheckpoint:
+    """JSON file holding the resume offset and running totals."""
+    
+    def __init__(self, path: Path = DEFAULT_CHECKPOINT_PATH):
+        self.path = Path(path)
+    
+    def load(self) -> Optional[dict]:
+        """Return the saved state, or None if there is nothing to resume."""
+        if not self.path.exists():
+            return None
+        try:
+            return json.loads(self.path.read_text())
+        except (OSError, ValueError) as e:
+            print(f"[HYBRID] Ignoring unreadable checkpoint {self.path}: {e}")
+            return None
+    
+    def save(self, offset: Any, migrated: int, errors: int) -> None:
+        """Atomically replace the checkpoint (write temp file, then rename)."""
+        state = {
+            "offset": offset,
+            "migrated": migrated,
+            "errors": errors,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(state))
+        tmp_path.replace(self.path)
+    
+    def clear(self) -> None:
+        """Remove the checkpoint once the migration has finished."""
+        self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class _Page:
+    """One scroll page moving through the pipeline."""
+    seq: int
+    points: list
+    next_offset: Any
+    hybrid_points: list[dict] = field(default_factory=list)
+    errors: int = 0
+
+
+def _point_text(payload: dict) -> str:
+    """Text to BM25-index: session content, or the chunk text for documents."""
+    return payload.get("content") or payload.get("text") or ""
+
+
+class HybridMigration:
+    """
+    Resumable, pipelined legacy -> hybrid collection migration.
+    
+    Usage:
+        stats = HybridMigration(qdrant_service, batch_size=256).run()
+    """
+    
+    def __init__(
+        self,
+        service,
+        batch_size: int = 256,
+        embed_workers: int = 2,
+        queue_depth: int = 4,
+        checkpoint_path: Path = DEFAULT_CHECKPOINT_PATH,
+        embedding_model=None,
+    ):
+        """
+        Args:
+            service: QdrantService used for scrolling and hybrid upserts
+            batch_size: Points per scroll page (and per sparse batch)
+            embed_workers: Concurrent sparse-embedding workers
+            queue_depth: Pages buffered between stages (bounds memory)
+            checkpoint_path: Where the resume offset is stored
+            embedding_model: HybridEmbeddingModel (default: the shared one)
+        """
+        self.service = service
+        self.batch_size = batch_size
+        self.embed_workers = max(1, embed_workers)
+        self.queue_depth = max(1, queue_depth)
+        self.checkpoint = MigrationCheckpoint(checkpoint_path)
+        self.embedding_model = embedding_model
+        self._stop = threading.Event()
+        self._failure: Optional[str] = None
+    
+    def run(self, resume: bool = True, recreate: bool = False) -> dict:
+        """
+        Run the migration to completion (or until a stage fails).
+        
+        Args:
+            resume: Continue from the checkpoint if one exists; False
+                discards it and starts from the beginning
+            recreate: Drop the hybrid collection first and re-create it
+                from the current schema (implies resume=False). This is how
+                a hybrid collection created before the ColBERT multivector
+                gets it. Hybrid search returns nothing for points not yet
+                re-migrated; vector_rag still has the legacy collection.
+        
+        Returns:
+            Dict with migration stats (migrated, errors, points_per_sec, ...)
+        """
+        from apps.api.src.services.hybrid_embedding import get_hybrid_embedding_model
+        from apps.api.src.services.qdrant_service import COLLECTION_NAME, HYBRID_COLLECTION_NAME
+        
+        self._stop.clear()
+        self._failure = None
+        if recreate:
+            resume = False
+            self._drop_hybrid_collection()
+        self.service.ensure_hybrid_collection()
+        model = self.embedding_model or get_hybrid_embedding_model()
+        late_interaction = self.service.late_interaction_ready(HYBRID_COLLECTION_NAME)
+        
+        state = self.checkpoint.load() if resume else None
+        if not resume:
+            self.checkpoint.clear()
+        
+        start_offset = state["offset"] if state else None
+        self._migrated = state["migrated"] if state else 0
+        self._errors = state["errors"] if state else 0
+        resumed_from = self._migrated
+        self._written_this_run = 0
+        
+        if state:
+            print(f"[HYBRID] Resuming migration at offset {start_offset} ({self._migrated} points already migrated)")
+        else:
+            print(f"[HYBRID] Starting migration from {COLLECTION_NAME} to {HYBRID_COLLECTION_NAME}")
+        
+        scroll_queue: queue.Queue = queue.Queue(maxsize=self.queue_depth)
+        upsert_queue: queue.Queue = queue.Queue(maxsize=self.queue_depth)
+        
+        threads = [
+            threading.Thread(
+                target=self._scroll_stage,
+                args=(COLLECTION_NAME, start_offset, scroll_queue),
+                name="hybrid-migration-scroll",
+                daemon=True,
+            )
+        ]
+        for i in range(self.embed_workers):
+            threads.append(threading.Thread(
+                target=self._embed_stage,
+                args=(model, scroll_queue, upsert_queue, late_interaction),
+                name=f"hybrid-migration-embed-{i}",
+                daemon=True,
+            ))
+        
+        self._started_at = time.monotonic()
+        for thread in threads:
+            thread.start()
+        
+        # Upsert stage runs on the calling thread
+        completed = self._upsert_stage(upsert_queue, start_offset)
+        
+        for thread in threads:
+            thread.join()
+        
+        elapsed = time.monotonic() - self._started_at
+        points_per_sec = self._written_this_run / elapsed if elapsed > 0 else 0.0
+        
+        if completed and self._failure is None:
+            self.checkpoint.clear()
+            print(
+                f"[HYBRID] Migration complete: {self._migrated} points migrated, "
+                f"{self._errors} errors ({points_per_sec:.0f} points/sec)"
+            )
+        else:
+            print(
+                f"[HYBRID] Migration stopped: {self._failure} - "
+                f"resume later from {self.checkpoint.path}"
+            )
+        
+        return {
+            "migrated": self._migrated,
+            "errors": self._errors,
+            # Newly migrated points, not counting pages re-written after a resume
+            "migrated_this_run": self._migrated - resumed_from,
+            "elapsed_seconds": round(elapsed, 2),
+            "points_per_sec": round(points_per_sec, 1),
+            "resumed": state is not None,
+            "completed": completed and self._failure is None,
+        }
+    
+    def _drop_hybrid_collection(self) -> None:
+        """Delete the collection behind the hybrid name so ensure() re-creates it."""
+        from apps.api.src.services.qdrant_service import HYBRID_COLLECTION_NAME
+        
+        registry = self.service.registry
+        client = self.service.get_client()
+        collection = registry.resolve(HYBRID_COLLECTION_NAME)
+        if collection in registry.existing_names(client):
+            client.delete_collection(collection)
+            print(f"[HYBRID] Dropped {collection} to re-create it from the current schema")
+        registry.invalidate(HYBRID_COLLECTION_NAME)
+    
+    def _fail(self, reason: str) -> None:
+        """Stop all stages; the checkpoint keeps the last contiguous page."""
+        if self._failure is None:
+            self._failure = reason
+        self._stop.set()
+    
+    def _scroll_stage(self, collection_name: str, offset: Any, out: queue.Queue) -> None:
+        """Page through the legacy collection."""
+        client = self.service.get_client()
+        seq = 0
+        try:
+            while not self._stop.is_set():
+                points, next_offset = client.scroll(
+                    collection_name=collection_name,
+                    limit=self.batch_size,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=True,
+                )
+                if not points:
+                    break
+                
+                out.put(_Page(seq=seq, points=points, next_offset=next_offset))
+                seq += 1
+                
+                if next_offset is None:
+                    break
+                offset = next_offset
+        except Exception as e:
+            print(f"[HYBRID] Scroll error: {e}")
+            self._fail(f"scroll error: {e}")
+        finally:
+            for _ in range(self.embed_workers):
+                out.put(_DONE)
+    
+    def _embed_stage(
+        self,
+        model,
+        inbox: queue.Queue,
+        out: queue.Queue,
+        late_interaction: bool = False,
+    ) -> None:
+        """Batch-embed one page of sparse vectors (and multivectors) at a time."""
+        while True:
+            page = inbox.get()
+            if page is _DONE:
+                out.put(_DONE)
+                return
+            if self._stop.is_set():
+                continue  # Drain without working so the scroll stage can exit
+            
+            try:
+                texts = [_point_text(point.payload or {}) for point in page.points]
+                to_embed = [i for i, text in enumerate(texts) if text]
+                sparse = [([], [])] * len(texts)
+                if to_embed and model.sparse_enabled:
+                    embedded = model.embed_sparse_documents([texts[i] for i in to_embed])
+                    for i, pair in zip(to_embed, embedded, strict=True):
+                        sparse[i] = pair
+                
+                # Every point needs a multivector, including empty ones
+                multivectors = (
+                    model.embed_multivector_documents(texts) if late_interaction else [None] * len(texts)
+                )
+                
+                for point, (sparse_indices, sparse_values), multivector in zip(page.points, sparse, multivectors, strict=True):
+                    try:
+                        # Reuse the dense vector already stored on the legacy point
+                        dense_vector = point.vector if isinstance(point.vector, list) else list(point.vector)
+                        page.hybrid_points.append({
+                            "id": str(point.id),
+                            "dense_vector": dense_vector,
+                            "sparse_indices": sparse_indices,
+                            "sparse_values": sparse_values,
+                            "payload": point.payload or {},
+                            "multivector": multivector,
+                        })
+                    except Exception as e:
+                        print(f"[HYBRID] Error processing point {point.id}: {e}")
+                        page.errors += 1
+            except Exception as e:
+                print(f"[HYBRID] Embed error on page {page.seq}: {e}")
+                self._fail(f"embed error: {e}")
+                continue
+            
+            out.put(page)
+    
+    def _upsert_stage(self, inbox: queue.Queue, start_offset: Any) -> bool:
+        """
+        Write pages and advance the checkpoint over contiguous pages.
+        
+        Returns:
+            True if every page was written
+        """
+        finished_workers = 0
+        next_seq = 0
+        done_pages: dict[int, tuple[Any, int, int]] = {}  # seq -> (next_offset, points, errors)
+        
+        while finished_workers < self.embed_workers:
+            page = inbox.get()
+            if page is _DONE:
+                finished_workers += 1
+                continue
+            if self._stop.is_set():
+                continue  # Keep draining so embed workers can exit
+            
+            if page.hybrid_points and not self.service.upsert_hybrid_batch(page.hybrid_points):
+                self._fail(f"upsert failed on page {page.seq}")
+                continue
+            
+            self._written_this_run += len(page.hybrid_points)
+            
+            # Only a contiguous run of finished pages moves the resume point
+            # and the totals saved with it
+            done_pages[page.seq] = (page.next_offset, len(page.hybrid_points), page.errors)
+            advanced = False
+            while next_seq in done_pages:
+                start_offset, points, errors = done_pages.pop(next_seq)
+                self._migrated += points
+                self._errors += errors
+                next_seq += 1
+                advanced = True
+            if advanced and start_offset is not None:
+                self.checkpoint.save(start_offset, self._migrated, self._errors)
+            
+            elapsed = time.monotonic() - self._started_at
+            rate = self._written_this_run / elapsed if elapsed > 0 else 0.0
+            print(f"[HYBRID] Migrated {self._migrated} points ({rate:.0f} points/sec)")
+        
+        return not self._stop.is_set()
@@ -4,14 +4,18 @@ Qdrant Service - Vector database operations with multi-tenant isolation.
 INVARIANT: All operations MUST include guild_id in filter/payload.
 """
 
-from typing import Optional, Any
+import asyncio
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional, Any
 from uuid import UUID
 
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http import models
 from qdrant_client.http.models import (
-    Distance,
-    VectorParams,
     PointStruct,
     Filter,
     FieldCondition,
@@ -19,27 +23,36 @@ from qdrant_client.http.models import (
     MatchAny,
     PayloadSchemaType,
     UpdateStatus,
-    SparseVectorParams,
-    SparseIndexParams,
     SparseVector,
     Prefetch,
     FusionQuery,
     Fusion,
     NamedVector,
     NamedSparseVector,
+    SearchParams,
+    QuantizationSearchParams,
+    QueryRequest,
+    DatetimeRange,
 )
 
 from apps.api.src.core.config import get_settings
 from apps.api.src.core.llm_factory import get_embedding_model
+from packages.database.qdrant_registry import CollectionRegistry, TenantRouter
+from packages.database.qdrant_schema import (
+    COLLECTION_CONFIGS,
+    SESSIONS_COLLECTION,
+    HYBRID_SESSIONS_COLLECTION,
+    DENSE_VECTOR_NAME,
+    SPARSE_VECTOR_NAME,
+    LATE_INTERACTION_VECTOR_NAME,
+    StorageProfile,
+    get_storage_profile,
+)
 
 
-# Collection configuration
-COLLECTION_NAME = "discord_sessions"
-HYBRID_COLLECTION_NAME = "discord_sessions_hybrid"
-
-# Named vector configuration
-DENSE_VECTOR_NAME = "dense"
-SPARSE_VECTOR_NAME = "sparse"
+# Collection configuration (schemas live in packages/database/qdrant_schema.py)
+COLLECTION_NAME = SESSIONS_COLLECTION
+HYBRID_COLLECTION_NAME = HYBRID_SESSIONS_COLLECTION
 
 
 def get_vector_size() -> int:
@@ -48,12 +61,488 @@ def get_vector_size() -> int:
     return embedding_model.dimension
 
 
+def get_active_storage_profile() -> StorageProfile:
+    """Storage profile for the session collections (QDRANT_STORAGE_PROFILE)."""
+    return get_storage_profile(get_settings().qdrant_storage_profile)
+
+
+def build_search_params(
+    oversampling: Optional[float] = None,
+    rescore: bool = True,
+) -> Optional[SearchParams]:
+    """
+    Quantization search params for the active storage profile.
+    
+    With a quantized profile, Qdrant fetches `limit * oversampling`
+    candidates from the compressed index and (if `rescore`) re-ranks them
+    with the full-precision vectors before returning `limit` results.
+    
+    Args:
+        oversampling: Candidate multiplier (default: settings override or the
+            profile's default)
+        rescore: Re-rank candidates against the original vectors
+        
+    Returns:
+        SearchParams, or None for unquantized profiles
+    """
+    profile = get_active_storage_profile()
+    if profile.quantization is None:
+        return None
+    
+    if oversampling is None:
+        oversampling = get_settings().qdrant_search_oversampling or profile.oversampling
+    
+    return SearchParams(
+        quantization=QuantizationSearchParams(
+            ignore=False,
+            rescore=rescore,
+            oversampling=oversampling,
+        ),
+    )
+
+
+def build_tenant_filter(
+    guild_id: int,
+    channel_ids: Optional[list[int]] = None,
+    source_types: Optional[list[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    author_ids: Optional[list[int]] = None,
+) -> Filter:
+    """
+    Build the search filter shared by the sync and async services.
+    
+    guild_id is ALWAYS required - this is the multi-tenant isolation boundary.
+    
+    `since`/`until` keep sessions overlapping the window (end_time >= since,
+    start_time <= until); `author_ids` keeps sessions where any of the
+    authors spoke. All are indexed, so Qdrant prunes before scoring.
+    """
+    must_conditions = [
+        FieldCondition(
+            key="guild_id",
+            match=MatchValue(value=guild_id),
+        ),
+    ]
+    
+    if channel_ids:
+        must_conditions.append(
+            FieldCondition(
+                key="channel_id",
+                match=MatchAny(any=channel_ids),
+            )
+        )
+    
+    # Filter by source_type if specified (for document queries)
+    if source_types:
+        must_conditions.append(
+            FieldCondition(
+                key="source_type",
+                match=MatchAny(any=source_types),
+            )
+        )
+    
+    if since:
+        must_conditions.append(
+            FieldCondition(
+                key="end_time",
+                range=DatetimeRange(gte=since),
+            )
+        )
+    
+    if until:
+        must_conditions.append(
+            FieldCondition(
+                key="start_time",
+                range=DatetimeRange(lte=until),
+            )
+        )
+    
+    if author_ids:
+        must_conditions.append(
+            FieldCondition(
+                key="author_ids",
+                match=MatchAny(any=author_ids),
+            )
+        )
+    
+    return Filter(must=must_conditions)
+
+
+def build_recency_formula(
+    half_life_days: float,
+    weight: float = 0.5,
+    now: Optional[datetime] = None,
+) -> models.FormulaQuery:
+    """
+    Server-side recency decay applied on top of the relevance score.
+    
+    score = $score * ((1 - weight) + weight * decay(end_time))
+    
+    decay is 1.0 for a session ending now and 0.5 at `half_life_days` ago.
+    Multiplying keeps it scale-free, so it works for cosine and RRF scores.
+    Sessions without end_time are treated as "now minus one half-life".
+    """
+    now = now or datetime.now(timezone.utc)
+    half_life_seconds = half_life_days * 86400
+    fallback_time = datetime.fromtimestamp(now.timestamp() - half_life_seconds, tz=timezone.utc)
+    
+    decay = models.ExpDecayExpression(
+        exp_decay=models.DecayParamsExpression(
+            x=models.DatetimeKeyExpression(datetime_key="end_time"),
+            target=models.DatetimeExpression(datetime=now.isoformat()),
+            scale=half_life_seconds,
+            midpoint=0.5,
+        ),
+    )
+    
+    return models.FormulaQuery(
+        formula=models.MultExpression(mult=[
+            "$score",
+            models.SumExpression(sum=[
+                1.0 - weight,
+                models.MultExpression(mult=[weight, decay]),
+            ]),
+        ]),
+        defaults={"end_time": fallback_time.isoformat()},
+    )
+
+
+def _hybrid_query_kwargs(
+    prefetch_queries: list[Prefetch],
+    limit: int,
+    recency_half_life_days: Optional[float] = None,
+    recency_weight: float = 0.5,
+    query_multivector: Optional[list[list[float]]] = None,
+) -> dict:
+    """
+    query_points arguments for RRF fusion, optionally re-scored by recency.
+    
+    With decay, fusion moves into a nested prefetch and the formula scores
+    its candidates. With a query multivector, the fused candidates are
+    reranked by MaxSim against the stored ColBERT vectors (before decay).
+    """
+    fused = Prefetch(
+        prefetch=prefetch_queries,
+        query=FusionQuery(fusion=Fusion.RRF),
+        limit=limit * 3,
+    )
+    
+    if query_multivector:
+        if not recency_half_life_days:
+            return {
+                "prefetch": [fused],
+                "query": query_multivector,
+                "using": LATE_INTERACTION_VECTOR_NAME,
+            }
+        fused = Prefetch(
+            prefetch=[fused],
+            query=query_multivector,
+            using=LATE_INTERACTION_VECTOR_NAME,
+            limit=limit * 3,
+        )
+    elif not recency_half_life_days:
+        return {"prefetch": prefetch_queries, "query": FusionQuery(fusion=Fusion.RRF)}
+    
+    return {
+        "prefetch": [fused],
+        "query": build_recency_formula(recency_half_life_days, recency_weight),
+    }
+
+
+def _dense_query_kwargs(
+    query_dense: list[float],
+    using: Optional[str],
+    query_filter: Filter,
+    search_params: Optional[SearchParams],
+    limit: int,
+    score_threshold: Optional[float],
+    recency_half_life_days: Optional[float] = None,
+    recency_weight: float = 0.5,
+) -> dict:
+    """query_points arguments for a dense search, optionally re-scored by recency."""
+    if not recency_half_life_days:
+        return {
+            "query": query_dense,
+            "using": using,
+            "query_filter": query_filter,
+            "search_params": search_params,
+            "score_threshold": score_threshold,
+        }
+    
+    # Relevance threshold applies to the similarity search, before decay
+    return {
+        "prefetch": [
+            Prefetch(
+                query=query_dense,
+                using=using,
+                filter=query_filter,
+                params=search_params,
+                score_threshold=score_threshold,
+                limit=limit * 3,
+            )
+        ],
+        "query": build_recency_formula(recency_half_life_days, recency_weight),
+    }
+
+
+def _to_results(points, score_threshold: Optional[float] = None) -> list[dict]:
+    """
+    Convert Qdrant scored points to the service result format.
+    
+    Points fetched with their dense vector (SearchRequest.with_vectors)
+    carry it as "vector".
+    """
+    results = []
+    for r in points:
+        if score_threshold is not None and r.score < score_threshold:
+            continue
+        result = {
+            "id": str(r.id),
+            "score": r.score,
+            "payload": r.payload,
+        }
+        vector = getattr(r, "vector", None)
+        if vector:
+            # Only the dense vector is requested (see _with_vector)
+            result["vector"] = next(iter(vector.values())) if isinstance(vector, dict) else vector
+        results.append(result)
+    return results
+
+
+def _groups_to_results(groups, score_threshold: Optional[float] = None) -> list[dict]:
+    """
+    Flatten query_points_groups() output into the service result format.
+    
+    Each hit carries its group_id; hits are re-sorted by score so callers
+    can keep treating the list as a ranked result set.
+    """
+    results = []
+    for group in groups:
+        for hit in _to_results(group.hits, score_threshold):
+            hit["group_id"] = group.id
+            results.append(hit)
+    results.sort(key=lambda r: r["score"], reverse=True)
+    return results
+
+
+def default_group_by(source_types: Optional[list[str]] = None) -> str:
+    """
+    Payload field to group results by.
+    
+    Document searches group by attachment_id (one group per file, so a
+    single PDF can't fill the result budget with adjacent chunks); chat
+    searches group by channel_id.
+    """
+    if source_types and "chat" not in source_types:
+        return "attachment_id"
+    return "channel_id"
+
+
+def _hybrid_prefetch(
+    query_dense: list[float],
+    query_sparse_indices: list[int],
+    query_sparse_values: list[float],
+    query_filter: Filter,
+    limit: int,
+    search_params: Optional[SearchParams] = None,
+) -> list[Prefetch]:
+    """Build dense + sparse prefetch queries for RRF fusion."""
+    # Dense (semantic) search prefetch
+    prefetch_queries = [
+        Prefetch(
+            query=query_dense,
+            using=DENSE_VECTOR_NAME,
+            limit=limit * 3,  # Oversample for fusion
+            filter=query_filter,
+            params=search_params,  # Quantization rescoring (dense only)
+        )
+    ]
+    
+    # Sparse (BM25) search prefetch - only if we have sparse data
+    if query_sparse_indices and query_sparse_values:
+        prefetch_queries.append(
+            Prefetch(
+                query=SparseVector(
+                    indices=query_sparse_indices,
+                    values=query_sparse_values,
+                ),
+                using=SPARSE_VECTOR_NAME,
+                limit=limit * 3,
+                filter=query_filter,
+            )
+        )
+    
+    return prefetch_queries
+
+
+@dataclass
+class SearchRequest:
+    """
+    One query in a search_batch() call.
+    
+    Dense-only by default. Set the sparse fields and fusion=True for a
+    hybrid dense + BM25 query with RRF fusion (hybrid collection only).
+    
+    Set group_by (e.g. "attachment_id", see default_group_by) to return at
+    most group_size hits per group; limit then counts groups.
+    
+    Set with_vectors to get each hit's stored dense vector back (for
+    reranking without re-encoding the candidates).
+    
+    Set query_multivector (token vectors of the query, see
+    HybridEmbedding.multivector) on a fusion request to rerank the fused
+    candidates by ColBERT MaxSim server-side. Only collections that store
+    the vector support it; search_batch drops it elsewhere.
+    """
+    collection_name: str
+    query_dense: list[float]
+    guild_id: int
+    channel_ids: Optional[list[int]] = None
+    source_types: Optional[list[str]] = None
+    limit: int = 5
+    score_threshold: Optional[float] = None
+    query_sparse_indices: Optional[list[int]] = None
+    query_sparse_values: Optional[list[float]] = None
+    fusion: bool = False
+    oversampling: Optional[float] = None
+    rescore: bool = True
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    author_ids: Optional[list[int]] = None
+    recency_half_life_days: Optional[float] = None
+    recency_weight: float = 0.5
+    group_by: Optional[str] = None
+    group_size: int = 1
+    with_vectors: bool = False
+    query_multivector: Optional[list[list[float]]] = None
+
+
+def _request_query_kwargs(request: SearchRequest, candidate_limit: Optional[int] = None) -> dict:
+    """
+    query_points()-style arguments for a SearchRequest (without limit).
+    
+    candidate_limit sizes the prefetch stages; grouped searches need
+    limit * group_size candidates rather than limit.
+    """
+    candidate_limit = candidate_limit or request.limit
+    query_filter = build_tenant_filter(
+        request.guild_id,
+        request.channel_ids,
+        request.source_types,
+        since=request.since,
+        until=request.until,
+        author_ids=request.author_ids,
+    )
+    search_params = build_search_params(request.oversampling, request.rescore)
+    
+    if request.fusion:
+        # Score threshold is applied client-side: RRF scores aren't similarities
+        return _hybrid_query_kwargs(
+            _hybrid_prefetch(
+                request.query_dense,
+                request.query_sparse_indices or [],
+                request.query_sparse_values or [],
+                query_filter,
+                candidate_limit,
+                search_params,
+            ),
+            candidate_limit,
+            request.recency_half_life_days,
+            request.recency_weight,
+            request.query_multivector,
+        )
+    
+    return _dense_query_kwargs(
+        request.query_dense,
+        COLLECTION_CONFIGS[request.collection_name].dense_vector_name,
+        query_filter,
+        search_params,
+        candidate_limit,
+        request.score_threshold,
+        request.recency_half_life_days,
+        request.recency_weight,
+    )
+
+
+def _with_vector(request: SearchRequest):
+    """with_vector(s) argument: the dense vector only, if requested."""
+    if not request.with_vectors:
+        return False
+    name = COLLECTION_CONFIGS[request.collection_name].dense_vector_name
+    return [name] if name else True
+
+
+def _build_query_request(request: SearchRequest, shard_key: Optional[str]) -> QueryRequest:
+    """Translate a SearchRequest into a Qdrant QueryRequest."""
+    kwargs = _request_query_kwargs(request)
+    # QueryRequest names these differently from query_points()
+    if "query_filter" in kwargs:
+        kwargs["filter"] = kwargs.pop("query_filter")
+        kwargs["params"] = kwargs.pop("search_params")
+    
+    return QueryRequest(
+        **kwargs,
+        limit=request.limit,
+        with_payload=True,
+        with_vector=_with_vector(request),
+        shard_key=shard_key,
+    )
+
+
+def _group_by_collection(requests: list[SearchRequest]) -> dict[str, list[int]]:
+    """
+    Ungrouped request indexes per collection (query_batch_points is per
+    collection). Grouped requests go through query_points_groups instead.
+    """
+    groups: dict[str, list[int]] = {}
+    for index, request in enumerate(requests):
+        if request.group_by:
+            continue
+        groups.setdefault(request.collection_name, []).append(index)
+    return groups
+
+
+def build_session_point(
+    session_id: str,
+    guild_id: int,
+    channel_id: int,
+    embedding: list[float],
+    message_ids: list[int],
+    content_preview: str,
+    start_time: str,
+    end_time: str,
+    author_ids: Optional[list[int]] = None,
+) -> PointStruct:
+    """Build the point for a message session (legacy collection layout)."""
+    payload = {
+        "guild_id": guild_id,
+        "channel_id": channel_id,
+        "message_ids": message_ids,
+        "message_count": len(message_ids),
+        "content": content_preview[:1000],  # Limit payload size
+        "start_time": start_time,
+        "end_time": end_time,
+        "author_ids": author_ids or [],
+    }
+    return PointStruct(id=session_id, vector=embedding, payload=payload)
+
+
 class QdrantService:
     """Sync Qdrant client wrapper with multi-tenant support."""
     
     def __init__(self):
         self._client: Optional[QdrantClient] = None
-        self._collection_initialized = False
+        settings = get_settings()
+        self.registry = CollectionRegistry(
+            self.get_client,
+            get_vector_size,
+            storage_profile=get_active_storage_profile,
+            tenant_router=TenantRouter(
+                enabled=settings.qdrant_custom_sharding,
+                dedicated_guild_ids=settings.qdrant_dedicated_guild_ids,
+            ),
+        )
     
     def get_client(self) -> QdrantClient:
         """Get or create Qdrant client."""
@@ -66,43 +555,80 @@ class QdrantService:
         return self._client
     
     def ensure_collection(self) -> None:
-        """Create collection and indexes if they don't exist."""
-        if self._collection_initialized:
-            return
-            
-        client = self.get_client()
-        vector_size = get_vector_size()
+        """Create collection and indexes if they don't exist (checked once per process)."""
+        self.registry.ensure(COLLECTION_NAME)
+    
+    def run(self, collection_name: str, operation: Callable[[QdrantClient], Any]) -> Any:
+        """
+        Run a client call against a collection.
         
-        collections = client.get_collections()
-        existing = [c.name for c in collections.collections]
+        If Qdrant reports the collection missing (dropped, server reset), the
+        registry re-creates it and the call is retried once.
+        """
+        self.registry.ensure(collection_name)
+        client = self.get_client()
+        try:
+            return operation(client)
+        except Exception as e:
+            if not self.registry.recover(collection_name, e):
+                raise
+            return operation(client)
+    
+    def upsert_points(
+        self,
+        collection_name: str,
+        points: list[PointStruct],
+        wait: bool = True,
+    ) -> bool:
+        """
+        Upsert points, routing each guild's points to its shard.
         
-        if COLLECTION_NAME not in existing:
-            client.create_collection(
-                collection_name=COLLECTION_NAME,
-                vectors_config=VectorParams(
-                    size=vector_size,
-                    distance=Distance.COSINE,
-                ),
-                optimizers_config=models.OptimizersConfigDiff(
-                    indexing_threshold=10000,
-                ),
-            )
-            
-            # Create payload indexes for efficient filtering
-            client.create_payload_index(
-                collection_name=COLLECTION_NAME,
-                field_name="guild_id",
-                field_schema=PayloadSchemaType.INTEGER,
-            )
-            client.create_payload_index(
-                collection_name=COLLECTION_NAME,
-                field_name="channel_id",
-                field_schema=PayloadSchemaType.INTEGER,
-            )
-            
-            print(f"Created Qdrant collection: {COLLECTION_NAME} with {vector_size} dimensions")
+        Sends one request per shard key - a single request when the
+        collection is not custom-sharded. While a blue/green reindex of the
+        collection is running, the points are also written to its shadow.
         
-        self._collection_initialized = True
+        Returns:
+            True if every request completed (wait=True) or was acknowledged
+        """
+        success = self._upsert_by_shard(collection_name, points, wait)
+        
+        shadow = self.registry.shadow_of(collection_name)
+        if shadow:
+            try:
+                self._upsert_by_shard(shadow, points, wait)
+            except Exception as e:
+                # Don't fail the live write; the shadow misses these points
+                # until the reindex backfill is run again
+                print(f"[QDRANT ERROR] Dual-write to shadow {shadow} failed: {e}")
+        
+        return success
+    
+    def _upsert_by_shard(
+        self,
+        collection_name: str,
+        points: list[PointStruct],
+        wait: bool,
+    ) -> bool:
+        """One upsert per shard key (see upsert_points)."""
+        self.registry.ensure(collection_name)
+        
+        groups: dict[Optional[str], list[PointStruct]] = {}
+        for point in points:
+            guild_id = (point.payload or {}).get("guild_id")
+            groups.setdefault(self.registry.shard_key(collection_name, guild_id), []).append(point)
+        
+        expected = UpdateStatus.COMPLETED if wait else UpdateStatus.ACKNOWLEDGED
+        success = True
+        for shard_key, group in groups.items():
+            result = self.run(collection_name, lambda client, group=group, shard_key=shard_key: client.upsert(
+                collection_name=collection_name,
+                points=group,
+                wait=wait,
+                shard_key_selector=shard_key,
+            ))
+            success = success and result.status in (expected, UpdateStatus.COMPLETED)
+        
+        return success
     
     def upsert_session(
         self,
@@ -133,33 +659,19 @@ class QdrantService:
         Returns:
             True if successful
         """
-        self.ensure_collection()
-        client = self.get_client()
-        
-        payload = {
-            "guild_id": guild_id,
-            "channel_id": channel_id,
-            "message_ids": message_ids,
-            "message_count": len(message_ids),
-            "content": content_preview[:1000],  # Limit payload size
-            "start_time": start_time,
-            "end_time": end_time,
-            "author_ids": author_ids or [],
-        }
-        
-        result = client.upsert(
-            collection_name=COLLECTION_NAME,
-            points=[
-                PointStruct(
-                    id=session_id,
-                    vector=embedding,
-                    payload=payload,
-                )
-            ],
-            wait=True,
+        point = build_session_point(
+            session_id=session_id,
+            guild_id=guild_id,
+            channel_id=channel_id,
+            embedding=embedding,
+            message_ids=message_ids,
+            content_preview=content_preview,
+            start_time=start_time,
+            end_time=end_time,
+            author_ids=author_ids,
         )
         
-        return result.status == UpdateStatus.COMPLETED
+        return self.upsert_points(COLLECTION_NAME, [point])
     
     def upsert_batch(self, points: list[dict]) -> bool:
         """
@@ -171,9 +683,6 @@ class QdrantService:
         Returns:
             True if successful
         """
-        self.ensure_collection()
-        client = self.get_client()
-        
         qdrant_points = [
             PointStruct(
                 id=p["id"],
@@ -183,13 +692,7 @@ class QdrantService:
             for p in points
         ]
         
-        result = client.upsert(
-            collection_name=COLLECTION_NAME,
-            points=qdrant_points,
-            wait=True,
-        )
-        
-        return result.status == UpdateStatus.COMPLETED
+        return self.upsert_points(COLLECTION_NAME, qdrant_points)
     
     def upsert_with_metadata(
         self,
@@ -208,22 +711,10 @@ class QdrantService:
         Returns:
             True if successful
         """
-        self.ensure_collection()
-        client = self.get_client()
-        
-        result = client.upsert(
-            collection_name=COLLECTION_NAME,
-            points=[
-                PointStruct(
-                    id=point_id,
-                    vector=vector,
-                    payload=payload,
-                ),
-            ],
-            wait=True,
+        return self.upsert_points(
+            COLLECTION_NAME,
+            [PointStruct(id=point_id, vector=vector, payload=payload)],
         )
-        
-        return result.status == UpdateStatus.COMPLETED
     
     def search(
         self,
@@ -233,6 +724,13 @@ class QdrantService:
         limit: int = 5,
         score_threshold: float = 0.2,
         source_types: Optional[list[str]] = None,
+        oversampling: Optional[float] = None,
+        rescore: bool = True,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        author_ids: Optional[list[int]] = None,
+        recency_half_life_days: Optional[float] = None,
+        recency_weight: float = 0.5,
     ) -> list[dict]:
         """
         Search for similar vectors with multi-tenant filtering.
@@ -244,88 +742,139 @@ class QdrantService:
             limit: Max results
             score_threshold: Minimum similarity score
             source_types: Optional filter for source types (e.g., ['pdf', 'markdown'])
+            oversampling: Quantized candidate multiplier (see build_search_params)
+            rescore: Re-rank quantized candidates with the original vectors
+            since: Only sessions ending at/after this time
+            until: Only sessions starting at/before this time
+            author_ids: Only sessions where any of these users spoke
+            recency_half_life_days: Enable recency decay (see build_recency_formula)
+            recency_weight: Share of the score subject to decay (0-1)
             
         Returns:
             List of results with id, score, payload
         """
-        self.ensure_collection()
-        client = self.get_client()
-        
-        # Build filter - guild_id is ALWAYS required
-        must_conditions = [
-            FieldCondition(
-                key="guild_id",
-                match=MatchValue(value=guild_id),
-            ),
-        ]
-        
-        if channel_ids:
-            must_conditions.append(
-                FieldCondition(
-                    key="channel_id",
-                    match=MatchAny(any=channel_ids),
-                )
-            )
-        
-        # Filter by source_type if specified (for document queries)
-        if source_types:
-            must_conditions.append(
-                FieldCondition(
-                    key="source_type",
-                    match=MatchAny(any=source_types),
-                )
-            )
+        query_filter = build_tenant_filter(
+            guild_id, channel_ids, source_types,
+            since=since, until=until, author_ids=author_ids,
+        )
+        query_kwargs = _dense_query_kwargs(
+            query_embedding, None, query_filter, build_search_params(oversampling, rescore),
+            limit, score_threshold, recency_half_life_days, recency_weight,
+        )
         
-        results = client.query_points(
+        results = self.run(COLLECTION_NAME, lambda client: client.query_points(
             collection_name=COLLECTION_NAME,
-            query=query_embedding,
-            query_filter=Filter(must=must_conditions),
+            **query_kwargs,
             limit=limit,
-            score_threshold=score_threshold,
             with_payload=True,
-        )
+            shard_key_selector=self.registry.shard_key(COLLECTION_NAME, guild_id),
+        ))
         
-        return [
-            {
-                "id": str(r.id),
-                "score": r.score,
-                "payload": r.payload,
-            }
-            for r in results.points
-        ]
+        return _to_results(results.points)
     
-    def delete_by_session_id(self, session_id: str) -> bool:
-        """Delete a session by ID."""
-        client = self.get_client()
-        
-        result = client.delete(
-            collection_name=COLLECTION_NAME,
-            points_selector=models.PointIdsList(
-                points=[session_id],
-            ),
-        )
+    def delete_by_session_id(self, session_id: str, guild_id: int) -> bool:
+        """Delete a session by ID from the guild's shard (from the shadow too during a reindex)."""
+        statuses = []
+        for collection_name in self._with_shadow(COLLECTION_NAME):
+            def delete(client, collection_name=collection_name):
+                return client.delete(
+                    collection_name=collection_name,
+                    points_selector=models.PointIdsList(
+                        points=[session_id],
+                    ),
+                    shard_key_selector=self.registry.shard_key(collection_name, guild_id),
+                )
+            
+            statuses.append(self.run(collection_name, delete).status)
         
-        return result.status == UpdateStatus.COMPLETED
+        return statuses[0] == UpdateStatus.COMPLETED
     
     def delete_by_guild(self, guild_id: int) -> bool:
-        """Delete all sessions for a guild."""
+        """Delete all sessions for a guild (from the shadow too during a reindex)."""
+        self.registry.ensure(COLLECTION_NAME)
         client = self.get_client()
         
-        result = client.delete(
-            collection_name=COLLECTION_NAME,
-            points_selector=models.FilterSelector(
-                filter=Filter(
-                    must=[
-                        FieldCondition(
-                            key="guild_id",
-                            match=MatchValue(value=guild_id),
-                        ),
-                    ]
-                )
-            ),
+        statuses = []
+        for collection_name in self._with_shadow(COLLECTION_NAME):
+            result = client.delete(
+                collection_name=collection_name,
+                points_selector=models.FilterSelector(
+                    filter=Filter(
+                        must=[
+                            FieldCondition(
+                                key="guild_id",
+                                match=MatchValue(value=guild_id),
+                            ),
+                        ]
+                    )
+                ),
+                shard_key_selector=self.registry.shard_key(collection_name, guild_id),
+            )
+            statuses.append(result.status)
+        
+        return statuses[0] == UpdateStatus.COMPLETED
+    
+    def _with_shadow(self, collection_name: str) -> list[str]:
+        """The collection plus its reindex shadow, if one is being built."""
+        shadow = self.registry.shadow_of(collection_name)
+        return [collection_name, shadow] if shadow else [collection_name]
+    
+    def _message_ids_filter(self, guild_id: int, message_ids: list[int]) -> Filter:
+        """Filter matching sessions of a guild that contain any of the message IDs."""
+        return Filter(
+            must=[
+                FieldCondition(
+                    key="guild_id",
+                    match=MatchValue(value=guild_id),
+                ),
+                FieldCondition(
+                    key="message_ids",
+                    match=MatchAny(any=message_ids),
+                ),
+            ]
         )
+    
+    def _session_collections(self) -> list[str]:
+        """
+        Session collections that currently exist (hybrid may not be created
+        yet), including aliases and any reindex shadows.
+        """
+        existing = self.registry.existing_names()
+        collections = []
+        for name in (COLLECTION_NAME, HYBRID_COLLECTION_NAME):
+            if name in existing:
+                collections.extend(self._with_shadow(name))
+        return collections
+    
+    def _scroll_matching_sessions(
+        self,
+        collection_name: str,
+        query_filter: Filter,
+        with_payload: bool = False,
+        shard_key: Optional[str] = None,
+    ) -> list:
+        """Scroll all points matching an indexed filter."""
+        client = self.get_client()
+        matched = []
+        offset = None
+        
+        while True:
+            points, next_offset = client.scroll(
+                collection_name=collection_name,
+                scroll_filter=query_filter,
+                limit=256,
+                offset=offset,
+                with_payload=with_payload,
+                with_vectors=False,
+                shard_key_selector=shard_key,
+            )
+            matched.extend(points)
+            
+            if next_offset is None:
+                break
+            offset = next_offset
         
-        return result.status == UpdateStatus.COMPLETED
+        return matched
     
     def delete_sessions_containing_messages(
         self,
@@ -340,6 +889,10 @@ class QdrantService:
         from the vector database to prevent the deleted content from
         appearing in RAG responses.
         
+        Uses the indexed `message_ids` payload field, so the cost depends on
+        the number of matching sessions rather than on guild size. Both the
+        legacy and hybrid session collections are cleaned.
+        
         Args:
             guild_id: Guild ID for multi-tenant filtering
             message_ids: List of message IDs that were deleted
@@ -347,63 +900,40 @@ class QdrantService:
         Returns:
             Dict with deleted_count and session_ids
         """
+        if not message_ids:
+            return {"deleted_count": 0, "session_ids": []}
+        
         client = self.get_client()
-        deleted_session_ids = []
+        query_filter = self._message_ids_filter(guild_id, message_ids)
+        deleted_session_ids: set[str] = set()
         
         try:
-            # Scroll through all sessions for this guild and find ones containing deleted messages
-            # This is necessary because Qdrant doesn't support "array contains any" filtering
-            offset = None
-            batch_size = 100
-            
-            while True:
-                results = client.scroll(
-                    collection_name=COLLECTION_NAME,
-                    scroll_filter=Filter(
-                        must=[
-                            FieldCondition(
-                                key="guild_id",
-                                match=MatchValue(value=guild_id),
-                            ),
-                        ]
-                    ),
-                    limit=batch_size,
-                    offset=offset,
-                    with_payload=True,
-                    with_vectors=False,
-                )
-                
-                points, next_offset = results
+            for collection_name in self._session_collections():
+                self.registry.ensure(collection_name)
+                shard_key = self.registry.shard_key(collection_name, guild_id)
                 
+                # Collect IDs first so Postgres can clear qdrant_point_id afterwards
+                points = self._scroll_matching_sessions(
+                    collection_name, query_filter, shard_key=shard_key
+                )
                 if not points:
-                    break
+                    continue
                 
-                # Check each session for deleted message IDs
-                for point in points:
-                    payload = point.payload or {}
-                    session_message_ids = payload.get("message_ids", [])
-                    
-                    # If any deleted message is in this session, mark for deletion
-                    if any(mid in session_message_ids for mid in message_ids):
-                        deleted_session_ids.append(str(point.id))
+                deleted_session_ids.update(str(p.id) for p in points)
                 
-                if next_offset is None:
-                    break
-                offset = next_offset
-            
-            # Delete all found sessions
-            if deleted_session_ids:
                 client.delete(
-                    collection_name=COLLECTION_NAME,
-                    points_selector=models.PointIdsList(
-                        points=deleted_session_ids,
-                    ),
+                    collection_name=collection_name,
+                    points_selector=models.FilterSelector(filter=query_filter),
+                    wait=True,
+                    shard_key_selector=shard_key,
                 )
+            
+            if deleted_session_ids:
                 print(f"[QDRANT] Deleted {len(deleted_session_ids)} sessions containing deleted messages")
             
             return {
                 "deleted_count": len(deleted_session_ids),
-                "session_ids": deleted_session_ids,
+                "session_ids": sorted(deleted_session_ids),
             }
             
         except Exception as e:
@@ -427,56 +957,62 @@ class QdrantService:
         Returns:
             List of session dicts with id and message_ids
         """
-        client = self.get_client()
-        found_sessions = []
+        if not message_ids:
+            return []
         
         try:
-            offset = None
-            batch_size = 100
+            self.registry.ensure(COLLECTION_NAME)
+            points = self._scroll_matching_sessions(
+                COLLECTION_NAME,
+                self._message_ids_filter(guild_id, message_ids),
+                with_payload=True,
+                shard_key=self.registry.shard_key(COLLECTION_NAME, guild_id),
+            )
             
-            while True:
-                results = client.scroll(
-                    collection_name=COLLECTION_NAME,
-                    scroll_filter=Filter(
-                        must=[
-                            FieldCondition(
-                                key="guild_id",
-                                match=MatchValue(value=guild_id),
-                            ),
-                        ]
-                    ),
-                    limit=batch_size,
-                    offset=offset,
-                    with_payload=True,
-                    with_vectors=False,
-                )
-                
-                points, next_offset = results
-                
-                if not points:
-                    break
-                
-                for point in points:
-                    payload = point.payload or {}
-                    session_message_ids = payload.get("message_ids", [])
-                    
-                    if any(mid in session_message_ids for mid in message_ids):
-                        found_sessions.append({
-                            "session_id": str(point.id),
-                            "message_ids": session_message_ids,
-                            "channel_id": payload.get("channel_id"),
-                        })
-                
-                if next_offset is None:
-                    break
-                offset = next_offset
-            
-            return found_sessions
+            return [
+                {
+                    "session_id": str(point.id),
+                    "message_ids": (point.payload or {}).get("message_ids", []),
+                    "channel_id": (point.payload or {}).get("channel_id"),
+                }
+                for point in points
+            ]
             
         except Exception as e:
             print(f"[QDRANT ERROR] get_sessions_by_message_ids: {e}")
             return []
     
+    def ensure_message_ids_index(self) -> dict:
+        """
+        Create the `message_ids` payload index on existing session collections.
+        
+        Qdrant builds the index over points already stored, so this doubles as
+        the backfill for collections created before the field was indexed.
+        Safe to run repeatedly.
+        
+        Returns:
+            Dict mapping collection name to "created" or "exists"
+        """
+        client = self.get_client()
+        status = {}
+        
+        for collection_name in self._session_collections():
+            info = client.get_collection(collection_name)
+            if "message_ids" in (info.payload_schema or {}):
+                status[collection_name] = "exists"
+                continue
+            
+            client.create_payload_index(
+                collection_name=collection_name,
+                field_name="message_ids",
+                field_schema=PayloadSchemaType.INTEGER,
+                wait=True,
+            )
+            status[collection_name] = "created"
+            print(f"[QDRANT] Created message_ids index on {collection_name}")
+        
+        return status
+    
     def get_collection_info(self) -> dict:
         """Get collection statistics."""
         self.ensure_collection()
@@ -500,52 +1036,10 @@ class QdrantService:
         - Dense vectors (semantic similarity)
         - Sparse vectors (BM25 keyword matching)
         - RRF fusion for hybrid search
-        """
-        client = self.get_client()
-        vector_size = get_vector_size()
-        
-        collections = client.get_collections()
-        existing = [c.name for c in collections.collections]
         
-        if HYBRID_COLLECTION_NAME not in existing:
-            client.create_collection(
-                collection_name=HYBRID_COLLECTION_NAME,
-                vectors_config={
-                    DENSE_VECTOR_NAME: VectorParams(
-                        size=vector_size,
-                        distance=Distance.COSINE,
-                    ),
-                },
-                sparse_vectors_config={
-                    SPARSE_VECTOR_NAME: SparseVectorParams(
-                        index=SparseIndexParams(
-                            on_disk=False,
-                        ),
-                    ),
-                },
-                optimizers_config=models.OptimizersConfigDiff(
-                    indexing_threshold=10000,
-                ),
-            )
-            
-            # Create payload indexes for efficient filtering
-            client.create_payload_index(
-                collection_name=HYBRID_COLLECTION_NAME,
-                field_name="guild_id",
-                field_schema=PayloadSchemaType.INTEGER,
-            )
-            client.create_payload_index(
-                collection_name=HYBRID_COLLECTION_NAME,
-                field_name="channel_id",
-                field_schema=PayloadSchemaType.INTEGER,
-            )
-            client.create_payload_index(
-                collection_name=HYBRID_COLLECTION_NAME,
-                field_name="source_type",
-                field_schema=PayloadSchemaType.KEYWORD,
-            )
-            
-            print(f"[HYBRID] Created collection: {HYBRID_COLLECTION_NAME} with dense ({vector_size}D) + sparse vectors")
+        Checked once per process; see CollectionRegistry.
+        """
+        self.registry.ensure(HYBRID_COLLECTION_NAME)
     
     def upsert_hybrid(
         self,
@@ -554,6 +1048,7 @@ class QdrantService:
         sparse_indices: list[int],
         sparse_values: list[float],
         payload: dict,
+        multivector: Optional[list[list[float]]] = None,
     ) -> bool:
         """
         Upsert a point with both dense and sparse vectors.
@@ -564,13 +1059,12 @@ class QdrantService:
             sparse_indices: BM25 sparse vector indices
             sparse_values: BM25 sparse vector values
             payload: Metadata payload (must include guild_id)
+            multivector: ColBERT token vectors (stored only if the
+                collection has the late-interaction vector)
             
         Returns:
             True if successful
         """
-        self.ensure_hybrid_collection()
-        client = self.get_client()
-        
         # Build vector dict with named vectors
         vectors = {
             DENSE_VECTOR_NAME: dense_vector,
@@ -583,19 +1077,13 @@ class QdrantService:
                 values=sparse_values,
             )
         
-        result = client.upsert(
-            collection_name=HYBRID_COLLECTION_NAME,
-            points=[
-                PointStruct(
-                    id=point_id,
-                    vector=vectors,
-                    payload=payload,
-                ),
-            ],
-            wait=True,
-        )
+        if multivector and self.late_interaction_ready(HYBRID_COLLECTION_NAME):
+            vectors[LATE_INTERACTION_VECTOR_NAME] = multivector
         
-        return result.status == UpdateStatus.COMPLETED
+        return self.upsert_points(
+            HYBRID_COLLECTION_NAME,
+            [PointStruct(id=point_id, vector=vectors, payload=payload)],
+        )
     
     def upsert_hybrid_batch(self, points: list[dict]) -> bool:
         """
@@ -608,13 +1096,12 @@ class QdrantService:
                 - sparse_indices: BM25 indices
                 - sparse_values: BM25 values
                 - payload: Metadata
+                - multivector: Optional ColBERT token vectors
                 
         Returns:
             True if successful
         """
-        self.ensure_hybrid_collection()
-        client = self.get_client()
-        
+        late_interaction = self.late_interaction_ready(HYBRID_COLLECTION_NAME)
         qdrant_points = []
         for p in points:
             vectors = {
@@ -625,6 +1112,8 @@ class QdrantService:
                     indices=p["sparse_indices"],
                     values=p["sparse_values"],
                 )
+            if late_interaction and p.get("multivector"):
+                vectors[LATE_INTERACTION_VECTOR_NAME] = p["multivector"]
             
             qdrant_points.append(
                 PointStruct(
@@ -634,13 +1123,7 @@ class QdrantService:
                 )
             )
         
-        result = client.upsert(
-            collection_name=HYBRID_COLLECTION_NAME,
-            points=qdrant_points,
-            wait=True,
-        )
-        
-        return result.status == UpdateStatus.COMPLETED
+        return self.upsert_points(HYBRID_COLLECTION_NAME, qdrant_points)
     
     def hybrid_search(
         self,
@@ -654,12 +1137,22 @@ class QdrantService:
         source_types: Optional[list[str]] = None,
         dense_weight: float = 0.7,
         sparse_weight: float = 0.3,
+        oversampling: Optional[float] = None,
+        rescore: bool = True,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        author_ids: Optional[list[int]] = None,
+        recency_half_life_days: Optional[float] = None,
+        recency_weight: float = 0.5,
+        query_multivector: Optional[list[list[float]]] = None,
     ) -> list[dict]:
         """
         Hybrid search combining dense (semantic) and sparse (BM25) vectors.
         
         Uses Reciprocal Rank Fusion (RRF) to combine results from both
-        dense and sparse searches.
+        dense and sparse searches. With query_multivector, the fused
+        candidates are reranked by ColBERT MaxSim as a final server-side
+        stage (skipped on collections without the multivector).
         
         Args:
             query_dense: Dense query embedding
@@ -672,91 +1165,60 @@ class QdrantService:
             source_types: Optional source type filter
             dense_weight: Weight for dense results (default 0.7)
             sparse_weight: Weight for sparse results (default 0.3)
+            oversampling: Quantized candidate multiplier (see build_search_params)
+            rescore: Re-rank quantized candidates with the original vectors
+            since: Only sessions ending at/after this time
+            until: Only sessions starting at/before this time
+            author_ids: Only sessions where any of these users spoke
+            recency_half_life_days: Enable server-side recency decay on the
+                fused score (see build_recency_formula)
+            recency_weight: Share of the score subject to decay (0-1)
+            query_multivector: ColBERT query token vectors for the
+                late-interaction rerank stage
             
         Returns:
             List of results with id, score, payload
         """
-        self.ensure_hybrid_collection()
-        client = self.get_client()
-        
-        # Build filter - guild_id is ALWAYS required
-        must_conditions = [
-            FieldCondition(
-                key="guild_id",
-                match=MatchValue(value=guild_id),
-            ),
-        ]
-        
-        if channel_ids:
-            must_conditions.append(
-                FieldCondition(
-                    key="channel_id",
-                    match=MatchAny(any=channel_ids),
-                )
-            )
-        
-        if source_types:
-            must_conditions.append(
-                FieldCondition(
-                    key="source_type",
-                    match=MatchAny(any=source_types),
-                )
-            )
+        if query_multivector and not self.late_interaction_ready(HYBRID_COLLECTION_NAME):
+            query_multivector = None
         
-        query_filter = Filter(must=must_conditions)
-        
-        # Build prefetch queries for RRF fusion
-        prefetch_queries = []
-        
-        # Dense (semantic) search prefetch
-        prefetch_queries.append(
-            Prefetch(
-                query=query_dense,
-                using=DENSE_VECTOR_NAME,
-                limit=limit * 3,  # Oversample for fusion
-                filter=query_filter,
-            )
+        query_filter = build_tenant_filter(
+            guild_id, channel_ids, source_types,
+            since=since, until=until, author_ids=author_ids,
+        )
+        search_params = build_search_params(oversampling, rescore)
+        prefetch_queries = _hybrid_prefetch(
+            query_dense, query_sparse_indices, query_sparse_values, query_filter, limit,
+            search_params,
         )
-        
-        # Sparse (BM25) search prefetch - only if we have sparse data
-        if query_sparse_indices and query_sparse_values:
-            prefetch_queries.append(
-                Prefetch(
-                    query=SparseVector(
-                        indices=query_sparse_indices,
-                        values=query_sparse_values,
-                    ),
-                    using=SPARSE_VECTOR_NAME,
-                    limit=limit * 3,
-                    filter=query_filter,
-                )
-            )
         
         # Execute hybrid search with RRF fusion
         try:
-            results = client.query_points(
+            results = self.run(HYBRID_COLLECTION_NAME, lambda client: client.query_points(
                 collection_name=HYBRID_COLLECTION_NAME,
-                prefetch=prefetch_queries,
-                query=FusionQuery(fusion=Fusion.RRF),
+                **_hybrid_query_kwargs(
+                    prefetch_queries, limit, recency_half_life_days, recency_weight,
+                    query_multivector,
+                ),
                 limit=limit,
                 with_payload=True,
-            )
+                shard_key_selector=self.registry.shard_key(HYBRID_COLLECTION_NAME, guild_id),
+            ))
             
-            return [
-                {
-                    "id": str(r.id),
-                    "score": r.score,
-                    "payload": r.payload,
-                }
-                for r in results.points
-                if r.score >= score_threshold
-            ]
+            return _to_results(results.points, score_threshold)
             
         except Exception as e:
             print(f"[HYBRID] Search error: {e}")
             # Fallback to dense-only search
             return self._dense_only_search(
-                query_dense, guild_id, channel_ids, limit, score_threshold, source_types
+                query_dense, guild_id, channel_ids, limit, score_threshold, source_types,
+                oversampling=oversampling,
+                rescore=rescore,
+                since=since,
+                until=until,
+                author_ids=author_ids,
+                recency_half_life_days=recency_half_life_days,
+                recency_weight=recency_weight,
             )
     
     def _dense_only_search(
@@ -767,51 +1229,136 @@ class QdrantService:
         limit: int = 5,
         score_threshold: float = 0.2,
         source_types: Optional[list[str]] = None,
+        oversampling: Optional[float] = None,
+        rescore: bool = True,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        author_ids: Optional[list[int]] = None,
+        recency_half_life_days: Optional[float] = None,
+        recency_weight: float = 0.5,
     ) -> list[dict]:
         """Fallback dense-only search on hybrid collection."""
-        client = self.get_client()
+        query_filter = build_tenant_filter(
+            guild_id, channel_ids, source_types,
+            since=since, until=until, author_ids=author_ids,
+        )
+        query_kwargs = _dense_query_kwargs(
+            query_dense, DENSE_VECTOR_NAME, query_filter, build_search_params(oversampling, rescore),
+            limit, score_threshold, recency_half_life_days, recency_weight,
+        )
         
-        must_conditions = [
-            FieldCondition(
-                key="guild_id",
-                match=MatchValue(value=guild_id),
-            ),
-        ]
+        results = self.run(HYBRID_COLLECTION_NAME, lambda client: client.query_points(
+            collection_name=HYBRID_COLLECTION_NAME,
+            **query_kwargs,
+            limit=limit,
+            with_payload=True,
+            shard_key_selector=self.registry.shard_key(HYBRID_COLLECTION_NAME, guild_id),
+        ))
         
-        if channel_ids:
-            must_conditions.append(
-                FieldCondition(
-                    key="channel_id",
-                    match=MatchAny(any=channel_ids),
-                )
-            )
+        return _to_results(results.points)
+    
+    def search_batch(self, requests: list[SearchRequest]) -> list[list[dict]]:
+        """
+        Run several searches with one query_batch_points request per collection.
         
-        if source_types:
-            must_conditions.append(
-                FieldCondition(
-                    key="source_type",
-                    match=MatchAny(any=source_types),
+        Lets callers send a primary query and its fallbacks together instead
+        of one after the other. A failing collection yields empty results
+        for its requests without affecting the others. Grouped requests
+        are run through search_groups().
+        
+        Args:
+            requests: Searches to run (each MUST carry its guild_id)
+            
+        Returns:
+            One result list per request, in request order
+        """
+        requests = [self._gate_late_interaction(request) for request in requests]
+        results: list[list[dict]] = [[] for _ in requests]
+        
+        for i, request in enumerate(requests):
+            if not request.group_by:
+                continue
+            try:
+                results[i] = self.search_groups(request)
+            except Exception as e:
+                print(f"[QDRANT ERROR] search_groups on {request.collection_name}: {e}")
+        
+        for collection_name, indexes in _group_by_collection(requests).items():
+            def query_batch(client, collection_name=collection_name, indexes=indexes):
+                return client.query_batch_points(
+                    collection_name=collection_name,
+                    requests=[
+                        _build_query_request(
+                            requests[i],
+                            self.registry.shard_key(collection_name, requests[i].guild_id),
+                        )
+                        for i in indexes
+                    ],
                 )
-            )
+            
+            try:
+                responses = self.run(collection_name, query_batch)
+            except Exception as e:
+                print(f"[QDRANT ERROR] search_batch on {collection_name}: {e}")
+                continue
+            
+            for i, response in zip(indexes, responses, strict=True):
+                threshold = requests[i].score_threshold if requests[i].fusion else None
+                results[i] = _to_results(response.points, threshold)
         
-        results = client.query_points(
-            collection_name=HYBRID_COLLECTION_NAME,
-            query=query_dense,
-            using=DENSE_VECTOR_NAME,
-            query_filter=Filter(must=must_conditions),
-            limit=limit,
-            score_threshold=score_threshold,
+        return results
+    
+    def search_groups(self, request: SearchRequest) -> list[dict]:
+        """
+        Grouped search: at most request.group_size hits per payload group.
+        
+        Keeps several adjacent chunks of one document (or sessions from one
+        busy channel) from crowding out everything else. request.limit is
+        the number of groups; the group field defaults to
+        default_group_by(request.source_types).
+        
+        Returns:
+            Flattened hits (best first), each with a "group_id"
+        """
+        request = self._gate_late_interaction(request)
+        collection_name = request.collection_name
+        group_by = request.group_by or default_group_by(request.source_types)
+        query_kwargs = _request_query_kwargs(request, request.limit * request.group_size)
+        
+        response = self.run(collection_name, lambda client: client.query_points_groups(
+            collection_name=collection_name,
+            group_by=group_by,
+            **query_kwargs,
+            limit=request.limit,
+            group_size=request.group_size,
             with_payload=True,
-        )
+            with_vectors=_with_vector(request),
+            shard_key_selector=self.registry.shard_key(collection_name, request.guild_id),
+        ))
         
-        return [
-            {
-                "id": str(r.id),
-                "score": r.score,
-                "payload": r.payload,
-            }
-            for r in results.points
-        ]
+        threshold = request.score_threshold if request.fusion else None
+        return _groups_to_results(response.groups, threshold)
+    
+    def late_interaction_ready(self, collection_name: str = HYBRID_COLLECTION_NAME) -> bool:
+        """
+        Whether the collection stores ColBERT multivectors.
+        
+        Hybrid collections created before the multivector was added to the
+        schema lack it until rebuilt (scripts/migrate_to_hybrid.py --recreate);
+        searches and writes skip the late-interaction stage for them.
+        """
+        try:
+            self.registry.ensure(collection_name)
+            return self.registry.has_vector(collection_name, LATE_INTERACTION_VECTOR_NAME)
+        except Exception as e:
+            print(f"[QDRANT ERROR] Vector check on {collection_name}: {e}")
+            return False
+    
+    def _gate_late_interaction(self, request: SearchRequest) -> SearchRequest:
+        """Drop query_multivector for collections without the multivector."""
+        if request.query_multivector and not self.late_interaction_ready(request.collection_name):
+            return replace(request, query_multivector=None)
+        return request
     
     def get_hybrid_collection_info(self) -> dict:
         """Get hybrid collection statistics."""
@@ -827,92 +1374,661 @@ class QdrantService:
             "hybrid_enabled": True,
         }
     
-    def migrate_to_hybrid(self, batch_size: int = 100) -> dict:
+    def migrate_storage_profile(self, profile_name: str) -> dict:
+        """
+        Move the existing session collections to another storage profile.
+        
+        Updates quantization, on-disk vectors, HNSW and sparse index placement
+        in place; Qdrant rebuilds segments in the background. Set
+        QDRANT_STORAGE_PROFILE to the same profile so new collections and
+        searches (oversampling/rescore) match.
+        
+        Args:
+            profile_name: One of STORAGE_PROFILES (memory, scalar, binary, product)
+            
+        Returns:
+            Dict mapping collection name to "updated" or "missing"
+        """
+        profile = get_storage_profile(profile_name)
+        existing = self.registry.existing_names()
+        status = {}
+        
+        for name, config in COLLECTION_CONFIGS.items():
+            if not config.use_storage_profile:
+                continue
+            if name not in existing:
+                status[name] = "missing"
+                continue
+            self.registry.apply_storage_profile(name, profile)
+            status[name] = "updated"
+        
+        return status
+    
+    def migrate_to_hybrid(
+        self,
+        batch_size: int = 256,
+        embed_workers: int = 2,
+        resume: bool = True,
+        checkpoint_path: Optional[str] = None,
+        recreate: bool = False,
+    ) -> dict:
         """
         Migrate existing points from legacy collection to hybrid collection.
         
-        This re-indexes all points with both dense and sparse vectors.
+        Reuses the stored dense vectors and adds BM25 sparse vectors, one
+        batch per scroll page. Scroll, embed and upsert run as concurrent
+        stages; progress is checkpointed so an interrupted run resumes
+        (see services/hybrid_migration.py).
         
         Args:
-            batch_size: Number of points to process per batch
+            batch_size: Number of points per scroll page / sparse batch
+            embed_workers: Concurrent sparse-embedding workers
+            resume: Continue from the last checkpoint (False starts over)
+            checkpoint_path: Checkpoint file (default: DEFAULT_CHECKPOINT_PATH)
+            recreate: Drop and re-create the hybrid collection first, e.g.
+                to add the ColBERT multivector to an older one
             
         Returns:
-            Dict with migration stats
+            Dict with migration stats (migrated, errors, points_per_sec, ...)
         """
-        from apps.api.src.services.hybrid_embedding import get_hybrid_embedding_model
+        from apps.api.src.services.hybrid_migration import DEFAULT_CHECKPOINT_PATH, HybridMigration
         
-        client = self.get_client()
-        self.ensure_hybrid_collection()
+        migration = HybridMigration(
+            self,
+            batch_size=batch_size,
+            embed_workers=embed_workers,
+            checkpoint_path=checkpoint_path or DEFAULT_CHECKPOINT_PATH,
+        )
+        return migration.run(resume=resume, recreate=recreate)
+
+
+@dataclass
+class _BufferedWrite:
+    """A group of points plus the callbacks to run once they are durable or lost."""
+    collection_name: str
+    points: list[PointStruct]
+    on_durable: Optional[Callable[[], None]] = None
+    on_failed: Optional[Callable[[], None]] = None
+    barrier_attempts: int = 0
+
+
+@dataclass
+class WriteBufferStats:
+    """Rolling metrics for the write-behind buffer."""
+    batches_flushed: int = 0
+    points_flushed: int = 0
+    barriers: int = 0
+    failed_batches: int = 0
+    failed_barriers: int = 0
+    failed_writes: int = 0  # Writes handed back through on_failed
+    batch_sizes: deque = field(default_factory=lambda: deque(maxlen=500))
+    flush_latencies_ms: deque = field(default_factory=lambda: deque(maxlen=500))
+    barrier_latencies_ms: deque = field(default_factory=lambda: deque(maxlen=500))
+
+
+def _percentile(samples: deque, pct: float) -> float:
+    """Nearest-rank percentile of a sample window (0.0 if empty)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return round(ordered[index], 2)
+
+
+class QdrantWriteBuffer:
+    """
+    Write-behind buffer that batches upserts across tasks in a worker process.
+    
+    Points are collected until `max_batch` points are pending or
+    `flush_interval` seconds pass, then sent in one upsert with wait=False.
+    A later ordered barrier (a wait=True, strongly ordered payload write per
+    collection) confirms everything flushed before it has been applied; only
+    then are the `on_durable` callbacks run - this is where callers mark
+    `messages.indexed_at` in Postgres.
+    
+    Failed writes are handed back rather than dropped:
+    - A failed flush (an error, or an upsert not acknowledged) runs
+      `on_failed` for every write in the batch right away.
+      The points are not re-sent from memory - the caller (the Celery task)
+      re-runs and rebuilds them from Postgres, so a message deleted meanwhile
+      isn't written back.
+    - A failed barrier is retried with the next barrier (the points may well
+      be applied) and `on_failed` runs after `max_barrier_attempts` failures.
+    - Writes still unconfirmed when the buffer is closed run `on_failed`.
+    
+    Usage:
+        write_buffer.add(COLLECTION_NAME, [point], on_durable=mark_indexed, on_failed=redeliver)
+    """
+    
+    def __init__(
+        self,
+        service: "QdrantService",
+        max_batch: int = 64,
+        flush_interval: float = 0.5,
+        max_barrier_attempts: int = 3,
+    ):
+        self._service = service
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_barrier_attempts = max_barrier_attempts
+        self._pending: list[_BufferedWrite] = []
+        self._pending_points = 0
+        self._awaiting_barrier: list[_BufferedWrite] = []
+        # Last point flushed per (collection, shard key) - target of the barrier write
+        self._barrier_points: dict[tuple[str, Optional[str]], PointStruct] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = WriteBufferStats()
+    
+    def _ensure_started(self) -> None:
+        """Start the background flusher thread (lazily, per process)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="qdrant-write-buffer",
+            daemon=True,
+        )
+        self._thread.start()
+    
+    def _run(self) -> None:
+        """Background loop: time-based flush followed by a barrier."""
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                self.barrier()
+            except Exception as e:
+                print(f"[QDRANT BUFFER] Background flush error: {e}")
+    
+    def add(
+        self,
+        collection_name: str,
+        points: list[PointStruct],
+        on_durable: Optional[Callable[[], None]] = None,
+        on_failed: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """
+        Queue points for a buffered upsert.
         
-        hybrid_model = get_hybrid_embedding_model()
-        migrated = 0
-        errors = 0
-        offset = None
+        Args:
+            collection_name: Target collection
+            points: Points to upsert (payloads must include guild_id)
+            on_durable: Called once the points are confirmed applied
+            on_failed: Called instead if the points could not be confirmed
+        """
+        self._service.registry.ensure(collection_name)
+        self._ensure_started()
         
-        print(f"[HYBRID] Starting migration from {COLLECTION_NAME} to {HYBRID_COLLECTION_NAME}")
+        with self._lock:
+            self._pending.append(_BufferedWrite(collection_name, points, on_durable, on_failed))
+            self._pending_points += len(points)
+            should_flush = self._pending_points >= self.max_batch
         
-        while True:
-            # Scroll through legacy collection
-            results = client.scroll(
-                collection_name=COLLECTION_NAME,
-                limit=batch_size,
-                offset=offset,
-                with_payload=True,
-                with_vectors=True,
-            )
+        if should_flush:
+            self.flush()
+    
+    def flush(self) -> None:
+        """Send all pending points with wait=False, one upsert per collection."""
+        failed: list[_BufferedWrite] = []
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                self._pending_points = 0
             
-            points, next_offset = results
+            if not pending:
+                return
             
-            if not points:
-                break
+            by_collection: dict[str, list[_BufferedWrite]] = {}
+            for write in pending:
+                by_collection.setdefault(write.collection_name, []).append(write)
             
-            # Process batch
-            hybrid_points = []
-            for point in points:
+            for collection_name, writes in by_collection.items():
+                points = [p for w in writes for p in w.points]
+                if not points:
+                    self._awaiting_barrier.extend(writes)
+                    continue
+                
+                start = time.perf_counter()
                 try:
-                    payload = point.payload or {}
-                    content = payload.get("content", "")
-                    
-                    # Get dense vector from existing point
-                    dense_vector = point.vector if isinstance(point.vector, list) else list(point.vector)
-                    
-                    # Generate sparse embedding for content
-                    if content and hybrid_model.sparse_enabled:
-                        hybrid_emb = hybrid_model.embed_document(content)
-                        sparse_indices = hybrid_emb.sparse_indices
-                        sparse_values = hybrid_emb.sparse_values
-                    else:
-                        sparse_indices = []
-                        sparse_values = []
-                    
-                    hybrid_points.append({
-                        "id": str(point.id),
-                        "dense_vector": dense_vector,
-                        "sparse_indices": sparse_indices,
-                        "sparse_values": sparse_values,
-                        "payload": payload,
-                    })
-                    
+                    if not self._service.upsert_points(collection_name, points, wait=False):
+                        raise RuntimeError("upsert was not acknowledged")
                 except Exception as e:
-                    print(f"[HYBRID] Error processing point {point.id}: {e}")
-                    errors += 1
+                    self.stats.failed_batches += 1
+                    print(f"[QDRANT BUFFER] Flush of {len(points)} points to {collection_name} failed: {e}")
+                    failed.extend(writes)
+                    continue
+                
+                latency_ms = (time.perf_counter() - start) * 1000
+                self.stats.batches_flushed += 1
+                self.stats.points_flushed += len(points)
+                self.stats.batch_sizes.append(len(points))
+                self.stats.flush_latencies_ms.append(latency_ms)
+                
+                # Updates are ordered per shard, so each shard written gets a barrier
+                registry = self._service.registry
+                for point in points:
+                    shard_key = registry.shard_key(collection_name, point.payload["guild_id"])
+                    self._barrier_points[(collection_name, shard_key)] = point
+                self._awaiting_barrier.extend(writes)
+        
+        self._fail(failed)
+    
+    def barrier(self) -> None:
+        """
+        Confirm all flushed writes are applied, then run their callbacks.
+        
+        Qdrant applies updates to a shard in order, so a strongly ordered
+        wait=True write completing means every earlier wait=False upsert to
+        that shard has been applied too. Writes in a collection whose barrier
+        failed wait for the next barrier, up to max_barrier_attempts.
+        """
+        failed: list[_BufferedWrite] = []
+        with self._flush_lock:
+            if not self._awaiting_barrier:
+                return
             
-            # Upsert batch to hybrid collection
-            if hybrid_points:
-                self.upsert_hybrid_batch(hybrid_points)
-                migrated += len(hybrid_points)
-                print(f"[HYBRID] Migrated {migrated} points...")
+            awaiting, self._awaiting_barrier = self._awaiting_barrier, []
+            barrier_points, self._barrier_points = self._barrier_points, {}
+            client = self._service.get_client()
             
-            if next_offset is None:
-                break
-            offset = next_offset
+            failed_collections = set()
+            for (collection_name, shard_key), point in barrier_points.items():
+                start = time.perf_counter()
+                try:
+                    # Re-set an unchanged payload key rather than re-upserting,
+                    # so a delete issued since the flush can't be undone
+                    client.set_payload(
+                        collection_name=collection_name,
+                        payload={"guild_id": point.payload["guild_id"]},
+                        points=[point.id],
+                        wait=True,
+                        ordering=models.WriteOrdering.STRONG,
+                        shard_key_selector=shard_key,
+                    )
+                except Exception as e:
+                    failed_collections.add(collection_name)
+                    self.stats.failed_barriers += 1
+                    # Retried by the next barrier (no flush can run until this one returns)
+                    self._barrier_points[(collection_name, shard_key)] = point
+                    print(f"[QDRANT BUFFER] Barrier on {collection_name} failed: {e}")
+                    continue
+                self.stats.barriers += 1
+                self.stats.barrier_latencies_ms.append((time.perf_counter() - start) * 1000)
+            
+            confirmed = []
+            for write in awaiting:
+                if write.collection_name not in failed_collections:
+                    confirmed.append(write)
+                    continue
+                write.barrier_attempts += 1
+                if write.barrier_attempts < self.max_barrier_attempts:
+                    self._awaiting_barrier.append(write)
+                else:
+                    failed.append(write)
+            if failed:
+                # Given up on: nothing left waiting needs these barrier points
+                waiting = {w.collection_name for w in self._awaiting_barrier}
+                self._barrier_points = {
+                    key: point for key, point in self._barrier_points.items() if key[0] in waiting
+                }
         
-        print(f"[HYBRID] Migration complete: {migrated} points migrated, {errors} errors")
+        for write in confirmed:
+            if write.on_durable is None:
+                continue
+            try:
+                write.on_durable()
+            except Exception as e:
+                print(f"[QDRANT BUFFER] on_durable callback failed: {e}")
+        self._fail(failed)
+    
+    def _fail(self, writes: list[_BufferedWrite]) -> None:
+        """Hand writes that could not be confirmed back to their callers."""
+        for write in writes:
+            self.stats.failed_writes += 1
+            if write.on_failed is None:
+                continue
+            try:
+                write.on_failed()
+            except Exception as e:
+                print(f"[QDRANT BUFFER] on_failed callback failed: {e}")
+    
+    def drain(self) -> None:
+        """Flush everything and wait for the barrier (used before shutdown)."""
+        self.flush()
+        self.barrier()
+    
+    def close(self) -> None:
+        """Stop the background thread, drain, and fail whatever is still unconfirmed."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval * 4)
+            self._thread = None
+        self.drain()
+        
+        with self._flush_lock:
+            with self._lock:
+                leftover, self._pending = self._pending, []
+                self._pending_points = 0
+            leftover.extend(self._awaiting_barrier)
+            self._awaiting_barrier = []
+            self._barrier_points = {}
+        self._fail(leftover)
+    
+    def get_stats(self) -> dict:
+        """Batch size and latency metrics for monitoring."""
+        stats = self.stats
         return {
-            "migrated": migrated,
-            "errors": errors,
+            "pending_points": self._pending_points,
+            "awaiting_barrier": len(self._awaiting_barrier),
+            "batches_flushed": stats.batches_flushed,
+            "points_flushed": stats.points_flushed,
+            "failed_batches": stats.failed_batches,
+            "failed_barriers": stats.failed_barriers,
+            "failed_writes": stats.failed_writes,
+            "barriers": stats.barriers,
+            "avg_batch_size": round(sum(stats.batch_sizes) / len(stats.batch_sizes), 2) if stats.batch_sizes else 0.0,
+            "max_batch_size": max(stats.batch_sizes, default=0),
+            "flush_latency_ms_p50": _percentile(stats.flush_latencies_ms, 50),
+            "flush_latency_ms_p99": _percentile(stats.flush_latencies_ms, 99),
+            "barrier_latency_ms_p50": _percentile(stats.barrier_latencies_ms, 50),
+            "barrier_latency_ms_p99": _percentile(stats.barrier_latencies_ms, 99),
         }
 
 
-# Global service instance
-qdrant_service = QdrantService()
+class AsyncQdrantService:
+    """
+    Async Qdrant client wrapper for the FastAPI request path.
+    
+    Mirrors the read methods of QdrantService on top of AsyncQdrantClient so
+    vector lookups don't block the event loop. Uses the same tenant filter
+    builder, so every query is scoped to guild_id. Collection creation is
+    delegated to the sync service (run once in a worker thread); Celery
+    tasks keep using QdrantService directly.
+    """
+    
+    def __init__(self, sync_service: QdrantService):
+        self._client: Optional[AsyncQdrantClient] = None
+        self._sync_service = sync_service
+    
+    def get_client(self) -> AsyncQdrantClient:
+        """Get or create the async Qdrant client."""
+        if self._client is None:
+            settings = get_settings()
+            self._client = AsyncQdrantClient(
+                url=settings.qdrant_url,
+                timeout=30.0,
+            )
+        return self._client
+    
+    async def close(self) -> None:
+        """Close the underlying HTTP connections (called on API shutdown)."""
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+    
+    async def ensure_collection(self) -> None:
+        """Create the legacy collection if needed (once per process)."""
+        await self._ensure(COLLECTION_NAME)
+    
+    async def ensure_hybrid_collection(self) -> None:
+        """Create the hybrid collection if needed (once per process)."""
+        await self._ensure(HYBRID_COLLECTION_NAME)
+    
+    async def late_interaction_ready(self, collection_name: str = HYBRID_COLLECTION_NAME) -> bool:
+        """Async QdrantService.late_interaction_ready (the check runs off the event loop)."""
+        return await asyncio.to_thread(self._sync_service.late_interaction_ready, collection_name)
+    
+    async def _gate_late_interaction(self, request: SearchRequest) -> SearchRequest:
+        """Drop query_multivector for collections without the multivector."""
+        if request.query_multivector and not await self.late_interaction_ready(request.collection_name):
+            return replace(request, query_multivector=None)
+        return request
+    
+    async def _ensure(self, collection_name: str) -> None:
+        """Shares the sync service's registry; bootstraps off the event loop."""
+        registry = self._sync_service.registry
+        if registry.is_ready(collection_name):
+            return
+        await asyncio.to_thread(registry.ensure, collection_name)
+    
+    async def run(
+        self,
+        collection_name: str,
+        operation: Callable[[AsyncQdrantClient], Awaitable[Any]],
+    ) -> Any:
+        """Async counterpart of QdrantService.run (re-check on missing collection)."""
+        await self._ensure(collection_name)
+        client = self.get_client()
+        try:
+            return await operation(client)
+        except Exception as e:
+            registry = self._sync_service.registry
+            if not await asyncio.to_thread(registry.recover, collection_name, e):
+                raise
+            return await operation(client)
+    
+    async def search(
+        self,
+        query_embedding: list[float],
+        guild_id: int,
+        channel_ids: Optional[list[int]] = None,
+        limit: int = 5,
+        score_threshold: float = 0.2,
+        source_types: Optional[list[str]] = None,
+        oversampling: Optional[float] = None,
+        rescore: bool = True,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        author_ids: Optional[list[int]] = None,
+        recency_half_life_days: Optional[float] = None,
+        recency_weight: float = 0.5,
+    ) -> list[dict]:
+        """
+        Search for similar vectors with multi-tenant filtering.
+        
+        Async counterpart of QdrantService.search.
+        """
+        query_filter = build_tenant_filter(
+            guild_id, channel_ids, source_types,
+            since=since, until=until, author_ids=author_ids,
+        )
+        query_kwargs = _dense_query_kwargs(
+            query_embedding, None, query_filter, build_search_params(oversampling, rescore),
+            limit, score_threshold, recency_half_life_days, recency_weight,
+        )
+        
+        results = await self.run(COLLECTION_NAME, lambda client: client.query_points(
+            collection_name=COLLECTION_NAME,
+            **query_kwargs,
+            limit=limit,
+            with_payload=True,
+            shard_key_selector=self._sync_service.registry.shard_key(COLLECTION_NAME, guild_id),
+        ))
+        
+        return _to_results(results.points)
+    
+    async def hybrid_search(
+        self,
+        query_dense: list[float],
+        query_sparse_indices: list[int],
+        query_sparse_values: list[float],
+        guild_id: int,
+        channel_ids: Optional[list[int]] = None,
+        limit: int = 5,
+        score_threshold: float = 0.0,
+        source_types: Optional[list[str]] = None,
+        dense_weight: float = 0.7,
+        sparse_weight: float = 0.3,
+        oversampling: Optional[float] = None,
+        rescore: bool = True,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        author_ids: Optional[list[int]] = None,
+        recency_half_life_days: Optional[float] = None,
+        recency_weight: float = 0.5,
+        query_multivector: Optional[list[list[float]]] = None,
+    ) -> list[dict]:
+        """
+        Hybrid dense + sparse search with RRF fusion.
+        
+        Async counterpart of QdrantService.hybrid_search, including the
+        late-interaction stage and the dense-only fallback.
+        """
+        if query_multivector and not await self.late_interaction_ready(HYBRID_COLLECTION_NAME):
+            query_multivector = None
+        
+        query_filter = build_tenant_filter(
+            guild_id, channel_ids, source_types,
+            since=since, until=until, author_ids=author_ids,
+        )
+        search_params = build_search_params(oversampling, rescore)
+        prefetch_queries = _hybrid_prefetch(
+            query_dense, query_sparse_indices, query_sparse_values, query_filter, limit,
+            search_params,
+        )
+        
+        try:
+            results = await self.run(HYBRID_COLLECTION_NAME, lambda client: client.query_points(
+                collection_name=HYBRID_COLLECTION_NAME,
+                **_hybrid_query_kwargs(
+                    prefetch_queries, limit, recency_half_life_days, recency_weight,
+                    query_multivector,
+                ),
+                limit=limit,
+                with_payload=True,
+                shard_key_selector=self._sync_service.registry.shard_key(HYBRID_COLLECTION_NAME, guild_id),
+            ))
+            
+            return _to_results(results.points, score_threshold)
+            
+        except Exception as e:
+            print(f"[HYBRID] Async search error: {e}")
+            return await self._dense_only_search(
+                query_dense, guild_id, channel_ids, limit, score_threshold, source_types,
+                oversampling=oversampling,
+                rescore=rescore,
+                since=since,
+                until=until,
+                author_ids=author_ids,
+                recency_half_life_days=recency_half_life_days,
+                recency_weight=recency_weight,
+            )
+    
+    async def _dense_only_search(
+        self,
+        query_dense: list[float],
+        guild_id: int,
+        channel_ids: Optional[list[int]] = None,
+        limit: int = 5,
+        score_threshold: float = 0.2,
+        source_types: Optional[list[str]] = None,
+        oversampling: Optional[float] = None,
+        rescore: bool = True,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        author_ids: Optional[list[int]] = None,
+        recency_half_life_days: Optional[float] = None,
+        recency_weight: float = 0.5,
+    ) -> list[dict]:
+        """Fallback dense-only search on hybrid collection."""
+        query_filter = build_tenant_filter(
+            guild_id, channel_ids, source_types,
+            since=since, until=until, author_ids=author_ids,
+        )
+        query_kwargs = _dense_query_kwargs(
+            query_dense, DENSE_VECTOR_NAME, query_filter, build_search_params(oversampling, rescore),
+            limit, score_threshold, recency_half_life_days, recency_weight,
+        )
+        
+        results = await self.run(HYBRID_COLLECTION_NAME, lambda client: client.query_points(
+            collection_name=HYBRID_COLLECTION_NAME,
+            **query_kwargs,
+            limit=limit,
+            with_payload=True,
+            shard_key_selector=self._sync_service.registry.shard_key(HYBRID_COLLECTION_NAME, guild_id),
+        ))
+        
+        return _to_results(results.points)
+    
+    async def search_batch(self, requests: list[SearchRequest]) -> list[list[dict]]:
+        """
+        Async counterpart of QdrantService.search_batch.
+        
+        The per-collection batch requests and any grouped requests are sent
+        concurrently, so the whole call costs a single round trip of latency.
+        """
+        requests = [await self._gate_late_interaction(request) for request in requests]
+        results: list[list[dict]] = [[] for _ in requests]
+        registry = self._sync_service.registry
+        groups = _group_by_collection(requests)
+        grouped = [i for i, request in enumerate(requests) if request.group_by]
+        
+        async def run_group(collection_name: str, indexes: list[int]):
+            return await self.run(collection_name, lambda client: client.query_batch_points(
+                collection_name=collection_name,
+                requests=[
+                    _build_query_request(
+                        requests[i],
+                        registry.shard_key(collection_name, requests[i].guild_id),
+                    )
+                    for i in indexes
+                ],
+            ))
+        
+        responses = await asyncio.gather(
+            *[run_group(name, indexes) for name, indexes in groups.items()],
+            *[self.search_groups(requests[i]) for i in grouped],
+            return_exceptions=True,
+        )
+        batch_responses = responses[:len(groups)]
+        
+        for i, grouped_results in zip(grouped, responses[len(groups):], strict=True):
+            if isinstance(grouped_results, Exception):
+                print(f"[QDRANT ERROR] Async search_groups on {requests[i].collection_name}: {grouped_results}")
+                continue
+            results[i] = grouped_results
+        
+        for (collection_name, indexes), group_response in zip(groups.items(), batch_responses, strict=True):
+            if isinstance(group_response, Exception):
+                print(f"[QDRANT ERROR] Async search_batch on {collection_name}: {group_response}")
+                continue
+            for i, response in zip(indexes, group_response, strict=True):
+                threshold = requests[i].score_threshold if requests[i].fusion else None
+                results[i] = _to_results(response.points, threshold)
+        
+        return results
+    
+    async def search_groups(self, request: SearchRequest) -> list[dict]:
+        """Async counterpart of QdrantService.search_groups."""
+        request = await self._gate_late_interaction(request)
+        collection_name = request.collection_name
+        group_by = request.group_by or default_group_by(request.source_types)
+        query_kwargs = _request_query_kwargs(request, request.limit * request.group_size)
+        registry = self._sync_service.registry
+        
+        response = await self.run(collection_name, lambda client: client.query_points_groups(
+            collection_name=collection_name,
+            group_by=group_by,
+            **query_kwargs,
+            limit=request.limit,
+            group_size=request.group_size,
+            with_payload=True,
+            with_vectors=_with_vector(request),
+            shard_key_selector=registry.shard_key(collection_name, request.guild_id),
+        ))
+        
+        threshold = request.score_threshold if request.fusion else None
+        return _groups_to_results(response.groups, threshold)
+
+
+# Global service instances
+qdrant_service = QdrantService()  # Sync - Celery tasks and scripts
+async_qdrant_service = AsyncQdrantService(qdrant_service)  # Async - FastAPI handlers
+write_buffer = QdrantWriteBuffer(
+    qdrant_service,
+    max_batch=get_settings().qdrant_write_batch_size,
+    flush_interval=get_settings().qdrant_write_flush_interval,
+)  # Write-behind ingestion for Celery workers
@@ -0,0 +1,567 @@
+"""
+Blue/Green Reindex Service - Rebuild session vectors without a search outage.
+
+A full reindex (new embedding model, new session strategy) used to mean
+resetting sync status and re-embedding into the live collection, leaving
+search empty until it caught up. Instead:
+
+1. start():    create a versioned shadow collection behind the
+               "discord_sessions__shadow" alias. From then on every
+               QdrantService write and RTBF delete also goes to the shadow.
+2. backfill(): re-sessionize and re-embed messages indexed before the job's
+               cutoff from Postgres into the shadow, channel by channel,
+               then copy document chunks. Resumable.
+3. promote():  atomically point "discord_sessions" at the shadow and move
+               messages' qdrant_point_id over to the shadow sessions.
+
+The live collection serves searches the whole time. Progress is stored in
+qdrant_reindex_jobs and reported by the sync-health endpoints.
+
+INVARIANT: Postgres is the source of truth; the shadow is rebuilt from it.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Optional
+from uuid import NAMESPACE_URL, uuid5
+
+from sqlalchemy import create_engine, text
+
+from apps.api.src.core.config import get_settings
+
+
+class ReindexStatus(str, Enum):
+    """Lifecycle of a reindex job."""
+    BUILDING = "building"    # Shadow exists, backfill running or pending
+    READY = "ready"          # Backfill done, shadow caught up via dual-writes
+    PROMOTED = "promoted"    # Alias swapped, shadow is live
+    FAILED = "failed"        # Backfill error - backfill() again to resume
+    ABORTED = "aborted"      # Shadow dropped
+
+
+# Jobs that still own a shadow collection
+ACTIVE_STATUSES = (ReindexStatus.BUILDING.value, ReindexStatus.READY.value, ReindexStatus.FAILED.value)
+
+# A conversation that never pauses is written in pieces of this many messages
+MAX_CARRIED_MESSAGES = 2000
+
+
+@dataclass
+class ReindexProgress:
+    """Progress of the latest reindex job for a collection."""
+    job_id: str
+    collection_name: str
+    shadow_collection: str
+    status: str
+    channels_total: int
+    channels_done: int
+    messages_total: int
+    messages_done: int
+    sessions_written: int
+    documents_written: int
+    progress_percentage: float
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    completed_at: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+
+def _session_point_id(job_id: str, message_ids: list[int]) -> str:
+    """
+    Deterministic session ID, so re-running a channel after an interrupted
+    backfill overwrites its sessions instead of duplicating them.
+    """
+    return str(uuid5(NAMESPACE_URL, f"reindex:{job_id}:{message_ids[0]}:{message_ids[-1]}"))
+
+
+class BlueGreenReindexService:
+    """
+    Builds a shadow session collection and swaps it in when caught up.
+
+    Usage:
+        reindex_service.start()
+        reindex_service.backfill()   # long-running; Celery task or script
+        reindex_service.promote()
+    """
+
+    def __init__(self):
+        settings = get_settings()
+        self._engine = None
+        self._db_url = settings.database_url.replace("+asyncpg", "")
+
+    @property
+    def engine(self):
+        """Lazy-load database engine."""
+        if self._engine is None:
+            self._engine = create_engine(self._db_url, pool_pre_ping=True)
+        return self._engine
+
+    def adopt(self) -> dict[str, Optional[str]]:
+        """
+        Move collections created before aliases behind their logical alias.
+
+        One-time migration to run before the first reindex of an older
+        deployment; collections that already are aliases are skipped.
+
+        Returns:
+            {collection: new physical collection, or None if already an alias}
+        """
+        from apps.api.src.services.qdrant_service import qdrant_service
+        from packages.database.qdrant_schema import COLLECTION_CONFIGS
+
+        registry = qdrant_service.registry
+        registry.bootstrap()
+        return {name: registry.adopt(name) for name in COLLECTION_CONFIGS}
+
+    def start(self) -> ReindexProgress:
+        """
+        Create the shadow collection and the job record.
+
+        The backfill cutoff is set ALIAS_CACHE_SECONDS after now: writers
+        may take that long to notice the shadow, so anything they index
+        before then is backfilled rather than relying on the dual-write.
+        """
+        from apps.api.src.services.qdrant_service import COLLECTION_NAME, qdrant_service
+        from packages.database.qdrant_registry import ALIAS_CACHE_SECONDS
+
+        if self._active_job(COLLECTION_NAME):
+            raise ValueError(f"A reindex of {COLLECTION_NAME} is already in progress")
+
+        shadow = qdrant_service.registry.create_shadow(COLLECTION_NAME)
+
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                INSERT INTO qdrant_reindex_jobs (collection_name, shadow_collection, status, cutoff_at)
+                VALUES (:collection, :shadow, :status, NOW() + make_interval(secs => :delay))
+            """), {
+                "collection": COLLECTION_NAME,
+                "shadow": shadow,
+                "status": ReindexStatus.BUILDING.value,
+                "delay": ALIAS_CACHE_SECONDS,
+            })
+            conn.commit()
+
+        print(f"[REINDEX] Started reindex of {COLLECTION_NAME} into {shadow}")
+        return self.get_progress(COLLECTION_NAME)
+
+    def backfill(self, page_size: int = 500) -> ReindexProgress:
+        """
+        Re-embed everything indexed before the cutoff into the shadow.
+
+        Channels are processed in id order and the last finished one is
+        recorded, so a failed or interrupted backfill resumes after it.
+        Ends with the job in "ready" state.
+
+        Args:
+            page_size: Messages fetched (and sessionized) per query
+        """
+        from apps.api.src.services.qdrant_service import COLLECTION_NAME
+
+        job = self._active_job(COLLECTION_NAME)
+        if job is None or job.status == ReindexStatus.READY.value:
+            raise ValueError(f"No reindex of {COLLECTION_NAME} waiting for backfill")
+
+        # Let every writer pick up the shadow alias before reading the snapshot
+        wait_seconds = (job.cutoff_at - datetime.now(timezone.utc)).total_seconds()
+        if wait_seconds > 0:
+            print(f"[REINDEX] Waiting {wait_seconds:.0f}s for writers to see the shadow collection")
+            time.sleep(wait_seconds)
+
+        job_id = str(job.id)
+        self._update_job(job_id, status=ReindexStatus.BUILDING.value, error=None)
+
+        try:
+            channels = self._pending_channels(job)
+            if job.messages_total == 0:
+                self._set_totals(job)
+
+            for channel_id, channel_name in channels:
+                self._backfill_channel(job, channel_id, channel_name, page_size)
+                self._increment(job_id, channels_done=1, last_channel_id=channel_id)
+
+            self._backfill_documents(job, page_size)
+
+        except Exception as e:
+            print(f"[REINDEX] Backfill failed: {e}")
+            self._update_job(job_id, status=ReindexStatus.FAILED.value, error=str(e))
+            raise
+
+        self._update_job(job_id, status=ReindexStatus.READY.value)
+        print(f"[REINDEX] Backfill complete - {job.shadow_collection} ready to promote")
+        return self.get_progress(COLLECTION_NAME)
+
+    def promote(self, drop_previous: bool = False) -> dict:
+        """
+        Swap the alias to the shadow and repoint messages at its sessions.
+
+        Args:
+            drop_previous: Delete the collection that was live before
+                (default keeps it for rollback / comparison)
+        """
+        from apps.api.src.services.qdrant_service import COLLECTION_NAME, qdrant_service
+
+        job = self._active_job(COLLECTION_NAME)
+        if job is None or job.status != ReindexStatus.READY.value:
+            raise ValueError(f"No backfilled reindex of {COLLECTION_NAME} to promote")
+
+        swap = qdrant_service.registry.promote_shadow(COLLECTION_NAME)
+
+        # Backfilled sessions have new IDs; dual-written ones kept theirs
+        with self.engine.connect() as conn:
+            result = conn.execute(text("""
+                UPDATE messages
+                SET qdrant_point_id = shadow_point_id, shadow_point_id = NULL
+                WHERE shadow_point_id IS NOT NULL
+            """))
+            repointed = result.rowcount
+            conn.commit()
+
+        self._update_job(str(job.id), status=ReindexStatus.PROMOTED.value, completed=True)
+
+        if drop_previous and swap["previous"]:
+            qdrant_service.get_client().delete_collection(swap["previous"])
+            print(f"[REINDEX] Dropped previous collection {swap['previous']}")
+
+        print(f"[REINDEX] Promoted {swap['current']} ({repointed} messages repointed)")
+        return {**swap, "messages_repointed": repointed}
+
+    def abort(self) -> Optional[str]:
+        """Drop the shadow collection and forget its session pointers."""
+        from apps.api.src.services.qdrant_service import COLLECTION_NAME, qdrant_service
+
+        job = self._active_job(COLLECTION_NAME)
+        shadow = qdrant_service.registry.drop_shadow(COLLECTION_NAME)
+
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                UPDATE messages SET shadow_point_id = NULL
+                WHERE shadow_point_id IS NOT NULL
+            """))
+            conn.commit()
+
+        if job is not None:
+            self._update_job(str(job.id), status=ReindexStatus.ABORTED.value, completed=True)
+        print(f"[REINDEX] Aborted reindex of {COLLECTION_NAME}")
+        return shadow
+
+    def get_progress(self, collection_name: Optional[str] = None) -> Optional[ReindexProgress]:
+        """Latest reindex job for a collection (None if there never was one)."""
+        if collection_name is None:
+            from apps.api.src.services.qdrant_service import COLLECTION_NAME
+            collection_name = COLLECTION_NAME
+
+        try:
+            with self.engine.connect() as conn:
+                job = conn.execute(text("""
+                    SELECT * FROM qdrant_reindex_jobs
+                    WHERE collection_name = :collection
+                    ORDER BY started_at DESC
+                    LIMIT 1
+                """), {"collection": collection_name}).fetchone()
+        except Exception as e:
+            print(f"[REINDEX] Error getting progress: {e}")
+            return None
+
+        if job is None:
+            return None
+
+        if job.status == ReindexStatus.PROMOTED.value:
+            percentage = 100.0
+        elif job.messages_total:
+            percentage = min(job.messages_done / job.messages_total * 100, 100.0)
+        else:
+            percentage = 0.0
+
+        return ReindexProgress(
+            job_id=str(job.id),
+            collection_name=job.collection_name,
+            shadow_collection=job.shadow_collection,
+            status=job.status,
+            channels_total=job.channels_total,
+            channels_done=job.channels_done,
+            messages_total=job.messages_total,
+            messages_done=job.messages_done,
+            sessions_written=job.sessions_written,
+            documents_written=job.documents_written,
+            progress_percentage=round(percentage, 2),
+            started_at=job.started_at.isoformat() if job.started_at else None,
+            updated_at=job.updated_at.isoformat() if job.updated_at else None,
+            completed_at=job.completed_at.isoformat() if job.completed_at else None,
+            error=job.error,
+        )
+
+    # -------------------------------------------------------------------------
+    # Backfill stages
+    # -------------------------------------------------------------------------
+
+    def _pending_channels(self, job) -> list[tuple[int, str]]:
+        """Channels with messages indexed before the cutoff, after the resume point."""
+        with self.engine.connect() as conn:
+            rows = conn.execute(text("""
+                SELECT c.id, c.name
+                FROM channels c
+                WHERE c.id > :after
+                  AND EXISTS (
+                      SELECT 1 FROM messages m
+                      WHERE m.channel_id = c.id
+                        AND m.is_deleted = FALSE
+                        AND m.indexed_at < :cutoff
+                  )
+                ORDER BY c.id
+            """), {"after": job.last_channel_id or 0, "cutoff": job.cutoff_at}).fetchall()
+        return [(row.id, row.name) for row in rows]
+
+    def _set_totals(self, job) -> None:
+        """Record how much the backfill has to do (for progress reporting)."""
+        with self.engine.connect() as conn:
+            totals = conn.execute(text("""
+                SELECT COUNT(DISTINCT channel_id) AS channels, COUNT(*) AS messages
+                FROM messages
+                WHERE is_deleted = FALSE AND indexed_at < :cutoff
+            """), {"cutoff": job.cutoff_at}).fetchone()
+            conn.execute(text("""
+                UPDATE qdrant_reindex_jobs
+                SET channels_total = :channels, messages_total = :messages, updated_at = NOW()
+                WHERE id = :id
+            """), {"channels": totals.channels, "messages": totals.messages, "id": job.id})
+            conn.commit()
+
+    def _backfill_channel(self, job, channel_id: int, channel_name: str, page_size: int) -> None:
+        """
+        Sessionize, embed and write one channel's messages to the shadow.
+
+        Messages are read page by page. A conversation can run across a page
+        boundary, so the last session of a page is held back and sessionized
+        again with the next page; it is only written once a later message
+        ends it, the channel runs out, or it reaches MAX_CARRIED_MESSAGES.
+        """
+        from apps.api.src.core.llm_factory import get_embedding_model
+        from apps.bot.src.sessionizer import Message, sessionize_messages
+
+        job_id = str(job.id)
+        embedding_model = get_embedding_model()
+        after_timestamp, after_id = datetime.min.replace(tzinfo=timezone.utc), 0
+        carried = []  # Rows of the held-back trailing session
+
+        while True:
+            with self.engine.connect() as conn:
+                rows = conn.execute(text("""
+                    SELECT m.id, m.guild_id, m.content, m.author_id, m.message_timestamp,
+                           m.reply_to_id, u.username, u.global_name
+                    FROM messages m
+                    JOIN users u ON m.author_id = u.id
+                    WHERE m.channel_id = :channel_id
+                      AND m.is_deleted = FALSE
+                      AND m.indexed_at < :cutoff
+                      AND (m.message_timestamp, m.id) > (:after_ts, :after_id)
+                    ORDER BY m.message_timestamp, m.id
+                    LIMIT :limit
+                """), {
+                    "channel_id": channel_id,
+                    "cutoff": job.cutoff_at,
+                    "after_ts": after_timestamp,
+                    "after_id": after_id,
+                    "limit": page_size,
+                }).fetchall()
+
+            if not rows and not carried:
+                return
+            if rows:
+                after_timestamp, after_id = rows[-1].message_timestamp, rows[-1].id
+            last_page = len(rows) < page_size
+
+            page = carried + list(rows)
+            by_id = {row.id: row for row in page}
+            sessions = sessionize_messages([
+                Message(
+                    id=row.id,
+                    channel_id=channel_id,
+                    author_id=row.author_id,
+                    content=row.content,
+                    timestamp=row.message_timestamp,
+                    reply_to_id=row.reply_to_id,
+                )
+                for row in page
+            ])
+            sessions = [s for s in sessions if s.messages]
+
+            carried = []
+            if not last_page and sessions and len(sessions[-1].messages) < MAX_CARRIED_MESSAGES:
+                carried = [by_id[mid] for mid in sessions.pop().message_ids]
+
+            written = self._write_sessions(job, channel_id, channel_name, sessions, by_id, embedding_model)
+            self._increment(job_id, messages_done=len(rows), sessions_written=written)
+
+            if last_page:
+                return
+
+    def _write_sessions(self, job, channel_id: int, channel_name: str, sessions, by_id: dict, embedding_model) -> int:
+        """Embed sessions, upsert them to the shadow and record shadow_point_id."""
+        from apps.api.src.services.enrichment_service import enrich_session
+        from apps.api.src.services.qdrant_service import build_session_point, qdrant_service
+
+        if not sessions:
+            return 0
+
+        texts = [
+            enrich_session(
+                [
+                    {
+                        "content": m.content,
+                        "author_name": by_id[m.id].global_name or by_id[m.id].username,
+                        "timestamp": m.timestamp,
+                    }
+                    for m in session.messages
+                ],
+                channel_name=channel_name,
+            )
+            for session in sessions
+        ]
+        embeddings = embedding_model.embed_documents(texts)
+
+        points = []
+        pointers = []
+        for session, enriched_text, embedding in zip(sessions, texts, embeddings, strict=True):
+            session_id = _session_point_id(str(job.id), session.message_ids)
+            points.append(build_session_point(
+                session_id=session_id,
+                guild_id=by_id[session.messages[0].id].guild_id,
+                channel_id=channel_id,
+                embedding=embedding,
+                message_ids=session.message_ids,
+                content_preview=enriched_text[:500],
+                start_time=session.start_time.isoformat(),
+                end_time=session.end_time.isoformat(),
+                author_ids=sorted(session.author_ids),
+            ))
+            pointers.extend({"id": mid, "session_id": session_id} for mid in session.message_ids)
+
+        if not qdrant_service.upsert_points(job.shadow_collection, points):
+            raise RuntimeError(f"Upsert to {job.shadow_collection} failed (channel {channel_id})")
+
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                UPDATE messages SET shadow_point_id = :session_id WHERE id = :id
+            """), pointers)
+            conn.commit()
+
+        return len(points)
+
+    def _backfill_documents(self, job, page_size: int) -> None:
+        """
+        Re-embed document chunks from Postgres into the shadow.
+
+        Chunks keep their point IDs (document_chunks.qdrant_point_id), so
+        no pointers need to move at promotion.
+        """
+        from qdrant_client.http.models import PointStruct
+        from apps.api.src.core.llm_factory import get_embedding_model
+        from apps.api.src.services.qdrant_service import COLLECTION_NAME, qdrant_service
+
+        embedding_model = get_embedding_model()
+        client = qdrant_service.get_client()
+        offset = None
+
+        while True:
+            points, offset = client.scroll(
+                collection_name=COLLECTION_NAME,
+                scroll_filter={"must": [{"key": "type", "match": {"value": "document"}}]},
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+
+            if points:
+                with self.engine.connect() as conn:
+                    rows = conn.execute(text("""
+                        SELECT qdrant_point_id::text AS point_id, chunk_text
+                        FROM document_chunks
+                        WHERE qdrant_point_id::text = ANY(:ids)
+                    """), {"ids": [str(p.id) for p in points]}).fetchall()
+                chunk_text = {row.point_id: row.chunk_text for row in rows}
+
+                # Chunks deleted from Postgres are not carried over
+                points = [p for p in points if str(p.id) in chunk_text]
+                embeddings = embedding_model.embed_documents([chunk_text[str(p.id)] for p in points])
+                shadow_points = [
+                    PointStruct(id=str(p.id), vector=embedding, payload=p.payload)
+                    for p, embedding in zip(points, embeddings, strict=True)
+                ]
+
+                if shadow_points and not qdrant_service.upsert_points(job.shadow_collection, shadow_points):
+                    raise RuntimeError(f"Upsert of document chunks to {job.shadow_collection} failed")
+                self._increment(str(job.id), documents_written=len(shadow_points))
+
+            if offset is None:
+                return
+
+    # -------------------------------------------------------------------------
+    # Job bookkeeping
+    # -------------------------------------------------------------------------
+
+    def _active_job(self, collection_name: str):
+        """The job currently owning a shadow collection, if any."""
+        with self.engine.connect() as conn:
+            return conn.execute(text("""
+                SELECT * FROM qdrant_reindex_jobs
+                WHERE collection_name = :collection AND status = ANY(:statuses)
+                ORDER BY started_at DESC
+                LIMIT 1
+            """), {"collection": collection_name, "statuses": list(ACTIVE_STATUSES)}).fetchone()
+
+    def _update_job(
+        self,
+        job_id: str,
+        status: Optional[str] = None,
+        error: Optional[str] = None,
+        completed: bool = False,
+    ) -> None:
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                UPDATE qdrant_reindex_jobs
+                SET status = COALESCE(:status, status),
+                    error = :error,
+                    completed_at = CASE WHEN :completed THEN NOW() ELSE completed_at END,
+                    updated_at = NOW()
+                WHERE id = :id
+            """), {"status": status, "error": error, "completed": completed, "id": job_id})
+            conn.commit()
+
+    def _increment(
+        self,
+        job_id: str,
+        channels_done: int = 0,
+        messages_done: int = 0,
+        sessions_written: int = 0,
+        documents_written: int = 0,
+        last_channel_id: Optional[int] = None,
+    ) -> None:
+        with self.engine.connect() as conn:
+            conn.execute(text("""
+                UPDATE qdrant_reindex_jobs
+                SET channels_done = channels_done + :channels_done,
+                    messages_done = messages_done + :messages_done,
+                    sessions_written = sessions_written + :sessions_written,
+                    documents_written = documents_written + :documents_written,
+                    last_channel_id = COALESCE(:last_channel_id, last_channel_id),
+                    updated_at = NOW()
+                WHERE id = :id
+            """), {
+                "channels_done": channels_done,
+                "messages_done": messages_done,
+                "sessions_written": sessions_written,
+                "documents_written": documents_written,
+                "last_channel_id": last_channel_id,
+                "id": job_id,
+            })
+            conn.commit()
+
+
+# Global service instance
+reindex_service = BlueGreenReindexService()
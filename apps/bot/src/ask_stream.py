@@ -0,0 +1,115 @@
+"""
+Streaming /ask client - progressive Discord replies.
+
+Reads the API's /ask/stream NDJSON (route, sources, answer tokens, final
+response) and hands the growing answer to a render callback that edits
+the reply. Edits are throttled twice: every edit takes a token from the
+shared edit_bucket, and one message is edited at most once per
+STREAM_EDIT_INTERVAL (Discord allows ~5 edits per 5s per channel). Tokens
+arriving in between are coalesced into the next edit.
+"""
+
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+import httpx
+
+from apps.bot.src.config import get_bot_settings
+from apps.bot.src.leaky_bucket import edit_bucket
+
+
+STREAM_EDIT_INTERVAL = 1.0  # Seconds between edits of one reply
+CURSOR = " ▌"  # Shown after the partial answer while streaming
+
+Render = Callable[[str, dict], Awaitable[None]]
+
+
+class AskStreamError(Exception):
+    """The API reported an error or ended the stream without an answer."""
+
+
+def interrupted_answer(partial: str, error: str, limit: int = 4000) -> str:
+    """
+    Final text for a reply whose stream failed after some tokens: the
+    answer so far (without the cursor) and the error, within `limit`.
+    """
+    note = f"\n\n⚠️ Answer interrupted: {error}"[:limit]
+    return partial[:limit - len(note)].rstrip() + note
+
+
+async def stream_ask(
+    payload: dict,
+    render: Render,
+    timeout: float = 60.0,
+    base_url: Optional[str] = None,
+) -> dict:
+    """
+    POST /ask/stream and render the answer as it is generated.
+
+    Args:
+        payload: AskQuery fields (guild_id, query, channel_id, ...)
+        render: async callback(partial_answer, state); state holds
+            "routed_to" and "sources" once known. Only called with a
+            non-empty answer, never concurrently.
+        timeout: Connect/read timeout in seconds
+        base_url: API base URL (default: bot settings)
+
+    Returns:
+        The final AskResponse as a dict
+    """
+    url = f"{base_url or get_bot_settings().api_base_url}/ask/stream"
+    state: dict[str, Any] = {"routed_to": None, "sources": []}
+    parts: list[str] = []
+    changed = asyncio.Event()
+    rendering = asyncio.Lock()
+
+    async def editor() -> None:
+        last_edit = 0.0
+        while True:
+            await changed.wait()
+            delay = STREAM_EDIT_INTERVAL - (time.monotonic() - last_edit)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await edit_bucket.acquire()
+            async with rendering:
+                changed.clear()
+                last_edit = time.monotonic()
+                try:
+                    await render("".join(parts), state)
+                except Exception as e:
+                    print(f"[STREAM] Progressive edit failed: {e}")
+
+    editor_task = asyncio.create_task(editor())
+    try:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            async with client.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    event = json.loads(line)
+                    event_type = event.get("type")
+
+                    if event_type == "token":
+                        parts.append(event.get("text", ""))
+                        changed.set()
+                    elif event_type == "route":
+                        state["routed_to"] = event.get("routed_to")
+                    elif event_type == "sources":
+                        state["sources"] = event.get("sources", [])
+                    elif event_type == "done":
+                        return event["response"]
+                    elif event_type == "error":
+                        raise AskStreamError(event.get("detail") or "API error")
+
+        raise AskStreamError("Stream ended without an answer")
+    finally:
+        # Let an edit in flight finish so it can't land after the final one
+        async with rendering:
+            editor_task.cancel()
+        try:
+            await editor_task
+        except asyncio.CancelledError:
+            pass
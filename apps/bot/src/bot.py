@@ -24,7 +24,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 import httpx
 from sqlalchemy import create_engine, text
 
+from apps.bot.src.ask_stream import CURSOR, interrupted_answer, stream_ask
 from apps.bot.src.config import get_bot_settings
+from apps.bot.src.leaky_bucket import edit_bucket, edit_message_rate_limited
 from packages.shared.python.models import IndexTaskPayload, DeleteTaskPayload
 
 
@@ -452,20 +454,33 @@ async def handle_mention(message: discord.Message) -> None:
     
     # Show typing indicator while processing
     async with message.channel.typing():
+        reply: Optional[discord.Message] = None
+        shown = ""
+        
+        async def render(partial: str, state: dict) -> None:
+            # First tokens post the reply, later ones edit it
+            nonlocal reply, shown
+            shown = partial
+            embed = discord.Embed(
+                description=partial[:4000 - len(CURSOR)] + CURSOR,
+                color=discord.Color.blue(),
+            )
+            embed.set_footer(text=f"Routed: {state['routed_to'] or '...'}")
+            if reply is None:
+                reply = await message.reply(embed=embed)
+            else:
+                await reply.edit(embed=embed)
+        
         try:
-            # Call API directly
-            async with httpx.AsyncClient() as client:
-                api_response = await client.post(
-                    "http://localhost:8000/ask",
-                    json={
-                        "guild_id": message.guild.id,
-                        "channel_id": message.channel.id,
-                        "query": question,
-                    },
-                    timeout=60.0,
-                )
-                api_response.raise_for_status()
-                response = api_response.json()
+            # Stream the answer from the API, editing the reply as it grows
+            response = await stream_ask(
+                {
+                    "guild_id": message.guild.id,
+                    "channel_id": message.channel.id,
+                    "query": question,
+                },
+                render,
+            )
             
             answer = response.get("answer", "Sorry, I couldn't process that question.")
             routed_to = response.get("routed_to", "unknown")
@@ -477,16 +492,53 @@ async def handle_mention(message: discord.Message) -> None:
             )
             embed.set_footer(text=f"Routed: {routed_to}")
             
-            await message.reply(embed=embed)
+            if reply is None:
+                await message.reply(embed=embed)
+            else:
+                await edit_message_rate_limited(reply, None, embed=embed)
             
         except Exception as e:
             import traceback
             error_msg = str(e) or type(e).__name__
             print(f"[MENTION ERROR] {error_msg}")
             traceback.print_exc()
+            if reply is not None:
+                # Turn the half-streamed reply into the error, cursor and all
+                try:
+                    await edit_message_rate_limited(reply, None, embed=discord.Embed(
+                        description=interrupted_answer(shown, error_msg),
+                        color=discord.Color.red(),
+                    ))
+                    return
+                except Exception as edit_error:
+                    print(f"[MENTION ERROR] Could not edit the streamed reply: {edit_error}")
             await message.reply(f"Sorry, I encountered an error: {error_msg}")
 
 
+def invalidate_cached_answers(guild_id: int) -> None:
+    """
+    Drop the guild's cached /ask answers (bumps its index version).
+    
+    Called as soon as a deletion or edit is committed to Postgres, before
+    the Qdrant cleanup runs, so a cached answer never outlives the message.
+    If the bump fails it is queued as a Celery task, which retries with
+    backoff until Redis is back.
+    """
+    try:
+        from apps.api.src.core.answer_cache import bump_index_version
+        bump_index_version(guild_id)
+        return
+    except Exception as e:
+        print(f"[ERROR] Answer cache invalidation for guild {guild_id}, queueing a retry: {e}")
+    
+    try:
+        from apps.bot.src.tasks import invalidate_answer_cache
+        invalidate_answer_cache.apply_async(args=[guild_id], countdown=1)
+    except Exception as e:
+        # Broker down too; cached answers expire after ANSWER_CACHE_TTL_SECONDS
+        print(f"[ERROR] Could not queue answer cache invalidation for guild {guild_id}: {e}")
+
+
 @bot.event
 async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent) -> None:
     """
@@ -541,6 +593,7 @@ async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent) -> None:
             attachment_rows = attach_result.fetchall()
             
             conn.commit()
+            invalidate_cached_answers(guild_id)
             
             # Step 3: Queue comprehensive Qdrant session deletion
             # This finds and deletes ALL sessions containing this message
@@ -615,6 +668,7 @@ async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent)
             })
             
             conn.commit()
+            invalidate_cached_answers(guild_id)
             
             # Queue comprehensive session deletion for all deleted messages
             # This is more efficient than individual deletions
@@ -694,6 +748,7 @@ async def on_raw_message_edit(payload: discord.RawMessageUpdateEvent) -> None:
                 "guild_id": guild_id,
             })
             conn.commit()
+            invalidate_cached_answers(guild_id)
             
             print(f"[EDIT] Updated message {message_id} in Postgres")
             
@@ -728,6 +783,7 @@ async def ai_ask(
     # DEFERRAL PATTERN: Immediately defer with thinking indicator
     # This gives us 15 minutes instead of 3 seconds
     await interaction.response.defer(thinking=True)
+    shown = ""
     
     try:
         # Parse channel filter if provided
@@ -739,19 +795,27 @@ async def ai_ask(
                 if ch.name.lower() in channel_names
             ]
         
-        # Call API directly (bypasses Celery/Redis for simpler local dev)
-        async with httpx.AsyncClient() as client:
-            api_response = await client.post(
-                "http://localhost:8000/ask",
-                json={
-                    "guild_id": interaction.guild.id,
-                    "query": question,
-                    "channel_ids": channel_ids,
-                },
-                timeout=60.0,
+        async def render(partial: str, state: dict) -> None:
+            # Replace the "thinking" indicator with the answer so far
+            nonlocal shown
+            shown = partial
+            embed = discord.Embed(
+                title="AI Response",
+                description=partial[:4000 - len(CURSOR)] + CURSOR,
+                color=discord.Color.blue(),
             )
-            api_response.raise_for_status()
-            response = api_response.json()
+            embed.set_footer(text=f"Routed: {state['routed_to'] or '...'}")
+            await interaction.edit_original_response(embed=embed)
+        
+        # Stream from the API directly (bypasses Celery/Redis for simpler local dev)
+        response = await stream_ask(
+            {
+                "guild_id": interaction.guild.id,
+                "query": question,
+                "channel_ids": channel_ids,
+            },
+            render,
+        )
         
         # Format response
         answer = response.get("answer", "Unable to process query")
@@ -775,9 +839,22 @@ async def ai_ask(
             ])
             embed.add_field(name="Sources", value=source_text, inline=False)
         
-        await interaction.followup.send(embed=embed)
+        await edit_bucket.acquire()
+        await interaction.edit_original_response(embed=embed)
         
     except Exception as e:
+        if shown:
+            # Part of the answer is already showing: end it with the error
+            try:
+                await edit_bucket.acquire()
+                await interaction.edit_original_response(embed=discord.Embed(
+                    title="AI Response",
+                    description=interrupted_answer(shown, str(e) or type(e).__name__),
+                    color=discord.Color.red(),
+                ))
+                return
+            except Exception as edit_error:
+                print(f"[ASK ERROR] Could not edit the streamed response: {edit_error}")
         await interaction.followup.send(
             f"Error processing your question: {str(e)}",
             ephemeral=True,
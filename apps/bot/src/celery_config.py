@@ -63,11 +63,13 @@ celery_app.conf.task_default_routing_key = "default"
 # Task routing
 celery_app.conf.task_routes = {
     "delete_message_vector": {"queue": "high"},  # Deletions are priority
+    "invalidate_answer_cache": {"queue": "high"},
     "index_messages": {"queue": "default"},
     "process_session": {"queue": "default"},
     "ask_query": {"queue": "default"},
     "batch_index_channel": {"queue": "low"},
     "verify_sync": {"queue": "low"},
+    "reindex_backfill": {"queue": "low"},
 }
 
 # Events for monitoring
@@ -23,7 +23,7 @@ from uuid import uuid4
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 from celery import Celery
-from celery.signals import task_failure
+from celery.signals import task_failure, worker_process_init, worker_process_shutdown
 from packages.shared.python.models import IndexTaskPayload, DeleteTaskPayload
 
 # Import production config
@@ -43,6 +43,119 @@ def get_db_engine():
     return create_engine(sync_url, pool_pre_ping=True)
 
 
+def _invalidate_answers(guild_id: int, strict: bool = True) -> None:
+    """
+    Bump the guild's index version so cached /ask answers are recomputed.
+    
+    strict: raise if Redis is unreachable (deletions - the task retries);
+    otherwise log (new content - cached answers just miss it until their TTL).
+    """
+    from apps.api.src.core.answer_cache import bump_index_version
+    
+    try:
+        bump_index_version(guild_id)
+    except Exception as e:
+        if strict:
+            raise
+        print(f"[TASK] Answer cache invalidation failed for guild {guild_id}: {e}")
+
+
+def _mark_messages_indexed(session_id: str, message_ids: list[int], guild_id: int):
+    """
+    Build the callback that marks messages indexed in PostgreSQL.
+    
+    Run by the Qdrant write buffer only after its ordered barrier confirms
+    the session point is durable. Cached answers of the guild are then
+    invalidated, since the new session is now searchable.
+    
+    A message deleted while the write was buffered found no qdrant_point_id
+    to delete (and its session may not have been in Qdrant yet), so the
+    session would outlive it. If any message is deleted by now, the session
+    is deleted instead of marked; its other messages stay unindexed and are
+    picked up again by the sync job.
+    """
+    def mark() -> None:
+        from sqlalchemy import text
+        
+        engine = get_db_engine()
+        with engine.connect() as conn:
+            # The UPDATE locks the rows it marks: a delete committing meanwhile
+            # waits for it, then sees qdrant_point_id and deletes the session
+            conn.execute(text("""
+                UPDATE messages 
+                SET qdrant_point_id = :session_id, shadow_point_id = NULL, indexed_at = NOW()
+                WHERE id = ANY(:message_ids) AND is_deleted = FALSE
+            """), {"session_id": session_id, "message_ids": message_ids})
+            deleted = [row[0] for row in conn.execute(text("""
+                SELECT id FROM messages
+                WHERE id = ANY(:message_ids) AND is_deleted = TRUE
+            """), {"message_ids": message_ids}).fetchall()]
+            if deleted:
+                conn.rollback()
+            else:
+                conn.commit()
+        
+        if deleted:
+            _delete_buffered_session(guild_id, session_id, deleted)
+            return
+        
+        _invalidate_answers(guild_id, strict=False)
+    
+    return mark
+
+
+def _delete_buffered_session(guild_id: int, session_id: str, deleted_ids: list[int]) -> None:
+    """Remove a just-written session whose messages were deleted before it was marked."""
+    from apps.api.src.services.qdrant_service import qdrant_service
+    
+    print(f"[TASK] Messages {deleted_ids} deleted before session {session_id} was confirmed, deleting it")
+    try:
+        qdrant_service.delete_sessions_containing_messages(guild_id=guild_id, message_ids=deleted_ids)
+        _invalidate_answers(guild_id)
+    except Exception as e:
+        # The task retries until Qdrant and Redis are reachable
+        print(f"[TASK] Could not delete session {session_id} now, queueing: {e}")
+        delete_sessions_for_messages.delay(guild_id, deleted_ids)
+
+
+def _redeliver_on_failure(task, session_id: str):
+    """
+    Build the callback that re-runs a task whose buffered Qdrant write was lost.
+    
+    Run by the Qdrant write buffer when the flush fails, the barrier keeps
+    failing, or the worker exits first. The task has already returned, so
+    this stands in for its autoretry: it is sent again with the next retry
+    number and the same backoff, keeping session_id so a point that did land
+    is overwritten rather than duplicated. Past max_retries the task goes to
+    the dead letter queue instead.
+    """
+    from celery.utils.time import get_exponential_backoff_interval
+    
+    request = task.request
+    retries = request.retries + 1
+    kwargs = dict(request.kwargs or {}, session_id=session_id)
+    countdown = get_exponential_backoff_interval(
+        factor=int(max(1.0, task.retry_backoff)),
+        retries=request.retries,
+        maximum=task.retry_backoff_max,
+        full_jitter=task.retry_jitter,
+    )
+    # Captured now: the request context is gone by the time the buffer fails
+    signature = task.signature_from_request(
+        request, kwargs=kwargs, countdown=countdown, retries=retries,
+    )
+    task_id, args = request.id, request.args
+    
+    def redeliver() -> None:
+        if retries > task.max_retries:
+            _push_dead_letter(task.name, task_id, args, kwargs, "Qdrant write was not confirmed")
+            return
+        signature.apply_async()
+        print(f"[TASK] {task.name} redelivered (retry {retries}) after a failed Qdrant write")
+    
+    return redeliver
+
+
 @celery_app.task(
     bind=True,
     name="index_messages",
@@ -52,7 +165,7 @@ def get_db_engine():
     retry_jitter=True,
     max_retries=5,
 )
-def index_messages(self, payload_dict: dict) -> dict:
+def index_messages(self, payload_dict: dict, session_id: Optional[str] = None) -> dict:
     """
     Index messages to Qdrant after storing in PostgreSQL.
     
@@ -60,13 +173,18 @@ def index_messages(self, payload_dict: dict) -> dict:
     
     Args:
         payload_dict: IndexTaskPayload as dict
+        session_id: Point ID to reuse (set when the task is redelivered)
         
     Returns:
         Result dict with indexed message IDs
     """
     from sqlalchemy import text
     from apps.api.src.core.llm_factory import get_embedding_model
-    from apps.api.src.services.qdrant_service import qdrant_service
+    from apps.api.src.services.qdrant_service import (
+        COLLECTION_NAME,
+        build_session_point,
+        write_buffer,
+    )
     from apps.api.src.services.enrichment_service import enrich_session
     
     payload = IndexTaskPayload(**payload_dict)
@@ -105,9 +223,10 @@ def index_messages(self, payload_dict: dict) -> dict:
     embedding_model = get_embedding_model()
     embedding = embedding_model.embed_query(enriched_text)
     
-    # 4. Upsert to Qdrant
-    session_id = str(uuid4())
-    success = qdrant_service.upsert_session(
+    # 4. Queue for a batched Qdrant upsert; messages are marked indexed in
+    #    PostgreSQL once the buffer's ordered barrier confirms durability
+    session_id = session_id or str(uuid4())
+    point = build_session_point(
         session_id=session_id,
         guild_id=payload.guild_id,
         channel_id=payload.channel_id,
@@ -117,21 +236,15 @@ def index_messages(self, payload_dict: dict) -> dict:
         start_time=payload.start_time or datetime.utcnow().isoformat(),
         end_time=payload.end_time or datetime.utcnow().isoformat(),
     )
-    
-    if not success:
-        raise Exception("Qdrant upsert failed")
-    
-    # 5. Mark messages as indexed in PostgreSQL
-    with engine.connect() as conn:
-        conn.execute(text("""
-            UPDATE messages 
-            SET qdrant_point_id = :session_id, indexed_at = NOW()
-            WHERE id = ANY(:message_ids)
-        """), {"session_id": session_id, "message_ids": payload.message_ids})
-        conn.commit()
+    write_buffer.add(
+        COLLECTION_NAME,
+        [point],
+        on_durable=_mark_messages_indexed(session_id, payload.message_ids, payload.guild_id),
+        on_failed=_redeliver_on_failure(self, session_id),
+    )
     
     return {
-        "status": "success",
+        "status": "buffered",
         "guild_id": payload.guild_id,
         "channel_id": payload.channel_id,
         "session_id": session_id,
@@ -165,7 +278,8 @@ def delete_message_vector(self, payload_dict: dict) -> dict:
     
     # Delete vector from Qdrant by point_id if provided
     if payload.qdrant_point_id:
-        success = qdrant_service.delete_by_session_id(payload.qdrant_point_id)
+        success = qdrant_service.delete_by_session_id(payload.qdrant_point_id, payload.guild_id)
+        _invalidate_answers(payload.guild_id)
         return {
             "status": "success" if success else "not_found",
             "guild_id": payload.guild_id,
@@ -218,19 +332,25 @@ def delete_sessions_for_messages(
         message_ids=message_ids,
     )
     
+    # The bot invalidated cached answers on delete; an answer computed
+    # before the sessions were gone could have been cached since. Raises
+    # (and the task retries) if Redis is down.
+    _invalidate_answers(guild_id)
+    
     # Clear qdrant_point_id from affected messages so they can be re-indexed
     if result.get("deleted_count", 0) > 0:
         engine = get_db_engine()
         with engine.connect() as conn:
             # Clear qdrant_point_id for non-deleted messages that were in deleted sessions
-            # This allows them to be re-indexed in new sessions
+            # This allows them to be re-indexed in new sessions (a reindex
+            # shadow session counts too - see reindex_service)
             conn.execute(text("""
                 UPDATE messages 
-                SET qdrant_point_id = NULL, indexed_at = NULL
+                SET qdrant_point_id = NULL, shadow_point_id = NULL, indexed_at = NULL
                 WHERE guild_id = :guild_id 
-                  AND qdrant_point_id IS NOT NULL
                   AND is_deleted = FALSE
-                  AND qdrant_point_id::text = ANY(:session_ids)
+                  AND (qdrant_point_id::text = ANY(:session_ids)
+                       OR shadow_point_id::text = ANY(:session_ids))
             """), {
                 "guild_id": guild_id,
                 "session_ids": result.get("session_ids", []),
@@ -248,6 +368,26 @@ def delete_sessions_for_messages(
     }
 
 
+@celery_app.task(
+    bind=True,
+    name="invalidate_answer_cache",
+    autoretry_for=(Exception,),
+    retry_backoff=True,
+    retry_backoff_max=60,
+    retry_jitter=True,
+    max_retries=10,
+)
+def invalidate_answer_cache(self, guild_id: int) -> dict:
+    """
+    Bump the guild's index version until Redis accepts it.
+    
+    Queued by the bot when its own bump after an edit or delete fails, so
+    a cached answer can't keep quoting the old content until its TTL.
+    """
+    _invalidate_answers(guild_id)
+    return {"status": "success", "guild_id": guild_id}
+
+
 @celery_app.task(
     bind=True,
     name="process_session",
@@ -265,6 +405,7 @@ def process_session(
     message_ids: list[int],
     start_time: str,
     end_time: str,
+    session_id: Optional[str] = None,
 ) -> dict:
     """
     Process a message session - fetch, embed, and store in Qdrant.
@@ -276,16 +417,21 @@ def process_session(
         message_ids: List of message IDs in session
         start_time: Session start timestamp (ISO format)
         end_time: Session end timestamp (ISO format)
+        session_id: Point ID to reuse (set when the task is redelivered)
         
     Returns:
         Result dict with session info
     """
     from sqlalchemy import text
     from apps.api.src.core.llm_factory import get_embedding_model
-    from apps.api.src.services.qdrant_service import qdrant_service
+    from apps.api.src.services.qdrant_service import (
+        COLLECTION_NAME,
+        build_session_point,
+        write_buffer,
+    )
     from apps.api.src.services.enrichment_service import enrich_session
     
-    session_id = str(uuid4())
+    session_id = session_id or str(uuid4())
     engine = get_db_engine()
     
     # 1. Fetch messages from Postgres
@@ -323,8 +469,9 @@ def process_session(
     embedding_model = get_embedding_model()
     embedding = embedding_model.embed_query(enriched_text)
     
-    # 4. Upsert to Qdrant
-    success = qdrant_service.upsert_session(
+    # 4. Queue for a batched Qdrant upsert; messages are marked indexed in
+    #    PostgreSQL once the buffer's ordered barrier confirms durability
+    point = build_session_point(
         session_id=session_id,
         guild_id=guild_id,
         channel_id=channel_id,
@@ -335,21 +482,15 @@ def process_session(
         end_time=end_time,
         author_ids=author_ids,
     )
-    
-    if not success:
-        raise Exception("Qdrant upsert failed")
-    
-    # 5. Mark messages as indexed in PostgreSQL
-    with engine.connect() as conn:
-        conn.execute(text("""
-            UPDATE messages 
-            SET qdrant_point_id = :session_id, indexed_at = NOW()
-            WHERE id = ANY(:message_ids)
-        """), {"session_id": session_id, "message_ids": message_ids})
-        conn.commit()
+    write_buffer.add(
+        COLLECTION_NAME,
+        [point],
+        on_durable=_mark_messages_indexed(session_id, message_ids, guild_id),
+        on_failed=_redeliver_on_failure(self, session_id),
+    )
     
     return {
-        "status": "success",
+        "status": "buffered",
         "session_id": session_id,
         "guild_id": guild_id,
         "channel_id": channel_id,
@@ -485,21 +626,15 @@ def batch_index_channel(
     }
 
 
-# Dead letter queue handler
-@task_failure.connect
-def handle_task_failure(sender=None, task_id=None, exception=None, args=None, kwargs=None, traceback=None, **kw):
-    """
-    Handle permanently failed tasks.
-    
-    Logs to dead letter queue for manual investigation.
-    """
+def _push_dead_letter(task_name: str, task_id, args, kwargs, exception) -> None:
+    """Log a permanently failed task to the dead letter queue."""
     import redis
     
     try:
         client = redis.from_url(os.environ.get("REDIS_URL", "redis://localhost:6379"))
         
         failure_data = {
-            "task_name": sender.name if sender else "unknown",
+            "task_name": task_name,
             "task_id": task_id,
             "args": args,
             "kwargs": kwargs,
@@ -515,6 +650,85 @@ def handle_task_failure(sender=None, task_id=None, exception=None, args=None, kw
         print(f"[DLQ] Failed to log to dead letter queue: {e}")
 
 
+# Dead letter queue handler
+@task_failure.connect
+def handle_task_failure(sender=None, task_id=None, exception=None, args=None, kwargs=None, traceback=None, **kw):
+    """
+    Handle permanently failed tasks.
+    
+    Logs to dead letter queue for manual investigation.
+    """
+    _push_dead_letter(sender.name if sender else "unknown", task_id, args, kwargs, exception)
+
+
+@worker_process_init.connect
+def bootstrap_qdrant_collections(**kw):
+    """Verify/create Qdrant collections and indexes once per worker process."""
+    from apps.api.src.services.qdrant_service import qdrant_service
+    
+    try:
+        status = qdrant_service.registry.bootstrap()
+        print(f"[QDRANT] Collections ready: {status}")
+    except Exception as e:
+        # Tasks still bootstrap lazily on first use
+        print(f"[QDRANT] Startup bootstrap failed: {e}")
+
+
+@worker_process_shutdown.connect
+def drain_qdrant_write_buffer(**kw):
+    """Flush buffered Qdrant writes before a worker process exits."""
+    from apps.api.src.services.qdrant_service import write_buffer
+    
+    try:
+        write_buffer.close()
+        print(f"[QDRANT BUFFER] Drained on shutdown: {write_buffer.get_stats()}")
+    except Exception as e:
+        print(f"[QDRANT BUFFER] Drain on shutdown failed: {e}")
+
+
+@celery_app.task(
+    bind=True,
+    name="reindex_backfill",
+    time_limit=6 * 3600,  # Full-history re-embed
+)
+def reindex_backfill(self, page_size: int = 500) -> dict:
+    """
+    Backfill the blue/green reindex shadow collection.
+    
+    Runs in low-priority queue; resumes after the last finished channel if
+    a previous run failed or was killed.
+    """
+    from apps.api.src.services.reindex_service import reindex_service
+    
+    print("[TASK] reindex_backfill")
+    
+    progress = reindex_service.backfill(page_size=page_size)
+    return progress.to_dict() if progress else {"status": "unknown"}
+
+
+@celery_app.task(name="get_write_buffer_stats")
+def get_write_buffer_stats() -> dict:
+    """
+    Get Qdrant write buffer metrics (batch sizes, flush latency).
+    
+    Each worker process has its own buffer, and this reports only the one
+    of the process that happens to run the task, named in "worker". To see
+    every process, call it repeatedly and group the results by "worker".
+    """
+    import socket
+    from apps.api.src.services.qdrant_service import write_buffer
+    
+    return {"worker": f"{socket.gethostname()}:{os.getpid()}", **write_buffer.get_stats()}
+
+
+@celery_app.task(name="get_embedding_cache_stats")
+def get_embedding_cache_stats() -> dict:
+    """Get embedding cache hit/miss counters for this worker process."""
+    from apps.api.src.core.llm_factory import get_embedding_model
+    
+    return get_embedding_model().cache_stats()
+
+
 @celery_app.task(name="get_queue_stats")
 def get_queue_stats() -> dict:
     """Get queue statistics for monitoring."""
@@ -698,6 +912,7 @@ def process_attachment(self, payload_dict: dict) -> dict:
                 chunks=result.chunks,
                 chunk_ids=chunk_ids,
             )
+            _invalidate_answers(guild_id, strict=False)
         
         return {
             "status": "success",
@@ -747,12 +962,14 @@ def delete_attachment_vectors(self, payload_dict: dict) -> dict:
     deleted_count = 0
     for point_id in qdrant_point_ids:
         try:
-            success = qdrant_service.delete_by_session_id(point_id)
+            success = qdrant_service.delete_by_session_id(point_id, guild_id)
             if success:
                 deleted_count += 1
         except Exception as e:
             print(f"[ERROR] Failed to delete point {point_id}: {e}")
     
+    _invalidate_answers(guild_id)
+    
     return {
         "status": "success",
         "attachment_id": attachment_id,
@@ -9,15 +9,37 @@ Hybrid Storage Model:
 from .qdrant_schema import (
     MESSAGES_COLLECTION,
     SESSIONS_COLLECTION,
+    HYBRID_SESSIONS_COLLECTION,
+    DM_MEMORY_COLLECTION,
+    COLLECTION_CONFIGS,
+    STORAGE_PROFILES,
+    StorageProfile,
+    get_storage_profile,
     ensure_collections,
     validate_payload,
     MessagePayload,
     SessionPayload,
 )
+from .qdrant_registry import (
+    SHADOW_ALIAS_SUFFIX,
+    CollectionRegistry,
+    TenantRouter,
+    is_collection_not_found,
+)
 
 __all__ = [
     "MESSAGES_COLLECTION",
     "SESSIONS_COLLECTION",
+    "HYBRID_SESSIONS_COLLECTION",
+    "DM_MEMORY_COLLECTION",
+    "COLLECTION_CONFIGS",
+    "STORAGE_PROFILES",
+    "StorageProfile",
+    "get_storage_profile",
+    "SHADOW_ALIAS_SUFFIX",
+    "CollectionRegistry",
+    "TenantRouter",
+    "is_collection_not_found",
     "ensure_collections",
     "validate_payload",
     "MessagePayload",
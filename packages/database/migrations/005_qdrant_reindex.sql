@@ -0,0 +1,49 @@
+-- Blue/green Qdrant reindexing
+-- A full reindex builds a shadow Qdrant collection while the live one keeps
+-- serving searches, then swaps the collection alias (see reindex_service.py)
+
+-- Session point of the message in the shadow collection; moved into
+-- qdrant_point_id when the reindex is promoted
+ALTER TABLE messages ADD COLUMN IF NOT EXISTS shadow_point_id UUID;
+
+COMMENT ON COLUMN messages.shadow_point_id IS 'Session point ID in the reindex shadow collection (NULL outside a reindex)';
+
+-- =============================================================================
+-- QDRANT REINDEX JOBS (progress shown on the sync-health endpoints)
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS qdrant_reindex_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    
+    -- Logical collection (alias) and the versioned collection being built
+    collection_name VARCHAR(128) NOT NULL,
+    shadow_collection VARCHAR(128) NOT NULL,
+    
+    -- 'building' -> 'ready' -> 'promoted' (or 'failed' / 'aborted')
+    status VARCHAR(16) NOT NULL DEFAULT 'building',
+    
+    -- Messages indexed before this are backfilled; later ones arrive via dual-write
+    cutoff_at TIMESTAMPTZ NOT NULL,
+    
+    -- Progress (channels are backfilled in id order; last_channel_id resumes)
+    channels_total INT NOT NULL DEFAULT 0,
+    channels_done INT NOT NULL DEFAULT 0,
+    last_channel_id BIGINT,
+    messages_total BIGINT NOT NULL DEFAULT 0,
+    messages_done BIGINT NOT NULL DEFAULT 0,
+    sessions_written BIGINT NOT NULL DEFAULT 0,
+    documents_written BIGINT NOT NULL DEFAULT 0,
+    error TEXT,
+    
+    -- Timestamps
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    completed_at TIMESTAMPTZ
+);
+
+-- One active reindex per collection
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reindex_jobs_active ON qdrant_reindex_jobs(collection_name)
+    WHERE status IN ('building', 'ready', 'failed');
+
+-- For promotion: messages whose pointer moves to the shadow session
+CREATE INDEX IF NOT EXISTS idx_messages_shadow_point ON messages(shadow_point_id)
+    WHERE shadow_point_id IS NOT NULL;
@@ -111,6 +111,8 @@ class Message(Base):
     # Vector sync status (Hybrid Storage integrity)
     qdrant_point_id: Mapped[Optional[UUID]] = mapped_column(PGUUID(as_uuid=True))
     indexed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    # Session point in the blue/green reindex shadow collection
+    shadow_point_id: Mapped[Optional[UUID]] = mapped_column(PGUUID(as_uuid=True))
     
     # Soft delete for "Right to be Forgotten"
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
@@ -276,3 +278,38 @@ class DocumentChunk(Base):
     # Relationships
     attachment: Mapped["Attachment"] = relationship(back_populates="chunks")
     parent: Mapped[Optional["DocumentChunk"]] = relationship(remote_side=[id])
+
+
+class QdrantReindexJob(Base):
+    """Blue/green rebuild of a Qdrant collection into a shadow collection."""
+    
+    __tablename__ = "qdrant_reindex_jobs"
+    
+    id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid())
+    
+    # Logical collection (alias) and the versioned collection being built
+    collection_name: Mapped[str] = mapped_column(String(128), nullable=False)
+    shadow_collection: Mapped[str] = mapped_column(String(128), nullable=False)
+    status: Mapped[str] = mapped_column(String(16), default="building", nullable=False)
+    
+    # Messages indexed before this are backfilled; later ones arrive via dual-write
+    cutoff_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    
+    # Progress
+    channels_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    channels_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    last_channel_id: Mapped[Optional[int]] = mapped_column(BigInteger)
+    messages_total: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    messages_done: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    sessions_written: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    documents_written: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    
+    # Timestamps
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
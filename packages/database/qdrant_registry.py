@@ -0,0 +1,745 @@
+"""
+Qdrant Collection Registry - one-time bootstrap driven by COLLECTION_CONFIGS.
+
+Collections and payload indexes are verified (and created if missing) once
+per process at startup. After that, hot-path calls check an in-memory set
+instead of calling get_collections() on every request. The only re-check is
+when Qdrant reports a missing collection, e.g. after it was dropped or the
+server was reset.
+
+Logical collection names are aliases: bootstrap creates each collection
+under a versioned physical name ("<name>__<timestamp>") behind the logical
+alias. A blue/green reindex builds a shadow collection (reachable through
+the "<name>__shadow" alias while it is being filled) and then atomically
+repoints "<name>" at it. Deployments from before aliases still have a
+physical collection under the logical name; adopt() moves it behind an
+alias once, before the first reindex.
+"""
+
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Optional
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    CompressionRatio,
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+    Disabled,
+    Distance,
+    HnswConfigDiff,
+    IntegerIndexParams,
+    IntegerIndexType,
+    MultiVectorComparator,
+    MultiVectorConfig,
+    OptimizersConfigDiff,
+    PointIdsList,
+    PointStruct,
+    ProductQuantization,
+    ProductQuantizationConfig,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    ShardingMethod,
+    SparseIndexParams,
+    SparseVectorParams,
+    TextIndexParams,
+    TokenizerType,
+    VectorParams,
+    VectorParamsDiff,
+)
+
+from .qdrant_schema import (
+    COLLECTION_CONFIGS,
+    STORAGE_PROFILES,
+    QdrantCollectionConfig,
+    StorageProfile,
+)
+
+
+def build_quantization_config(profile: StorageProfile) -> Optional[Any]:
+    """
+    Qdrant quantization config for a storage profile (None = float32 only).
+    
+    Quantized vectors are pinned in RAM (always_ram) so the HNSW walk never
+    touches disk; only the final rescoring reads the on-disk originals.
+    """
+    if profile.quantization is None:
+        return None
+    if profile.quantization == "scalar":
+        return ScalarQuantization(
+            scalar=ScalarQuantizationConfig(
+                type=ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True,
+            ),
+        )
+    if profile.quantization == "binary":
+        return BinaryQuantization(
+            binary=BinaryQuantizationConfig(always_ram=True),
+        )
+    if profile.quantization == "product":
+        return ProductQuantization(
+            product=ProductQuantizationConfig(
+                compression=CompressionRatio.X16,
+                always_ram=True,
+            ),
+        )
+    raise ValueError(f"Unknown quantization type: {profile.quantization}")
+
+
+SHARED_SHARD_KEY = "shared"
+
+# Alias pointing at the collection a blue/green reindex is building
+SHADOW_ALIAS_SUFFIX = "__shadow"
+# How long writers trust their view of which shadows exist
+ALIAS_CACHE_SECONDS = 30.0
+
+
+class TenantRouter:
+    """
+    Routes guilds to custom shard keys on tenant-sharded collections.
+    
+    Most guilds live on the "shared" shard and are separated by the
+    guild_id filter (lookup index). Guilds listed as dedicated
+    get a shard of their own, so one very large guild neither slows down
+    nor is slowed down by everyone else.
+    """
+    
+    def __init__(self, enabled: bool = False, dedicated_guild_ids: Iterable[int] = ()):
+        self.enabled = enabled
+        self.dedicated_guild_ids = frozenset(dedicated_guild_ids)
+    
+    def shard_key(self, guild_id: int) -> str:
+        """Shard key holding a guild's points."""
+        if guild_id in self.dedicated_guild_ids:
+            return f"guild_{guild_id}"
+        return SHARED_SHARD_KEY
+    
+    def shard_keys(self) -> list[str]:
+        """Every shard key a sharded collection needs."""
+        return [SHARED_SHARD_KEY] + [f"guild_{g}" for g in sorted(self.dedicated_guild_ids)]
+
+
+def _tenant_index_params() -> IntegerIndexParams:
+    """
+    guild_id index: exact-match lookups only.
+    
+    Qdrant's is_tenant storage layout is only available for keyword/uuid
+    indexes, so the integer guild_id index skips the range structure it
+    never needs instead.
+    """
+    return IntegerIndexParams(
+        type=IntegerIndexType.INTEGER,
+        lookup=True,
+        range=False,
+    )
+
+
+def is_collection_not_found(exc: Exception) -> bool:
+    """True if a Qdrant error means the target collection does not exist."""
+    message = str(exc).lower()
+    if "collection" not in message:
+        return False
+    return (
+        getattr(exc, "status_code", None) == 404
+        or "not found" in message
+        or "doesn't exist" in message
+    )
+
+
+class CollectionRegistry:
+    """
+    Per-process cache of which Qdrant collections are known to be ready.
+    
+    Usage:
+        registry = CollectionRegistry(qdrant_service.get_client, get_vector_size)
+        registry.bootstrap()                 # API / worker startup
+        registry.ensure(SESSIONS_COLLECTION) # hot path: no round trip once ready
+    """
+    
+    def __init__(
+        self,
+        get_client: Callable[[], QdrantClient],
+        vector_size: Optional[Callable[[], Optional[int]]] = None,
+        configs: Optional[dict[str, QdrantCollectionConfig]] = None,
+        storage_profile: Optional[Callable[[], StorageProfile]] = None,
+        tenant_router: Optional[TenantRouter] = None,
+    ):
+        self._get_client = get_client
+        self._vector_size = vector_size
+        self._storage_profile = storage_profile
+        self._tenant_router = tenant_router or TenantRouter()
+        self._configs = configs if configs is not None else COLLECTION_CONFIGS
+        self._ready: set[str] = set()
+        # Collections actually created with custom sharding (checked, not assumed)
+        self._custom_sharded: set[str] = set()
+        self._lock = threading.Lock()
+        # alias -> collection, refreshed every ALIAS_CACHE_SECONDS
+        self._aliases: dict[str, str] = {}
+        self._aliases_loaded_at = 0.0
+        # physical collection -> its named dense vectors
+        self._vector_names: dict[str, tuple[set[str], float]] = {}  # collection -> (names, loaded at)
+    
+    def is_ready(self, name: str) -> bool:
+        """Whether the collection was verified in this process."""
+        return name in self._ready
+    
+    def shard_key(self, name: str, guild_id: int) -> Optional[str]:
+        """
+        Shard key selector for a guild's points in a collection.
+        
+        None for collections without custom sharding, which makes every
+        call site work unchanged whether or not sharding is enabled.
+        """
+        if name not in self._custom_sharded:
+            return None
+        return self._tenant_router.shard_key(guild_id)
+    
+    def bootstrap(self, names: Optional[list[str]] = None) -> dict[str, str]:
+        """
+        Verify or create collections and their payload indexes.
+        
+        Uses one get_collections() call for the whole set, then one
+        get_collection() per existing collection to find missing indexes.
+        
+        Args:
+            names: Collections to bootstrap (default: every registered config)
+            
+        Returns:
+            Dict mapping collection name to "created", "verified" or
+            "indexes_added"
+        """
+        names = names if names is not None else list(self._configs)
+        for name in names:
+            if self.config_for(name) is None:
+                raise ValueError(f"Unknown collection: {name}")
+        
+        with self._lock:
+            pending = [name for name in names if name not in self._ready]
+            if not pending:
+                return {name: "verified" for name in names}
+            
+            client = self._get_client()
+            existing = self.existing_names(client)
+            status = {name: "verified" for name in names}
+            
+            for name in pending:
+                config = self.config_for(name)
+                if name in existing:
+                    info = client.get_collection(name)
+                    added = self._ensure_indexes(client, config, info.payload_schema or {})
+                    if added:
+                        status[name] = "indexes_added"
+                        print(f"[QDRANT] Added payload indexes on {name}: {', '.join(added)}")
+                    if info.config.params.sharding_method == ShardingMethod.CUSTOM:
+                        self._custom_sharded.add(name)
+                        self._ensure_shard_keys(client, name)
+                else:
+                    self._create_aliased(client, config, existing)
+                    status[name] = "created"
+                self._ready.add(name)
+            
+            return status
+    
+    def _create_aliased(self, client: QdrantClient, config: QdrantCollectionConfig, existing: set[str]) -> None:
+        """Create a logical collection as a versioned physical one behind the logical alias."""
+        name = config.name
+        physical = self._versioned_name(name, existing)
+        self._create(client, replace(config, name=physical))
+        try:
+            client.update_collection_aliases(change_aliases_operations=[
+                CreateAliasOperation(create_alias=CreateAlias(collection_name=physical, alias_name=name)),
+            ])
+        except Exception as e:
+            # Another process (API vs worker) created the collection first
+            if "already exists" not in str(e).lower():
+                raise
+            client.delete_collection(physical)
+            self._custom_sharded.discard(physical)
+            physical = self._load_aliases(client, force=True).get(name, name)
+            if client.get_collection(name).config.params.sharding_method == ShardingMethod.CUSTOM:
+                self._custom_sharded.add(name)
+            return
+        
+        self._aliases[name] = physical
+        if physical in self._custom_sharded:
+            self._custom_sharded.add(name)
+    
+    def _versioned_name(self, name: str, existing: set[str]) -> str:
+        """Unused "<name>__<timestamp>" physical collection name."""
+        # Microsecond timestamp; a counter covers two collections in the same tick
+        base = f"{name}__{datetime.now(timezone.utc):%Y%m%d%H%M%S%f}"
+        physical, suffix = base, 1
+        while physical in existing:
+            suffix += 1
+            physical = f"{base}_{suffix}"
+        return physical
+    
+    def ensure(self, name: str) -> None:
+        """Make sure one collection is ready; free once bootstrapped."""
+        if name in self._ready:
+            return
+        self.bootstrap([name])
+    
+    def invalidate(self, name: Optional[str] = None) -> None:
+        """Forget a collection (or all) so the next ensure() re-checks Qdrant."""
+        with self._lock:
+            if name is None:
+                self._ready.clear()
+                self._vector_names.clear()
+            else:
+                self._ready.discard(name)
+                # A re-created collection may have a different set of named vectors
+                self._vector_names.pop(name, None)
+                self._vector_names.pop(self._aliases.get(name, name), None)
+    
+    def recover(self, name: str, exc: Exception) -> bool:
+        """
+        Handle an operation error on a collection.
+        
+        If the error says the collection is missing, re-create it and return
+        True so the caller can retry once. Any other error returns False.
+        """
+        if not is_collection_not_found(exc):
+            return False
+        print(f"[QDRANT] Collection {name} not found - re-checking schema")
+        self.invalidate(name)
+        self.ensure(name)
+        return True
+    
+    def has_vector(self, name: str, vector_name: str) -> bool:
+        """
+        Whether the collection behind `name` has a named vector.
+        
+        Qdrant can't add a named vector to an existing collection, so a
+        vector added to the schema (e.g. the ColBERT multivector) only
+        exists in collections created since; older ones get it by being
+        rebuilt. Cached per physical collection for ALIAS_CACHE_SECONDS, so
+        an alias swap or a rebuild under the same name is picked up by every
+        process; invalidate() and recover() drop the cached names at once.
+        """
+        collection = self._load_aliases().get(name, name)
+        cached = self._vector_names.get(collection)
+        if cached is None or time.monotonic() - cached[1] > ALIAS_CACHE_SECONDS:
+            vectors = self._get_client().get_collection(collection).config.params.vectors
+            cached = (set(vectors) if isinstance(vectors, dict) else set(), time.monotonic())
+            self._vector_names[collection] = cached
+        return vector_name in cached[0]
+    
+    def config_for(self, name: str) -> Optional[QdrantCollectionConfig]:
+        """Config for a logical name or one of its versioned ("<name>__...") collections."""
+        if name in self._configs:
+            return self._configs[name]
+        for logical, config in self._configs.items():
+            if name.startswith(logical + "__") and not name.endswith(SHADOW_ALIAS_SUFFIX):
+                return replace(config, name=name)
+        return None
+    
+    def existing_names(self, client: Optional[QdrantClient] = None) -> set[str]:
+        """Names that can be addressed right now: collections plus aliases."""
+        client = client or self._get_client()
+        names = {c.name for c in client.get_collections().collections}
+        return names | set(self._load_aliases(client, force=True))
+    
+    def _load_aliases(self, client: Optional[QdrantClient] = None, force: bool = False) -> dict[str, str]:
+        """alias -> collection map, cached for ALIAS_CACHE_SECONDS."""
+        if force or time.monotonic() - self._aliases_loaded_at > ALIAS_CACHE_SECONDS:
+            client = client or self._get_client()
+            self._aliases = {
+                a.alias_name: a.collection_name for a in client.get_aliases().aliases
+            }
+            self._aliases_loaded_at = time.monotonic()
+        return self._aliases
+    
+    def resolve(self, name: str) -> str:
+        """Collection currently behind a logical name (itself if not an alias)."""
+        return self._load_aliases(force=True).get(name, name)
+    
+    def shadow_of(self, name: str) -> Optional[str]:
+        """
+        Collection a reindex of `name` is building, if any.
+        
+        Cached, so writers can call it per upsert; a newly created shadow
+        is picked up within ALIAS_CACHE_SECONDS. Writes made before that
+        are covered by the reindex backfill.
+        """
+        try:
+            return self._load_aliases().get(name + SHADOW_ALIAS_SUFFIX)
+        except Exception as e:
+            print(f"[QDRANT] Could not load aliases: {e}")
+            return None
+    
+    def create_shadow(self, name: str) -> str:
+        """
+        Create an empty versioned copy of a logical collection for reindexing.
+        
+        The new collection ("<name>__<timestamp>") gets the current schema,
+        storage profile and sharding, and the "<name>__shadow" alias so
+        every process starts dual-writing to it.
+        
+        Returns:
+            The shadow collection name
+        """
+        config = self._configs.get(name)
+        if config is None:
+            raise ValueError(f"Unknown collection: {name}")
+        
+        client = self._get_client()
+        if self._is_physical(client, name):
+            raise ValueError(f"{name} is not behind an alias yet; run adopt() first (scripts/reindex_qdrant.py adopt)")
+        return self._create_shadow(client, name, config)
+    
+    def _create_shadow(self, client: QdrantClient, name: str, config: QdrantCollectionConfig) -> str:
+        shadow_alias = name + SHADOW_ALIAS_SUFFIX
+        if shadow_alias in self._load_aliases(client, force=True):
+            raise ValueError(f"A reindex of {name} is already in progress ({self._aliases[shadow_alias]})")
+        
+        shadow = self._versioned_name(name, self.existing_names(client))
+        self._create(client, replace(config, name=shadow))
+        client.update_collection_aliases(change_aliases_operations=[
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=shadow, alias_name=shadow_alias)),
+        ])
+        self._load_aliases(client, force=True)
+        print(f"[QDRANT] Created shadow collection {shadow} for {name}")
+        return shadow
+    
+    def promote_shadow(self, name: str) -> dict[str, Optional[str]]:
+        """
+        Point the logical name at its shadow collection.
+        
+        One atomic alias update: searches switch from the previous
+        collection to the shadow with no gap. The previous collection is
+        left in place for rollback (reindex_service.promote can drop it).
+        
+        Returns:
+            {"previous": old collection or None, "current": shadow}
+        """
+        client = self._get_client()
+        aliases = self._load_aliases(client, force=True)
+        shadow_alias = name + SHADOW_ALIAS_SUFFIX
+        shadow = aliases.get(shadow_alias)
+        if shadow is None:
+            raise ValueError(f"No reindex in progress for {name}")
+        
+        previous = aliases.get(name)
+        if previous is None and self._is_physical(client, name):
+            raise ValueError(f"{name} is not behind an alias yet; run adopt() first (scripts/reindex_qdrant.py adopt)")
+        
+        operations = []
+        if previous is not None:
+            operations.append(DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=name)))
+        operations.extend([
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=shadow, alias_name=name)),
+            DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=shadow_alias)),
+        ])
+        client.update_collection_aliases(change_aliases_operations=operations)
+        
+        with self._lock:
+            self._aliases_loaded_at = 0.0
+            self._ready.discard(name)
+            if shadow in self._custom_sharded:
+                self._custom_sharded.add(name)
+        print(f"[QDRANT] {name} now points at {shadow} (previous: {previous or 'none'})")
+        return {"previous": previous, "current": shadow}
+    
+    def adopt(self, name: str, settle_seconds: float = ALIAS_CACHE_SECONDS) -> Optional[str]:
+        """
+        Move a logical name that is still a physical collection behind an alias.
+        
+        One-time step for deployments created before bootstrap used
+        aliases; run it before the first reindex. The collection is copied
+        into a versioned one that is first made the reindex shadow, so after
+        `settle_seconds` (the alias cache lifetime) every process writes and
+        deletes there too. Points deleted from the original while being
+        copied are removed from the copy again. Then the original is
+        dropped and the name becomes an alias of the copy - the name does
+        not resolve for that one step; writes meanwhile are re-created by
+        recover() and also reach the copy through the shadow alias.
+        
+        Returns:
+            The new physical collection, or None if the name already was an alias
+        """
+        config = self._configs.get(name)
+        if config is None:
+            raise ValueError(f"Unknown collection: {name}")
+        
+        client = self._get_client()
+        if not self._is_physical(client, name):
+            return None
+        
+        copy = self._create_shadow(client, name, config)
+        time.sleep(settle_seconds)
+        copied = self._copy_points(client, name, copy, config)
+        removed = self._remove_missing(client, name, copy)
+        print(f"[QDRANT] Copied {copied} points from {name} to {copy} ({removed} deleted meanwhile)")
+        
+        client.delete_collection(name)
+        operations = [
+            CreateAliasOperation(create_alias=CreateAlias(collection_name=copy, alias_name=name)),
+            DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=name + SHADOW_ALIAS_SUFFIX)),
+        ]
+        for attempt in range(3):
+            try:
+                client.update_collection_aliases(change_aliases_operations=operations)
+                break
+            except Exception as e:
+                if attempt == 2 or "already exists" not in str(e).lower():
+                    raise
+                # Another process's recover() re-created the name in the gap;
+                # what it wrote there was dual-written to the copy as well
+                recreated = self._load_aliases(client, force=True).get(name)
+                if recreated is None:
+                    client.delete_collection(name)
+                else:
+                    client.update_collection_aliases(change_aliases_operations=[
+                        DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=name)),
+                    ])
+                    client.delete_collection(recreated)
+        
+        with self._lock:
+            self._aliases_loaded_at = 0.0
+            self._ready.discard(name)
+            if copy in self._custom_sharded:
+                self._custom_sharded.add(name)
+        print(f"[QDRANT] {name} is now an alias of {copy}")
+        return copy
+    
+    def _is_physical(self, client: QdrantClient, name: str) -> bool:
+        """Whether a physical collection (not an alias) holds the name."""
+        if name in self._load_aliases(client, force=True):
+            return False
+        return name in {c.name for c in client.get_collections().collections}
+    
+    def _copy_points(self, client: QdrantClient, source: str, target: str, config: QdrantCollectionConfig) -> int:
+        """Copy every point with its vectors, routed to the target's shard keys."""
+        copied = 0
+        offset = None
+        while True:
+            records, offset = client.scroll(
+                collection_name=source, limit=256, offset=offset, with_payload=True, with_vectors=True,
+            )
+            groups: dict[Optional[str], list[PointStruct]] = {}
+            for record in records:
+                guild_id = (record.payload or {}).get(config.tenant_field) if config.tenant_field else None
+                groups.setdefault(self.shard_key(target, guild_id), []).append(
+                    PointStruct(id=record.id, vector=record.vector, payload=record.payload)
+                )
+            for shard_key, points in groups.items():
+                client.upsert(collection_name=target, points=points, wait=True, shard_key_selector=shard_key)
+                copied += len(points)
+            if offset is None:
+                return copied
+    
+    def _remove_missing(self, client: QdrantClient, source: str, target: str) -> int:
+        """Delete points from the copy that are gone from the source (deleted mid-copy)."""
+        removed = 0
+        offset = None
+        while True:
+            records, offset = client.scroll(collection_name=target, limit=256, offset=offset)
+            ids = [record.id for record in records]
+            present = {record.id for record in client.retrieve(source, ids=ids)} if ids else set()
+            missing = [point_id for point_id in ids if point_id not in present]
+            if missing:
+                client.delete(collection_name=target, points_selector=PointIdsList(points=missing), wait=True)
+                removed += len(missing)
+            if offset is None:
+                return removed
+    
+    def drop_shadow(self, name: str) -> Optional[str]:
+        """Abandon a reindex: remove the shadow alias and its collection."""
+        client = self._get_client()
+        shadow = self._load_aliases(client, force=True).get(name + SHADOW_ALIAS_SUFFIX)
+        if shadow is None:
+            return None
+        client.update_collection_aliases(change_aliases_operations=[
+            DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=name + SHADOW_ALIAS_SUFFIX)),
+        ])
+        client.delete_collection(shadow)
+        self._aliases_loaded_at = 0.0
+        print(f"[QDRANT] Dropped shadow collection {shadow}")
+        return shadow
+    
+    def _resolve_vector_size(self, config: QdrantCollectionConfig) -> int:
+        """Vector size from the config, or the embedding model when unset."""
+        size = config.vector_size
+        if size is None and self._vector_size is not None:
+            size = self._vector_size()
+        if size is None:
+            raise ValueError(f"No vector size configured for collection: {config.name}")
+        return size
+    
+    def profile_for(self, config: QdrantCollectionConfig) -> StorageProfile:
+        """Storage profile a collection should use."""
+        if config.use_storage_profile and self._storage_profile is not None:
+            return self._storage_profile()
+        return STORAGE_PROFILES["memory"]
+    
+    def _create(self, client: QdrantClient, config: QdrantCollectionConfig) -> None:
+        """Create a collection and all its payload indexes."""
+        vector_size = self._resolve_vector_size(config)
+        profile = self.profile_for(config)
+        vector_params = VectorParams(
+            size=vector_size,
+            distance=config.distance,
+            on_disk=profile.vectors_on_disk,
+        )
+        
+        vectors_config: Any = vector_params
+        if config.dense_vector_name:
+            vectors_config = {config.dense_vector_name: vector_params}
+            if config.multivector_name:
+                # Only scored for the final rerank stage over a few fused
+                # candidates: no HNSW graph, and the token vectors (tens of
+                # KB per point) stay on disk
+                vectors_config[config.multivector_name] = VectorParams(
+                    size=config.multivector_size,
+                    distance=Distance.COSINE,
+                    multivector_config=MultiVectorConfig(comparator=MultiVectorComparator.MAX_SIM),
+                    hnsw_config=HnswConfigDiff(m=0),
+                    on_disk=True,
+                )
+        
+        sparse_vectors_config = None
+        if config.sparse_vector_name:
+            sparse_vectors_config = {
+                config.sparse_vector_name: SparseVectorParams(
+                    index=SparseIndexParams(on_disk=profile.sparse_on_disk),
+                ),
+            }
+        
+        custom_sharding = bool(config.tenant_field) and self._tenant_router.enabled
+        
+        try:
+            client.create_collection(
+                collection_name=config.name,
+                vectors_config=vectors_config,
+                sparse_vectors_config=sparse_vectors_config,
+                hnsw_config=HnswConfigDiff(on_disk=profile.hnsw_on_disk),
+                quantization_config=build_quantization_config(profile),
+                optimizers_config=OptimizersConfigDiff(
+                    indexing_threshold=config.indexing_threshold,
+                ),
+                sharding_method=ShardingMethod.CUSTOM if custom_sharding else None,
+            )
+        except Exception as e:
+            # Another process (API vs worker) may have created it first
+            if "already exists" not in str(e).lower():
+                raise
+        
+        if custom_sharding:
+            self._custom_sharded.add(config.name)
+            self._ensure_shard_keys(client, config.name)
+        
+        self._ensure_indexes(client, config, existing_schema={})
+        print(
+            f"[QDRANT] Created collection: {config.name} ({vector_size}D, "
+            f"profile={profile.name}, custom_sharding={custom_sharding})"
+        )
+    
+    def _ensure_shard_keys(self, client: QdrantClient, name: str) -> None:
+        """Create the shared shard and one shard per dedicated guild."""
+        for shard_key in self._tenant_router.shard_keys():
+            try:
+                client.create_shard_key(collection_name=name, shard_key=shard_key)
+            except Exception as e:
+                if "already exists" not in str(e).lower():
+                    raise
+    
+    def apply_storage_profile(self, name: str, profile: StorageProfile) -> None:
+        """
+        Switch an existing collection to a storage profile in place.
+        
+        Qdrant's optimizer rebuilds the affected segments (quantized copies,
+        on-disk vectors, HNSW and sparse index placement) in the background;
+        the collection stays searchable meanwhile. Collection status is
+        "yellow" until the rebuild finishes.
+        """
+        config = self._configs.get(name)
+        if config is None:
+            raise ValueError(f"Unknown collection: {name}")
+        
+        client = self._get_client()
+        quantization_config = build_quantization_config(profile)
+        
+        # "" addresses the unnamed default vector
+        vector_name = config.dense_vector_name or ""
+        sparse_vectors_config = None
+        if config.sparse_vector_name:
+            sparse_vectors_config = {
+                config.sparse_vector_name: SparseVectorParams(
+                    index=SparseIndexParams(on_disk=profile.sparse_on_disk),
+                ),
+            }
+        
+        client.update_collection(
+            collection_name=self.resolve(name),
+            vectors_config={vector_name: VectorParamsDiff(on_disk=profile.vectors_on_disk)},
+            sparse_vectors_config=sparse_vectors_config,
+            hnsw_config=HnswConfigDiff(on_disk=profile.hnsw_on_disk),
+            quantization_config=quantization_config if quantization_config is not None else Disabled.DISABLED,
+        )
+        print(f"[QDRANT] Applied storage profile {profile.name} to {name}")
+    
+    def _ensure_indexes(
+        self,
+        client: QdrantClient,
+        config: QdrantCollectionConfig,
+        existing_schema: Optional[dict] = None,
+    ) -> list[str]:
+        """Create payload indexes missing from a collection. Returns added fields."""
+        if existing_schema is None:
+            existing_schema = client.get_collection(config.name).payload_schema or {}
+        
+        added = []
+        for field_name, field_type in config.payload_schema.items():
+            if field_name in config.text_index_fields:
+                continue
+            
+            if field_name == config.tenant_field:
+                # Also replaces a plain (lookup + range) guild_id index
+                existing = existing_schema.get(field_name)
+                if existing is not None and getattr(getattr(existing, "params", None), "range", None) is False:
+                    continue
+                client.create_payload_index(
+                    collection_name=config.name,
+                    field_name=field_name,
+                    field_schema=_tenant_index_params(),
+                    wait=existing is None,  # Rebuilding an existing index runs in the background
+                )
+                added.append(field_name)
+                continue
+            
+            if field_name in existing_schema:
+                continue
+            client.create_payload_index(
+                collection_name=config.name,
+                field_name=field_name,
+                field_schema=field_type,
+            )
+            added.append(field_name)
+        
+        # Full-text indexes for keyword search over payload text
+        for field_name in config.text_index_fields:
+            if field_name in existing_schema:
+                continue
+            client.create_payload_index(
+                collection_name=config.name,
+                field_name=field_name,
+                field_schema=TextIndexParams(
+                    type="text",
+                    tokenizer=TokenizerType.WORD,
+                    min_token_len=2,
+                    max_token_len=20,
+                    lowercase=True,
+                ),
+            )
+            added.append(field_name)
+        
+        return added
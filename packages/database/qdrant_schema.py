@@ -8,22 +8,25 @@ CRITICAL CONSTRAINT:
 """
 
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Optional
 from qdrant_client import QdrantClient
 from qdrant_client.models import (
     Distance,
-    VectorParams,
     PayloadSchemaType,
-    TextIndexParams,
-    TokenizerType,
-    CreateCollection,
-    OptimizersConfigDiff,
 )
 
 
 # Collection names
 MESSAGES_COLLECTION = "discord_messages"
 SESSIONS_COLLECTION = "discord_sessions"
+HYBRID_SESSIONS_COLLECTION = "discord_sessions_hybrid"
+DM_MEMORY_COLLECTION = "dm_memory"
+
+# Named vectors (hybrid collection)
+DENSE_VECTOR_NAME = "dense"
+SPARSE_VECTOR_NAME = "sparse"
+LATE_INTERACTION_VECTOR_NAME = "colbert"
+LATE_INTERACTION_VECTOR_SIZE = 96  # answerai-colbert-small-v1 token vectors (see hybrid_embedding)
 
 
 @dataclass
@@ -31,10 +34,77 @@ class QdrantCollectionConfig:
     """Configuration for Qdrant collections."""
     
     name: str
-    vector_size: int
+    vector_size: Optional[int]  # None = dimension of the configured embedding model
     distance: Distance
     payload_schema: dict[str, PayloadSchemaType]
     text_index_fields: list[str]
+    dense_vector_name: Optional[str] = None  # None = single unnamed vector
+    sparse_vector_name: Optional[str] = None  # BM25 sparse vector (hybrid search)
+    multivector_name: Optional[str] = None  # ColBERT token vectors, MaxSim rerank only (no HNSW)
+    multivector_size: Optional[int] = None
+    indexing_threshold: int = 10000
+    use_storage_profile: bool = False  # Apply QDRANT_STORAGE_PROFILE (large collections)
+    tenant_field: Optional[str] = None  # Lookup-only index + custom shard routing key
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """
+    How a collection stores its vectors.
+    
+    Quantized profiles keep the compressed vectors in RAM for the HNSW walk
+    and the float32 originals on disk; searches oversample candidates on the
+    quantized index and rescore them against the originals.
+    """
+    
+    name: str
+    quantization: Optional[str] = None  # None, "scalar" (int8), "binary" or "product"
+    vectors_on_disk: bool = False  # float32 originals memory-mapped from disk
+    hnsw_on_disk: bool = False
+    sparse_on_disk: bool = False  # BM25 inverted index on disk
+    oversampling: float = 1.0  # Default candidate multiplier before rescoring
+
+
+STORAGE_PROFILES: dict[str, StorageProfile] = {
+    # Full float32 vectors in RAM (original behaviour)
+    "memory": StorageProfile(name="memory"),
+    # int8: 4x smaller, ~99% recall with rescoring
+    "scalar": StorageProfile(
+        name="scalar",
+        quantization="scalar",
+        vectors_on_disk=True,
+        sparse_on_disk=True,
+        oversampling=2.0,
+    ),
+    # 1 bit/dim: 32x smaller; best for high-dimensional (>=1024D) embeddings
+    "binary": StorageProfile(
+        name="binary",
+        quantization="binary",
+        vectors_on_disk=True,
+        sparse_on_disk=True,
+        oversampling=3.0,
+    ),
+    # PQ x16: smallest footprint, lowest recall; for very large archives
+    "product": StorageProfile(
+        name="product",
+        quantization="product",
+        vectors_on_disk=True,
+        hnsw_on_disk=True,
+        sparse_on_disk=True,
+        oversampling=4.0,
+    ),
+}
+
+
+def get_storage_profile(name: str) -> StorageProfile:
+    """Look up a storage profile by name."""
+    profile = STORAGE_PROFILES.get(name)
+    if profile is None:
+        raise ValueError(
+            f"Unknown storage profile: {name}. "
+            f"Expected one of: {', '.join(STORAGE_PROFILES)}"
+        )
+    return profile
 
 
 COLLECTION_CONFIGS: dict[str, QdrantCollectionConfig] = {
@@ -61,7 +131,7 @@ COLLECTION_CONFIGS: dict[str, QdrantCollectionConfig] = {
     ),
     SESSIONS_COLLECTION: QdrantCollectionConfig(
         name=SESSIONS_COLLECTION,
-        vector_size=1536,
+        vector_size=None,
         distance=Distance.COSINE,
         payload_schema={
             # REQUIRED: Multi-tenant filtering
@@ -70,66 +140,83 @@ COLLECTION_CONFIGS: dict[str, QdrantCollectionConfig] = {
             
             # Postgres reference
             "session_id": PayloadSchemaType.KEYWORD,
+            # Right to be Forgotten: find sessions containing a deleted message
+            "message_ids": PayloadSchemaType.INTEGER,
+            # Grouped search: one result group per document
+            "attachment_id": PayloadSchemaType.INTEGER,
             
-            # Session metadata
+            # Session metadata (time-window filters + recency decay)
             "start_time": PayloadSchemaType.DATETIME,
             "end_time": PayloadSchemaType.DATETIME,
             "message_count": PayloadSchemaType.INTEGER,
+            # Author filter: "what did @alice say about X"
+            "author_ids": PayloadSchemaType.INTEGER,
             
             # Topics for GraphRAG
             "topic_tags": PayloadSchemaType.KEYWORD,
             "summary": PayloadSchemaType.TEXT,
         },
         text_index_fields=["summary"],
+        use_storage_profile=True,
+        tenant_field="guild_id",
+    ),
+    HYBRID_SESSIONS_COLLECTION: QdrantCollectionConfig(
+        name=HYBRID_SESSIONS_COLLECTION,
+        vector_size=None,
+        distance=Distance.COSINE,
+        payload_schema={
+            # REQUIRED: Multi-tenant filtering
+            "guild_id": PayloadSchemaType.INTEGER,
+            "channel_id": PayloadSchemaType.INTEGER,
+            
+            # Document vs chat filtering ("Search only PDFs")
+            "source_type": PayloadSchemaType.KEYWORD,
+            # Right to be Forgotten: find sessions containing a deleted message
+            "message_ids": PayloadSchemaType.INTEGER,
+            # Grouped search: one result group per document
+            "attachment_id": PayloadSchemaType.INTEGER,
+            
+            # Time-window filters + recency decay, author filter
+            "start_time": PayloadSchemaType.DATETIME,
+            "end_time": PayloadSchemaType.DATETIME,
+            "author_ids": PayloadSchemaType.INTEGER,
+        },
+        text_index_fields=[],
+        dense_vector_name=DENSE_VECTOR_NAME,
+        sparse_vector_name=SPARSE_VECTOR_NAME,
+        multivector_name=LATE_INTERACTION_VECTOR_NAME,
+        multivector_size=LATE_INTERACTION_VECTOR_SIZE,
+        use_storage_profile=True,
+        tenant_field="guild_id",
+    ),
+    DM_MEMORY_COLLECTION: QdrantCollectionConfig(
+        name=DM_MEMORY_COLLECTION,
+        vector_size=384,  # all-MiniLM-L6-v2
+        distance=Distance.COSINE,
+        payload_schema={
+            # DMs are scoped per user rather than per guild
+            "user_id": PayloadSchemaType.INTEGER,
+        },
+        text_index_fields=[],
     ),
 }
 
 
-async def ensure_collections(client: QdrantClient) -> None:
+async def ensure_collections(client: QdrantClient, vector_size: Optional[int] = None) -> dict[str, str]:
     """
     Create or verify Qdrant collections with proper indexing.
     
     INVARIANT: guild_id is always indexed for multi-tenant queries.
+    
+    Args:
+        client: Qdrant client
+        vector_size: Dimension for collections whose config leaves it to the
+            embedding model (vector_size=None)
     """
-    existing = {c.name for c in client.get_collections().collections}
+    from .qdrant_registry import CollectionRegistry
     
-    for config in COLLECTION_CONFIGS.values():
-        if config.name in existing:
-            continue
-        
-        # Create collection with vector params
-        client.create_collection(
-            collection_name=config.name,
-            vectors_config=VectorParams(
-                size=config.vector_size,
-                distance=config.distance,
-            ),
-            optimizers_config=OptimizersConfigDiff(
-                indexing_threshold=10000,
-            ),
-        )
-        
-        # Create payload indexes for filtering
-        for field_name, field_type in config.payload_schema.items():
-            client.create_payload_index(
-                collection_name=config.name,
-                field_name=field_name,
-                field_schema=field_type,
-            )
-        
-        # Create text indexes for hybrid search
-        for field_name in config.text_index_fields:
-            client.create_payload_index(
-                collection_name=config.name,
-                field_name=field_name,
-                field_schema=TextIndexParams(
-                    type="text",
-                    tokenizer=TokenizerType.WORD,
-                    min_token_len=2,
-                    max_token_len=20,
-                    lowercase=True,
-                ),
-            )
+    registry = CollectionRegistry(lambda: client, vector_size=lambda: vector_size)
+    return registry.bootstrap()
 
 
 def validate_payload(payload: dict[str, Any], collection_name: str) -> None:
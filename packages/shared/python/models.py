@@ -131,6 +131,14 @@ class AskResponse(BaseModel):
     sources: list[MessageSource]
     routed_to: Union[RouterIntent, str]  # Can be enum or dynamic label like "vector + knowledge"
     execution_time_ms: float
+    timings_ms: Optional[dict[str, float]] = None  # Per-stage latency, e.g. {"search": 41.2, "generate": 812.0}
+    tokens_in: Optional[int] = None  # LLM prompt tokens for the answer
+    cached: bool = False  # Served from the answer cache (see answer_cache)
+    error: bool = False  # The answer reports a failure or a degraded fallback; never cached
+
+
+class ErrorAnswer(str):
+    """Answer text produced by a failure path; agents set AskResponse.error from it."""
 
 
 # =============================================================================
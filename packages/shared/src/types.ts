@@ -94,6 +94,10 @@ export interface AskResponse {
   sources: MessageSource[];
   routedTo: RouterIntent;
   executionTimeMs: number;
+  timingsMs?: Record<string, number>; // Per-stage latency (vector RAG)
+  tokensIn?: number; // LLM prompt tokens for the answer
+  cached?: boolean; // Served from the answer cache
+  error?: boolean; // The answer reports a failure or a degraded fallback
 }
 
 export interface MessageSource {
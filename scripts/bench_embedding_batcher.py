@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark: query embedding latency with and without the micro-batcher.
+
+Sends queries at a fixed arrival rate (Poisson, open loop) and compares:
+- direct:  embed_query() called inline per request (old /ask, /search path;
+           blocks the event loop for every batch-size-1 forward pass)
+- batched: EmbeddingBatcher coalescing concurrent requests into one call
+
+Latency is measured from each request's scheduled arrival, so time spent
+queued behind a blocked event loop counts. Reports p50/p99 latency and
+achieved throughput.
+
+Usage:
+    python scripts/bench_embedding_batcher.py                     # all-MiniLM-L6-v2
+    python scripts/bench_embedding_batcher.py --model all-mpnet-base-v2
+    python scripts/bench_embedding_batcher.py --synthetic         # no model download
+    python scripts/bench_embedding_batcher.py --rates 50 200 800 --wait-ms 2 5
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.api.src.core.embedding_batcher import EmbeddingBatcher
+
+
+WORDS = "deploy bug release python discord bot server voice channel role error fix update meeting".split()
+
+
+class SyntheticModel:
+    """Fixed per-call overhead plus per-text cost, like a small CPU model."""
+
+    def __init__(self, call_ms: float = 8.0, text_ms: float = 0.4, dim: int = 384):
+        self.call_ms = call_ms
+        self.text_ms = text_ms
+        self.dim = dim
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        time.sleep((self.call_ms + self.text_ms * len(texts)) / 1000)
+        return [[float(len(text))] * self.dim for text in texts]
+
+
+class LocalModel:
+    """sentence-transformers model, the LOCAL provider's code path."""
+
+    def __init__(self, name: str):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(name)
+
+    def embed_batch(self, texts: list[str]) -> list[list[float]]:
+        return [emb.tolist() for emb in self.model.encode(texts, convert_to_numpy=True)]
+
+
+def make_query() -> str:
+    return " ".join(random.choices(WORDS, k=random.randint(4, 12))) + "?"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def send_requests(embed, rate: float, total: int) -> tuple[list[float], float]:
+    """Fire `total` requests at `rate`/s; returns (latencies in ms, wall time in s)."""
+    latencies: list[float] = []
+    rng = random.Random(0)
+
+    async def request(arrival: float):
+        await embed(make_query())
+        latencies.append((time.perf_counter() - arrival) * 1000)
+
+    start = time.perf_counter()
+    arrival = start
+    tasks = []
+    for _ in range(total):
+        arrival += rng.expovariate(rate)
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(request(arrival)))
+    await asyncio.gather(*tasks)
+    return latencies, time.perf_counter() - start
+
+
+async def bench(model, rate: float, total: int, wait_ms: float) -> dict:
+    async def direct(text):
+        return model.embed_batch([text])[0]
+
+    batcher = EmbeddingBatcher(model.embed_batch, max_wait_ms=wait_ms)
+
+    results = {}
+    for name, embed in (("direct", direct), ("batched", batcher.embed)):
+        latencies, wall = await send_requests(embed, rate, total)
+        results[name] = {
+            "p50": percentile(latencies, 50),
+            "p99": percentile(latencies, 99),
+            "qps": len(latencies) / wall,
+        }
+    results["batched"]["avg_batch"] = batcher.get_stats()["avg_batch_size"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the embedding micro-batcher")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model")
+    parser.add_argument("--synthetic", action="store_true", help="Use a synthetic model (no download)")
+    parser.add_argument("--rates", type=float, nargs="+", default=[20, 100, 400, 1000], help="Arrivals/sec")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per run")
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[5.0], help="Batch windows to try")
+
+    args = parser.parse_args()
+
+    model = SyntheticModel() if args.synthetic else LocalModel(args.model)
+    model.embed_batch(["warm up"])
+
+    print(
+        f"{'rate/s':>7} | {'wait':>5} | {'direct p50/p99 (ms)':>20} | {'batched p50/p99 (ms)':>21} | "
+        f"{'direct q/s':>10} | {'batched q/s':>11} | {'avg batch':>9}"
+    )
+    print("-" * 102)
+
+    for rate in args.rates:
+        for wait_ms in args.wait_ms:
+            r = asyncio.run(bench(model, rate, args.requests, wait_ms))
+            d, b = r["direct"], r["batched"]
+            print(
+                f"{rate:>7.0f} | {wait_ms:>5.1f} | {d['p50']:>9.1f} / {d['p99']:>8.1f} | "
+                f"{b['p50']:>10.1f} / {b['p99']:>8.1f} | {d['qps']:>10.0f} | {b['qps']:>11.0f} | "
+                f"{b['avg_batch']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
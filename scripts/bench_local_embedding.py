@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local embedding throughput, torch vs ONNX Runtime (float32/int8).
+
+Loads the same model on each backend and reports load time, single-query
+latency, batch throughput (texts/sec) and cosine similarity to the torch
+vectors, so the speedup can be weighed against any drift.
+
+Usage:
+    python scripts/bench_local_embedding.py                          # all-MiniLM-L6-v2
+    python scripts/bench_local_embedding.py --model all-mpnet-base-v2
+    python scripts/bench_local_embedding.py --texts 2000 --batch-size 64 --threads 4
+    python scripts/bench_local_embedding.py --backends onnx onnx-int8
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from apps.api.src.core.onnx_embedding import load_sentence_model
+
+
+WORDS = (
+    "deploy bug release python discord bot server voice channel role error fix update meeting "
+    "database migration latency cache worker queue token vector search index rollback config"
+).split()
+
+BACKENDS = {
+    "torch": {"backend": "torch"},
+    "onnx": {"backend": "onnx"},
+    "onnx-int8": {"backend": "onnx", "quantized": True},
+}
+
+
+def make_text(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(8, 60)))
+
+
+def bench(name: str, model_name: str, texts: list[str], batch_size: int, threads) -> dict:
+    options = dict(BACKENDS[name])
+    if options["backend"] == "onnx":
+        options["threads"] = threads
+
+    start = time.perf_counter()
+    model = load_sentence_model(model_name, **options)
+    load_s = time.perf_counter() - start
+
+    model.encode(texts[:batch_size], batch_size=batch_size)  # warm up
+
+    query_ms = []
+    for text in texts[:100]:
+        start = time.perf_counter()
+        model.encode([text])
+        query_ms.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    vectors = model.encode(texts, batch_size=batch_size, convert_to_numpy=True)
+    batch_s = time.perf_counter() - start
+
+    return {
+        "load_s": load_s,
+        "query_p50": float(np.percentile(query_ms, 50)),
+        "texts_per_s": len(texts) / batch_s,
+        "vectors": np.asarray(vectors, dtype=np.float32),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local embedding backends")
+    parser.add_argument("--model", default="all-MiniLM-L6-v2", help="sentence-transformers model")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--texts", type=int, default=1000, help="Texts in the throughput run")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None, help="ONNX Runtime intra-op threads")
+
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    texts = [make_text(rng) for _ in range(args.texts)]
+
+    results = {name: bench(name, args.model, texts, args.batch_size, args.threads) for name in args.backends}
+    reference = results.get("torch")
+
+    print(f"\nModel: {args.model} | {args.texts} texts | batch size {args.batch_size}\n")
+    print(f"{'backend':>10} | {'load (s)':>8} | {'query p50 (ms)':>14} | {'texts/s':>8} | {'min / mean cosine vs torch':>26}")
+    print("-" * 78)
+
+    for name, r in results.items():
+        if reference is None or name == "torch":
+            parity = "-"
+        else:
+            a = reference["vectors"] / np.linalg.norm(reference["vectors"], axis=1, keepdims=True)
+            b = r["vectors"] / np.linalg.norm(r["vectors"], axis=1, keepdims=True)
+            cosine = (a * b).sum(axis=1)
+            parity = f"{cosine.min():.5f} / {cosine.mean():.5f}"
+        print(f"{name:>10} | {r['load_s']:>8.2f} | {r['query_p50']:>14.2f} | {r['texts_per_s']:>8.0f} | {parity:>26}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-query cost of the routing patterns.
+
+Compares three ways of getting the hybrid flags, conversational flag and
+pattern intent for a query:
+- legacy:    should_use_hybrid() re-searching its pattern strings, then
+             _is_conversational() and _classify_by_pattern() looping over
+             ~30 separately compiled patterns (the old /ask path)
+- automaton: one regex over every family, each family an optional
+             lookahead tried at every position (a single scan)
+- engine:    RoutingEngine.route() - one scan for the patterns' trigger
+             literals, then only patterns whose trigger occurs, in routing
+             order with early exit
+
+Checks that all three agree on every query before timing. The corpus is
+the labeled routing examples plus hybrid/conversational queries, padded
+with longer variants (Discord questions with pasted context).
+
+Usage:
+    python scripts/bench_routing.py
+    python scripts/bench_routing.py --rounds 500
+"""
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.api.src.agents import router
+from apps.api.src.agents.intent_examples import INTENT_EXAMPLES
+
+
+EXTRA_QUERIES = [
+    # Hybrid
+    "What did people say about the latest Python release?",
+    "Can you see the file I uploaded?",
+    "Explain the PDF that was shared in this channel",
+    "What is the document Alex mentioned yesterday?",
+    # Conversational
+    "I just updated the deploy script",
+    "thanks, that worked",
+    "We merged the fix to main",
+    "hey",
+]
+
+
+def build_corpus() -> list[str]:
+    queries = [text for texts in INTENT_EXAMPLES.values() for text in texts] + EXTRA_QUERIES
+    # Longer queries: the same question after a pasted log line
+    padded = [f"{query} (context: deploy failed on node-3 with exit code 137 after 42s)" for query in queries[::3]]
+    return queries + padded
+
+
+def legacy_route(query: str) -> tuple:
+    """The routing pattern work /ask did before RoutingEngine."""
+    include_vector = any(re.search(p.pattern, query, re.IGNORECASE) for p in router.HYBRID_CONTEXT_PATTERNS)
+    include_web = any(re.search(p.pattern, query, re.IGNORECASE) for p in router.HYBRID_WEB_PATTERNS)
+    is_meta = any(re.search(p.pattern, query, re.IGNORECASE) for p in router.HYBRID_META_PATTERNS)
+    if (is_meta and include_vector) or (include_vector and include_web):
+        return (True, None, None)
+
+    if not query.strip().endswith("?") and any(p.search(query) for p in router.CONVERSATIONAL_PATTERNS):
+        return (False, True, None)
+
+    for intent, patterns in router.INTENT_PATTERN_FAMILIES:
+        if any(p.search(query) for p in patterns):
+            return (False, False, intent)
+    return (False, False, None)
+
+
+def build_automaton() -> re.Pattern[str]:
+    families = [
+        ("context", router.HYBRID_CONTEXT_PATTERNS),
+        ("web", router.HYBRID_WEB_PATTERNS),
+        ("meta", router.HYBRID_META_PATTERNS),
+        ("conversational", router.CONVERSATIONAL_PATTERNS),
+    ] + [(intent.value, patterns) for intent, patterns in router.INTENT_PATTERN_FAMILIES]
+    return re.compile(
+        "".join(
+            f"(?=(?P<{name}>" + "|".join(f"(?:{p.pattern})" for p in patterns) + "))?"
+            for name, patterns in families
+        ),
+        re.IGNORECASE,
+    )
+
+
+def automaton_route(automaton: re.Pattern[str], query: str) -> tuple:
+    found = set()
+    for match in automaton.finditer(query):
+        found.update(name for name, value in match.groupdict().items() if value is not None)
+
+    if ("context" in found and "meta" in found) or ("context" in found and "web" in found):
+        return (True, None, None)
+    if not query.strip().endswith("?") and "conversational" in found:
+        return (False, True, None)
+    for intent, _ in router.INTENT_PATTERN_FAMILIES:
+        if intent.value in found:
+            return (False, False, intent)
+    return (False, False, None)
+
+
+def engine_route(query: str) -> tuple:
+    route = router.route_query(query)
+    if route.use_hybrid:
+        return (True, None, None)
+    return (False, route.conversational, route.intent)
+
+
+def time_per_query(route, corpus: list[str], rounds: int) -> list[float]:
+    """Microseconds per query, one sample per round."""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for query in corpus:
+            route(query)
+        samples.append((time.perf_counter() - start) / len(corpus) * 1e6)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark routing pattern evaluation")
+    parser.add_argument("--rounds", type=int, default=200, help="Passes over the corpus")
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+    automaton = build_automaton()
+    contenders = {
+        "legacy": legacy_route,
+        "automaton": lambda query: automaton_route(automaton, query),
+        "engine": engine_route,
+    }
+
+    for query in corpus:
+        expected = legacy_route(query)
+        for name, route in contenders.items():
+            assert route(query) == expected, f"{name} disagrees on {query!r}: {route(query)} != {expected}"
+    print(f"{len(corpus)} queries (avg {statistics.mean(len(q) for q in corpus):.0f} chars), all routes agree\n")
+
+    print(f"{'':<10} {'median us/query':>16} {'min':>8} {'speedup':>8}")
+    baseline = None
+    for name, route in contenders.items():
+        samples = time_per_query(route, corpus, args.rounds)
+        median = statistics.median(samples)
+        baseline = baseline or median
+        print(f"{name:<10} {median:>16.1f} {min(samples):>8.1f} {baseline / median:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
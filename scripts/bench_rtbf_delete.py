@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Right to be Forgotten delete latency vs guild size.
+
+Seeds a scratch collection with N synthetic sessions for one guild and times
+deleting the session(s) that contain a single message, comparing:
+- scan:    scroll the whole guild and test message_ids in Python (old path)
+- indexed: MatchAny on the indexed message_ids field + FilterSelector delete
+
+Usage:
+    python scripts/bench_rtbf_delete.py                      # in-process Qdrant
+    python scripts/bench_rtbf_delete.py --url http://localhost:6333
+    python scripts/bench_rtbf_delete.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from qdrant_client.http.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    MatchAny,
+    MatchValue,
+    PayloadSchemaType,
+    PointStruct,
+    VectorParams,
+)
+
+
+BENCH_COLLECTION = "bench_rtbf_sessions"
+GUILD_ID = 424242424242424242
+VECTOR_SIZE = 8
+MESSAGES_PER_SESSION = 10
+
+
+def seed(client: QdrantClient, sessions: int) -> list[list[int]]:
+    """Create the scratch collection and insert `sessions` points."""
+    if client.collection_exists(BENCH_COLLECTION):
+        client.delete_collection(BENCH_COLLECTION)
+
+    client.create_collection(
+        collection_name=BENCH_COLLECTION,
+        vectors_config=VectorParams(size=VECTOR_SIZE, distance=Distance.COSINE),
+    )
+    for field_name in ("guild_id", "message_ids"):
+        client.create_payload_index(
+            collection_name=BENCH_COLLECTION,
+            field_name=field_name,
+            field_schema=PayloadSchemaType.INTEGER,
+        )
+
+    all_message_ids = []
+    next_message_id = 10**17
+    batch = []
+    for _ in range(sessions):
+        message_ids = list(range(next_message_id, next_message_id + MESSAGES_PER_SESSION))
+        next_message_id += MESSAGES_PER_SESSION
+        all_message_ids.append(message_ids)
+        batch.append(
+            PointStruct(
+                id=str(uuid4()),
+                vector=[random.random() for _ in range(VECTOR_SIZE)],
+                payload={"guild_id": GUILD_ID, "message_ids": message_ids},
+            )
+        )
+        if len(batch) >= 1000:
+            client.upsert(collection_name=BENCH_COLLECTION, points=batch, wait=True)
+            batch = []
+    if batch:
+        client.upsert(collection_name=BENCH_COLLECTION, points=batch, wait=True)
+
+    return all_message_ids
+
+
+def delete_by_scan(client: QdrantClient, message_ids: list[int]) -> int:
+    """Baseline: full guild scroll with Python-side membership test."""
+    to_delete = []
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=BENCH_COLLECTION,
+            scroll_filter=Filter(
+                must=[FieldCondition(key="guild_id", match=MatchValue(value=GUILD_ID))]
+            ),
+            limit=100,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+        for point in points:
+            if any(mid in point.payload.get("message_ids", []) for mid in message_ids):
+                to_delete.append(point.id)
+        if offset is None:
+            break
+
+    if to_delete:
+        client.delete(
+            collection_name=BENCH_COLLECTION,
+            points_selector=models.PointIdsList(points=to_delete),
+            wait=True,
+        )
+    return len(to_delete)
+
+
+def delete_by_index(client: QdrantClient, message_ids: list[int]) -> None:
+    """Indexed: a single filter-based delete."""
+    client.delete(
+        collection_name=BENCH_COLLECTION,
+        points_selector=models.FilterSelector(
+            filter=Filter(
+                must=[
+                    FieldCondition(key="guild_id", match=MatchValue(value=GUILD_ID)),
+                    FieldCondition(key="message_ids", match=MatchAny(any=message_ids)),
+                ]
+            )
+        ),
+        wait=True,
+    )
+
+
+def run(client: QdrantClient, sizes: list[int], repeats: int) -> None:
+    print(f"{'sessions':>10} | {'scan (ms)':>12} | {'indexed (ms)':>12} | {'speedup':>8}")
+    print("-" * 52)
+
+    for size in sizes:
+        session_message_ids = seed(client, size)
+        targets = random.sample(session_message_ids, min(repeats * 2, size))
+
+        scan_times = []
+        for message_ids in targets[:repeats]:
+            start = time.perf_counter()
+            delete_by_scan(client, [random.choice(message_ids)])
+            scan_times.append((time.perf_counter() - start) * 1000)
+
+        index_times = []
+        for message_ids in targets[repeats:]:
+            start = time.perf_counter()
+            delete_by_index(client, [random.choice(message_ids)])
+            index_times.append((time.perf_counter() - start) * 1000)
+
+        scan_ms = sum(scan_times) / len(scan_times)
+        index_ms = sum(index_times) / max(len(index_times), 1)
+        speedup = scan_ms / index_ms if index_ms else float("inf")
+        print(f"{size:>10,} | {scan_ms:>12.1f} | {index_ms:>12.1f} | {speedup:>7.1f}x")
+
+    client.delete_collection(BENCH_COLLECTION)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark RTBF delete latency")
+    parser.add_argument("--url", default=None, help="Qdrant URL (default: in-process)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--repeats", type=int, default=5, help="Deletes timed per size")
+
+    args = parser.parse_args()
+
+    client = QdrantClient(url=args.url) if args.url else QdrantClient(location=":memory:")
+    run(client, args.sizes, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
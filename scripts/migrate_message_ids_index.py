@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Qdrant Migration - Index `message_ids` on the session collections.
+
+Right to be Forgotten deletes look up "sessions containing message X" via a
+MatchAny filter on `message_ids`. Collections created before the field was
+indexed need the payload index added; Qdrant backfills it from the points
+already stored.
+
+Usage:
+    python scripts/migrate_message_ids_index.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.api.src.services.qdrant_service import qdrant_service
+
+
+def main():
+    print("=" * 60)
+    print("MIGRATION: message_ids payload index")
+    print("=" * 60)
+
+    status = qdrant_service.ensure_message_ids_index()
+
+    if not status:
+        print("\nNo session collections found - nothing to migrate")
+        return
+
+    for collection_name, result in status.items():
+        print(f"  {collection_name}: {result}")
+
+    print("\n✓ Migration complete")
+
+
+if __name__ == "__main__":
+    main()
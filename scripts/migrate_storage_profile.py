@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Qdrant Migration - Switch session collections to a storage profile.
+
+Profiles (packages/database/qdrant_schema.py):
+    memory   float32 vectors in RAM (default)
+    scalar   int8 quantized in RAM, originals on disk (~4x less RAM)
+    binary   1-bit quantized in RAM, originals on disk (~32x less RAM)
+    product  PQ x16 in RAM, originals + HNSW on disk (smallest footprint)
+
+Collections are updated in place and Qdrant rebuilds segments in the
+background (status "yellow" until done). Set QDRANT_STORAGE_PROFILE to the
+same value afterwards so searches use matching oversampling/rescore params.
+
+Usage:
+    python scripts/migrate_storage_profile.py --profile scalar
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.api.src.services.qdrant_service import qdrant_service
+from packages.database.qdrant_schema import STORAGE_PROFILES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate Qdrant storage profile")
+    parser.add_argument("--profile", required=True, choices=list(STORAGE_PROFILES))
+    
+    args = parser.parse_args()
+    
+    print("=" * 60)
+    print(f"MIGRATION: storage profile -> {args.profile}")
+    print("=" * 60)
+    
+    status = qdrant_service.migrate_storage_profile(args.profile)
+    
+    for collection_name, result in status.items():
+        print(f"  {collection_name}: {result}")
+    
+    print(f"\n✓ Migration submitted - set QDRANT_STORAGE_PROFILE={args.profile}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Qdrant Migration - Copy the legacy session collection into the hybrid one.
+
+Reuses the stored dense vectors and adds BM25 sparse vectors page by page.
+Progress is checkpointed after each contiguous run of written pages, so
+re-running the script after an interruption picks up where it stopped.
+
+Usage:
+    python scripts/migrate_to_hybrid.py
+    python scripts/migrate_to_hybrid.py --batch-size 512 --workers 4
+    python scripts/migrate_to_hybrid.py --restart      # ignore checkpoint
+    python scripts/migrate_to_hybrid.py --recreate     # rebuild with the current schema
+
+Qdrant can't add a named vector to an existing collection, so a hybrid
+collection created before the ColBERT multivector was added gets it with
+--recreate: the collection is dropped, re-created from the current schema
+and migrated again from scratch. Until the run finishes, hybrid search only
+sees the points migrated so far (/ask and /search still query the legacy
+collection alongside it). Other processes pick up the new schema within
+30 seconds.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.api.src.services.hybrid_migration import DEFAULT_CHECKPOINT_PATH
+from apps.api.src.services.qdrant_service import qdrant_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate legacy sessions to the hybrid collection")
+    parser.add_argument("--batch-size", type=int, default=256, help="Points per scroll page")
+    parser.add_argument("--workers", type=int, default=2, help="Sparse embedding workers")
+    parser.add_argument("--checkpoint", default=str(DEFAULT_CHECKPOINT_PATH), help="Checkpoint file")
+    parser.add_argument("--restart", action="store_true", help="Discard the checkpoint and start over")
+    parser.add_argument(
+        "--recreate",
+        action="store_true",
+        help="Drop and re-create the hybrid collection from the current schema, then migrate from scratch",
+    )
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("MIGRATION: legacy sessions -> hybrid collection")
+    print("=" * 60)
+
+    stats = qdrant_service.migrate_to_hybrid(
+        batch_size=args.batch_size,
+        embed_workers=args.workers,
+        resume=not args.restart,
+        checkpoint_path=args.checkpoint,
+        recreate=args.recreate,
+    )
+
+    print(f"\n  Migrated:  {stats['migrated']:,} points ({stats['errors']} errors)")
+    print(f"  This run:  {stats['migrated_this_run']:,} points in {stats['elapsed_seconds']}s")
+    print(f"  Rate:      {stats['points_per_sec']:,.1f} points/sec")
+
+    if not stats["completed"]:
+        print(f"\n✗ Migration interrupted - re-run to resume from {args.checkpoint}")
+        sys.exit(1)
+
+    print("\n✓ Migration complete")
+
+
+if __name__ == "__main__":
+    main()
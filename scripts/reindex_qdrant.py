@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Blue/Green Reindex - Rebuild the session collection while search stays up.
+
+Builds a shadow collection behind the "discord_sessions__shadow" alias,
+backfills it from Postgres while new sessions are dual-written, then swaps
+the "discord_sessions" alias over in one atomic step.
+
+Deployments whose collections predate aliases (a physical collection under
+the logical name) run 'adopt' once first; it copies each such collection
+into an aliased one.
+
+Usage:
+    python scripts/reindex_qdrant.py adopt             # once, on older deployments
+    python scripts/reindex_qdrant.py start
+    python scripts/reindex_qdrant.py backfill          # or: --async (Celery, low queue)
+    python scripts/reindex_qdrant.py status
+    python scripts/reindex_qdrant.py promote [--drop-previous]
+    python scripts/reindex_qdrant.py abort
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from apps.api.src.services.reindex_service import reindex_service
+
+
+def print_progress(progress) -> None:
+    """Print a reindex job summary."""
+    if progress is None:
+        print("No reindex has been started")
+        return
+
+    print(f"\n  Job:        {progress.job_id}")
+    print(f"  Shadow:     {progress.shadow_collection}")
+    print(f"  Status:     {progress.status}")
+    print(f"  Channels:   {progress.channels_done:,}/{progress.channels_total:,}")
+    print(f"  Messages:   {progress.messages_done:,}/{progress.messages_total:,} ({progress.progress_percentage:.1f}%)")
+    print(f"  Sessions:   {progress.sessions_written:,} written")
+    print(f"  Documents:  {progress.documents_written:,} chunks written")
+    if progress.error:
+        print(f"  Error:      {progress.error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blue/green reindex of the session collection")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("adopt", help="Move collections created before aliases behind an alias (once)")
+
+    subparsers.add_parser("start", help="Create the shadow collection and start dual-writing")
+
+    backfill = subparsers.add_parser("backfill", help="Re-embed existing messages into the shadow")
+    backfill.add_argument("--page-size", type=int, default=500, help="Messages per page")
+    backfill.add_argument("--async", dest="run_async", action="store_true", help="Queue as a Celery task")
+
+    subparsers.add_parser("status", help="Show reindex progress")
+
+    promote = subparsers.add_parser("promote", help="Swap the alias to the shadow collection")
+    promote.add_argument("--drop-previous", action="store_true", help="Delete the previously live collection")
+
+    subparsers.add_parser("abort", help="Drop the shadow collection")
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"BLUE/GREEN REINDEX: {args.command}")
+    print("=" * 60)
+
+    if args.command == "adopt":
+        for name, physical in reindex_service.adopt().items():
+            print(f"  {name}: {'now an alias of ' + physical if physical else 'already an alias'}")
+        print("\n✓ All collections are behind aliases")
+
+    elif args.command == "start":
+        print_progress(reindex_service.start())
+        print("\n✓ Shadow created - new sessions are now dual-written. Run 'backfill' next.")
+
+    elif args.command == "backfill":
+        if args.run_async:
+            from apps.bot.src.tasks import reindex_backfill
+
+            result = reindex_backfill.delay(page_size=args.page_size)
+            print(f"\n✓ Queued reindex_backfill task {result.id}")
+        else:
+            print_progress(reindex_service.backfill(page_size=args.page_size))
+            print("\n✓ Backfill complete. Run 'promote' to switch searches over.")
+
+    elif args.command == "status":
+        print_progress(reindex_service.get_progress())
+
+    elif args.command == "promote":
+        result = reindex_service.promote(drop_previous=args.drop_previous)
+        print(f"\n  Previous:   {result['previous']}")
+        print(f"  Live now:   {result['current']}")
+        print(f"  Repointed:  {result['messages_repointed']:,} messages")
+        print("\n✓ Promoted")
+
+    elif args.command == "abort":
+        shadow = reindex_service.abort()
+        print(f"\n✓ Dropped {shadow or 'nothing (no shadow collection)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from apps.api.src.services.storage_service import storage_service
 from apps.api.src.services.qdrant_service import qdrant_service
+from apps.api.src.services.reindex_service import reindex_service
 
 
 def print_sync_health(guild_id: int) -> None:
@@ -41,6 +42,14 @@ def print_sync_health(guild_id: int) -> None:
         status = "✗ CRITICAL"
     
     print(f"Health Status:   {status}")
+    
+    reindex = reindex_service.get_progress()
+    if reindex and reindex.status != "aborted":
+        print(
+            f"\nReindex ({reindex.shadow_collection}): {reindex.status} - "
+            f"{reindex.messages_done:,}/{reindex.messages_total:,} messages "
+            f"({reindex.progress_percentage:.1f}%)"
+        )
     print("=" * 60)
 
 
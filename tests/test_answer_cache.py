@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Test: /ask answer cache
+
+Uses an in-memory stand-in for Redis and stubbed agents to check that:
+1. Keys depend on guild, scope, intent and the normalized query
+2. A bumped index version makes cached answers unreachable
+3. Conversational, uncacheable and error answers are never stored
+4. Redis errors disable the cache instead of serving stale answers
+5. /ask serves repeated questions from the cache until the guild changes
+6. The bot queues a retry when its invalidation can't reach Redis
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeRedis:
+    """Just enough of redis-py for AnswerCache."""
+
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        raise ConnectionError("redis down")
+
+
+def make_cache():
+    from apps.api.src.core.answer_cache import AnswerCache
+
+    cache = AnswerCache(redis_url="redis://fake", ttl_seconds=60)
+    cache._client = FakeRedis()
+    return cache
+
+
+def make_response(answer="Mostly Python and deploys.", error=False):
+    from packages.shared.python.models import AskResponse, RouterIntent
+
+    return AskResponse(
+        answer=answer, sources=[], routed_to=RouterIntent.VECTOR_RAG, execution_time_ms=900.0, error=error
+    )
+
+
+def test_keys():
+    """Equivalent questions share a key; scope and intent separate them."""
+    print("Testing cache keys...")
+    print("=" * 50)
+
+    from apps.api.src.core.answer_cache import answer_key, channel_scope
+
+    base = answer_key(1, 0, "all", "What's the server about?", "vector_rag")
+    assert answer_key(1, 0, "all", "  what's the SERVER about ", "vector_rag") == base
+    print("✓ Case, whitespace and trailing punctuation are normalized")
+
+    assert channel_scope([3, 2, 3]) == channel_scope([2, 3]) == "2,3"
+    assert channel_scope(None) == "all"
+    others = {
+        answer_key(2, 0, "all", "What's the server about?", "vector_rag"),
+        answer_key(1, 1, "all", "What's the server about?", "vector_rag"),
+        answer_key(1, 0, "2,3", "What's the server about?", "vector_rag"),
+        answer_key(1, 0, "all", "What's the server about?", "analytics_db"),
+    }
+    assert base not in others and len(others) == 4
+    print("✓ Guild, version, channel scope and intent are part of the key")
+
+    print()
+    return True
+
+
+def test_version_bump():
+    """Bumping the index version drops every cached answer of the guild."""
+    print("Testing index version invalidation...")
+    print("=" * 50)
+
+    cache = make_cache()
+    lookup = cache.lookup(1, "who is most active?", "analytics_db")
+    assert lookup.key and lookup.response is None
+    assert cache.store(lookup, make_response())
+
+    hit = cache.lookup(1, "Who is most active", "analytics_db")
+    assert hit.response["answer"] == "Mostly Python and deploys."
+    assert cache.lookup(2, "who is most active?", "analytics_db").response is None
+    print("✓ Stored answer served to the same guild only")
+
+    assert cache.bump_index_version(1) == 1
+    assert cache.lookup(1, "who is most active?", "analytics_db").response is None
+    print("✓ Bump makes the cached answer unreachable")
+
+    # Answer computed while a deletion was processed: stored under the old version
+    racing = cache.lookup(1, "what's new?", "vector_rag")
+    cache.bump_index_version(1)
+    cache.store(racing, make_response())
+    assert cache.lookup(1, "what's new?", "vector_rag").response is None
+    print("✓ An answer computed across a bump is never served")
+
+    print()
+    return True
+
+
+def test_uncacheable():
+    """Conversational, web and error answers are not stored."""
+    print("Testing uncacheable answers...")
+    print("=" * 50)
+
+    cache = make_cache()
+    assert cache.lookup(1, "what did we decide?", "vector_rag", channel_id=7).key is None
+    assert cache.lookup(1, "bitcoin price today", None).key is None
+    print("✓ Requests with channel_id or without a cacheable intent skip the cache")
+
+    lookup = cache.lookup(1, "summarize the server", "vector_rag")
+    assert not cache.store(lookup, make_response("Error generating response: timeout", error=True))
+    assert cache.lookup(1, "summarize the server", "vector_rag").response is None
+    print("✓ Answers flagged as errors are not cached")
+
+    assert cache.store(lookup, make_response("Sorry, nobody has discussed that yet."))
+    assert cache.lookup(1, "summarize the server", "vector_rag").response is not None
+    print("✓ Unflagged answers are cached whatever their wording")
+
+    from apps.api.src.agents import web_search
+
+    search_web = web_search.search_web
+
+    async def no_results(query):
+        return []
+
+    try:
+        web_search.search_web = no_results
+        response = asyncio.run(web_search.process_web_search_query("rust 2.0 release date", guild_id=1))
+    finally:
+        web_search.search_web = search_web
+    assert response.error and response.answer.startswith("I wasn't able to search the web")
+    print("✓ Agents flag their failure answers")
+
+    print()
+    return True
+
+
+def test_redis_failure():
+    """The cache fails closed when Redis is unreachable."""
+    print("Testing Redis failure...")
+    print("=" * 50)
+
+    cache = make_cache()
+    cache.store(cache.lookup(1, "what's the server about?", "vector_rag"), make_response())
+
+    redis = cache._client
+    cache._client = BrokenRedis()
+    assert cache.lookup(1, "what's the server about?", "vector_rag").key is None
+    assert cache.get_stats()["errors"] == 1
+
+    cache._client = redis
+    assert cache.lookup(1, "what's the server about?", "vector_rag").key is None
+    print("✓ Nothing is served or stored, and Redis is skipped for a while")
+
+    try:
+        cache._client = BrokenRedis()
+        cache.bump_index_version(1)
+        raise AssertionError("bump should raise")
+    except ConnectionError:
+        pass
+    print("✓ A failed bump raises so callers can retry")
+
+    print()
+    return True
+
+
+def test_bot_invalidation_retry():
+    """The bot hands a failed bump to Celery instead of dropping it."""
+    print("Testing bot invalidation retry...")
+    print("=" * 50)
+
+    os.environ.setdefault("DISCORD_TOKEN", "test-token")
+    from apps.api.src.core import answer_cache
+    from apps.bot.src import bot
+    from apps.bot.src import tasks
+
+    queued = []
+
+    def apply_async(args=None, countdown=None):
+        queued.append(args)
+
+    saved = (answer_cache._answer_cache, tasks.invalidate_answer_cache.apply_async)
+    try:
+        tasks.invalidate_answer_cache.apply_async = apply_async
+        answer_cache._answer_cache = make_cache()
+        bot.invalidate_cached_answers(1)
+        assert queued == [] and answer_cache._answer_cache.index_version(1) == 1
+        print("✓ A successful bump queues nothing")
+
+        answer_cache._answer_cache._client = BrokenRedis()
+        bot.invalidate_cached_answers(1)
+        assert queued == [[1]], queued
+        print("✓ A failed bump is queued as the invalidate_answer_cache task")
+    finally:
+        answer_cache._answer_cache, tasks.invalidate_answer_cache.apply_async = saved
+
+    print()
+    return True
+
+
+def test_ask_endpoint():
+    """/ask answers a repeated question from the cache until the guild changes."""
+    print("Testing /ask with the answer cache...")
+    print("=" * 50)
+
+    from apps.api.src import main
+    from apps.api.src.core import answer_cache
+    from packages.shared.python.models import AskQuery, RouterIntent
+
+    calls = []
+
+    async def classify_intent(query, route=None):
+        return RouterIntent.ANALYTICS_DB
+
+    async def process_analytics_query(query, guild_id):
+        calls.append(query)
+        return make_response(f"answer {len(calls)}")
+
+    saved = (main.classify_intent, main.process_analytics_query, answer_cache._answer_cache)
+    try:
+        main.classify_intent = classify_intent
+        main.process_analytics_query = process_analytics_query
+        answer_cache._answer_cache = make_cache()
+
+        def ask(text):
+            return asyncio.run(main.ask(AskQuery(guild_id=1, query=text)))
+
+        first = ask("Who is most active?")
+        second = ask("who is most active")
+        assert len(calls) == 1 and second.cached and not first.cached
+        assert second.answer == first.answer == "answer 1"
+        print("✓ Repeated question answered without running the agent")
+
+        answer_cache.bump_index_version(1)
+        third = ask("Who is most active?")
+        assert len(calls) == 2 and not third.cached and third.answer == "answer 2"
+        print("✓ Recomputed after the guild's index version is bumped")
+    finally:
+        main.classify_intent, main.process_analytics_query, answer_cache._answer_cache = saved
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("ANSWER CACHE TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Cache keys", test_keys()))
+    results.append(("Version bump", test_version_bump()))
+    results.append(("Uncacheable answers", test_uncacheable()))
+    results.append(("Redis failure", test_redis_failure()))
+    results.append(("/ask endpoint", test_ask_endpoint()))
+    results.append(("Bot invalidation retry", test_bot_invalidation_retry()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
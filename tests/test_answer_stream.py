@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test: Streaming /ask answers
+
+Uses a fake chat model (no provider) to check that:
+1. ainvoke_answer is a plain ainvoke outside a streaming request
+2. Inside one, tokens are emitted and chunks merged into the full answer
+3. AnswerStream sends route, sources, tokens and the response in order
+4. Pipeline errors end the stream with an error event
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class Chunk:
+    """Minimal message chunk: content concatenates with +."""
+
+    def __init__(self, content):
+        self.content = content
+
+    def __add__(self, other):
+        return Chunk(self.content + other.content)
+
+
+class FakeLLM:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.calls = []
+
+    async def ainvoke(self, messages):
+        self.calls.append("ainvoke")
+        return Chunk("".join(self.tokens))
+
+    async def astream(self, messages):
+        self.calls.append("astream")
+        for token in self.tokens:
+            await asyncio.sleep(0)
+            yield Chunk(token)
+
+
+class Result:
+    def __init__(self, answer):
+        self.answer = answer
+
+    def model_dump(self, mode=None):
+        return {"answer": self.answer}
+
+
+def collect(stream, work) -> list[dict]:
+    async def run():
+        return [json.loads(line) async for line in stream.ndjson(work)]
+    return asyncio.run(run())
+
+
+def test_ainvoke_without_stream():
+    """/ask keeps the single ainvoke call."""
+    print("Testing ainvoke_answer outside a stream...")
+    print("=" * 50)
+
+    from apps.api.src.core.answer_stream import ainvoke_answer, current_stream, emit
+
+    llm = FakeLLM(["Hel", "lo"])
+    emit("route", routed_to="vector_rag")  # No-op without a stream
+    response = asyncio.run(ainvoke_answer(llm, []))
+
+    assert current_stream() is None
+    assert response.content == "Hello" and llm.calls == ["ainvoke"]
+    print("✓ No stream bound: plain ainvoke, emit() is a no-op")
+
+    print()
+    return True
+
+
+def test_event_order():
+    """Metadata first, then tokens, then the final response."""
+    print("Testing NDJSON event order...")
+    print("=" * 50)
+
+    from apps.api.src.core.answer_stream import AnswerStream, ainvoke_answer, emit
+
+    llm = FakeLLM(["The deploy ", "finished ", "at noon."])
+    merged = {}
+
+    async def pipeline():
+        emit("route", routed_to="vector_rag")
+        emit("sources", sources=[{"channel_id": "7"}])
+        response = await ainvoke_answer(llm, [])
+        merged["content"] = response.content
+        return Result(response.content)
+
+    events = collect(AnswerStream(), pipeline())
+    types = [event["type"] for event in events]
+
+    assert types == ["route", "sources", "token", "token", "token", "done"], types
+    assert llm.calls == ["astream"]
+    print(f"✓ Events: {' -> '.join(types)}")
+
+    tokens = "".join(event["text"] for event in events if event["type"] == "token")
+    assert tokens == merged["content"] == "The deploy finished at noon."
+    assert events[-1]["response"] == {"answer": "The deploy finished at noon."}
+    print("✓ Tokens add up to the merged answer in the final response")
+
+    print()
+    return True
+
+
+def test_block_content():
+    """Chunks with content blocks (e.g. thinking) stream only their text."""
+    print("Testing content-block chunks...")
+    print("=" * 50)
+
+    from apps.api.src.core.answer_stream import _chunk_text
+
+    chunk = Chunk([{"type": "thinking", "thinking": "hmm"}, {"type": "text", "text": "Yes."}])
+    assert _chunk_text(chunk) == "Yes."
+    assert _chunk_text(Chunk("")) == ""
+    print("✓ Only text blocks are sent as tokens")
+
+    print()
+    return True
+
+
+def test_error_event():
+    """A failing pipeline ends the stream with its error."""
+    print("Testing error event...")
+    print("=" * 50)
+
+    from apps.api.src.core.answer_stream import AnswerStream, emit
+
+    class HTTPError(Exception):
+        detail = "Query processing failed: boom"
+
+    async def pipeline():
+        emit("route", routed_to="web_search")
+        raise HTTPError()
+
+    events = collect(AnswerStream(), pipeline())
+    assert [event["type"] for event in events] == ["route", "error"], events
+    assert events[-1]["detail"] == "Query processing failed: boom"
+    print("✓ Error detail sent as the last event")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("ANSWER STREAM TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("ainvoke without stream", test_ainvoke_without_stream()))
+    results.append(("Event order", test_event_order()))
+    results.append(("Content blocks", test_block_content()))
+    results.append(("Error event", test_error_event()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
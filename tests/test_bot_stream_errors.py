@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Test: Streamed replies that fail part way
+
+Replaces stream_ask with one that renders a partial answer and then fails,
+and checks that:
+1. An @mention reply is edited into the error instead of a second message
+2. /ai ask edits its original response instead of sending a followup
+3. Without any streamed tokens, both still report the error as before
+"""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("DISCORD_TOKEN", "test-token")
+
+
+def failing_stream(partial):
+    """stream_ask stand-in: renders `partial` (if any), then the API fails."""
+
+    async def stream_ask(payload, render):
+        if partial:
+            await render(partial, {"routed_to": "vector_rag", "sources": []})
+        raise ConnectionError("API went away")
+
+    return stream_ask
+
+
+class FakeTyping:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeMessage:
+    """Enough of discord.Message for handle_mention and edits."""
+
+    def __init__(self, content="", parent=None):
+        self.content = content
+        self.mentions = []
+        self.attachments = []
+        self.guild = type("Guild", (), {"id": 1})()
+        self.channel = type("Channel", (), {"id": 10, "typing": lambda self: FakeTyping()})()
+        self.replies = parent.replies if parent else []
+        self.embed = None
+
+    async def reply(self, content=None, embed=None):
+        message = FakeMessage(parent=self)
+        message.content, message.embed = content, embed
+        self.replies.append(message)
+        return message
+
+    async def edit(self, content=None, embed=None):
+        self.embed = embed
+
+
+class FakeInteraction:
+    """Enough of discord.Interaction for ai_ask."""
+
+    def __init__(self):
+        self.guild = type("Guild", (), {"id": 1, "channels": []})()
+        self.embed = None
+        self.followups = []
+
+        async def defer(thinking=False):
+            pass
+
+        async def send(content=None, ephemeral=False):
+            self.followups.append(content)
+
+        self.response = type("Response", (), {"defer": staticmethod(defer)})()
+        self.followup = type("Followup", (), {"send": staticmethod(send)})()
+
+    async def edit_original_response(self, embed=None):
+        self.embed = embed
+
+
+def run_with_stream(stream, coroutine_factory):
+    from apps.bot.src import bot as bot_module
+
+    original = bot_module.stream_ask
+    bot_module.stream_ask = stream
+    try:
+        asyncio.run(coroutine_factory(bot_module))
+    finally:
+        bot_module.stream_ask = original
+
+
+def test_mention_stream_error():
+    """A half-streamed mention reply becomes the error message."""
+    print("Testing @mention stream failure...")
+    print("=" * 50)
+
+    from apps.bot.src.ask_stream import CURSOR
+
+    message = FakeMessage("<@99> why did the deploy fail?")
+    run_with_stream(failing_stream("The deploy failed because"), lambda bot: bot.handle_mention(message))
+
+    assert len(message.replies) == 1, [r.content for r in message.replies]
+    description = message.replies[0].embed.description
+    assert description.startswith("The deploy failed because") and "API went away" in description
+    assert CURSOR not in description
+    print("✓ The streamed reply was edited into the error, no cursor left, no second message")
+
+    message = FakeMessage("<@99> why did the deploy fail?")
+    run_with_stream(failing_stream(""), lambda bot: bot.handle_mention(message))
+    assert [r.content for r in message.replies] == ["Sorry, I encountered an error: API went away"]
+    print("✓ Nothing streamed yet: error posted as a reply")
+
+    print()
+    return True
+
+
+def test_ai_ask_stream_error():
+    """A half-streamed /ai ask response becomes the error message."""
+    print("Testing /ai ask stream failure...")
+    print("=" * 50)
+
+    from apps.bot.src.ask_stream import CURSOR
+
+    interaction = FakeInteraction()
+    run_with_stream(
+        failing_stream("Three people discussed"),
+        lambda bot: bot.ai_ask.callback(interaction, "who talked about the deploy?"),
+    )
+    assert interaction.followups == []
+    description = interaction.embed.description
+    assert description.startswith("Three people discussed") and "API went away" in description
+    assert CURSOR not in description
+    print("✓ Original response edited into the error, no followup")
+
+    interaction = FakeInteraction()
+    run_with_stream(failing_stream(""), lambda bot: bot.ai_ask.callback(interaction, "who?"))
+    assert interaction.followups == ["Error processing your question: API went away"]
+    print("✓ Nothing streamed yet: error sent as a followup")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("BOT STREAM ERROR TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("@mention stream failure", test_mention_stream_error()))
+    results.append(("/ai ask stream failure", test_ai_ask_stream_error()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Test: Token-budgeted context assembly
+
+Uses a whitespace "tokenizer" (one token per word) to check that:
+1. Items are kept by score within the budget and rendered in order
+2. Duplicates (by content, across sections) are dropped and the crossing
+   item is cut to fit
+3. RAG context splits the budget between recent messages and chunks
+4. The real token counter falls back to an estimate without tiktoken files
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+from apps.api.src.core.context_budget import (
+    ContextAssembler,
+    ContextItem,
+    TokenCounter,
+)
+
+
+class WordCounter(TokenCounter):
+    """One token per whitespace-separated word."""
+
+    def __init__(self):
+        self.model = "words"
+        self._encoding = None
+
+    def count(self, text):
+        return len(text.split())
+
+    def truncate(self, text, max_tokens):
+        return " ".join(text.split()[:max_tokens])
+
+
+def words(n, word="w"):
+    return " ".join(f"{word}{i}" for i in range(n))
+
+
+def test_fill_by_score():
+    """Best-scoring items win; output keeps the rendering order."""
+    print("Testing budget fill by score...")
+    print("=" * 50)
+
+    assembler = ContextAssembler(WordCounter())
+    items = [
+        ContextItem(text=words(40, "a"), score=0.2, order=0),
+        ContextItem(text=words(40, "b"), score=0.9, order=1),
+        ContextItem(text=words(40, "c"), score=0.5, order=2),
+    ]
+    context = assembler.assemble(items, budget=85, separator_tokens=1)
+    assert [item.text[:1] for item in context.items] == ["b", "c"], context.texts
+    assert context.tokens <= 85 and context.dropped == 1
+    print(f"✓ Kept the two best of three within 85 tokens ({context.tokens} used)")
+
+    # The lowest-scoring item is cut to the room left
+    items = [ContextItem(text=words(40, "a"), score=0.2, order=0), ContextItem(text=words(40, "b"), score=0.9, order=1)]
+    context = assembler.assemble(items, budget=80, separator_tokens=1)
+    assert [item.text[:1] for item in context.items] == ["a", "b"]
+    assert context.items[0].truncated and assembler.count(context.items[0].text) == 38
+    assert context.tokens == 80
+    print("✓ Crossing item truncated to fit, rendered in original order")
+
+    print()
+    return True
+
+
+def test_duplicates():
+    """Repeated texts (ignoring case/whitespace) are kept once, across sections."""
+    print("Testing duplicate removal...")
+    print("=" * 50)
+
+    assembler = ContextAssembler(WordCounter())
+    seen = set()
+    first = assembler.assemble([ContextItem(text="Deploy is  done")], budget=100, seen=seen)
+    second = assembler.assemble(
+        [
+            ContextItem(text="deploy is done", prefix="[Relevance: 0.90]\n", score=0.9),
+            ContextItem(text="rollback planned", prefix="[Relevance: 0.80]\n", score=0.8),
+            ContextItem(text="Rollback planned", prefix="[Relevance: 0.70]\n", score=0.7),
+        ],
+        budget=100,
+        seen=seen,
+    )
+    assert len(first.items) == 1
+    assert second.texts == ["[Relevance: 0.80]\nrollback planned"], second.texts
+    assert second.duplicates == 2
+    print("✓ Duplicate of a recent message and a repeated chunk dropped")
+
+    from apps.api.src.agents.vector_rag import assemble_rag_context
+
+    context = assemble_rag_context(
+        [{"id": "1", "score": 0.9, "payload": {"content": "The deploy is  DONE"}}],
+        recent_messages=[
+            {"author_name": "ana", "content": "the deploy is done", "timestamp": None},
+            {"author_name": "bob", "content": "The deploy is done", "timestamp": None},
+        ],
+        budget_tokens=200,
+        assembler=assembler,
+    )
+    assert context.recent.texts == ["[] bob: The deploy is done"], context.recent.texts
+    assert context.chunks.items == [] and context.chunks.duplicates == 1
+    print("✓ Recent messages deduplicated on their content, not the [HH:MM] author line")
+
+    print()
+    return True
+
+
+def test_rag_context():
+    """Recent messages take their share newest-first; chunks get the rest."""
+    print("Testing RAG context assembly...")
+    print("=" * 50)
+
+    from apps.api.src.agents.vector_rag import assemble_rag_context
+
+    messages = [{"author_name": "ana", "content": words(10, f"m{i}_"), "timestamp": None} for i in range(10)]
+    chunks = [
+        {"id": str(i), "score": score, "payload": {"content": words(30, f"c{i}_")}}
+        for i, score in enumerate([0.3, 0.9, 0.6])
+    ]
+
+    context = assemble_rag_context(
+        chunks, messages, budget_tokens=110, recent_share=0.4, assembler=ContextAssembler(WordCounter())
+    )
+    # Each message line is 12 words + separator: 3 fit in 44 tokens
+    recent_lines = context.recent_text.split("\n")
+    assert len(recent_lines) == 3 and "m7_" in recent_lines[0] and "m9_" in recent_lines[2], recent_lines
+    print("✓ Newest 3 messages kept, oldest first")
+
+    kept = [item.source["id"] for item in context.chunks.items]
+    assert kept == ["1", "2"], kept
+    assert context.tokens <= 110 and context.chunks.dropped == 1
+    assert context.chunk_text.startswith("[Relevance: 0.90]")
+    print(f"✓ Chunks by relevance within the remaining budget ({context.tokens}/110 tokens)")
+
+    print()
+    return True
+
+
+def test_token_counter_fallback():
+    """Without a usable tokenizer, counts are ~4 characters per token."""
+    print("Testing token counter fallback...")
+    print("=" * 50)
+
+    counter = TokenCounter("claude-sonnet-4-20250514")
+    text = "the deploy failed on friday " * 20
+    count = counter.count(text)
+    assert count > 0
+    truncated = counter.truncate(text, 10)
+    assert counter.count(truncated) <= 10, counter.count(truncated)
+    kind = "tiktoken" if counter.exact else "estimate"
+    print(f"✓ {count} tokens ({kind}); truncation stays within the limit")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("CONTEXT BUDGET TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Fill by score", test_fill_by_score()))
+    results.append(("Duplicates", test_duplicates()))
+    results.append(("RAG context", test_rag_context()))
+    results.append(("Token counter", test_token_counter_fallback()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
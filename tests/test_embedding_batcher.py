@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Test: Embedding micro-batcher
+
+Checks that:
+1. Concurrent requests are embedded in one batched call
+2. Each caller gets its own vector back (identical texts embedded once)
+3. A full batch flushes without waiting for the window
+4. Errors from the batched call reach every waiting caller
+5. Running batches are referenced until they finish
+6. HybridEmbeddingModel.aembed_query keeps model work off the event loop
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class RecordingModel:
+    """Embeds text as [len(text)] and records each batch."""
+
+    def __init__(self, fail: bool = False):
+        self.batches = []
+        self.fail = fail
+
+    def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return [[float(len(text))] for text in texts]
+
+
+def test_concurrent_requests_share_a_batch():
+    """Requests arriving within the window go out as one call."""
+    print("Testing request coalescing...")
+    print("=" * 50)
+
+    from apps.api.src.core.embedding_batcher import EmbeddingBatcher
+
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model.embed_batch, max_wait_ms=20)
+    texts = ["a", "bb", "ccc", "bb"]
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed(text) for text in texts))
+
+    vectors = asyncio.run(run())
+    assert vectors == [[1.0], [2.0], [3.0], [2.0]], vectors
+    print("✓ Each caller received its own vector")
+
+    assert model.batches == [["a", "bb", "ccc"]], model.batches
+    print("✓ 4 requests -> 1 batched call, duplicate text embedded once")
+
+    print()
+    return True
+
+
+def test_full_batch_flushes_early():
+    """Reaching max_batch_size doesn't wait for the window."""
+    print("Testing early flush...")
+    print("=" * 50)
+
+    import time
+    from apps.api.src.core.embedding_batcher import EmbeddingBatcher
+
+    model = RecordingModel()
+    batcher = EmbeddingBatcher(model.embed_batch, max_wait_ms=5000, max_batch_size=3)
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed(str(i)) for i in range(3)))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    assert elapsed < 1.0, f"Waited {elapsed:.2f}s for a full batch"
+    assert len(model.batches) == 1
+    print(f"✓ Full batch flushed in {elapsed * 1000:.0f}ms (window 5000ms)")
+
+    print()
+    return True
+
+
+def test_errors_reach_every_caller():
+    """A failing batch fails each waiting request instead of hanging it."""
+    print("Testing error propagation...")
+    print("=" * 50)
+
+    from apps.api.src.core.embedding_batcher import EmbeddingBatcher
+
+    batcher = EmbeddingBatcher(RecordingModel(fail=True).embed_batch, max_wait_ms=5)
+
+    async def run():
+        return await asyncio.gather(*(batcher.embed(text) for text in ["x", "y"]), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results), results
+    print("✓ Both callers received the model error")
+
+    print()
+    return True
+
+
+def test_running_batches_are_referenced():
+    """The batcher holds each batch task until it is done, then drops it."""
+    print("Testing batch task references...")
+    print("=" * 50)
+
+    from apps.api.src.core.embedding_batcher import EmbeddingBatcher
+
+    batcher = EmbeddingBatcher(RecordingModel().embed_batch, max_wait_ms=1, max_batch_size=1)
+
+    async def run():
+        waiter = asyncio.ensure_future(batcher.embed("a"))
+        await asyncio.sleep(0)
+        held = set(batcher._tasks)
+        await waiter
+        await asyncio.sleep(0)
+        return held
+
+    held = asyncio.run(run())
+    assert len(held) == 1, held
+    print("✓ Running batch task is held by the batcher")
+
+    assert batcher._tasks == set(), batcher._tasks
+    print("✓ Reference dropped once the batch finished")
+
+    print()
+    return True
+
+
+def test_hybrid_aembed_query_off_loop():
+    """Model loading, BM25 and ColBERT query encodes run in worker threads."""
+    print("Testing hybrid aembed_query threading...")
+    print("=" * 50)
+
+    import threading
+    from apps.api.src.services.hybrid_embedding import HybridEmbeddingModel
+
+    threads = {}
+
+    class DenseModel:
+        async def aembed_query(self, text):
+            threads["dense"] = threading.get_ident()
+            return [1.0]
+
+    class Model(HybridEmbeddingModel):
+        def _ensure_models(self):
+            threads["ensure"] = threading.get_ident()
+            self._dense_model = DenseModel()
+            self._initialized = True
+
+        def _sparse_query(self, text):
+            threads["sparse"] = threading.get_ident()
+            return [7], [0.5]
+
+        def _multivector_query(self, text):
+            threads["multivector"] = threading.get_ident()
+            return [[0.1]]
+
+    async def run():
+        return threading.get_ident(), await Model().aembed_query("hello")
+
+    loop_thread, embedding = asyncio.run(run())
+    assert embedding.dense == [1.0] and embedding.sparse_indices == [7] and embedding.multivector == [[0.1]]
+    assert threads["dense"] == loop_thread
+    for name in ("ensure", "sparse", "multivector"):
+        assert threads[name] != loop_thread, name
+    print("✓ _ensure_models, _sparse_query and _multivector_query ran off the event loop")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("EMBEDDING BATCHER TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Request coalescing", test_concurrent_requests_share_a_batch()))
+    results.append(("Early flush", test_full_batch_flushes_early()))
+    results.append(("Error propagation", test_errors_reach_every_caller()))
+    results.append(("Batch task references", test_running_batches_are_referenced()))
+    results.append(("Hybrid aembed_query threading", test_hybrid_aembed_query_off_loop()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
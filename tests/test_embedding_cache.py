@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Test: Content-hash embedding cache
+
+Checks that:
+1. Keys depend on provider, model, input type and text content
+2. The local LRU serves repeats and evicts the least recently used entry
+3. Vectors round-trip through float16 storage
+4. The shared tier is consulted on a local miss and trims to its byte budget
+5. A failing shared tier falls back to local-only instead of raising
+6. EmbeddingModel embeds only uncached texts, each once per batch, and
+   returns the same vector for a hit as for the miss that stored it
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeRedis:
+    """Just enough of redis-py for RedisEmbeddingCache."""
+
+    def __init__(self):
+        self.values = {}
+        self.index = {}
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def zadd(self, name, mapping):
+        self.index.update(mapping)
+
+    def zcard(self, name):
+        return len(self.index)
+
+    def zpopmin(self, name, count):
+        oldest = sorted(self.index.items(), key=lambda item: item[1])[:count]
+        for key, _ in oldest:
+            del self.index[key]
+        return oldest
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def execute(self):
+        return []
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        raise ConnectionError("redis down")
+
+
+def test_cache_keys():
+    """Same text under another model or input type is a different entry."""
+    print("Testing cache keys...")
+    print("=" * 50)
+
+    from apps.api.src.core.embedding_cache import cache_key
+
+    key = cache_key("local", "all-MiniLM-L6-v2", "query", "what's new")
+    assert key == cache_key("local", "all-MiniLM-L6-v2", "query", "what's new")
+    assert key != cache_key("local", "all-mpnet-base-v2", "query", "what's new")
+    assert key != cache_key("voyage", "all-MiniLM-L6-v2", "query", "what's new")
+    assert key != cache_key("local", "all-MiniLM-L6-v2", "document", "what's new")
+    assert "what's new" not in key
+    print("✓ Keys cover provider, model, input type and content hash")
+
+    print()
+    return True
+
+
+def test_local_lru():
+    """Local tier serves repeats and evicts the oldest entry."""
+    print("Testing local LRU tier...")
+    print("=" * 50)
+
+    from apps.api.src.core.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(local_entries=2)
+    cache.put_many({"a": [1.0, 0.0], "b": [0.0, 1.0]})
+    assert cache.get_many(["a"]) == [[1.0, 0.0]]  # "a" is now most recent
+    cache.put_many({"c": [0.5, 0.5]})
+
+    assert cache.get_many(["a", "b", "c"]) == [[1.0, 0.0], None, [0.5, 0.5]]
+    stats = cache.get_stats()
+    assert stats["local_hits"] == 3 and stats["misses"] == 1, stats
+    assert stats["evictions"] == 1, stats
+    print(f"✓ Least recently used entry evicted (hit rate {stats['hit_rate']:.0%})")
+
+    print()
+    return True
+
+
+def test_float16_storage():
+    """Vectors are stored at half precision with negligible error."""
+    print("Testing float16 storage...")
+    print("=" * 50)
+
+    import numpy as np
+    from apps.api.src.core.embedding_cache import decode_vector, encode_vector
+
+    vector = np.random.default_rng(0).standard_normal(384).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+    data = encode_vector(vector.tolist())
+    assert len(data) == 384 * 2, len(data)
+
+    restored = np.array(decode_vector(data))
+    cosine = float(restored @ vector / np.linalg.norm(restored))
+    assert cosine > 0.9999, cosine
+    print(f"✓ 384-dim vector in {len(data)} bytes, cosine to original {cosine:.6f}")
+
+    print()
+    return True
+
+
+def test_shared_tier():
+    """Local misses fall through to the shared tier, which trims itself."""
+    print("Testing shared tier...")
+    print("=" * 50)
+
+    from apps.api.src.core import embedding_cache
+    from apps.api.src.core.embedding_cache import EmbeddingCache
+
+    redis = FakeRedis()
+
+    # Another process wrote the vector; this one only has it in Redis
+    writer = EmbeddingCache(local_entries=10, redis_url="redis://fake", shared_max_bytes=4 * 8)
+    writer.shared._client = redis
+    writer.put_many({"a": [1.0, 2.0, 3.0, 4.0]})
+
+    reader = EmbeddingCache(local_entries=10, redis_url="redis://fake", shared_max_bytes=4 * 8)
+    reader.shared._client = redis
+    assert reader.get_many(["a"]) == [[1.0, 2.0, 3.0, 4.0]]
+    assert reader.get_many(["a"]) == [[1.0, 2.0, 3.0, 4.0]]
+    stats = reader.get_stats()
+    assert stats["shared_hits"] == 1 and stats["local_hits"] == 1, stats
+    print("✓ Shared hit promoted into the local tier")
+
+    # 8-byte entries, 32-byte budget -> 4 entries survive a trim
+    writer.put_many({f"k{i}": [float(i)] * 4 for i in range(embedding_cache.TRIM_EVERY)})
+    assert len(redis.index) == 4, len(redis.index)
+    assert set(redis.values) == set(redis.index)
+    print(f"✓ Shared tier trimmed to its byte budget ({len(redis.index)} entries)")
+
+    print()
+    return True
+
+
+def test_shared_tier_failure():
+    """Redis errors degrade to local-only caching."""
+    print("Testing shared tier failure...")
+    print("=" * 50)
+
+    from apps.api.src.core.embedding_cache import EmbeddingCache
+
+    cache = EmbeddingCache(local_entries=10, redis_url="redis://fake")
+    cache.shared._client = BrokenRedis()
+    cache.put_many({"a": [1.0]})
+    assert cache.get_many(["a", "b"]) == [[1.0], None]
+    assert cache.get_stats()["shared_errors"] == 1
+    print("✓ Local tier keeps working, shared tier skipped after one error")
+
+    print()
+    return True
+
+
+def make_model(provider="local", model="all-MiniLM-L6-v2"):
+    """EmbeddingModel with a local-only cache and no provider set up."""
+    from types import SimpleNamespace
+    from apps.api.src.core.config import EmbeddingProvider
+    from apps.api.src.core.embedding_cache import EmbeddingCache
+    from apps.api.src.core.llm_factory import EmbeddingModel
+
+    embedding_model = EmbeddingModel.__new__(EmbeddingModel)
+    embedding_model.settings = SimpleNamespace(
+        active_embedding_provider=EmbeddingProvider(provider),
+        active_embedding_model=model,
+    )
+    embedding_model._cache = EmbeddingCache(local_entries=100)
+    return embedding_model
+
+
+class RecordingEmbed:
+    """Provider stand-in: full-precision vectors, records what it was asked."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[len(text) / 3, 0.1, 1 / 7] for text in texts]
+
+    async def aembed(self, texts):
+        return self(texts)
+
+
+def test_embedding_model_cache():
+    """_cached() dedupes, keys by provider/model/input type, and is hit/miss consistent."""
+    print("Testing EmbeddingModel caching...")
+    print("=" * 50)
+
+    import asyncio
+    import numpy as np
+
+    embedding_model = make_model()
+    embed = RecordingEmbed()
+
+    first = embedding_model._cached("query", ["hello", "world", "hello"], embed)
+    assert embed.calls == [["hello", "world"]], embed.calls
+    assert first[0] == first[2]
+    print("✓ A text repeated within one batch is embedded once")
+
+    again = embedding_model._cached("query", ["world", "hello", "new"], embed)
+    assert embed.calls[1:] == [["new"]], embed.calls
+    assert again[:2] == [first[1], first[0]]
+    print("✓ Only uncached texts reach the provider")
+
+    expected = np.asarray(embed(["hello"])[0], dtype=np.float16).astype(np.float32).tolist()
+    assert first[0] == expected, (first[0], expected)
+    print("✓ Miss and hit return the same float16-rounded vector")
+
+    embed.calls.clear()
+    embedding_model._cached("document", ["hello"], embed)
+    embedding_model.settings.active_embedding_model = "all-mpnet-base-v2"
+    embedding_model._cached("query", ["hello"], embed)
+    other_provider = make_model(provider="voyage")
+    other_provider._cache = embedding_model._cache
+    other_provider._cached("query", ["hello"], embed)
+    assert embed.calls == [["hello"]] * 3, embed.calls
+    print("✓ Input type, model and provider each get their own entries")
+
+    embedding_model = make_model()
+    embed = RecordingEmbed()
+    miss = asyncio.run(embedding_model._acached("document", ["a", "b", "a"], embed.aembed))
+    hit = asyncio.run(embedding_model._acached("document", ["b", "a"], embed.aembed))
+    assert embed.calls == [["a", "b"]], embed.calls
+    assert hit == [miss[1], miss[0]]
+    print("✓ Async path: same dedupe and hit/miss consistency")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("EMBEDDING CACHE TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Cache keys", test_cache_keys()))
+    results.append(("Local LRU", test_local_lru()))
+    results.append(("float16 storage", test_float16_storage()))
+    results.append(("Shared tier", test_shared_tier()))
+    results.append(("Shared tier failure", test_shared_tier_failure()))
+    results.append(("EmbeddingModel caching", test_embedding_model_cache()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
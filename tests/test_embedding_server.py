@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Test: Shared embedding server and its client
+
+Runs the server app in-process (FastAPI TestClient) with small stand-in
+models, and checks that:
+1. Dense, sparse and rerank requests round-trip through the client
+2. Model name aliases share one loaded model and one batcher
+3. Server errors surface as EmbeddingServerError
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeDenseModel:
+    """Stands in for SentenceTransformer: [len, vowels, 1] per text."""
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=False):
+        import numpy as np
+
+        vectors = np.array([[len(t), sum(c in "aeiou" for c in t), 1.0] for t in texts], dtype=np.float32)
+        if normalize_embeddings:
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors
+
+
+class FakeSparse:
+    def __init__(self, indices, values):
+        import numpy as np
+
+        self.indices = np.array(indices)
+        self.values = np.array(values)
+
+
+class FakeBM25:
+    def query_embed(self, text):
+        yield FakeSparse([len(text)], [1.0])
+
+    def passage_embed(self, texts):
+        return [FakeSparse([len(text)], [0.5]) for text in texts]
+
+
+def make_client():
+    from fastapi.testclient import TestClient
+    from apps.api.src.services import embedding_server
+    from apps.api.src.services.embedding_client import EmbeddingServerClient
+
+    embedding_server.pool._dense["all-MiniLM-L6-v2"] = FakeDenseModel()
+    embedding_server.pool._sparse = FakeBM25()
+
+    client = EmbeddingServerClient("http://testserver")
+    client._client = TestClient(embedding_server.app)
+    return client
+
+
+def test_round_trips():
+    """Each endpoint returns what the in-process model would."""
+    print("Testing server round trips...")
+    print("=" * 50)
+
+    client = make_client()
+
+    assert client.embed_dense(["hello"], "all-MiniLM-L6-v2", input_type="query") == [[5.0, 2.0, 1.0]]
+    assert client.embed_dense(["ab", "abc"], "all-MiniLM-L6-v2") == [[2.0, 1.0, 1.0], [3.0, 1.0, 1.0]]
+    print("✓ Dense: single query (batched path) and document batch")
+
+    assert client.embed_sparse(["abcd"], input_type="query") == [([4], [1.0])]
+    assert client.embed_sparse(["ab", "abc"]) == [([2], [0.5]), ([3], [0.5])]
+    print("✓ Sparse: query and passage weighting")
+
+    scores = client.rerank("hello", ["hello", "xyz"], "sentence-transformers/all-MiniLM-L6-v2")
+    assert len(scores) == 2 and abs(scores[0] - 1.0) < 1e-5 and scores[1] < scores[0], scores
+    print("✓ Rerank: prefixed model name reuses the loaded model")
+
+    health = client.health()
+    assert health["models"]["dense"] == ["all-MiniLM-L6-v2"], health
+    print("✓ One dense model loaded for both names")
+
+    from apps.api.src.services import embedding_server
+
+    client.embed_dense(["hi"], "sentence-transformers/all-MiniLM-L6-v2", input_type="document")
+    assert list(embedding_server.pool._batchers) == ["all-MiniLM-L6-v2"], embedding_server.pool._batchers
+    print("✓ Single-text queries and documents share one batcher per model")
+
+    print()
+    return True
+
+
+def test_errors():
+    """Failures become EmbeddingServerError, not silent empty results."""
+    print("Testing error handling...")
+    print("=" * 50)
+
+    from apps.api.src.services import embedding_server
+    from apps.api.src.services.embedding_client import EmbeddingServerClient, EmbeddingServerError
+
+    client = make_client()
+    original = embedding_server.pool.dense_model
+
+    def fail(model):
+        raise RuntimeError(f"no such model: {model}")
+
+    embedding_server.pool.dense_model = fail
+    try:
+        client.embed_dense(["a", "b"], "broken-model")
+        raise AssertionError("Expected EmbeddingServerError")
+    except EmbeddingServerError as e:
+        assert "500" in str(e), e
+    finally:
+        embedding_server.pool.dense_model = original
+    print("✓ Server error raised to the caller")
+
+    unreachable = EmbeddingServerClient("unix:///nonexistent/embedding.sock", timeout=1.0)
+    assert unreachable.health()["status"] == "unreachable"
+    print("✓ Unreachable server reported by health()")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("EMBEDDING SERVER TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Round trips", test_round_trips()))
+    results.append(("Errors", test_errors()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
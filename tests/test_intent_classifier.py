@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Test: Embedding intent classifier
+
+Uses a bag-of-words embedder (no model) to check that:
+1. Queries are assigned to the nearest intent centroid with a confidence
+2. classify_intent only asks the LLM below the confidence threshold
+3. Classifier and LLM results are cached per normalized query
+4. The shipped example set covers every intent and the repro routing cases
+5. A settings change rebuilds the classifier; failed fits back off
+"""
+
+import asyncio
+import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+EXAMPLES = {
+    "analytics_db": ["who posts the most", "busiest channel ranking", "posts per day ranking"],
+    "vector_rag": ["what did we decide about the release", "did anyone fix the login bug"],
+    "web_search": ["weather in berlin today", "price of bitcoin today"],
+}
+
+
+class BagOfWords:
+    """Word-count embeddings over a fixed vocabulary."""
+
+    def __init__(self, texts):
+        words = sorted({word for text in texts for word in self.words(text)})
+        self.index = {word: i for i, word in enumerate(words)}
+        self.calls = 0
+
+    @staticmethod
+    def words(text):
+        return re.findall(r"[a-z]+", text.lower())
+
+    def embed(self, text):
+        vector = [0.0] * (len(self.index) + 1)
+        vector[-1] = 0.01  # Unknown words only: near-uniform similarities
+        for word in self.words(text):
+            if word in self.index:
+                vector[self.index[word]] += 1.0
+        return vector
+
+    def embed_queries(self, texts):
+        return [self.embed(text) for text in texts]
+
+    async def aembed_query(self, text):
+        self.calls += 1
+        return self.embed(text)
+
+
+def make_classifier():
+    from apps.api.src.agents.intent_classifier import EmbeddingIntentClassifier
+    from packages.shared.python.models import RouterIntent
+
+    examples = {RouterIntent(intent): texts for intent, texts in EXAMPLES.items()}
+    embedder = BagOfWords([text for texts in EXAMPLES.values() for text in texts])
+    classifier = EmbeddingIntentClassifier(
+        examples,
+        embed_queries=embedder.embed_queries,
+        aembed_query=embedder.aembed_query,
+    )
+    return classifier, embedder
+
+
+def test_nearest_centroid():
+    """Queries go to the closest centroid; vague ones get low confidence."""
+    print("Testing nearest-centroid classification...")
+    print("=" * 50)
+
+    from packages.shared.python.models import RouterIntent
+
+    classifier, _ = make_classifier()
+    prediction = asyncio.run(classifier.aclassify("Who posts the most?"))
+    assert classifier.fitted
+    assert prediction.intent == RouterIntent.ANALYTICS_DB, prediction
+    assert prediction.confidence > 0.9, prediction
+    print(f"✓ 'Who posts the most?' -> {prediction.intent.value} ({prediction.confidence:.2f})")
+
+    prediction = asyncio.run(classifier.aclassify("did anyone decide on the login fix"))
+    assert prediction.intent == RouterIntent.VECTOR_RAG, prediction
+    print(f"✓ Unseen phrasing -> {prediction.intent.value} ({prediction.confidence:.2f})")
+
+    vague = asyncio.run(classifier.aclassify("hmm"))
+    assert vague.confidence < 0.6, vague
+    assert set(vague.scores) == set(EXAMPLES)
+    print(f"✓ Query with no known words is low confidence ({vague.confidence:.2f})")
+
+    print()
+    return True
+
+
+def test_llm_fallback_and_cache():
+    """The LLM only runs when the classifier is unsure; results are cached."""
+    print("Testing LLM fallback and classification cache...")
+    print("=" * 50)
+
+    from apps.api.src.agents import intent_classifier, router
+    from apps.api.src.agents.intent_classifier import IntentCache
+    from apps.api.src.core.config import get_settings_version
+    from packages.shared.python.models import RouterIntent
+
+    classifier, embedder = make_classifier()
+    llm_calls = []
+    llm_answer = {"intent": RouterIntent.GENERAL_KNOWLEDGE}
+
+    async def classify_with_llm(query):
+        llm_calls.append(query)
+        return llm_answer["intent"]
+
+    saved = (router._classify_with_llm, intent_classifier._classifiers, intent_classifier._intent_cache)
+    try:
+        router._classify_with_llm = classify_with_llm
+        intent_classifier._classifiers = {get_settings_version(): classifier}
+        intent_classifier._intent_cache = IntentCache(16)
+
+        intent = asyncio.run(router.classify_intent("Who posts the most per day"))
+        assert intent == RouterIntent.ANALYTICS_DB and not llm_calls
+        print("✓ Confident classification skips the LLM")
+
+        intent = asyncio.run(router.classify_intent("Write me a limerick"))
+        assert intent == RouterIntent.GENERAL_KNOWLEDGE and llm_calls == ["Write me a limerick"]
+        print("✓ Low confidence falls back to the LLM")
+
+        embeds = embedder.calls
+        asyncio.run(router.classify_intent("write me a LIMERICK!"))
+        asyncio.run(router.classify_intent("who posts the most per day?"))
+        assert len(llm_calls) == 1 and embedder.calls == embeds
+        print("✓ Repeated queries are served from the cache (no embed, no LLM)")
+
+        llm_answer["intent"] = None  # LLM unavailable
+        intent = asyncio.run(router.classify_intent("tell me a story"))
+        assert intent == RouterIntent.GENERAL_KNOWLEDGE
+        assert intent_classifier._intent_cache.get("tell me a story") is None
+        print("✓ Default used when the LLM is unavailable is not cached")
+    finally:
+        router._classify_with_llm, intent_classifier._classifiers, intent_classifier._intent_cache = saved
+
+    print()
+    return True
+
+
+def test_refit_and_backoff():
+    """A new settings version gets a new classifier; failed fits aren't retried at once."""
+    print("Testing settings refit and fit back-off...")
+    print("=" * 50)
+
+    from apps.api.src.agents import intent_classifier
+    from apps.api.src.agents.intent_classifier import EmbeddingIntentClassifier
+    from apps.api.src.core import config
+
+    saved = (intent_classifier._classifiers, config._settings_version)
+    try:
+        intent_classifier._classifiers = {}
+        first = intent_classifier.get_intent_classifier()
+        assert intent_classifier.get_intent_classifier() is first
+        config._settings_version += 1
+        second = intent_classifier.get_intent_classifier()
+        assert second is not first and list(intent_classifier._classifiers.values()) == [second]
+        print("✓ Changing settings (e.g. the embedding model) rebuilds the classifier")
+    finally:
+        intent_classifier._classifiers, config._settings_version = saved
+
+    _, embedder = make_classifier()
+    calls = []
+
+    def embed_queries(texts):
+        calls.append(len(texts))
+        if len(calls) == 1:
+            raise ConnectionError("embedding provider down")
+        return embedder.embed_queries(texts)
+
+    classifier = EmbeddingIntentClassifier(
+        make_classifier()[0].examples, embed_queries=embed_queries, aembed_query=embedder.aembed_query
+    )
+    for expected in (ConnectionError, RuntimeError):
+        try:
+            classifier.fit()
+            raise AssertionError("fit should raise")
+        except expected:
+            pass
+    assert len(calls) == 1 and not classifier.fitted
+    print("✓ A failed fit raises, and retries within the back-off don't re-embed")
+
+    classifier._retry_at = 0.0
+    classifier.fit()
+    assert classifier.fitted and len(calls) == 2
+    print("✓ The fit is retried once the back-off has passed")
+
+    print()
+    return True
+
+
+def test_example_set():
+    """Every intent has examples; the repro routing cases are included."""
+    print("Testing shipped example set...")
+    print("=" * 50)
+
+    from apps.api.src.agents.intent_examples import INTENT_EXAMPLES
+    from packages.shared.python.models import RouterIntent
+    from tests.repro_routing import TEST_CASES
+
+    assert set(INTENT_EXAMPLES) == set(RouterIntent) - {RouterIntent.HYBRID}  # Hybrid isn't classified
+    sizes = [len(texts) for texts in INTENT_EXAMPLES.values()]
+    assert min(sizes) >= 10 and max(sizes) <= 2 * min(sizes), sizes
+    print(f"✓ {sum(sizes)} examples over {len(sizes)} intents ({min(sizes)}-{max(sizes)} each)")
+
+    for query, intent in TEST_CASES:
+        assert query in INTENT_EXAMPLES[intent], query
+    print(f"✓ All {len(TEST_CASES)} repro routing cases are labeled examples")
+
+    all_texts = [text for texts in INTENT_EXAMPLES.values() for text in texts]
+    assert len(all_texts) == len(set(all_texts))
+    print("✓ No example is labeled twice")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("INTENT CLASSIFIER TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Nearest centroid", test_nearest_centroid()))
+    results.append(("LLM fallback and cache", test_llm_fallback_and_cache()))
+    results.append(("Example set", test_example_set()))
+    results.append(("Refit and back-off", test_refit_and_backoff()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test: ONNX Runtime embedding backend parity
+
+Loads all-MiniLM-L6-v2 on torch (sentence-transformers) and on ONNX Runtime
+(float32 and int8) and checks that:
+1. encode() rejects options it can't honour instead of ignoring them
+2. encode() has the SentenceTransformer shape contract
+3. ONNX float32 vectors match torch (cosine > 0.999)
+4. int8 vectors stay close (cosine > 0.98) and keep the same top result
+
+Checks 2-4 need fastembed, sentence-transformers and the model downloads;
+they are skipped when those are unavailable.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+MODEL = "all-MiniLM-L6-v2"
+
+SENTENCES = [
+    "The deploy failed last night because of a bad database migration.",
+    "Anyone know why the bot stopped responding in #general?",
+    "We should switch the CI runners to the new ARM instances.",
+    "lol that meme is amazing",
+    "Python 3.12 made the f-string parser a lot more flexible.",
+    "Reminder: the community call is moved to Thursday at 5pm UTC.",
+]
+
+QUERY = "why did the deployment break?"
+
+
+def cosine_rows(a, b):
+    import numpy as np
+
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def load_onnx(quantized: bool = False):
+    """OnnxSentenceModel for MODEL, or skip if fastembed or the download is unavailable."""
+    pytest.importorskip("fastembed")
+    from apps.api.src.core.onnx_embedding import OnnxSentenceModel
+
+    try:
+        return OnnxSentenceModel(MODEL, quantized=quantized)
+    except Exception as e:
+        pytest.skip(f"{MODEL} ONNX export unavailable: {e}")
+
+
+def load_torch():
+    """SentenceTransformer for MODEL, or skip if unavailable."""
+    sentence_transformers = pytest.importorskip("sentence_transformers")
+
+    try:
+        return sentence_transformers.SentenceTransformer(MODEL)
+    except Exception as e:
+        pytest.skip(f"{MODEL} torch model unavailable: {e}")
+
+
+def test_encode_rejects_unsupported_options():
+    """Options that change the output raise instead of being dropped."""
+    print("Testing unsupported encode() options...")
+    print("=" * 50)
+
+    import numpy as np
+    from apps.api.src.core.onnx_embedding import OnnxSentenceModel
+
+    class FakeTextEmbedding:
+        def embed(self, texts, batch_size=32):
+            return (np.ones(4, dtype=np.float32) for _ in texts)
+
+    model = object.__new__(OnnxSentenceModel)
+    model._model, model._dim = FakeTextEmbedding(), 4
+
+    assert model.encode(["a", "b"], show_progress_bar=False).shape == (2, 4)
+    print("✓ show_progress_bar is accepted")
+
+    for kwargs in ({"output_value": "token_embeddings"}, {"convert_to_tensor": True}, {"convert_to_numpy": False}):
+        with pytest.raises(TypeError):
+            model.encode(["a"], **kwargs)
+        print(f"✓ {kwargs} raises TypeError")
+
+    print()
+    return True
+
+
+def test_encode_contract():
+    """Single string -> 1-D vector, list -> 2-D matrix."""
+    print("Testing encode() contract...")
+    print("=" * 50)
+
+    model = load_onnx()
+    assert model.encode("hello").shape == (384,)
+    assert model.encode(["hello", "world"]).shape == (2, 384)
+    assert model.encode([]).shape == (0, 384)
+    assert model.get_sentence_embedding_dimension() == 384
+    print("✓ Shapes match SentenceTransformer.encode()")
+
+    print()
+    return True
+
+
+def test_parity_with_torch():
+    """ONNX float32 and int8 vectors agree with the torch vectors."""
+    print("Testing parity with torch...")
+    print("=" * 50)
+
+    torch_vectors = load_torch().encode(SENTENCES + [QUERY], convert_to_numpy=True)
+
+    for quantized, threshold in ((False, 0.999), (True, 0.98)):
+        label = "int8" if quantized else "float32"
+        onnx_vectors = load_onnx(quantized).encode(SENTENCES + [QUERY])
+
+        similarity = cosine_rows(torch_vectors, onnx_vectors)
+        assert similarity.min() > threshold, f"{label}: min cosine {similarity.min():.4f}"
+        print(f"✓ {label}: min cosine to torch {similarity.min():.5f} (> {threshold})")
+
+        # Same best match for the query
+        torch_best = (torch_vectors[:-1] @ torch_vectors[-1]).argmax()
+        onnx_best = (onnx_vectors[:-1] @ onnx_vectors[-1]).argmax()
+        assert torch_best == onnx_best, f"{label}: top result {onnx_best} != {torch_best}"
+        print(f"✓ {label}: same top result for the query")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("ONNX EMBEDDING BACKEND TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    for name, test in (
+        ("Unsupported encode() options", test_encode_rejects_unsupported_options),
+        ("encode() contract", test_encode_contract),
+        ("Parity with torch", test_parity_with_torch),
+    ):
+        try:
+            results.append((name, test()))
+        except pytest.skip.Exception as e:
+            print(f"- Skipped: {e}\n")
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Test: Qdrant collection registry and storage profiles
+
+Runs against an in-process Qdrant (no server needed) and checks that:
+1. Every collection in COLLECTION_CONFIGS is created at bootstrap, as a
+   versioned physical collection behind the logical alias
+2. Hot-path ensure() calls don't hit get_collections() again
+3. A "collection not found" error triggers a re-check and re-create
+4. Storage profiles map to the right quantization settings
+5. Guilds route to the shared or a dedicated shard
+6. The legacy -> hybrid migration resumes from its checkpoint, counting
+   each point once
+7. A shadow collection is swapped in behind the collection alias, always
+   in one alias update
+8. A collection created before aliases is adopted (copied, then aliased)
+   and can't be promoted over until it is
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class CountingClient:
+    """Wraps a QdrantClient and counts get_collections() round trips."""
+
+    def __init__(self, client):
+        self._client = client
+        self.get_collections_calls = 0
+
+    def get_collections(self):
+        self.get_collections_calls += 1
+        return self._client.get_collections()
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def make_registry():
+    from qdrant_client import QdrantClient
+    from packages.database.qdrant_registry import CollectionRegistry
+
+    client = CountingClient(QdrantClient(location=":memory:"))
+    registry = CollectionRegistry(lambda: client, vector_size=lambda: 8)
+    return registry, client
+
+
+def test_bootstrap_creates_all_collections():
+    """Bootstrap creates every configured collection in one pass."""
+    print("Testing registry bootstrap...")
+    print("=" * 50)
+
+    from packages.database.qdrant_schema import COLLECTION_CONFIGS, HYBRID_SESSIONS_COLLECTION
+
+    registry, client = make_registry()
+    status = registry.bootstrap()
+
+    assert set(status) == set(COLLECTION_CONFIGS), f"Unexpected status keys: {status}"
+    assert all(result == "created" for result in status.values()), status
+    print(f"✓ Created {len(status)} collections")
+
+    physical = {c.name for c in client.get_collections().collections}
+    for name in COLLECTION_CONFIGS:
+        assert name not in physical, f"{name} created as a physical collection"
+        assert registry.resolve(name) in physical, f"{name} alias points nowhere"
+        assert registry.resolve(name).startswith(name + "__")
+    print("✓ All collections exist in Qdrant behind their logical alias")
+
+    info = client.get_collection(HYBRID_SESSIONS_COLLECTION)
+    assert "dense" in info.config.params.vectors
+    assert "sparse" in (info.config.params.sparse_vectors or {})
+    print("✓ Hybrid collection has named dense + sparse vectors")
+
+    print()
+    return True
+
+
+def test_ensure_is_cached():
+    """After bootstrap, ensure() makes no get_collections() round trips."""
+    print("Testing per-process cache...")
+    print("=" * 50)
+
+    from packages.database.qdrant_schema import SESSIONS_COLLECTION, HYBRID_SESSIONS_COLLECTION
+
+    registry, client = make_registry()
+    registry.bootstrap()
+    calls_after_bootstrap = client.get_collections_calls
+
+    for _ in range(100):
+        registry.ensure(SESSIONS_COLLECTION)
+        registry.ensure(HYBRID_SESSIONS_COLLECTION)
+
+    assert client.get_collections_calls == calls_after_bootstrap, \
+        f"ensure() hit Qdrant {client.get_collections_calls - calls_after_bootstrap} times"
+    print("✓ 200 ensure() calls, 0 extra get_collections() calls")
+
+    print()
+    return True
+
+
+def test_recover_on_missing_collection():
+    """A not-found error re-creates the collection; other errors don't."""
+    print("Testing not-found re-check...")
+    print("=" * 50)
+
+    from packages.database.qdrant_registry import is_collection_not_found
+    from packages.database.qdrant_schema import SESSIONS_COLLECTION
+
+    registry, client = make_registry()
+    registry.bootstrap()
+    client.delete_collection(registry.resolve(SESSIONS_COLLECTION))
+
+    try:
+        client.count(SESSIONS_COLLECTION)
+        raise AssertionError("Expected a missing-collection error")
+    except Exception as e:
+        assert is_collection_not_found(e), f"Not detected as not-found: {e}"
+        assert registry.recover(SESSIONS_COLLECTION, e)
+    print("✓ Not-found error detected and recovered")
+
+    assert client.count(SESSIONS_COLLECTION).count == 0
+    print("✓ Collection re-created")
+
+    assert not registry.recover(SESSIONS_COLLECTION, RuntimeError("timed out"))
+    print("✓ Unrelated errors are not treated as missing collections")
+
+    print()
+    return True
+
+
+def test_storage_profiles():
+    """Each storage profile maps to the matching quantization config."""
+    print("Testing storage profiles...")
+    print("=" * 50)
+
+    from qdrant_client.models import BinaryQuantization, ProductQuantization, ScalarQuantization
+    from packages.database.qdrant_registry import build_quantization_config
+    from packages.database.qdrant_schema import STORAGE_PROFILES, get_storage_profile
+
+    expected = {
+        "memory": type(None),
+        "scalar": ScalarQuantization,
+        "binary": BinaryQuantization,
+        "product": ProductQuantization,
+    }
+    for name, config_type in expected.items():
+        config = build_quantization_config(STORAGE_PROFILES[name])
+        assert isinstance(config, config_type), f"{name}: got {type(config)}"
+    print("✓ Quantization config matches each profile")
+
+    for profile in STORAGE_PROFILES.values():
+        if profile.quantization:
+            assert profile.vectors_on_disk, f"{profile.name} should keep originals on disk"
+            assert profile.oversampling > 1.0, f"{profile.name} should oversample"
+    print("✓ Quantized profiles keep originals on disk and oversample")
+
+    try:
+        get_storage_profile("float8")
+        raise AssertionError("Expected ValueError for unknown profile")
+    except ValueError:
+        pass
+    print("✓ Unknown profile rejected")
+
+    print()
+    return True
+
+
+def test_tenant_routing():
+    """Dedicated guilds get their own shard; unsharded collections get no selector."""
+    print("Testing tenant shard routing...")
+    print("=" * 50)
+
+    from packages.database.qdrant_registry import SHARED_SHARD_KEY, TenantRouter
+    from packages.database.qdrant_schema import SESSIONS_COLLECTION
+
+    router = TenantRouter(enabled=True, dedicated_guild_ids=[111])
+    assert router.shard_key(111) == "guild_111"
+    assert router.shard_key(222) == SHARED_SHARD_KEY
+    assert router.shard_keys() == [SHARED_SHARD_KEY, "guild_111"]
+    print("✓ Large guild routed to a dedicated shard, others to shared")
+
+    registry, _ = make_registry()
+    registry.bootstrap()
+    assert registry.shard_key(SESSIONS_COLLECTION, 111) is None
+    print("✓ No shard selector on collections without custom sharding")
+
+    print()
+    return True
+
+
+class FakeSparseModel:
+    """Stands in for HybridEmbeddingModel: one token per word, counts batches."""
+
+    sparse_enabled = True
+
+    def __init__(self, delays=None):
+        self.batches = 0
+        self.delays = delays or {}  # first text of a page -> seconds to stall it
+
+    def embed_sparse_documents(self, texts):
+        self.batches += 1
+        time.sleep(self.delays.get(texts[0], 0))
+        return [([len(word) for word in text.split()][:1], [1.0]) for text in texts]
+
+
+class MigrationService:
+    """Minimal QdrantService stand-in; fails one upsert when asked to."""
+
+    def __init__(self, client, fail_on_call=None, fail_on_id=None):
+        self.client = client
+        self.upserted = []
+        self.calls = 0
+        self.fail_on_call = fail_on_call
+        self.fail_on_id = fail_on_id
+
+    def get_client(self):
+        return self.client
+
+    def ensure_hybrid_collection(self):
+        pass
+
+    def late_interaction_ready(self, collection_name):
+        return False
+
+    def upsert_hybrid_batch(self, points):
+        self.calls += 1
+        if self.calls == self.fail_on_call or any(p["id"] == self.fail_on_id for p in points):
+            return False
+        self.upserted.extend(p["id"] for p in points)
+        return True
+
+
+def test_hybrid_migration_resumes():
+    """An interrupted migration resumes from the checkpoint and finishes."""
+    print("Testing resumable hybrid migration...")
+    print("=" * 50)
+
+    import tempfile
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+    from apps.api.src.services.hybrid_migration import HybridMigration
+    from packages.database.qdrant_schema import SESSIONS_COLLECTION
+
+    client = QdrantClient(location=":memory:")
+    client.create_collection(SESSIONS_COLLECTION, vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    client.upsert(SESSIONS_COLLECTION, points=[
+        PointStruct(id=i, vector=[1.0, 0.0, 0.0, float(i)], payload={"guild_id": 1, "content": f"session {i}"})
+        for i in range(1, 101)
+    ])
+
+    checkpoint = Path(tempfile.mkdtemp()) / "checkpoint.json"
+
+    # First run: third page fails to upsert -> stops with a checkpoint
+    model = FakeSparseModel()
+    service = MigrationService(client, fail_on_call=3)
+    stats = HybridMigration(
+        service, batch_size=10, embed_workers=1, checkpoint_path=checkpoint, embedding_model=model,
+    ).run()
+    assert not stats["completed"], stats
+    assert checkpoint.exists(), "Checkpoint not written"
+    assert stats["migrated"] == 20, stats
+    print(f"✓ Interrupted after {stats['migrated']} points, checkpoint saved")
+
+    # Second run: resumes where the first stopped, not from the start
+    model = FakeSparseModel()
+    service = MigrationService(client)
+    stats = HybridMigration(
+        service, batch_size=10, embed_workers=2, checkpoint_path=checkpoint, embedding_model=model,
+    ).run()
+    assert stats["completed"] and stats["resumed"], stats
+    assert stats["migrated"] == 100, stats
+    assert len(service.upserted) == 80, f"Re-migrated {len(service.upserted)} points"
+    assert not checkpoint.exists(), "Checkpoint not cleared"
+    print(f"✓ Resumed and finished ({stats['points_per_sec']} points/sec)")
+
+    assert model.batches == 8, f"{model.batches} sparse batches for 8 pages"
+    print("✓ Sparse vectors embedded in one batch per page")
+
+    print()
+    return True
+
+
+def test_hybrid_migration_counts_once():
+    """Pages written past the checkpoint before a failure aren't counted twice on resume."""
+    print("Testing migration totals across a resume...")
+    print("=" * 50)
+
+    import tempfile
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+    from apps.api.src.services.hybrid_migration import HybridMigration, MigrationCheckpoint
+    from packages.database.qdrant_schema import SESSIONS_COLLECTION
+
+    client = QdrantClient(location=":memory:")
+    client.create_collection(SESSIONS_COLLECTION, vectors_config=VectorParams(size=4, distance=Distance.COSINE))
+    client.upsert(SESSIONS_COLLECTION, points=[
+        PointStruct(id=i, vector=[1.0, 0.0, 0.0, float(i)], payload={"guild_id": 1, "content": f"session {i}"})
+        for i in range(1, 101)
+    ])
+
+    checkpoint = Path(tempfile.mkdtemp()) / "checkpoint.json"
+
+    # Page 2 is written before page 0; page 3 then fails while page 1 is still embedding
+    model = FakeSparseModel(delays={"session 1": 0.3, "session 11": 1.0, "session 31": 0.6})
+    service = MigrationService(client, fail_on_id="31")
+    stats = HybridMigration(
+        service, batch_size=10, embed_workers=3, checkpoint_path=checkpoint, embedding_model=model,
+    ).run()
+    assert not stats["completed"], stats
+    assert "21" in service.upserted and "11" not in service.upserted
+    state = MigrationCheckpoint(checkpoint).load()
+    assert stats["migrated"] == state["migrated"] == 10, (stats, state)
+    print(f"✓ Only the contiguous page is counted ({len(service.upserted)} points written)")
+
+    service = MigrationService(client)
+    stats = HybridMigration(
+        service, batch_size=10, embed_workers=2, checkpoint_path=checkpoint, embedding_model=FakeSparseModel(),
+    ).run()
+    assert stats["completed"], stats
+    assert stats["migrated"] == 100, stats
+    assert stats["migrated_this_run"] == 90, stats
+    print(f"✓ Resumed run counts {stats['migrated_this_run']} new points, 100 in total")
+
+    print()
+    return True
+
+
+def test_blue_green_alias_swap():
+    """Shadow collection receives writes, then replaces the live one."""
+    print("Testing blue/green alias swap...")
+    print("=" * 50)
+
+    from qdrant_client.models import PointStruct
+    from packages.database.qdrant_registry import SHADOW_ALIAS_SUFFIX
+    from packages.database.qdrant_schema import SESSIONS_COLLECTION
+
+    registry, client = make_registry()
+    registry.bootstrap()
+    original = registry.resolve(SESSIONS_COLLECTION)
+    client.upsert(SESSIONS_COLLECTION, points=[PointStruct(id=1, vector=[1.0] * 8, payload={"v": "old"})])
+
+    shadow = registry.create_shadow(SESSIONS_COLLECTION)
+    assert registry.shadow_of(SESSIONS_COLLECTION) == shadow
+    assert SESSIONS_COLLECTION + SHADOW_ALIAS_SUFFIX in registry.existing_names()
+    print(f"✓ Shadow {shadow} created behind {SESSIONS_COLLECTION + SHADOW_ALIAS_SUFFIX}")
+
+    client.upsert(shadow, points=[PointStruct(id=2, vector=[1.0] * 8, payload={"v": "new"})])
+
+    swap = registry.promote_shadow(SESSIONS_COLLECTION)
+    assert swap == {"previous": original, "current": shadow}, swap
+    assert registry.resolve(SESSIONS_COLLECTION) == shadow
+    assert registry.shadow_of(SESSIONS_COLLECTION) is None
+    points, _ = client.scroll(SESSIONS_COLLECTION, with_payload=True)
+    assert [p.payload["v"] for p in points] == ["new"], points
+    print("✓ Logical name now serves the shadow collection")
+
+    assert client.count(original).count == 1
+    print("✓ First swap is an alias update too; the bootstrap collection is kept")
+
+    # Second reindex: alias -> alias swap keeps the previous collection
+    second = registry.create_shadow(SESSIONS_COLLECTION)
+    swap = registry.promote_shadow(SESSIONS_COLLECTION)
+    assert swap == {"previous": shadow, "current": second}, swap
+    assert client.count(shadow).count == 1
+    print("✓ Later swaps are atomic and keep the previous collection for rollback")
+
+    print()
+    return True
+
+
+def test_adopt_legacy_collection():
+    """A physical collection under the logical name is copied behind an alias."""
+    print("Testing adoption of a pre-alias collection...")
+    print("=" * 50)
+
+    from qdrant_client.models import PointStruct
+    from packages.database.qdrant_schema import COLLECTION_CONFIGS, SESSIONS_COLLECTION
+
+    registry, client = make_registry()
+    # An older deployment: the collection itself carries the logical name
+    registry._create(client, COLLECTION_CONFIGS[SESSIONS_COLLECTION])
+    client.upsert(SESSIONS_COLLECTION, points=[
+        PointStruct(id=i, vector=[float(i)] * 8, payload={"guild_id": 1, "n": i}) for i in range(1, 4)
+    ])
+    assert registry.bootstrap([SESSIONS_COLLECTION])[SESSIONS_COLLECTION] != "created"
+
+    try:
+        registry.create_shadow(SESSIONS_COLLECTION)
+        raise AssertionError("Expected a reindex of a pre-alias collection to be refused")
+    except ValueError as e:
+        assert "adopt" in str(e), e
+    print("✓ Reindex refused until the collection is adopted")
+
+    copy = registry.adopt(SESSIONS_COLLECTION, settle_seconds=0)
+    assert copy is not None and copy.startswith(SESSIONS_COLLECTION + "__")
+    assert registry.resolve(SESSIONS_COLLECTION) == copy
+    assert SESSIONS_COLLECTION not in {c.name for c in client.get_collections().collections}
+    assert registry.shadow_of(SESSIONS_COLLECTION) is None
+    points, _ = client.scroll(SESSIONS_COLLECTION, with_payload=True, with_vectors=True)
+    assert sorted(p.payload["n"] for p in points) == [1, 2, 3], points
+    assert all(len(p.vector) == 8 for p in points)
+    print(f"✓ Points and vectors copied; {SESSIONS_COLLECTION} now aliases {copy}")
+
+    assert registry.adopt(SESSIONS_COLLECTION, settle_seconds=0) is None
+    print("✓ Adopting again is a no-op")
+
+    shadow = registry.create_shadow(SESSIONS_COLLECTION)
+    swap = registry.promote_shadow(SESSIONS_COLLECTION)
+    assert swap == {"previous": copy, "current": shadow}, swap
+    print("✓ Adopted collection is promoted over with an alias swap")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("QDRANT COLLECTION REGISTRY TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Bootstrap", test_bootstrap_creates_all_collections()))
+    results.append(("Cached ensure", test_ensure_is_cached()))
+    results.append(("Not-found re-check", test_recover_on_missing_collection()))
+    results.append(("Storage profiles", test_storage_profiles()))
+    results.append(("Tenant routing", test_tenant_routing()))
+    results.append(("Resumable migration", test_hybrid_migration_resumes()))
+    results.append(("Migration totals", test_hybrid_migration_counts_once()))
+    results.append(("Blue/green alias swap", test_blue_green_alias_swap()))
+    results.append(("Adopt pre-alias collection", test_adopt_legacy_collection()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""
+Test: QdrantService / AsyncQdrantService search paths
+
+Runs both services against one in-process Qdrant (the async service through
+an adapter over the same client) and checks that:
+1. Every async search path sends the same query and filter as the sync one
+2. Every query sent is scoped to the requested guild_id
+3. Another guild's points never come back, even when they score higher
+4. search_batch answers each request like its single search, one request
+   per collection, and a failing collection only empties its own results
+5. Grouped search collapses document chunks per file and chat per channel
+6. On a custom-sharded collection, upserts and searches go to the guild's shard
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+GUILD = 1
+OTHER_GUILD = 2
+QUERY = [1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+SPARSE_INDICES = [1, 2]
+SPARSE_VALUES = [1.0, 0.5]
+
+
+class RecordingClient:
+    """Wraps a QdrantClient and records the arguments of every query call."""
+
+    QUERY_METHODS = ("query_points", "query_batch_points", "query_points_groups")
+
+    def __init__(self, client):
+        self._client = client
+        self.calls = []
+        self.fail_collections = set()
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+        if name not in self.QUERY_METHODS:
+            return method
+
+        def record(**kwargs):
+            self.calls.append((name, kwargs))
+            if kwargs["collection_name"] in self.fail_collections:
+                raise ConnectionError("qdrant unavailable")
+            return method(**kwargs)
+        return record
+
+
+class ShardingClient(RecordingClient):
+    """
+    Records shard key routing on top of the in-memory client.
+
+    Local Qdrant can't create shard keys and ignores shard_key_selector, so
+    the sharding method and shard keys are tracked here (per physical
+    collection, resolving aliases like the server), and every upsert must
+    name a shard key that exists. Recorded calls keep the name as passed.
+    """
+
+    def __init__(self, client):
+        super().__init__(client)
+        self.sharded = set()
+        self.shard_keys = {}
+        self.upserts = []
+        self.deletes = []
+
+    def physical(self, collection_name):
+        aliases = {a.alias_name: a.collection_name for a in self._client.get_aliases().aliases}
+        return aliases.get(collection_name, collection_name)
+
+    def create_collection(self, collection_name, sharding_method=None, **kwargs):
+        from qdrant_client.models import ShardingMethod
+
+        if sharding_method == ShardingMethod.CUSTOM:
+            self.sharded.add(collection_name)
+        return self._client.create_collection(collection_name=collection_name, **kwargs)
+
+    def get_collection(self, collection_name):
+        from qdrant_client.models import ShardingMethod
+
+        info = self._client.get_collection(collection_name)
+        if self.physical(collection_name) in self.sharded:
+            info.config.params.sharding_method = ShardingMethod.CUSTOM
+        return info
+
+    def create_shard_key(self, collection_name, shard_key):
+        keys = self.shard_keys.setdefault(self.physical(collection_name), [])
+        if shard_key in keys:
+            raise ValueError(f"Shard key {shard_key} already exists")
+        keys.append(shard_key)
+
+    def upsert(self, collection_name, points, shard_key_selector=None, **kwargs):
+        self.upserts.append((collection_name, shard_key_selector, sorted(p.id for p in points)))
+        if self.physical(collection_name) in self.sharded:
+            assert shard_key_selector in self.shard_keys[self.physical(collection_name)], (
+                f"Upsert to {collection_name} without a valid shard key: {shard_key_selector}"
+            )
+        return self._client.upsert(collection_name=collection_name, points=points, **kwargs)
+
+    def delete(self, collection_name, points_selector, shard_key_selector=None, **kwargs):
+        self.deletes.append((collection_name, shard_key_selector))
+        if self.physical(collection_name) in self.sharded:
+            assert shard_key_selector in self.shard_keys[self.physical(collection_name)], (
+                f"Delete from {collection_name} without a valid shard key: {shard_key_selector}"
+            )
+        return self._client.delete(collection_name=collection_name, points_selector=points_selector, **kwargs)
+
+
+class AsyncAdapter:
+    """AsyncQdrantClient stand-in running calls on the sync in-memory client."""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+        return call
+
+    async def close(self):
+        pass
+
+
+def make_services():
+    """Sync and async services sharing one in-memory Qdrant with two guilds' points."""
+    from qdrant_client import QdrantClient
+    from apps.api.src.services.qdrant_service import AsyncQdrantService, QdrantService
+    from packages.database.qdrant_registry import CollectionRegistry
+
+    client = RecordingClient(QdrantClient(location=":memory:"))
+    service = QdrantService()
+    service._client = client
+    service.registry = CollectionRegistry(service.get_client, vector_size=lambda: 8)
+
+    async_client = RecordingClient(client._client)
+    async_service = AsyncQdrantService(service)
+    async_service._client = AsyncAdapter(async_client)
+
+    seed_points(service)
+    client.calls.clear()
+    return service, async_service, client, async_client
+
+
+def seed_points(service):
+    """Guild 2 holds the exact query vector; guild 1 only close ones."""
+    from qdrant_client.models import PointStruct, SparseVector
+    from apps.api.src.services.qdrant_service import COLLECTION_NAME, HYBRID_COLLECTION_NAME
+
+    def vector(guild_id, i):
+        if guild_id == OTHER_GUILD:
+            return list(QUERY)
+        return [1.0, 0.1 * (i + 1), 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+
+    legacy, hybrid = [], []
+    for guild_id in (GUILD, OTHER_GUILD):
+        for i in range(4):
+            point_id = guild_id * 100 + i
+            payload = {
+                "guild_id": guild_id,
+                "channel_id": 10 + i % 2,
+                "source_type": "pdf" if i < 2 else "chat",
+                "attachment_id": 500 + guild_id,
+            }
+            legacy.append(PointStruct(id=point_id, vector=vector(guild_id, i), payload=payload))
+            hybrid.append(PointStruct(
+                id=point_id,
+                vector={
+                    "dense": vector(guild_id, i),
+                    "sparse": SparseVector(indices=SPARSE_INDICES, values=SPARSE_VALUES),
+                },
+                payload=payload,
+            ))
+
+    service.upsert_points(COLLECTION_NAME, legacy)
+    service.upsert_points(HYBRID_COLLECTION_NAME, hybrid)
+
+
+def sent_filters(kwargs) -> list:
+    """Every Filter in a recorded call: query filters, prefetches and batch requests."""
+    from qdrant_client.models import Filter
+
+    found = []
+
+    def walk(value):
+        if isinstance(value, Filter):
+            found.append(value)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                walk(item)
+        elif hasattr(value, "__dict__") and not isinstance(value, type):
+            for item in vars(value).values():
+                walk(item)
+
+    walk(list(kwargs.values()))
+    return found
+
+
+def assert_scoped(calls, guild_id):
+    """Every recorded query carries a guild_id == guild_id condition."""
+    assert calls, "No query was sent"
+    for name, kwargs in calls:
+        filters = sent_filters(kwargs)
+        assert filters, f"{name} sent without a filter"
+        for query_filter in filters:
+            guilds = [
+                condition.match.value
+                for condition in query_filter.must
+                if getattr(condition, "key", None) == "guild_id"
+            ]
+            assert guilds == [guild_id], f"{name} filter not scoped to guild {guild_id}: {query_filter}"
+
+
+def ranked(results):
+    return [(r["id"], round(r["score"], 5), r.get("group_id")) for r in results]
+
+
+def test_sync_async_parity():
+    """Both services send the same queries and get the same results."""
+    print("Testing sync/async search parity...")
+    print("=" * 50)
+
+    from apps.api.src.services.qdrant_service import (
+        COLLECTION_NAME,
+        HYBRID_COLLECTION_NAME,
+        SearchRequest,
+    )
+
+    service, async_service, client, async_client = make_services()
+    requests = [
+        SearchRequest(collection_name=COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD, limit=3),
+        SearchRequest(
+            collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD,
+            query_sparse_indices=SPARSE_INDICES, query_sparse_values=SPARSE_VALUES, fusion=True,
+        ),
+        SearchRequest(
+            collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD,
+            source_types=["pdf"], group_by="attachment_id", group_size=2,
+        ),
+    ]
+    paths = {
+        "search": (
+            lambda: service.search(QUERY, GUILD, channel_ids=[10, 11], source_types=["pdf", "chat"]),
+            lambda: async_service.search(QUERY, GUILD, channel_ids=[10, 11], source_types=["pdf", "chat"]),
+        ),
+        "hybrid_search": (
+            lambda: service.hybrid_search(QUERY, SPARSE_INDICES, SPARSE_VALUES, GUILD, channel_ids=[10]),
+            lambda: async_service.hybrid_search(QUERY, SPARSE_INDICES, SPARSE_VALUES, GUILD, channel_ids=[10]),
+        ),
+        "dense fallback": (
+            lambda: service._dense_only_search(QUERY, GUILD, channel_ids=[11]),
+            lambda: async_service._dense_only_search(QUERY, GUILD, channel_ids=[11]),
+        ),
+        "search_groups": (
+            lambda: service.search_groups(requests[2]),
+            lambda: async_service.search_groups(requests[2]),
+        ),
+        "search_batch": (
+            lambda: service.search_batch(requests),
+            lambda: async_service.search_batch(requests),
+        ),
+    }
+
+    for name, (run_sync, run_async) in paths.items():
+        client.calls.clear()
+        async_client.calls.clear()
+        sync_results = run_sync()
+        async_results = asyncio.run(run_async())
+
+        if name == "search_batch":
+            assert [ranked(r) for r in sync_results] == [ranked(r) for r in async_results], name
+        else:
+            assert ranked(sync_results) == ranked(async_results), name
+        sent = sorted(str(sent_filters(kwargs)) for _, kwargs in client.calls)
+        async_sent = sorted(str(sent_filters(kwargs)) for _, kwargs in async_client.calls)
+        assert sent and sent == async_sent, f"{name}: filters differ"
+        print(f"✓ {name}: same filters and results")
+
+    print()
+    return True
+
+
+def test_tenant_isolation():
+    """Async searches never return another guild's points."""
+    print("Testing async tenant isolation...")
+    print("=" * 50)
+
+    from apps.api.src.services.qdrant_service import HYBRID_COLLECTION_NAME, SearchRequest
+
+    _, async_service, _, async_client = make_services()
+
+    async def every_path():
+        return {
+            "search": await async_service.search(QUERY, GUILD),
+            "hybrid_search": await async_service.hybrid_search(QUERY, SPARSE_INDICES, SPARSE_VALUES, GUILD),
+            "dense fallback": await async_service._dense_only_search(QUERY, GUILD),
+            "search_batch": [
+                hit
+                for hits in await async_service.search_batch([
+                    SearchRequest(
+                        collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD,
+                        query_sparse_indices=SPARSE_INDICES, query_sparse_values=SPARSE_VALUES,
+                        fusion=True,
+                    ),
+                    SearchRequest(collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD),
+                ])
+                for hit in hits
+            ],
+            "search_groups": await async_service.search_groups(SearchRequest(
+                collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD,
+                group_by="channel_id",
+            )),
+        }
+
+    for name, results in asyncio.run(every_path()).items():
+        assert results, f"{name} returned nothing"
+        assert {r["payload"]["guild_id"] for r in results} == {GUILD}, f"{name} leaked another guild"
+        print(f"✓ {name}: only guild {GUILD} ({len(results)} hits)")
+
+    assert_scoped(async_client.calls, GUILD)
+    print(f"✓ All {len(async_client.calls)} async queries (incl. prefetches) filter on guild_id")
+
+    print()
+    return True
+
+
+def test_search_batch():
+    """search_batch matches the single searches and isolates failing collections."""
+    print("Testing search_batch...")
+    print("=" * 50)
+
+    from apps.api.src.services.qdrant_service import (
+        COLLECTION_NAME,
+        HYBRID_COLLECTION_NAME,
+        SearchRequest,
+    )
+
+    service, async_service, client, async_client = make_services()
+    requests = [
+        SearchRequest(
+            collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD,
+            query_sparse_indices=SPARSE_INDICES, query_sparse_values=SPARSE_VALUES, fusion=True,
+            limit=3,
+        ),
+        SearchRequest(
+            collection_name=COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD,
+            channel_ids=[10], limit=3, score_threshold=0.0,
+        ),
+        SearchRequest(
+            collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD,
+            source_types=["chat"], limit=1,
+        ),
+        SearchRequest(
+            collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=GUILD,
+            group_by="channel_id",
+        ),
+    ]
+    expected = [
+        service.hybrid_search(QUERY, SPARSE_INDICES, SPARSE_VALUES, GUILD, limit=3),
+        service.search(QUERY, GUILD, channel_ids=[10], limit=3, score_threshold=0.0),
+        service.search_batch([requests[2]])[0],
+        service.search_groups(requests[3]),
+    ]
+    assert all(expected), "A single search returned nothing"
+    assert [r["payload"]["source_type"] for r in expected[2]] == ["chat"]
+
+    for label, recorder, run in (
+        ("sync", client, lambda: service.search_batch(requests)),
+        ("async", async_client, lambda: asyncio.run(async_service.search_batch(requests))),
+    ):
+        recorder.calls.clear()
+        results = run()
+        assert [ranked(r) for r in results] == [ranked(r) for r in expected], label
+        print(f"✓ {label}: results in request order, same as the single searches")
+
+        sent = sorted((name, kwargs["collection_name"]) for name, kwargs in recorder.calls)
+        assert sent == [
+            ("query_batch_points", COLLECTION_NAME),
+            ("query_batch_points", HYBRID_COLLECTION_NAME),
+            ("query_points_groups", HYBRID_COLLECTION_NAME),
+        ], sent
+        hybrid_batch = next(
+            kwargs for name, kwargs in recorder.calls
+            if name == "query_batch_points" and kwargs["collection_name"] == HYBRID_COLLECTION_NAME
+        )
+        assert len(hybrid_batch["requests"]) == 2
+        print(f"✓ {label}: one batch per collection, grouped request via query_points_groups")
+
+        recorder.fail_collections = {HYBRID_COLLECTION_NAME}
+        try:
+            results = run()
+        finally:
+            recorder.fail_collections = set()
+        assert results[0] == results[2] == results[3] == []
+        assert ranked(results[1]) == ranked(expected[1])
+        print(f"✓ {label}: a failing collection only empties its own requests")
+
+    assert service.search_batch([]) == []
+    assert asyncio.run(async_service.search_batch([])) == []
+    print("✓ No requests, no queries")
+
+    print()
+    return True
+
+
+def test_grouped_search():
+    """search_groups keeps one document's chunks (or one channel) from filling the results."""
+    print("Testing grouped search...")
+    print("=" * 50)
+
+    from types import SimpleNamespace
+    from qdrant_client.models import PointStruct, SparseVector
+    from apps.api.src.services.qdrant_service import (
+        HYBRID_COLLECTION_NAME,
+        SearchRequest,
+        _groups_to_results,
+        default_group_by,
+    )
+
+    assert default_group_by() == "channel_id"
+    assert default_group_by(["pdf"]) == "attachment_id"
+    assert default_group_by(["pdf", "chat"]) == "channel_id"
+    print("✓ default_group_by: attachment_id for documents, channel_id otherwise")
+
+    groups = [
+        SimpleNamespace(id=7, hits=[
+            SimpleNamespace(id=1, score=0.5, payload={}, vector=None),
+            SimpleNamespace(id=2, score=0.1, payload={}, vector=None),
+        ]),
+        SimpleNamespace(id=8, hits=[SimpleNamespace(id=3, score=0.9, payload={}, vector=None)]),
+    ]
+    flat = _groups_to_results(groups)
+    assert [(r["id"], r["group_id"]) for r in flat] == [("3", 8), ("1", 7), ("2", 7)]
+    assert [r["id"] for r in _groups_to_results(groups, score_threshold=0.3)] == ["3", "1"]
+    print("✓ _groups_to_results: flattened by score, group_id kept, threshold applied")
+
+    service, async_service, _, _ = make_services()
+    guild_id = 3
+
+    def point(point_id, closeness, **payload):
+        vector = [1.0, closeness, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
+        return PointStruct(
+            id=point_id,
+            vector={"dense": vector, "sparse": SparseVector(indices=SPARSE_INDICES, values=SPARSE_VALUES)},
+            payload={"guild_id": guild_id, **payload},
+        )
+
+    service.upsert_points(HYBRID_COLLECTION_NAME, [
+        # Four adjacent chunks of one PDF outscore everything else
+        *[point(300 + i, 0.01 * i, source_type="pdf", attachment_id=1, channel_id=10) for i in range(4)],
+        point(310, 0.5, source_type="pdf", attachment_id=2, channel_id=10),
+        point(311, 0.6, source_type="pdf", attachment_id=3, channel_id=11),
+        # Busy channel 10 outscores channel 11
+        *[point(320 + i, 0.01 * i, source_type="chat", channel_id=10) for i in range(3)],
+        point(330, 0.5, source_type="chat", channel_id=11),
+    ])
+
+    documents = SearchRequest(
+        collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=guild_id,
+        source_types=["pdf"], limit=3,
+    )
+    ungrouped = service.search_batch([documents])[0]
+    assert {r["payload"]["attachment_id"] for r in ungrouped} == {1}
+    print("✓ Ungrouped: the top 3 are all chunks of one PDF")
+
+    documents.group_by = default_group_by(documents.source_types)
+    for label, hits in (
+        ("sync", service.search_groups(documents)),
+        ("async", asyncio.run(async_service.search_groups(documents))),
+    ):
+        assert [r["group_id"] for r in hits] == [1, 2, 3], hits
+        assert hits[0]["id"] == "300"
+        print(f"✓ {label}: one chunk per document, best chunk of each, best document first")
+
+    chat = SearchRequest(
+        collection_name=HYBRID_COLLECTION_NAME, query_dense=QUERY, guild_id=guild_id,
+        source_types=["chat"], limit=2, group_size=2, group_by=default_group_by(["chat"]),
+    )
+    for label, hits in (
+        ("sync", service.search_groups(chat)),
+        ("async", asyncio.run(async_service.search_groups(chat))),
+    ):
+        assert [(r["id"], r["group_id"]) for r in hits] == [("320", 10), ("321", 10), ("330", 11)], hits
+        print(f"✓ {label}: at most group_size sessions per channel")
+
+    print()
+    return True
+
+
+def test_shard_routing():
+    """Upserts to a custom-sharded collection go to each guild's shard key."""
+    print("Testing custom shard key routing...")
+    print("=" * 50)
+
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import PointStruct
+    from apps.api.src.services.qdrant_service import COLLECTION_NAME, QdrantService
+    from packages.database.qdrant_registry import CollectionRegistry, TenantRouter
+    from packages.database.qdrant_schema import MESSAGES_COLLECTION
+
+    client = ShardingClient(QdrantClient(location=":memory:"))
+    router = TenantRouter(enabled=True, dedicated_guild_ids=[OTHER_GUILD])
+    service = QdrantService()
+    service._client = client
+    service.registry = CollectionRegistry(service.get_client, vector_size=lambda: 8, tenant_router=router)
+
+    service.registry.ensure(COLLECTION_NAME)
+    physical = client.physical(COLLECTION_NAME)
+    assert physical in client.sharded
+    assert client.shard_keys[physical] == ["shared", f"guild_{OTHER_GUILD}"]
+    print(f"✓ {COLLECTION_NAME} created with custom sharding and shard keys {client.shard_keys[physical]}")
+
+    points = [
+        PointStruct(id=i, vector=list(QUERY), payload={"guild_id": guild_id})
+        for i, guild_id in enumerate([GUILD, OTHER_GUILD, 3, OTHER_GUILD])
+    ]
+    assert service.upsert_points(COLLECTION_NAME, points)
+    assert sorted(client.upserts) == [
+        (COLLECTION_NAME, "guild_2", [1, 3]),
+        (COLLECTION_NAME, "shared", [0, 2]),
+    ], client.upserts
+    print("✓ One upsert per shard: the dedicated guild's points to its own shard, the rest to shared")
+
+    client.calls.clear()
+    service.search(QUERY, OTHER_GUILD)
+    service.search(QUERY, GUILD)
+    selectors = [kwargs["shard_key_selector"] for _, kwargs in client.calls]
+    assert selectors == ["guild_2", "shared"], selectors
+    print("✓ Searches are sent to the guild's shard")
+
+    assert service.delete_by_session_id(1, OTHER_GUILD)
+    assert service.delete_by_session_id(0, GUILD)
+    assert client.deletes == [(COLLECTION_NAME, "guild_2"), (COLLECTION_NAME, "shared")], client.deletes
+    assert [p.id for p in client.scroll(COLLECTION_NAME)[0]] == [2, 3]
+    print("✓ Deleting a session by ID targets the guild's shard")
+
+    # A fresh process finds the sharding on the existing collection
+    restarted = QdrantService()
+    restarted._client = client
+    restarted.registry = CollectionRegistry(restarted.get_client, vector_size=lambda: 8, tenant_router=router)
+    client.upserts.clear()
+    restarted.upsert_points(COLLECTION_NAME, points[:2])
+    assert sorted(client.upserts) == [(COLLECTION_NAME, "guild_2", [1]), (COLLECTION_NAME, "shared", [0])]
+    print("✓ Sharding detected on an existing collection after restart")
+
+    service.registry.ensure(MESSAGES_COLLECTION)
+    size = client.get_collection(MESSAGES_COLLECTION).config.params.vectors.size
+    client.upserts.clear()
+    service.upsert_points(MESSAGES_COLLECTION, [
+        PointStruct(id=p.id, vector=[1.0] * size, payload=p.payload) for p in points[:2]
+    ])
+    assert client.upserts == [(MESSAGES_COLLECTION, None, [0, 1])], client.upserts
+    print(f"✓ {MESSAGES_COLLECTION} (no tenant field) gets a single unsharded upsert")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("QDRANT SERVICE TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Sync/async parity", test_sync_async_parity()))
+    results.append(("Async tenant isolation", test_tenant_isolation()))
+    results.append(("search_batch", test_search_batch()))
+    results.append(("Grouped search", test_grouped_search()))
+    results.append(("Shard key routing", test_shard_routing()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
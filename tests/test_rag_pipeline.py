@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Test: Concurrent stages in process_rag_query
+
+Replaces the Postgres lookups, vector search and LLM call with 150ms
+stand-ins to check that:
+1. Recent messages, pre-prompt and search run concurrently
+2. Their results reach the answer stage
+3. Per-stage timings are reported in the AskResponse
+4. A failed pre-prompt lookup is logged, not silently dropped
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+STAGE_SECONDS = 0.15
+
+
+def test_concurrent_stages():
+    """Retrieval takes about one stage, not three."""
+    print("Testing concurrent retrieval stages...")
+    print("=" * 50)
+
+    from apps.api.src.agents import vector_rag
+    from apps.api.src.core import pre_prompt
+    from apps.api.src.services import conversation_memory
+
+    def recent_messages(guild_id, channel_id, limit=30):
+        time.sleep(STAGE_SECONDS)  # Blocking, like the Postgres query
+        return [{"author_name": "ana", "content": "deploy is done", "timestamp": None}]
+
+    def guild_pre_prompt(guild_id):
+        time.sleep(STAGE_SECONDS)
+        return "Be brief."
+
+    async def search_vectors(**kwargs):
+        await asyncio.sleep(STAGE_SECONDS)
+        return [{"id": "1", "score": 0.9, "payload": {"content": "deploy notes", "channel_id": 7}}]
+
+    generated = {}
+
+    async def generate_rag_response(**kwargs):
+        generated.update(kwargs)
+        return "answer"
+
+    saved = (
+        conversation_memory.get_recent_channel_messages,
+        pre_prompt.get_guild_pre_prompt,
+        vector_rag.search_vectors,
+        vector_rag.generate_rag_response,
+    )
+    try:
+        conversation_memory.get_recent_channel_messages = recent_messages
+        pre_prompt.get_guild_pre_prompt = guild_pre_prompt
+        vector_rag.search_vectors = search_vectors
+        vector_rag.generate_rag_response = generate_rag_response
+
+        start = time.perf_counter()
+        response = asyncio.run(vector_rag.process_rag_query("what happened with the deploy?", guild_id=1, channel_id=7))
+        elapsed = time.perf_counter() - start
+    finally:
+        (
+            conversation_memory.get_recent_channel_messages,
+            pre_prompt.get_guild_pre_prompt,
+            vector_rag.search_vectors,
+            vector_rag.generate_rag_response,
+        ) = saved
+
+    assert elapsed < 2.5 * STAGE_SECONDS, f"stages ran serially ({elapsed:.2f}s)"
+    print(f"✓ Three {STAGE_SECONDS * 1000:.0f}ms stages finished in {elapsed * 1000:.0f}ms")
+
+    assert generated["pre_prompt"] == "Be brief."
+    assert generated["recent_messages"][0]["content"] == "deploy is done"
+    assert generated["context_chunks"][0]["id"] == "1"
+    assert response.answer == "answer" and len(response.sources) == 1
+    print("✓ Recent messages, pre-prompt and search results reach the answer stage")
+
+    timings = response.timings_ms
+    for stage in ("recent_messages", "pre_prompt", "search", "retrieval", "generate"):
+        assert stage in timings, timings
+    for stage in ("recent_messages", "pre_prompt", "search"):
+        assert timings[stage] >= STAGE_SECONDS * 1000 * 0.9, timings
+    assert timings["retrieval"] < 2 * STAGE_SECONDS * 1000, timings
+    print(f"✓ Per-stage timings reported: {timings}")
+
+    print()
+    return True
+
+
+def test_pre_prompt_errors_logged():
+    """get_guild_pre_prompt reports a database error and answers without a pre-prompt."""
+    print("Testing pre-prompt lookup errors...")
+    print("=" * 50)
+
+    import contextlib
+    import io
+    import sqlalchemy
+    from apps.api.src.core.pre_prompt import get_guild_pre_prompt
+
+    def broken_engine(*args, **kwargs):
+        raise ConnectionError("database unavailable")
+
+    original = sqlalchemy.create_engine
+    sqlalchemy.create_engine = broken_engine
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            assert get_guild_pre_prompt(42) is None
+    finally:
+        sqlalchemy.create_engine = original
+
+    assert "[PRE_PROMPT]" in output.getvalue() and "guild 42" in output.getvalue(), output.getvalue()
+    assert "database unavailable" in output.getvalue()
+    print("✓ Error logged with the guild id, answer continues without a pre-prompt")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("RAG PIPELINE TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Concurrent stages", test_concurrent_stages()))
+    results.append(("Pre-prompt errors", test_pre_prompt_errors_logged()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
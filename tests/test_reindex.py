@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Test: Blue/green reindex
+
+Runs the reindex service against an in-process Qdrant and an SQLite copy of
+the messages tables, and checks that:
+1. Writes to the live collection are dual-written to the shadow
+2. Right-to-be-forgotten deletes reach the shadow too
+3. The backfill sessionizes a whole channel, even across page boundaries
+4. promote() swaps the alias and moves messages onto the shadow sessions
+"""
+
+import sqlite3
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+GUILD = 1
+CHANNEL = 10
+T0 = datetime(2025, 6, 1, 10, 0)
+
+
+class FakeEmbeddings:
+    """Deterministic 8-dim embeddings; counts calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [[1.0, len(text) / 1000, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0] for text in texts]
+
+
+def make_env():
+    """Point the global qdrant_service at in-memory Qdrant and the reindex service at SQLite."""
+    from qdrant_client import QdrantClient
+    from sqlalchemy import create_engine, text
+    from apps.api.src.core import llm_factory
+    from apps.api.src.services import qdrant_service as qdrant_module
+    from apps.api.src.services.reindex_service import BlueGreenReindexService
+    from packages.database.qdrant_registry import CollectionRegistry
+
+    service = qdrant_module.qdrant_service
+    saved = (service._client, service.registry, llm_factory.get_embedding_model)
+    service._client = QdrantClient(location=":memory:")
+    service.registry = CollectionRegistry(service.get_client, vector_size=lambda: 8)
+    service.registry.bootstrap([qdrant_module.COLLECTION_NAME])
+    embeddings = FakeEmbeddings()
+    llm_factory.get_embedding_model = lambda: embeddings
+
+    def restore():
+        service._client, service.registry, llm_factory.get_embedding_model = saved
+
+    engine = create_engine("sqlite://", connect_args={"detect_types": sqlite3.PARSE_DECLTYPES})
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, global_name TEXT)"))
+        conn.execute(text("CREATE TABLE channels (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("""
+            CREATE TABLE messages (
+                id INTEGER PRIMARY KEY, guild_id INTEGER, channel_id INTEGER, author_id INTEGER,
+                content TEXT, message_timestamp TIMESTAMP, reply_to_id INTEGER,
+                is_deleted BOOLEAN DEFAULT FALSE, indexed_at TIMESTAMP,
+                qdrant_point_id TEXT, shadow_point_id TEXT
+            )
+        """))
+        conn.execute(text("INSERT INTO users VALUES (1, 'alice', 'Alice'), (2, 'bob', NULL)"))
+        conn.execute(text("INSERT INTO channels VALUES (:id, 'general')"), {"id": CHANNEL})
+        conn.commit()
+
+    reindex = BlueGreenReindexService()
+    reindex._engine = engine
+    return service, reindex, engine, embeddings, restore
+
+
+def insert_messages(engine, minutes: list[int]):
+    """One message per entry, at T0 + minutes; returns their ids."""
+    from sqlalchemy import text
+
+    rows = [
+        {
+            "id": 100 + i,
+            "author_id": 1 + i % 2,
+            "content": f"message {i}",
+            "ts": T0 + timedelta(minutes=minute),
+            "indexed_at": T0 + timedelta(days=1),
+        }
+        for i, minute in enumerate(minutes)
+    ]
+    with engine.connect() as conn:
+        conn.execute(text("""
+            INSERT INTO messages (id, guild_id, channel_id, author_id, content, message_timestamp,
+                                  is_deleted, indexed_at, qdrant_point_id)
+            VALUES (:id, 1, 10, :author_id, :content, :ts, FALSE, :indexed_at, 'live-' || :id)
+        """), rows)
+        conn.commit()
+    return [row["id"] for row in rows]
+
+
+def start_job(service, reindex):
+    """Create the shadow and stub the Postgres job record with an in-memory one."""
+    from apps.api.src.services.qdrant_service import COLLECTION_NAME
+    from apps.api.src.services.reindex_service import ReindexStatus
+
+    shadow = service.registry.create_shadow(COLLECTION_NAME)
+    job = SimpleNamespace(
+        id="job-1",
+        shadow_collection=shadow,
+        status=ReindexStatus.BUILDING.value,
+        cutoff_at=datetime.now(timezone.utc) - timedelta(seconds=1),
+        messages_total=1,
+        last_channel_id=None,
+        progress={"messages_done": 0, "sessions_written": 0, "channels_done": 0},
+    )
+
+    def update_job(job_id, status=None, error=None, completed=False):
+        job.status = status or job.status
+
+    def increment(job_id, last_channel_id=None, **counts):
+        for key, value in counts.items():
+            job.progress[key] = job.progress.get(key, 0) + value
+
+    reindex._active_job = lambda collection_name: job
+    reindex._update_job = update_job
+    reindex._increment = increment
+    reindex.get_progress = lambda collection_name=None: None
+    return job
+
+
+def session_payloads(service, collection_name):
+    points, _ = service.get_client().scroll(collection_name, limit=100, with_payload=True)
+    return {str(p.id): p.payload for p in points}
+
+
+def test_dual_write_and_rtbf():
+    """While a shadow exists, writes and RTBF deletes reach it too."""
+    print("Testing dual-write and RTBF delete...")
+    print("=" * 50)
+
+    from apps.api.src.services.qdrant_service import COLLECTION_NAME, build_session_point
+
+    service, reindex, _, _, restore = make_env()
+    try:
+        job = start_job(service, reindex)
+        point = build_session_point(
+            session_id="00000000-0000-0000-0000-000000000001",
+            guild_id=GUILD,
+            channel_id=CHANNEL,
+            embedding=[1.0] * 8,
+            message_ids=[100, 101],
+            content_preview="hello",
+            start_time=T0.isoformat(),
+            end_time=T0.isoformat(),
+        )
+        assert service.upsert_points(COLLECTION_NAME, [point])
+        for collection_name in (COLLECTION_NAME, job.shadow_collection):
+            assert list(session_payloads(service, collection_name)) == [str(point.id)], collection_name
+        print(f"✓ upsert_points wrote to {COLLECTION_NAME} and {job.shadow_collection}")
+
+        result = service.delete_sessions_containing_messages(GUILD, [101])
+        assert result["deleted_count"] >= 1, result
+        for collection_name in (COLLECTION_NAME, job.shadow_collection):
+            assert session_payloads(service, collection_name) == {}, collection_name
+        print("✓ Deleting a message removed its session from the live and shadow collections")
+    finally:
+        restore()
+
+    print()
+    return True
+
+
+def test_backfill_across_pages():
+    """A conversation split over several pages is backfilled as one session."""
+    print("Testing backfill across page boundaries...")
+    print("=" * 50)
+
+    from sqlalchemy import text
+    from apps.api.src.services import reindex_service as reindex_module
+    from apps.api.src.services.reindex_service import ReindexStatus
+
+    service, reindex, engine, embeddings, restore = make_env()
+    max_carried = reindex_module.MAX_CARRIED_MESSAGES
+    try:
+        # Seven messages a minute apart, a 40 minute gap, then three more
+        ids = insert_messages(engine, [0, 1, 2, 3, 4, 5, 6, 46, 47, 48])
+        job = start_job(service, reindex)
+
+        reindex.backfill(page_size=3)
+        assert job.status == ReindexStatus.READY.value
+
+        sessions = sorted(
+            (payload["message_ids"], point_id)
+            for point_id, payload in session_payloads(service, job.shadow_collection).items()
+        )
+        assert [message_ids for message_ids, _ in sessions] == [ids[:7], ids[7:]], sessions
+        print("✓ 10 messages in pages of 3 -> the same 2 sessions as one pass over the channel")
+
+        assert job.progress["messages_done"] == 10 and job.progress["sessions_written"] == 2, job.progress
+        assert job.progress["channels_done"] == 1
+        print(f"✓ Progress: {job.progress}")
+
+        with engine.connect() as conn:
+            pointers = dict(conn.execute(text("SELECT id, shadow_point_id FROM messages")).fetchall())
+        expected = {mid: point_id for message_ids, point_id in sessions for mid in message_ids}
+        assert pointers == expected, pointers
+        print("✓ Every message points at its shadow session")
+
+        calls = embeddings.calls
+        reindex._backfill_channel(job, CHANNEL, "general", page_size=3)
+        assert len(session_payloads(service, job.shadow_collection)) == 2
+        print(f"✓ Re-running a channel overwrites its sessions ({embeddings.calls - calls} embed calls)")
+
+        # A conversation that never pauses is written in capped pieces
+        reindex_module.MAX_CARRIED_MESSAGES = 3
+        with engine.connect() as conn:
+            conn.execute(text("DELETE FROM messages"))
+            conn.commit()
+        service.get_client().delete_collection(job.shadow_collection)
+        service.registry.invalidate(job.shadow_collection)
+        ids = insert_messages(engine, list(range(7)))
+        reindex._backfill_channel(job, CHANNEL, "general", page_size=3)
+        sizes = sorted(len(p["message_ids"]) for p in session_payloads(service, job.shadow_collection).values())
+        assert sizes == [1, 3, 3], sizes
+        print("✓ A session reaching MAX_CARRIED_MESSAGES is written without waiting for its end")
+    finally:
+        reindex_module.MAX_CARRIED_MESSAGES = max_carried
+        restore()
+
+    print()
+    return True
+
+
+def test_promote_repoints_messages():
+    """promote() swaps the alias and moves qdrant_point_id to the shadow sessions."""
+    print("Testing promote...")
+    print("=" * 50)
+
+    from sqlalchemy import text
+    from apps.api.src.services.qdrant_service import COLLECTION_NAME
+    from apps.api.src.services.reindex_service import ReindexStatus
+
+    service, reindex, engine, _, restore = make_env()
+    try:
+        insert_messages(engine, [0, 1, 2, 40])
+        job = start_job(service, reindex)
+        reindex.backfill(page_size=500)
+
+        with engine.connect() as conn:
+            shadow_pointers = dict(conn.execute(text("SELECT id, shadow_point_id FROM messages")).fetchall())
+        assert all(shadow_pointers.values())
+
+        result = reindex.promote()
+        assert result["current"] == job.shadow_collection, result
+        assert result["messages_repointed"] == 4, result
+        assert service.registry.resolve(COLLECTION_NAME) == job.shadow_collection
+        assert job.status == ReindexStatus.PROMOTED.value
+        print(f"✓ {COLLECTION_NAME} now resolves to {job.shadow_collection}")
+
+        with engine.connect() as conn:
+            rows = conn.execute(text("SELECT id, qdrant_point_id, shadow_point_id FROM messages")).fetchall()
+        assert {row.id: row.qdrant_point_id for row in rows} == shadow_pointers
+        assert all(row.shadow_point_id is None for row in rows)
+        print("✓ qdrant_point_id moved to the shadow sessions, shadow_point_id cleared")
+
+        assert set(session_payloads(service, COLLECTION_NAME)) == set(shadow_pointers.values())
+        print("✓ Searches through the alias see the backfilled sessions")
+    finally:
+        restore()
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("BLUE/GREEN REINDEX TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Dual-write and RTBF", test_dual_write_and_rtbf()))
+    results.append(("Backfill across pages", test_backfill_across_pages()))
+    results.append(("Promote", test_promote_repoints_messages()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
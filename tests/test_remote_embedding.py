@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Test: Pooled, rate-limited remote embedding clients
+
+Uses a stand-in provider (no API calls) to check that:
+1. Inputs are split into provider-sized batches
+2. The token bucket spaces requests out to the configured rate
+3. Bulk embeds run batches concurrently (sync and async) and keep order
+4. EmbeddingModel reuses one client until settings change
+5. Redis-backed buckets share one budget across processes, and fall back
+   to a per-process bucket when Redis is down
+6. 429s are retried after the provider's Retry-After, other errors are not
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+from apps.api.src.core.remote_embedding import (
+    BatchLimits,
+    RedisTokenBucket,
+    RemoteEmbeddingClient,
+    TokenBucket,
+    rate_limit_retry_after,
+    split_batches,
+)
+
+
+class FakeRemoteClient(RemoteEmbeddingClient):
+    """Provider call replaced by a 50ms sleep that records concurrency."""
+
+    def __init__(self, **kwargs):
+        super().__init__("voyage", "fake-model", "key", **kwargs)
+        self.limits = BatchLimits(max_texts=10, max_tokens=10_000)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._track = threading.Lock()
+
+    def _enter(self):
+        with self._track:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._track:
+            self.in_flight -= 1
+
+    def _request(self, texts, input_type):
+        self._enter()
+        time.sleep(0.05)
+        self._exit()
+        return [[float(text)] for text in texts]
+
+    async def _arequest(self, texts, input_type):
+        self._enter()
+        await asyncio.sleep(0.05)
+        self._exit()
+        return [[float(text)] for text in texts]
+
+    def _build_client(self, use_async):
+        return object()
+
+
+def test_split_batches():
+    """Batches respect both the text count and the token budget."""
+    print("Testing batch splitting...")
+    print("=" * 50)
+
+    limits = BatchLimits(max_texts=3, max_tokens=100)
+    assert split_batches([], limits) == []
+    assert split_batches(["a"] * 7, limits) == [(0, 3), (3, 6), (6, 7)]
+    print("✓ Split by text count")
+
+    # ~51 tokens each: two would exceed 100
+    long_text = "x" * 200
+    assert split_batches([long_text, long_text, "a"], limits) == [(0, 1), (1, 3)]
+    # A single oversized text still gets its own batch
+    assert split_batches(["x" * 1000], limits) == [(0, 1)]
+    print("✓ Split by token budget")
+
+    print()
+    return True
+
+
+def test_token_bucket():
+    """Requests beyond the burst wait for refill."""
+    print("Testing token bucket...")
+    print("=" * 50)
+
+    bucket = TokenBucket(per_minute=600, burst_seconds=0.5)  # 10/s, burst of 5
+    start = time.perf_counter()
+    for _ in range(10):
+        bucket.acquire(1)
+    elapsed = time.perf_counter() - start
+    assert 0.4 < elapsed < 0.8, f"10 acquires took {elapsed:.2f}s"
+    print(f"✓ Burst of 5 then 10/s: 10 acquires in {elapsed:.2f}s")
+
+    async def run_async():
+        async_bucket = TokenBucket(per_minute=600, burst_seconds=0.5)
+        begin = time.perf_counter()
+        await asyncio.gather(*(async_bucket.aacquire(1) for _ in range(10)))
+        return time.perf_counter() - begin
+
+    elapsed = asyncio.run(run_async())
+    assert 0.4 < elapsed < 0.8, f"10 async acquires took {elapsed:.2f}s"
+    print(f"✓ Async callers spaced the same way ({elapsed:.2f}s)")
+
+    print()
+    return True
+
+
+def test_concurrent_bulk():
+    """Bulk embeds run batches in parallel, capped at the concurrency setting."""
+    print("Testing concurrent bulk embedding...")
+    print("=" * 50)
+
+    texts = [str(i) for i in range(80)]  # 8 batches of 10
+    expected = [[float(i)] for i in range(80)]
+
+    client = FakeRemoteClient(concurrency=4, tokens_per_minute=0, requests_per_minute=0)
+    start = time.perf_counter()
+    assert client.embed(texts) == expected
+    elapsed = time.perf_counter() - start
+    assert client.max_in_flight == 4, client.max_in_flight
+    assert elapsed < 0.3, f"8 batches took {elapsed:.2f}s"
+    print(f"✓ Sync: 8 batches, 4 in flight, order kept ({elapsed:.2f}s vs 0.4s serial)")
+
+    client = FakeRemoteClient(concurrency=4, tokens_per_minute=0, requests_per_minute=0)
+    assert asyncio.run(client.aembed(texts)) == expected
+    assert client.max_in_flight == 4, client.max_in_flight
+    print("✓ Async: same batches and cap on the event loop")
+
+    # 8 requests at 120/min with a 1s burst (2 requests): the rest wait 0.5s each
+    client = FakeRemoteClient(concurrency=8, tokens_per_minute=0, requests_per_minute=120)
+    client._request_bucket = TokenBucket(120, burst_seconds=1.0)
+    start = time.perf_counter()
+    assert client.embed(texts) == expected
+    elapsed = time.perf_counter() - start
+    assert elapsed > 2.5, f"rate limit not applied ({elapsed:.2f}s)"
+    assert client.get_stats()["requests"] == 8
+    print(f"✓ Rate limit holds requests back ({elapsed:.2f}s, throttled {client.get_stats()['throttled_s']}s)")
+
+    print()
+    return True
+
+
+def test_client_reuse():
+    """One client per settings version, rebuilt after a settings change."""
+    print("Testing client reuse...")
+    print("=" * 50)
+
+    from apps.api.src.core import config, remote_embedding
+    from apps.api.src.core.llm_factory import EmbeddingModel
+
+    saved = dict(config._runtime_overrides)
+    original = remote_embedding.RemoteEmbeddingClient
+    built = []
+
+    class CountingClient(FakeRemoteClient):
+        def __init__(self, provider, model, api_key, redis_url=None, **kwargs):
+            super().__init__(**kwargs)
+            built.append((provider, model, api_key))
+            self.redis_url = redis_url
+
+    try:
+        config._runtime_overrides.update({
+            "embedding_provider": "voyage",
+            "embedding_model": "voyage-3.5",
+            "voyage_api_key": "test-key",
+        })
+        remote_embedding.RemoteEmbeddingClient = CountingClient
+
+        model = EmbeddingModel()
+        model._cache = None
+        assert model.embed_documents(["1", "2"]) == [[1.0], [2.0]]
+        assert model.embed_query("3") == [3.0]
+        assert asyncio.run(model.aembed_documents(["4"])) == [[4.0]]
+        assert built == [("voyage", "voyage-3.5", "test-key")], built
+        assert model._remote_client().redis_url == config.get_settings().redis_url
+        print("✓ Sync, query and async calls share one client, rate limited through Redis")
+
+        config.clear_settings_cache()
+        model.embed_query("5")
+        assert len(built) == 2
+        assert len(model._remote_clients) == 1
+        print("✓ Settings change builds a new client and drops the old one")
+    finally:
+        remote_embedding.RemoteEmbeddingClient = original
+        config._runtime_overrides.clear()
+        config._runtime_overrides.update(saved)
+
+    print()
+    return True
+
+
+class FakeRedis:
+    """Runs the bucket script's arithmetic in Python, against one shared dict."""
+
+    def __init__(self, fail: bool = False):
+        self.hashes = {}
+        self.fail = fail
+        self.calls = 0
+
+    def eval(self, script, numkeys, key, rate, capacity, amount, burst_seconds):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("redis unavailable")
+        now = time.time()
+        tokens, updated = self.hashes.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - updated) * rate) - amount
+        self.hashes[key] = (tokens, now)
+        return str(max(0.0, -tokens / rate))
+
+
+def test_shared_rate_limit():
+    """Buckets in different processes draw on one Redis balance."""
+    print("Testing shared rate limit...")
+    print("=" * 50)
+
+    redis = FakeRedis()
+
+    def process_bucket():
+        bucket = RedisTokenBucket("redis://test", "embed_rate:test:requests", per_minute=600, burst_seconds=0.5)
+        bucket._client = redis
+        return bucket
+
+    first, second = process_bucket(), process_bucket()
+    waits = [bucket._reserve(1) for bucket in (first, second) * 5]
+    assert waits[:5] == [0.0] * 5, waits
+    assert all(later > earlier for earlier, later in zip(waits[5:-1], waits[6:], strict=True)), waits
+    assert 0.4 < waits[-1] < 0.6, waits
+    print(f"✓ 2 processes x 5 requests share a burst of 5 (last waits {waits[-1]:.2f}s)")
+
+    client = RemoteEmbeddingClient("voyage", "voyage-3.5", "secret-key", redis_url="redis://test")
+    assert isinstance(client._request_bucket, RedisTokenBucket)
+    assert client._request_bucket.key.startswith("embed_rate:voyage:") and "secret-key" not in client._request_bucket.key
+    assert RemoteEmbeddingClient("voyage", "voyage-3.5", "secret-key")._request_bucket.__class__ is TokenBucket
+    print("✓ Keyed by provider and a hash of the API key; per process without redis_url")
+
+    down = FakeRedis(fail=True)
+    bucket = process_bucket()
+    bucket._client = down
+    waits = [bucket._reserve(1) for _ in range(6)]
+    assert down.calls == 1 and bucket.redis_errors == 1
+    assert waits[:5] == [0.0] * 5 and waits[5] > 0, waits
+    print("✓ Redis down: falls back to the per-process bucket without retrying Redis each call")
+
+    print()
+    return True
+
+
+class RateLimitError(Exception):
+    """Shaped like the OpenAI/Voyage SDK errors: status and response headers."""
+
+    def __init__(self, headers=None):
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = type("Response", (), {"status_code": 429, "headers": headers or {}})()
+
+
+def test_rate_limit_retry():
+    """A 429 waits out Retry-After and retries; other errors surface at once."""
+    print("Testing 429 retry...")
+    print("=" * 50)
+
+    assert rate_limit_retry_after(RateLimitError({"Retry-After": "2"})) == 2.0
+    assert rate_limit_retry_after(RateLimitError({"retry-after-ms": "150"})) == 0.15
+    assert rate_limit_retry_after(RateLimitError()) == 0.0
+    assert rate_limit_retry_after(ValueError("bad input")) is None
+    print("✓ Retry-After (seconds or ms) read from 429s, other errors ignored")
+
+    class FlakyClient(FakeRemoteClient):
+        def __init__(self, errors, **kwargs):
+            super().__init__(tokens_per_minute=0, requests_per_minute=0, **kwargs)
+            self.errors = list(errors)
+            self.attempts = 0
+
+        def _request(self, texts, input_type):
+            self.attempts += 1
+            if self.errors:
+                raise self.errors.pop(0)
+            return super()._request(texts, input_type)
+
+        async def _arequest(self, texts, input_type):
+            return self._request(texts, input_type)
+
+    client = FlakyClient([RateLimitError({"retry-after": "0.2"})])
+    start = time.perf_counter()
+    assert client.embed(["1"]) == [[1.0]]
+    elapsed = time.perf_counter() - start
+    assert client.attempts == 2 and 0.2 <= elapsed < 0.5, (client.attempts, elapsed)
+    assert client.get_stats()["rate_limited"] == 1
+    print(f"✓ Sync: retried after Retry-After ({elapsed:.2f}s)")
+
+    client = FlakyClient([RateLimitError({"retry-after": "0.1"})] * 2)
+    assert asyncio.run(client.aembed(["2"])) == [[2.0]] and client.attempts == 3
+    print("✓ Async: retried twice")
+
+    client = FlakyClient([RateLimitError({"retry-after": "0"})] * 3, max_retries=1)
+    try:
+        client.embed(["3"])
+        raise AssertionError("expected the 429 to surface")
+    except RateLimitError:
+        pass
+    assert client.attempts == 2
+    print("✓ Gives up after max_retries")
+
+    client = FlakyClient([ValueError("bad input")])
+    try:
+        client.embed(["4"])
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+    assert client.attempts == 1
+    print("✓ Non-429 errors are not retried")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("REMOTE EMBEDDING CLIENT TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Batch splitting", test_split_batches()))
+    results.append(("Token bucket", test_token_bucket()))
+    results.append(("Concurrent bulk", test_concurrent_bulk()))
+    results.append(("Client reuse", test_client_reuse()))
+    results.append(("Shared rate limit", test_shared_rate_limit()))
+    results.append(("429 retry", test_rate_limit_retry()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Test: Vectorized late-interaction reranker
+
+Uses a counting stand-in model and an in-process Qdrant to check that:
+1. Candidates with stored vectors are reranked without any model call
+2. Otherwise query + candidates are encoded in exactly one batch
+3. Scores match the old one-encode-per-document loop
+4. Searches with with_vectors=True return each hit's dense vector
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+
+class CountingModel:
+    """Stands in for SentenceTransformer: letter histogram, counts encode() calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, sentences, convert_to_numpy=True, **kwargs):
+        self.calls += 1
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else sentences
+        vectors = np.array(
+            [[text.lower().count(c) + 0.1 for c in "abcdefghijklmnopqrstuvwxyz"] for text in texts],
+            dtype=np.float32,
+        )
+        return vectors[0] if single else vectors
+
+
+def make_reranker(model):
+    from apps.api.src.services.hybrid_embedding import LateInteractionModel
+
+    reranker = LateInteractionModel()
+    reranker._model = model
+    reranker._initialized = True
+    return reranker
+
+
+DOCUMENTS = [
+    {"id": "1", "score": 0.50, "payload": {"content": "the deploy failed on friday"}},
+    {"id": "2", "score": 0.45, "payload": {"content": "lunch plans for the team"}},
+    {"id": "3", "score": 0.40, "payload": {"content": "rollback the failed deploy"}},
+    {"id": "4", "score": 0.30, "payload": {}},
+]
+
+QUERY = "why did the deploy fail"
+
+
+def old_rerank(model, query, documents, top_k):
+    """The previous implementation: one encode per document, Python loop."""
+    query_embedding = model.encode(query)
+    scored = []
+    for doc in documents:
+        content = doc["payload"].get("content", "")
+        if not content:
+            scored.append((doc["id"], doc["score"]))
+            continue
+        doc_embedding = model.encode(content[:1000])
+        similarity = float(np.dot(query_embedding, doc_embedding) / (
+            np.linalg.norm(query_embedding) * np.linalg.norm(doc_embedding) + 1e-8
+        ))
+        scored.append((doc["id"], 0.6 * similarity + 0.4 * doc["score"]))
+    scored.sort(key=lambda x: x[1], reverse=True)
+    return scored[:top_k]
+
+
+def test_batch_encode():
+    """Without stored vectors: one encode call, same ranking as before."""
+    print("Testing batched encode path...")
+    print("=" * 50)
+
+    model = CountingModel()
+    reranked = make_reranker(model).rerank(QUERY, DOCUMENTS, top_k=3)
+    assert model.calls == 1, f"{model.calls} encode calls"
+    print("✓ One encode call for query + 3 candidates")
+
+    expected = old_rerank(CountingModel(), QUERY, DOCUMENTS, top_k=3)
+    assert [d["id"] for d in reranked] == [doc_id for doc_id, _ in expected]
+    for doc, (_, score) in zip(reranked, expected, strict=True):
+        assert abs(doc["score"] - score) < 1e-5, (doc["score"], score)
+    original = {doc["id"]: doc["score"] for doc in DOCUMENTS}
+    assert all(d["original_score"] == original[d["id"]] for d in reranked)
+    print(f"✓ Same order and scores as the per-document loop: {[d['id'] for d in reranked]}")
+
+    print()
+    return True
+
+
+def test_stored_vectors():
+    """Stored vectors + query vector: no model call at all."""
+    print("Testing stored-vector path...")
+    print("=" * 50)
+
+    model = CountingModel()
+    query_vector = [1.0, 0.0, 0.0]
+    documents = [
+        {"id": "a", "score": 0.9, "payload": {}, "vector": [0.0, 1.0, 0.0]},
+        {"id": "b", "score": 0.1, "payload": {}, "vector": [2.0, 0.1, 0.0]},
+        {"id": "c", "score": 0.5, "payload": {}, "vector": [1.0, 1.0, 0.0]},
+    ]
+    reranked = make_reranker(model).rerank("q", documents, top_k=2, query_vector=query_vector)
+    assert model.calls == 0
+    assert [d["id"] for d in reranked] == ["b", "c"], [d["id"] for d in reranked]
+    assert abs(reranked[1]["score"] - (0.6 * 2 ** -0.5 + 0.4 * 0.5)) < 1e-5
+    print("✓ Reranked from stored vectors with zero encode calls")
+
+    # A candidate without a vector (or another dimension) falls back to one batch
+    documents[1] = {"id": "b", "score": 0.1, "payload": {"content": "abc"}, "vector": [1.0, 0.0]}
+    make_reranker(model).rerank("q", documents, top_k=2, query_vector=query_vector)
+    assert model.calls == 1
+    print("✓ Mismatched vector falls back to a single batch encode")
+
+    print()
+    return True
+
+
+def test_search_returns_vectors():
+    """with_vectors=True brings the dense vector back on every hit."""
+    print("Testing with_vectors search...")
+    print("=" * 50)
+
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, PointStruct, SparseVectorParams, VectorParams
+    from apps.api.src.services.qdrant_service import (
+        HYBRID_COLLECTION_NAME,
+        SearchRequest,
+        _build_query_request,
+        _to_results,
+    )
+    from packages.database.qdrant_schema import DENSE_VECTOR_NAME, SPARSE_VECTOR_NAME
+
+    client = QdrantClient(location=":memory:")
+    client.create_collection(
+        HYBRID_COLLECTION_NAME,
+        vectors_config={DENSE_VECTOR_NAME: VectorParams(size=3, distance=Distance.COSINE)},
+        sparse_vectors_config={SPARSE_VECTOR_NAME: SparseVectorParams()},
+    )
+    client.upsert(HYBRID_COLLECTION_NAME, points=[
+        PointStruct(id=i, vector={DENSE_VECTOR_NAME: vector}, payload={"guild_id": 1})
+        for i, vector in enumerate([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    ])
+
+    def search(with_vectors):
+        request = SearchRequest(
+            collection_name=HYBRID_COLLECTION_NAME,
+            query_dense=[1.0, 0.1, 0.0],
+            guild_id=1,
+            limit=2,
+            with_vectors=with_vectors,
+        )
+        response = client.query_batch_points(HYBRID_COLLECTION_NAME, requests=[_build_query_request(request, None)])
+        return _to_results(response[0].points)
+
+    hits = search(with_vectors=True)
+    assert [h["id"] for h in hits] == ["0", "1"]
+    assert np.allclose(hits[0]["vector"], [1.0, 0.0, 0.0]), hits[0]["vector"]
+    print("✓ Dense vector returned with each hit")
+
+    assert all("vector" not in h for h in search(with_vectors=False))
+    print("✓ No vectors unless requested")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("RERANKER TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Batched encode", test_batch_encode()))
+    results.append(("Stored vectors", test_stored_vectors()))
+    results.append(("with_vectors search", test_search_returns_vectors()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
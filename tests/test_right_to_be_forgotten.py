@@ -6,6 +6,9 @@ Tests the complete deletion pipeline:
 1. Message soft-deleted in Postgres (content cleared)
 2. Session containing message deleted from Qdrant
 3. Deleted content does NOT appear in RAG responses
+
+The session deletes and the message_ids index migration are also checked
+against an in-process Qdrant with two guilds (no services needed).
 """
 
 import sys
@@ -32,6 +35,92 @@ def test_qdrant_delete_sessions_method():
         "get_sessions_by_message_ids method missing"
     print("✓ get_sessions_by_message_ids method exists")
     
+    # Check the message_ids index migration exists
+    assert hasattr(qdrant_service, 'ensure_message_ids_index'), \
+        "ensure_message_ids_index method missing"
+    print("✓ ensure_message_ids_index method exists")
+    
+    print()
+    return True
+
+
+class IndexReportingClient:
+    """
+    Wraps the in-memory client and reports created payload indexes.
+
+    Local Qdrant accepts create_payload_index but leaves payload_schema
+    empty; this adds the indexed fields back, as a server would.
+    """
+
+    def __init__(self, client):
+        self._client = client
+        self.indexed = {}
+
+    def create_payload_index(self, collection_name, field_name, field_schema=None, **kwargs):
+        self.indexed.setdefault(collection_name, {})[field_name] = field_schema
+        return self._client.create_payload_index(
+            collection_name=collection_name, field_name=field_name, field_schema=field_schema, **kwargs
+        )
+
+    def get_collection(self, collection_name):
+        info = self._client.get_collection(collection_name)
+        info.payload_schema = {**(info.payload_schema or {}), **self.indexed.get(collection_name, {})}
+        return info
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def test_delete_sessions_in_memory():
+    """Sessions holding deleted messages go from both collections, other guilds' stay."""
+    print("Testing session deletes against in-memory Qdrant...")
+    print("=" * 50)
+    
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import PointStruct
+    from apps.api.src.services.qdrant_service import COLLECTION_NAME, HYBRID_COLLECTION_NAME, QdrantService
+    from packages.database.qdrant_registry import CollectionRegistry
+    
+    guild, other_guild = 111, 222
+    client = QdrantClient(location=":memory:")
+    service = QdrantService()
+    service._client = client
+    service.registry = CollectionRegistry(service.get_client, vector_size=lambda: 8)
+    service.registry.bootstrap([COLLECTION_NAME, HYBRID_COLLECTION_NAME])
+    
+    # Same message IDs in both guilds: only the requesting guild's sessions may go
+    sessions = [
+        (1, guild, [10, 11]),
+        (2, guild, [12]),
+        (3, guild, [11, 13]),
+        (4, other_guild, [10, 11]),
+    ]
+    for collection_name, vector in ((COLLECTION_NAME, [1.0] * 8), (HYBRID_COLLECTION_NAME, {"dense": [1.0] * 8})):
+        client.upsert(collection_name, points=[
+            PointStruct(id=point_id, vector=vector, payload={"guild_id": guild_id, "message_ids": message_ids})
+            for point_id, guild_id, message_ids in sessions
+        ])
+    
+    result = service.delete_sessions_containing_messages(guild_id=guild, message_ids=[11])
+    assert "error" not in result, result
+    assert result["session_ids"] == ["1", "3"], result
+    print(f"✓ Deleted sessions {result['session_ids']} containing message 11")
+    
+    for collection_name in (COLLECTION_NAME, HYBRID_COLLECTION_NAME):
+        remaining = sorted(p.id for p in client.scroll(collection_name, limit=10)[0])
+        assert remaining == [2, 4], f"{collection_name}: {remaining}"
+    print("✓ Removed from both session collections; the other guild's session is untouched")
+    
+    assert service.delete_sessions_containing_messages(guild_id=guild, message_ids=[99])["deleted_count"] == 0
+    print("✓ Unknown message IDs delete nothing")
+    
+    # Collections created before message_ids was indexed get the index once
+    service._client = IndexReportingClient(client)
+    expected = {COLLECTION_NAME: "created", HYBRID_COLLECTION_NAME: "created"}
+    assert service.ensure_message_ids_index() == expected
+    assert service.ensure_message_ids_index() == {name: "exists" for name in expected}
+    print("✓ ensure_message_ids_index creates the index, then reports it exists")
+    
     print()
     return True
 
@@ -406,6 +495,7 @@ def main():
     
     # Run basic checks first
     results.append(("Qdrant Delete Method", test_qdrant_delete_sessions_method()))
+    results.append(("In-Memory Session Deletes", test_delete_sessions_in_memory()))
     results.append(("Celery Task", test_celery_task_exists()))
     results.append(("Postgres Soft Delete", test_postgres_soft_delete()))
     
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test: Speculative retrieval in /ask
+
+Uses stubbed classification, retrieval and agents to check that:
+1. A hit reuses the running retrieval and records the time saved
+2. A miss cancels the retrieval; failures of unused retrievals are swallowed
+3. /ask speculates only when no pattern decides the intent
+4. general_knowledge with a channel uses the speculative retrieval
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+AMBIGUOUS = "anything on the migration plan"  # No routing pattern matches
+
+
+def test_hit_and_miss():
+    """take() hands over the running task; cancel() stops it."""
+    print("Testing hit and miss...")
+    print("=" * 50)
+
+    from apps.api.src.core.speculation import SpeculationStats, SpeculativeRetrieval
+
+    stats = SpeculationStats()
+
+    async def retrieve(delay, result="context"):
+        await asyncio.sleep(delay)
+        return result
+
+    async def hit():
+        speculation = SpeculativeRetrieval(retrieve(0.05), stats)
+        await asyncio.sleep(0.03)  # Classification
+        return await speculation.take(), speculation.saved_ms
+
+    result, saved_ms = asyncio.run(hit())
+    assert result == "context" and 25 <= saved_ms < 50, saved_ms
+    print(f"✓ Hit reuses the retrieval ({saved_ms:.0f}ms already done)")
+
+    async def miss():
+        speculation = SpeculativeRetrieval(retrieve(10), stats)
+        await asyncio.sleep(0.01)
+        speculation.cancel()
+        await asyncio.sleep(0)
+        return speculation
+
+    speculation = asyncio.run(miss())
+    assert speculation.task.cancelled() and speculation.take() is None
+    print("✓ Miss cancels the retrieval")
+
+    async def failed():
+        async def broken():
+            raise ConnectionError("qdrant down")
+        speculation = SpeculativeRetrieval(broken(), stats)
+        await asyncio.sleep(0.01)
+        speculation.cancel("discarded")
+
+    errors = []
+    loop = asyncio.new_event_loop()
+    loop.set_exception_handler(lambda loop, context: errors.append(context))
+    loop.run_until_complete(failed())
+    loop.close()
+    assert not errors, errors
+    print("✓ An unused failed retrieval is not reported as unhandled")
+
+    summary = stats.get_stats()
+    assert (summary["started"], summary["hits"], summary["misses"], summary["discarded"]) == (3, 1, 1, 1)
+    assert summary["hit_rate"] == 0.5 and summary["avg_saved_ms"] == round(saved_ms, 1)
+    print(f"✓ Stats: {summary}")
+
+    print()
+    return True
+
+
+def run_ask(text, intent, channel_id=None):
+    """Run /ask with stubs; returns (response, calls, speculation stats)."""
+    from apps.api.src import main
+    from apps.api.src.core import answer_cache, speculation
+    from apps.api.src.core.answer_cache import AnswerCache
+    from apps.api.src.core.speculation import SpeculationStats
+    from packages.shared.python.models import AskQuery, AskResponse, RouterIntent
+
+    calls = {"retrieve": 0, "cancelled": 0}
+
+    async def classify_intent(query, route=None):
+        if route.intent is not None:
+            return route.intent
+        await asyncio.sleep(0.05)  # Embedding classifier / LLM
+        return intent
+
+    async def retrieve_rag_context(**kwargs):
+        calls["retrieve"] += 1
+        try:
+            await asyncio.sleep(0.1)  # Outlasts classification
+        except asyncio.CancelledError:
+            calls["cancelled"] += 1
+            raise
+        return "speculative context"
+
+    async def process_rag_query(query, guild_id, retrieval=None, **kwargs):
+        context = await retrieval if retrieval is not None else "fresh context"
+        return AskResponse(answer=context, sources=[], routed_to=RouterIntent.VECTOR_RAG,
+                           execution_time_ms=1.0, timings_ms={})
+
+    async def process_analytics_query(query, guild_id):
+        return AskResponse(answer="42 messages", sources=[], routed_to=RouterIntent.ANALYTICS_DB,
+                           execution_time_ms=1.0)
+
+    names = ("classify_intent", "retrieve_rag_context", "process_rag_query", "process_analytics_query")
+    saved = [getattr(main, name) for name in names]
+    saved_cache, saved_stats = answer_cache._answer_cache, speculation._speculation_stats
+    try:
+        for name, stub in zip(names, (classify_intent, retrieve_rag_context, process_rag_query, process_analytics_query), strict=True):
+            setattr(main, name, stub)
+        answer_cache._answer_cache = AnswerCache(redis_url="redis://unused", enabled=False)
+        speculation._speculation_stats = SpeculationStats()
+
+        async def ask():
+            response = await main.ask(AskQuery(guild_id=1, query=text, channel_id=channel_id))
+            await asyncio.sleep(0.05)  # Let a cancelled retrieval finish unwinding
+            return response
+
+        response = asyncio.run(ask())
+        return response, calls, speculation._speculation_stats.get_stats()
+    finally:
+        for name, original in zip(names, saved, strict=True):
+            setattr(main, name, original)
+        answer_cache._answer_cache, speculation._speculation_stats = saved_cache, saved_stats
+
+
+def test_ask_endpoint():
+    """/ask speculates on ambiguous queries and keeps only useful retrievals."""
+    print("Testing /ask speculation...")
+    print("=" * 50)
+
+    from apps.api.src.agents.router import route_query
+    from packages.shared.python.models import RouterIntent
+
+    assert route_query(AMBIGUOUS).intent is None
+
+    response, calls, stats = run_ask(AMBIGUOUS, RouterIntent.VECTOR_RAG)
+    assert response.answer == "speculative context" and calls["retrieve"] == 1
+    assert stats["hits"] == 1 and response.timings_ms["speculation_saved"] >= 25
+    print(f"✓ vector_rag: retrieval reused ({response.timings_ms['speculation_saved']:.0f}ms saved)")
+
+    response, calls, stats = run_ask(AMBIGUOUS, RouterIntent.GENERAL_KNOWLEDGE, channel_id=7)
+    assert response.answer == "speculative context" and stats["hits"] == 1
+    assert response.routed_to == RouterIntent.VECTOR_RAG
+    print("✓ general_knowledge with a channel: retrieval reused")
+
+    response, calls, stats = run_ask(AMBIGUOUS, RouterIntent.ANALYTICS_DB)
+    assert response.answer == "42 messages"
+    assert stats["misses"] == 1 and calls["cancelled"] == 1
+    print("✓ analytics_db: retrieval cancelled")
+
+    response, calls, stats = run_ask("How many messages were sent yesterday?", RouterIntent.VECTOR_RAG)
+    assert calls["retrieve"] == 0 and stats["started"] == 0
+    print("✓ No speculation when a pattern decides the intent")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("SPECULATIVE RETRIEVAL TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Hit and miss", test_hit_and_miss()))
+    results.append(("/ask endpoint", test_ask_endpoint()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
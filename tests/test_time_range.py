@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Test: Time-range extraction and time-window session filtering
+
+Checks that:
+1. The router pulls time windows out of natural-language queries
+2. Recency words ask for a recency decay instead of a hard window
+3. The service filter (build_tenant_filter) on start_time/end_time prunes
+   sessions in Qdrant, also under recency decay
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+NOW = datetime(2025, 6, 18, 15, 30, tzinfo=timezone.utc)  # a Wednesday
+
+
+def test_explicit_windows():
+    """Calendar phrases map to the right [since, until) window."""
+    print("Testing explicit time windows...")
+    print("=" * 50)
+
+    from apps.api.src.agents.router import extract_time_range
+
+    today = NOW.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    time_range = extract_time_range("what did we talk about yesterday?", now=NOW)
+    assert time_range.since == today - timedelta(days=1), time_range
+    assert time_range.until == today, time_range
+    print("✓ 'yesterday' -> previous calendar day")
+
+    time_range = extract_time_range("summarize last week's discussion", now=NOW)
+    assert time_range.until == today - timedelta(days=today.weekday()), time_range
+    assert time_range.since == time_range.until - timedelta(days=7), time_range
+    print("✓ 'last week' -> previous Monday-to-Monday week")
+
+    time_range = extract_time_range("any bugs reported in the past 3 days?", now=NOW)
+    assert time_range.since == NOW - timedelta(days=3), time_range
+    assert time_range.until is None
+    print("✓ 'past 3 days' -> open-ended window")
+
+    time_range = extract_time_range("what was decided two weeks ago", now=NOW)
+    assert time_range.since is not None and time_range.since < NOW - timedelta(days=7)
+    print("✓ 'two weeks ago' -> window around that point")
+
+    assert extract_time_range("what are the main complaints?", now=NOW) is None
+    print("✓ No time phrase -> no time range")
+
+    print()
+    return True
+
+
+def test_recency_decay():
+    """'latest'/'recent' asks for recency decay, not a hard cutoff."""
+    print("Testing recency decay hints...")
+    print("=" * 50)
+
+    from apps.api.src.agents.router import extract_time_range
+
+    time_range = extract_time_range("what's the latest on the deploy?", now=NOW)
+    assert time_range is not None
+    assert time_range.since is None and time_range.until is None
+    assert time_range.recency_half_life_days, time_range
+    print("✓ 'latest' -> recency half-life, no window")
+
+    print()
+    return True
+
+
+def test_datetime_filter_prunes_sessions():
+    """The service's time-window filter prunes sessions in Qdrant before scoring."""
+    print("Testing DatetimeRange session filtering...")
+    print("=" * 50)
+
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, PayloadSchemaType, PointStruct, VectorParams
+    from apps.api.src.services.qdrant_service import _dense_query_kwargs, build_tenant_filter
+
+    guild_id, other_guild = 1, 2
+    query = [1.0, 0.5, 0.25, 0.125]
+
+    client = QdrantClient(location=":memory:")
+    client.create_collection(
+        collection_name="sessions",
+        vectors_config=VectorParams(size=4, distance=Distance.COSINE),
+    )
+    for field_name in ("start_time", "end_time"):
+        client.create_payload_index("sessions", field_name, PayloadSchemaType.DATETIME)
+
+    points = []
+    for day in range(10):
+        end = NOW - timedelta(days=day)
+        for guild in (guild_id, other_guild):
+            points.append(PointStruct(
+                id=guild * 100 + day,
+                vector=query,
+                payload={
+                    "guild_id": guild,
+                    "start_time": (end - timedelta(hours=1)).isoformat(),
+                    "end_time": end.isoformat(),
+                },
+            ))
+    client.upsert("sessions", points=points, wait=True)
+
+    def search(recency_half_life_days=None, **window):
+        kwargs = _dense_query_kwargs(
+            query,
+            None,
+            build_tenant_filter(guild_id, **window),
+            None,
+            limit=20,
+            score_threshold=None,
+            recency_half_life_days=recency_half_life_days,
+        )
+        response = client.query_points(collection_name="sessions", **kwargs, limit=20)
+        return sorted(point.id for point in response.points)
+
+    since = NOW - timedelta(days=3, hours=12)
+    ids = search(since=since)
+    assert ids == [100, 101, 102, 103], ids
+    print(f"✓ since: {len(ids)}/10 sessions inside the window, none from the other guild")
+
+    until = NOW - timedelta(days=7)
+    ids = search(since=NOW - timedelta(days=8, hours=12), until=until)
+    assert ids == [107, 108], ids
+    print("✓ since + until: only sessions overlapping the window")
+
+    ids = search(recency_half_life_days=1.0, since=since)
+    assert ids == [100, 101, 102, 103], ids
+    print("✓ The window also applies inside the recency-decay prefetch")
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("TIME RANGE RETRIEVAL TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Explicit windows", test_explicit_windows()))
+    results.append(("Recency decay", test_recency_decay()))
+    results.append(("Datetime filter", test_datetime_filter_prunes_sessions()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Test: Qdrant write-behind buffer
+
+Runs QdrantWriteBuffer against a recording fake service and checks that:
+1. Points are flushed once max_batch are pending, or after flush_interval
+2. The barrier writes once per (collection, shard key) before callbacks run
+3. A failed or unacknowledged flush hands its writes back through on_failed
+4. A failed barrier is retried, then hands its writes back
+5. Writes still unconfirmed at close() are handed back
+6. The Celery tasks redeliver themselves from on_failed
+7. A session whose message was deleted before the barrier is deleted, not marked
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeRegistry:
+    """One custom shard key per guild, like a sharded collection."""
+
+    def ensure(self, collection_name):
+        pass
+
+    def shard_key(self, collection_name, guild_id):
+        return f"guild_{guild_id}"
+
+
+class FakeClient:
+    def __init__(self):
+        self.barriers = []
+        self.fail_barriers = 0
+
+    def set_payload(self, **kwargs):
+        if self.fail_barriers:
+            self.fail_barriers -= 1
+            raise ConnectionError("qdrant unavailable")
+        self.barriers.append(kwargs)
+
+
+class FakeService:
+    """Records upserts instead of sending them."""
+
+    def __init__(self):
+        self.registry = FakeRegistry()
+        self.client = FakeClient()
+        self.upserts = []
+        self.fail_upserts = False
+        self.reject_upserts = False
+
+    def upsert_points(self, collection_name, points, wait=True):
+        if self.fail_upserts:
+            raise ConnectionError("qdrant unavailable")
+        if self.reject_upserts:
+            return False  # Neither ACKNOWLEDGED nor COMPLETED
+        self.upserts.append((collection_name, [p.id for p in points], wait))
+        return True
+
+    def get_client(self):
+        return self.client
+
+
+def point(point_id, guild_id=1):
+    from qdrant_client.models import PointStruct
+
+    return PointStruct(id=point_id, vector=[0.1, 0.2], payload={"guild_id": guild_id})
+
+
+def make_buffer(**kwargs):
+    from apps.api.src.services.qdrant_service import QdrantWriteBuffer
+
+    service = FakeService()
+    kwargs.setdefault("flush_interval", 60)  # Background thread stays idle unless a test wants it
+    return QdrantWriteBuffer(service, **kwargs), service
+
+
+class Calls:
+    """Callback recorder: calls.on("durable", 1) returns a callback."""
+
+    def __init__(self):
+        self.log = []
+
+    def on(self, kind, write_id):
+        return lambda: self.log.append((kind, write_id))
+
+
+def test_flush_on_size():
+    """Reaching max_batch flushes in the caller, without waiting for the timer."""
+    print("Testing flush on batch size...")
+    print("=" * 50)
+
+    buffer, service = make_buffer(max_batch=3)
+    try:
+        buffer.add("messages", [point(1)])
+        buffer.add("messages", [point(2)])
+        assert service.upserts == [], "Flushed before max_batch"
+        print("✓ Points stay pending below max_batch")
+
+        buffer.add("messages", [point(3)])
+        assert service.upserts == [("messages", [1, 2, 3], False)]
+        print("✓ One wait=False upsert once max_batch is reached")
+
+        buffer.add("messages", [point(4)])
+        buffer.add("sessions", [point(5)])
+        buffer.add("messages", [point(6)])
+        assert service.upserts[1:] == [("messages", [4, 6], False), ("sessions", [5], False)]
+        print("✓ One upsert per collection")
+
+        stats = buffer.get_stats()
+        assert stats["batches_flushed"] == 3 and stats["points_flushed"] == 6
+        assert stats["pending_points"] == 0
+        print(f"✓ Stats: {stats['batches_flushed']} batches, {stats['points_flushed']} points")
+    finally:
+        buffer.close()
+
+    print()
+    return True
+
+
+def test_flush_on_interval():
+    """The background thread flushes and confirms a partial batch on its timer."""
+    print("Testing flush on interval...")
+    print("=" * 50)
+
+    buffer, service = make_buffer(max_batch=100, flush_interval=0.05)
+    calls = Calls()
+    try:
+        buffer.add("messages", [point(1)], on_durable=calls.on("durable", 1))
+        deadline = time.monotonic() + 2
+        while not calls.log and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert service.upserts == [("messages", [1], False)]
+        assert calls.log == [("durable", 1)]
+        print("✓ Partial batch flushed and confirmed by the background thread")
+    finally:
+        buffer.close()
+
+    print()
+    return True
+
+
+def test_barrier():
+    """Callbacks run only after a strongly ordered barrier on every shard written."""
+    print("Testing barrier...")
+    print("=" * 50)
+
+    from qdrant_client.models import WriteOrdering
+
+    buffer, service = make_buffer()
+    calls = Calls()
+    try:
+        buffer.add("messages", [point(1, guild_id=1)], on_durable=calls.on("durable", 1))
+        buffer.add("messages", [point(2, guild_id=2), point(3, guild_id=1)], on_durable=calls.on("durable", 2))
+
+        buffer.flush()
+        assert calls.log == [], "Callbacks ran before the barrier"
+        print("✓ Flushed writes wait for the barrier")
+
+        buffer.barrier()
+        targets = sorted((b["shard_key_selector"], b["points"]) for b in service.client.barriers)
+        assert targets == [("guild_1", [3]), ("guild_2", [2])], targets
+        for barrier in service.client.barriers:
+            assert barrier["wait"] is True and barrier["ordering"] == WriteOrdering.STRONG
+            assert barrier["payload"] == {"guild_id": int(barrier["shard_key_selector"][6:])}
+        print("✓ One wait=True STRONG write on the last point of each shard")
+
+        assert calls.log == [("durable", 1), ("durable", 2)]
+        print("✓ on_durable ran for every write, in order")
+
+        buffer.barrier()
+        assert len(service.client.barriers) == 2
+        print("✓ Nothing awaiting: no extra barrier")
+    finally:
+        buffer.close()
+
+    print()
+    return True
+
+
+def test_failed_flush():
+    """A failed upsert hands its writes back and never marks them durable."""
+    print("Testing failed flush...")
+    print("=" * 50)
+
+    buffer, service = make_buffer()
+    calls = Calls()
+    try:
+        service.fail_upserts = True
+        buffer.add("messages", [point(1)], on_durable=calls.on("durable", 1), on_failed=calls.on("failed", 1))
+        buffer.add("sessions", [point(2)], on_durable=calls.on("durable", 2), on_failed=calls.on("failed", 2))
+        buffer.drain()
+
+        assert calls.log == [("failed", 1), ("failed", 2)]
+        print("✓ on_failed ran for both writes, on_durable never")
+
+        service.fail_upserts = False
+        buffer.drain()
+        assert service.upserts == [] and service.client.barriers == []
+        print("✓ Failed points are not re-sent from memory")
+
+        stats = buffer.get_stats()
+        assert stats["failed_batches"] == 2 and stats["failed_writes"] == 2
+        print(f"✓ Stats: {stats['failed_batches']} failed batches, {stats['failed_writes']} failed writes")
+
+        service.reject_upserts = True
+        buffer.add("messages", [point(3)], on_durable=calls.on("durable", 3), on_failed=calls.on("failed", 3))
+        buffer.drain()
+        assert calls.log[-1] == ("failed", 3) and service.client.barriers == []
+        assert buffer.get_stats()["failed_batches"] == 3
+        print("✓ An upsert that isn't acknowledged fails the same way")
+    finally:
+        buffer.close()
+
+    print()
+    return True
+
+
+def test_failed_barrier():
+    """A failed barrier is retried; writes are handed back after max_barrier_attempts."""
+    print("Testing failed barrier...")
+    print("=" * 50)
+
+    buffer, service = make_buffer(max_barrier_attempts=2)
+    calls = Calls()
+    try:
+        buffer.add("messages", [point(1)], on_durable=calls.on("durable", 1), on_failed=calls.on("failed", 1))
+        service.client.fail_barriers = 1
+        buffer.drain()
+        assert calls.log == [] and buffer.get_stats()["awaiting_barrier"] == 1
+        print("✓ First barrier failure keeps the write awaiting")
+
+        buffer.barrier()
+        assert calls.log == [("durable", 1)]
+        assert service.client.barriers[0]["points"] == [1]
+        print("✓ Retried barrier confirmed it")
+
+        buffer.add("messages", [point(2)], on_durable=calls.on("durable", 2), on_failed=calls.on("failed", 2))
+        service.client.fail_barriers = 2
+        buffer.drain()
+        buffer.barrier()
+        assert calls.log[1:] == [("failed", 2)]
+        assert buffer.get_stats()["awaiting_barrier"] == 0
+        print("✓ Handed back after max_barrier_attempts")
+
+        buffer.barrier()
+        assert len(service.client.barriers) == 1
+        print("✓ Its barrier point is dropped with it")
+    finally:
+        buffer.close()
+
+    print()
+    return True
+
+
+def test_close_fails_leftovers():
+    """Writes that are still unconfirmed at shutdown are handed back."""
+    print("Testing close with unconfirmed writes...")
+    print("=" * 50)
+
+    buffer, service = make_buffer()
+    calls = Calls()
+    buffer.add("messages", [point(1)], on_durable=calls.on("durable", 1), on_failed=calls.on("failed", 1))
+    service.client.fail_barriers = 10
+    buffer.close()
+
+    assert calls.log == [("failed", 1)]
+    assert buffer.get_stats()["awaiting_barrier"] == 0
+    print("✓ on_failed ran for the write left awaiting its barrier")
+
+    print()
+    return True
+
+
+def test_task_redelivery():
+    """The indexing tasks re-send themselves with the same session_id from on_failed."""
+    print("Testing task redelivery...")
+    print("=" * 50)
+
+    from types import SimpleNamespace
+    from apps.bot.src import tasks
+
+    sent, dead = [], []
+
+    class FakeTask:
+        name = "process_session"
+        max_retries = 2
+        retry_backoff = True
+        retry_backoff_max = 600
+        retry_jitter = False
+
+        def __init__(self, retries):
+            self.request = SimpleNamespace(id="task-1", args=[1, 2], kwargs={"end_time": "t"}, retries=retries)
+
+        def signature_from_request(self, request, kwargs=None, **options):
+            return SimpleNamespace(apply_async=lambda: sent.append((kwargs, options)))
+
+    original = tasks._push_dead_letter
+    tasks._push_dead_letter = lambda *args: dead.append(args)
+    try:
+        tasks._redeliver_on_failure(FakeTask(retries=1), "session-1")()
+        assert sent == [({"end_time": "t", "session_id": "session-1"}, {"countdown": 2, "retries": 2})]
+        print("✓ Redelivered with the session_id, next retry number and backoff")
+
+        tasks._redeliver_on_failure(FakeTask(retries=2), "session-1")()
+        assert len(sent) == 1 and dead[0][:2] == ("process_session", "task-1")
+        print("✓ Past max_retries it goes to the dead letter queue")
+    finally:
+        tasks._push_dead_letter = original
+
+    print()
+    return True
+
+
+class FakeMessagesDB:
+    """The messages table as the mark-indexed callback sees it (Postgres SQL is matched, not run)."""
+
+    def __init__(self, message_ids):
+        self.rows = {mid: {"is_deleted": False, "qdrant_point_id": None} for mid in message_ids}
+        self.marked = {}
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement, params):
+        from types import SimpleNamespace
+
+        sql = str(statement)
+        ids = [mid for mid in params["message_ids"] if mid in self.rows]
+        if sql.strip().startswith("UPDATE"):
+            for mid in ids:
+                if not self.rows[mid]["is_deleted"]:
+                    self.marked[mid] = params["session_id"]
+            return None
+        deleted = [(mid,) for mid in ids if self.rows[mid]["is_deleted"]]
+        return SimpleNamespace(fetchall=lambda: deleted)
+
+    def commit(self):
+        for mid, session_id in self.marked.items():
+            self.rows[mid]["qdrant_point_id"] = session_id
+        self.marked = {}
+
+    def rollback(self):
+        self.marked = {}
+
+
+def test_deleted_before_barrier():
+    """A message deleted between the task and the barrier takes its session with it."""
+    print("Testing delete before the buffered write is confirmed...")
+    print("=" * 50)
+
+    from apps.api.src.services import qdrant_service as qdrant_module
+    from apps.bot.src import tasks
+
+    db = FakeMessagesDB([10, 11])
+    deleted_sessions, bumps = [], []
+
+    def delete_sessions_containing_messages(guild_id, message_ids):
+        deleted_sessions.append((guild_id, message_ids))
+        return {"deleted_count": 1, "session_ids": ["session-1"]}
+
+    service = qdrant_module.qdrant_service
+    saved = (tasks.get_db_engine, tasks._invalidate_answers, service.__dict__.get("delete_sessions_containing_messages"))
+    buffer, _ = make_buffer()
+    try:
+        tasks.get_db_engine = lambda: db
+        tasks._invalidate_answers = lambda guild_id, strict=True: bumps.append(guild_id)
+        service.delete_sessions_containing_messages = delete_sessions_containing_messages
+
+        buffer.add("sessions", [point("00000000-0000-0000-0000-000000000001")],
+                   on_durable=tasks._mark_messages_indexed("session-1", [10, 11], 1))
+        # The bot soft-deletes message 11; its delete task finds no qdrant_point_id
+        db.rows[11]["is_deleted"] = True
+        buffer.drain()
+
+        assert all(row["qdrant_point_id"] is None for row in db.rows.values()), db.rows
+        assert deleted_sessions == [(1, [11])], deleted_sessions
+        assert bumps == [1]
+        print("✓ Session deleted and no message marked indexed")
+
+        db = FakeMessagesDB([12])
+        buffer.add("sessions", [point("00000000-0000-0000-0000-000000000002")],
+                   on_durable=tasks._mark_messages_indexed("session-2", [12], 1))
+        buffer.drain()
+        assert db.rows[12]["qdrant_point_id"] == "session-2" and len(deleted_sessions) == 1
+        print("✓ Without deletions the messages are marked as before")
+    finally:
+        buffer.close()
+        tasks.get_db_engine, tasks._invalidate_answers = saved[:2]
+        if saved[2] is None:
+            del service.delete_sessions_containing_messages
+        else:
+            service.delete_sessions_containing_messages = saved[2]
+
+    print()
+    return True
+
+
+def main():
+    print("\n" + "=" * 60)
+    print("QDRANT WRITE BUFFER TESTS")
+    print("=" * 60 + "\n")
+
+    results = []
+    results.append(("Flush on size", test_flush_on_size()))
+    results.append(("Flush on interval", test_flush_on_interval()))
+    results.append(("Barrier", test_barrier()))
+    results.append(("Failed flush", test_failed_flush()))
+    results.append(("Failed barrier", test_failed_barrier()))
+    results.append(("Close with unconfirmed writes", test_close_fails_leftovers()))
+    results.append(("Task redelivery", test_task_redelivery()))
+    results.append(("Deleted before barrier", test_deleted_before_barrier()))
+
+    print("=" * 60)
+    print("TEST SUMMARY")
+    print("=" * 60)
+
+    all_passed = True
+    for name, passed in results:
+        status = "✓ PASS" if passed else "✗ FAIL"
+        print(f"  {status}: {name}")
+        if not passed:
+            all_passed = False
+
+    print("=" * 60 + "\n")
+
+    return all_passed
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)